@@ -0,0 +1,95 @@
+"""Agent 对话上下文基准：比较全量历史与有界上下文在不同会话长度下的组装耗时与 token 量。
+
+用法：python agent_context_benchmark.py [会话长度 ...]
+使用临时 SQLite 库，不访问外部服务。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="qj-bench-"), "bench.sqlite3")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{DB_PATH}")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-benchmark-secret-key")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from sqlalchemy import select
+
+from app.api.v1.agent import SYSTEM_PROMPT
+from app.core.database import Base, async_session, engine
+from app.models import AgentChatMessage, AgentChatSession, User
+from app.services.agent_context import build_agent_context, message_to_llm
+from app.services.ai_governor import estimate_tokens
+
+ROUNDS = 20
+
+
+async def seed_session(length: int) -> AgentChatSession:
+    async with async_session() as db:
+        user = User(email=f"bench-{length}@example.com", nickname="bench", password_hash="x")
+        db.add(user)
+        await db.flush()
+        session = AgentChatSession(user_id=user.id, session_date=date.today(), status="active")
+        db.add(session)
+        await db.flush()
+        started = datetime(2026, 1, 1)
+        db.add_all(
+            AgentChatMessage(
+                session_id=session.id,
+                role="user" if i % 2 == 0 else "assistant",
+                content=f"第{i}条消息：今天和伴侣聊了聊工作上的压力，感觉被理解了一些。",
+                created_at=started + timedelta(seconds=i),
+            )
+            for i in range(length)
+        )
+        await db.commit()
+        return session
+
+
+async def full_history(db, session) -> list[dict]:
+    result = await db.execute(
+        select(AgentChatMessage)
+        .where(AgentChatMessage.session_id == session.id)
+        .order_by(AgentChatMessage.created_at.asc())
+    )
+    return [{"role": "system", "content": SYSTEM_PROMPT}] + [
+        message_to_llm(msg) for msg in result.scalars().all()
+    ]
+
+
+async def bounded_history(db, session) -> list[dict]:
+    context = await build_agent_context(db, session, system_prompt=SYSTEM_PROMPT)
+    await db.rollback()  # 丢弃基准中排入的摘要任务
+    return context.messages
+
+
+async def measure(builder, session) -> tuple[float, int]:
+    session_id = session.id
+    async with async_session() as db:
+        messages = await builder(db, await db.get(AgentChatSession, session_id))
+        started = time.perf_counter()
+        for _ in range(ROUNDS):
+            messages = await builder(db, await db.get(AgentChatSession, session_id))
+        elapsed_ms = (time.perf_counter() - started) * 1000 / ROUNDS
+    return elapsed_ms, estimate_tokens(messages, max_tokens=0)
+
+
+async def main(lengths: list[int]) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    print(f"{'messages':>8} {'full ms':>9} {'full tok':>9} {'bounded ms':>11} {'bounded tok':>12}")
+    for length in lengths:
+        session = await seed_session(length)
+        full_ms, full_tokens = await measure(full_history, session)
+        bounded_ms, bounded_tokens = await measure(bounded_history, session)
+        print(f"{length:>8} {full_ms:>9.2f} {full_tokens:>9} {bounded_ms:>11.2f} {bounded_tokens:>12}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main([int(arg) for arg in sys.argv[1:]] or [10, 100, 1000, 5000]))
@@ -0,0 +1,80 @@
+"""add relationship profile states
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-04-02
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0013"
+down_revision: Union[str, None] = "0012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    existing_tables = set(inspector.get_table_names())
+    if "relationship_profile_states" in existing_tables:
+        return
+
+    op.create_table(
+        "relationship_profile_states",
+        sa.Column(
+            "id",
+            postgresql.UUID(as_uuid=True),
+            primary_key=True,
+            nullable=False,
+        ),
+        sa.Column(
+            "pair_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("pairs.id"),
+            nullable=True,
+        ),
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id"),
+            nullable=True,
+        ),
+        sa.Column("covered_from", sa.Date(), nullable=False),
+        sa.Column("day_buckets", sa.JSON(), nullable=False),
+        sa.Column("last_rebuilt_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_relationship_profile_states_pair_id",
+        "relationship_profile_states",
+        ["pair_id"],
+        unique=True,
+    )
+    op.create_index(
+        "ix_relationship_profile_states_user_id",
+        "relationship_profile_states",
+        ["user_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_relationship_profile_states_user_id",
+        table_name="relationship_profile_states",
+    )
+    op.drop_index(
+        "ix_relationship_profile_states_pair_id",
+        table_name="relationship_profile_states",
+    )
+    op.drop_table("relationship_profile_states")
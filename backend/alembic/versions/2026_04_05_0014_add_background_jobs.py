@@ -0,0 +1,84 @@
+"""add background jobs
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-04-05
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0014"
+down_revision: Union[str, None] = "0013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    existing_tables = set(inspector.get_table_names())
+    if "background_jobs" in existing_tables:
+        return
+
+    op.create_table(
+        "background_jobs",
+        sa.Column(
+            "id",
+            postgresql.UUID(as_uuid=True),
+            primary_key=True,
+            nullable=False,
+        ),
+        sa.Column("job_type", sa.String(length=60), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("dedupe_key", sa.String(length=160), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("max_attempts", sa.Integer(), nullable=False),
+        sa.Column("run_after", sa.DateTime(), nullable=False),
+        sa.Column("locked_by", sa.String(length=80), nullable=True),
+        sa.Column("locked_at", sa.DateTime(), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_background_jobs_job_type",
+        "background_jobs",
+        ["job_type"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_background_jobs_status",
+        "background_jobs",
+        ["status"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_background_jobs_dedupe_key",
+        "background_jobs",
+        ["dedupe_key"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_background_jobs_run_after",
+        "background_jobs",
+        ["run_after"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_background_jobs_run_after", table_name="background_jobs")
+    op.drop_index("ix_background_jobs_dedupe_key", table_name="background_jobs")
+    op.drop_index("ix_background_jobs_status", table_name="background_jobs")
+    op.drop_index("ix_background_jobs_job_type", table_name="background_jobs")
+    op.drop_table("background_jobs")
@@ -0,0 +1,58 @@
+"""add agent context summary
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-04-08
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0015"
+down_revision: Union[str, None] = "0014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    session_columns = {
+        column["name"] for column in inspector.get_columns("agent_chat_sessions")
+    }
+    if "context_summary" not in session_columns:
+        op.add_column(
+            "agent_chat_sessions",
+            sa.Column("context_summary", sa.Text(), nullable=True),
+        )
+    if "context_summary_until" not in session_columns:
+        op.add_column(
+            "agent_chat_sessions",
+            sa.Column("context_summary_until", sa.DateTime(), nullable=True),
+        )
+
+    message_indexes = {
+        index["name"] for index in inspector.get_indexes("agent_chat_messages")
+    }
+    if "ix_agent_chat_messages_session_id_created_at" not in message_indexes:
+        op.create_index(
+            "ix_agent_chat_messages_session_id_created_at",
+            "agent_chat_messages",
+            ["session_id", "created_at"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_agent_chat_messages_session_id_created_at",
+        table_name="agent_chat_messages",
+    )
+    op.drop_column("agent_chat_sessions", "context_summary_until")
+    op.drop_column("agent_chat_sessions", "context_summary")
@@ -0,0 +1,74 @@
+"""add checkin streaks
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-04-11
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0016"
+down_revision: Union[str, None] = "0015"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    existing_tables = set(inspector.get_table_names())
+    if "checkin_streaks" in existing_tables:
+        return
+
+    # 旧数据不在迁移中回填：下次打卡时按历史建立，回填请执行 python -m app.rebuild_streaks；
+    # 在此之前读取走只读的历史扫描
+    op.create_table(
+        "checkin_streaks",
+        sa.Column(
+            "id",
+            postgresql.UUID(as_uuid=True),
+            primary_key=True,
+            nullable=False,
+        ),
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id"),
+            nullable=False,
+        ),
+        sa.Column(
+            "pair_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("pairs.id"),
+            nullable=True,
+        ),
+        sa.Column("scope_key", sa.String(length=40), nullable=False),
+        sa.Column("current_streak", sa.Integer(), nullable=False),
+        sa.Column("longest_streak", sa.Integer(), nullable=False),
+        sa.Column("total_checkins", sa.Integer(), nullable=False),
+        sa.Column("last_checkin_date", sa.Date(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_checkin_streaks_user_id_scope_key",
+        "checkin_streaks",
+        ["user_id", "scope_key"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_checkin_streaks_user_id_scope_key",
+        table_name="checkin_streaks",
+    )
+    op.drop_table("checkin_streaks")
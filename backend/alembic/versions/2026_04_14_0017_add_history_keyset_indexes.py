@@ -0,0 +1,69 @@
+"""add history keyset indexes
+
+Revision ID: 0017
+Revises: 0016
+Create Date: 2026-04-14
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0017"
+down_revision: Union[str, None] = "0016"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# 历史列表按 (排序列, id) 倒序 keyset 分页，索引以范围列开头、分页键结尾
+HISTORY_INDEXES = (
+    (
+        "checkins",
+        "ix_checkins_user_id_pair_id_checkin_date_id",
+        ["user_id", "pair_id", "checkin_date", "id"],
+    ),
+    (
+        "reports",
+        "ix_reports_pair_id_type_status_report_date_id",
+        ["pair_id", "type", "status", "report_date", "id"],
+    ),
+    (
+        "reports",
+        "ix_reports_user_id_type_status_report_date_id",
+        ["user_id", "type", "status", "report_date", "id"],
+    ),
+    (
+        "user_notifications",
+        "ix_user_notifications_user_id_created_at_id",
+        ["user_id", "created_at", "id"],
+    ),
+    (
+        "relationship_events",
+        "ix_relationship_events_pair_id_occurred_at_id",
+        ["pair_id", "occurred_at", "id"],
+    ),
+    (
+        "relationship_events",
+        "ix_relationship_events_user_id_occurred_at_id",
+        ["user_id", "occurred_at", "id"],
+    ),
+)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    for table_name, index_name, columns in HISTORY_INDEXES:
+        existing = {index["name"] for index in inspector.get_indexes(table_name)}
+        if index_name not in existing:
+            op.create_index(index_name, table_name, columns, unique=False)
+
+
+def downgrade() -> None:
+    for table_name, index_name, _columns in reversed(HISTORY_INDEXES):
+        op.drop_index(index_name, table_name=table_name)
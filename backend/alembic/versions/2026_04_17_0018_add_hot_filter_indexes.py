@@ -0,0 +1,74 @@
+"""add hot filter indexes
+
+Revision ID: 0018
+Revises: 0017
+Create Date: 2026-04-17
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0018"
+down_revision: Union[str, None] = "0017"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# 单人打卡 (user_id, pair_id IS NULL, checkin_date) 与报告 (pair_id, type, status,
+# report_date) 已由 0017 的 keyset 索引覆盖，这里不重复建
+HOT_FILTER_INDEXES = (
+    (
+        "checkins",
+        "ix_checkins_pair_id_checkin_date",
+        ["pair_id", "checkin_date"],
+    ),
+    (
+        "relationship_events",
+        "ix_relationship_events_pair_id_event_type_occurred_at",
+        ["pair_id", "event_type", "occurred_at"],
+    ),
+    (
+        "crisis_alerts",
+        "ix_crisis_alerts_pair_id_status_created_at",
+        ["pair_id", "status", "created_at"],
+    ),
+    (
+        "long_distance_activities",
+        "ix_long_distance_activities_pair_id_created_at",
+        ["pair_id", "created_at"],
+    ),
+)
+
+QUEUED_JOBS_INDEX = "ix_background_jobs_queued_job_type_run_after"
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    for table_name, index_name, columns in HOT_FILTER_INDEXES:
+        existing = {index["name"] for index in inspector.get_indexes(table_name)}
+        if index_name not in existing:
+            op.create_index(index_name, table_name, columns, unique=False)
+
+    job_indexes = {index["name"] for index in inspector.get_indexes("background_jobs")}
+    if QUEUED_JOBS_INDEX not in job_indexes:
+        op.create_index(
+            QUEUED_JOBS_INDEX,
+            "background_jobs",
+            ["job_type", "run_after"],
+            unique=False,
+            postgresql_where=sa.text("status = 'queued'"),
+            sqlite_where=sa.text("status = 'queued'"),
+        )
+
+
+def downgrade() -> None:
+    op.drop_index(QUEUED_JOBS_INDEX, table_name="background_jobs")
+    for table_name, index_name, _columns in reversed(HOT_FILTER_INDEXES):
+        op.drop_index(index_name, table_name=table_name)
@@ -0,0 +1,150 @@
+"""split view telemetry and privacy audit out of relationship_events
+
+Revision ID: 0019
+Revises: 0018
+Create Date: 2026-04-20
+
+"""
+
+from datetime import date
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0019"
+down_revision: Union[str, None] = "0018"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+EVENT_COLUMNS = (
+    "id",
+    "pair_id",
+    "user_id",
+    "event_type",
+    "entity_type",
+    "entity_id",
+    "source",
+    "payload",
+    "idempotency_key",
+    "occurred_at",
+    "created_at",
+)
+
+VIEW_INDEXES = (
+    ("idempotency_key", ["idempotency_key"]),
+    ("user_id_occurred_at", ["user_id", "occurred_at"]),
+)
+PRIVACY_INDEXES = (
+    ("occurred_at_id", ["occurred_at", "id"]),
+    ("user_id_occurred_at_id", ["user_id", "occurred_at", "id"]),
+    ("pair_id_occurred_at_id", ["pair_id", "occurred_at", "id"]),
+    ("event_type_occurred_at", ["event_type", "occurred_at"]),
+)
+
+# (热表, 归档表, 索引, 从 relationship_events 迁出的条件)
+EVENT_LOG_TABLES = (
+    (
+        "relationship_view_events",
+        "relationship_view_events_archive",
+        VIEW_INDEXES,
+        "event_type NOT LIKE 'privacy.%' AND "
+        "(event_type LIKE '%.viewed' OR event_type LIKE '%!_viewed' ESCAPE '!')",
+    ),
+    (
+        "privacy_audit_events",
+        "privacy_audit_events_archive",
+        PRIVACY_INDEXES,
+        "event_type LIKE 'privacy.%'",
+    ),
+)
+
+MONTHS_AHEAD = 3
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_event_log_table(table_name: str, indexes: tuple, postgres: bool) -> None:
+    op.create_table(
+        table_name,
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("pair_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("event_type", sa.String(length=50), nullable=False),
+        sa.Column("entity_type", sa.String(length=50), nullable=True),
+        sa.Column("entity_id", sa.String(length=64), nullable=True),
+        sa.Column("source", sa.String(length=30), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=True),
+        sa.Column("idempotency_key", sa.String(length=100), nullable=True),
+        sa.Column("occurred_at", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id", "occurred_at"),
+        postgresql_partition_by="RANGE (occurred_at)",
+    )
+    if postgres:
+        op.execute(
+            f"CREATE TABLE {table_name}_default PARTITION OF {table_name} DEFAULT"
+        )
+    for suffix, columns in indexes:
+        op.create_index(f"ix_{table_name}_{suffix}", table_name, columns, unique=False)
+
+
+def _create_month_partitions(conn, table_name: str, condition: str) -> None:
+    # 从已有数据最早的月份建到未来 MONTHS_AHEAD 个月，迁入的旧数据落进月分区
+    earliest = conn.execute(
+        sa.text(f"SELECT min(occurred_at) FROM relationship_events WHERE {condition}")
+    ).scalar()
+    current = date.today().replace(day=1)
+    month = earliest.date().replace(day=1) if earliest else current
+    while month <= _add_months(current, MONTHS_AHEAD):
+        upper = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE {table_name}_p{month:%Y%m} PARTITION OF {table_name} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        month = upper
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    postgres = conn.dialect.name == "postgresql"
+
+    existing_tables = set(inspector.get_table_names())
+    columns = ", ".join(EVENT_COLUMNS)
+    for hot_table, archive_table, indexes, condition in EVENT_LOG_TABLES:
+        if hot_table in existing_tables:
+            continue
+        _create_event_log_table(hot_table, indexes, postgres)
+        _create_event_log_table(archive_table, indexes, postgres)
+        if postgres:
+            _create_month_partitions(conn, hot_table, condition)
+
+        # 被干预计划引用的事件留在原表，避免破坏外键；0023 解除引用后再迁出
+        moved = (
+            f"{condition} AND id NOT IN (SELECT trigger_event_id "
+            "FROM intervention_plans WHERE trigger_event_id IS NOT NULL)"
+        )
+        op.execute(
+            f"INSERT INTO {hot_table} ({columns}) "
+            f"SELECT {columns} FROM relationship_events WHERE {moved}"
+        )
+        op.execute(f"DELETE FROM relationship_events WHERE {moved}")
+
+
+def downgrade() -> None:
+    columns = ", ".join(EVENT_COLUMNS)
+    for hot_table, archive_table, _indexes, _condition in reversed(EVENT_LOG_TABLES):
+        for table_name in (archive_table, hot_table):
+            op.execute(
+                f"INSERT INTO relationship_events ({columns}) "
+                f"SELECT {columns} FROM {table_name}"
+            )
+            op.drop_table(table_name)
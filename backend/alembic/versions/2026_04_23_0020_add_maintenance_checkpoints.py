@@ -0,0 +1,39 @@
+"""add maintenance checkpoints
+
+Revision ID: 0020
+Revises: 0019
+Create Date: 2026-04-23
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0020"
+down_revision: Union[str, None] = "0019"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    existing_tables = set(inspector.get_table_names())
+    if "maintenance_checkpoints" in existing_tables:
+        return
+
+    op.create_table(
+        "maintenance_checkpoints",
+        sa.Column("name", sa.String(length=80), primary_key=True, nullable=False),
+        sa.Column("state", sa.JSON(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("maintenance_checkpoints")
@@ -0,0 +1,107 @@
+"""add uploads ownership table
+
+Revision ID: 0021
+Revises: 0020
+Create Date: 2026-04-24
+
+"""
+
+from datetime import datetime, timezone
+from typing import Sequence, Union
+from urllib.parse import urlparse
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0021"
+down_revision: Union[str, None] = "0020"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+UPLOAD_PREFIX = "/uploads/"
+BATCH_SIZE = 1000
+
+
+def _storage_path(value):
+    # 与 upload_access.normalize_upload_storage_path 保持一致
+    if not value or not str(value).strip():
+        return None
+    raw = str(value).strip()
+    parsed = urlparse(raw)
+    candidate = parsed.path if parsed.scheme or parsed.netloc else raw.split("?", 1)[0]
+    return candidate if candidate.startswith(UPLOAD_PREFIX) else None
+
+
+def _backfill(conn, uploads_table) -> None:
+    # 旧的归属判定：头像优先归本人；否则看引用它的打卡，配对打卡归整个配对
+    owners: dict[str, tuple] = {}
+    checkins = conn.execute(
+        sa.text(
+            "SELECT user_id, pair_id, image_url, voice_url FROM checkins "
+            "WHERE image_url IS NOT NULL OR voice_url IS NOT NULL"
+        )
+    )
+    for user_id, pair_id, image_url, voice_url in checkins:
+        for value in (image_url, voice_url):
+            path = _storage_path(value)
+            if path:
+                owners.setdefault(path, (user_id, pair_id))
+    users = conn.execute(
+        sa.text(
+            "SELECT id, avatar_url, wechat_avatar FROM users "
+            "WHERE avatar_url IS NOT NULL OR wechat_avatar IS NOT NULL"
+        )
+    )
+    for user_id, avatar_url, wechat_avatar in users:
+        for value in (avatar_url, wechat_avatar):
+            path = _storage_path(value)
+            if path:
+                owners[path] = (user_id, None)
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    rows = [
+        {
+            "path": path,
+            "owner_user_id": user_id,
+            "pair_id": pair_id,
+            "kind": path[len(UPLOAD_PREFIX) :].split("/", 1)[0][:20],
+            "created_at": now,
+        }
+        for path, (user_id, pair_id) in owners.items()
+    ]
+    for offset in range(0, len(rows), BATCH_SIZE):
+        conn.execute(uploads_table.insert(), rows[offset : offset + BATCH_SIZE])
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    existing_tables = set(inspector.get_table_names())
+    if "uploads" in existing_tables:
+        return
+
+    uploads_table = op.create_table(
+        "uploads",
+        sa.Column("path", sa.String(length=500), primary_key=True, nullable=False),
+        sa.Column("owner_user_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("pair_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["owner_user_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["pair_id"], ["pairs.id"]),
+    )
+    op.create_index("ix_uploads_owner_user_id", "uploads", ["owner_user_id"], unique=False)
+    op.create_index("ix_uploads_pair_id", "uploads", ["pair_id"], unique=False)
+    _backfill(conn, uploads_table)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_uploads_pair_id", table_name="uploads")
+    op.drop_index("ix_uploads_owner_user_id", table_name="uploads")
+    op.drop_table("uploads")
@@ -0,0 +1,79 @@
+"""add background job claim token and active dedupe index
+
+Revision ID: 0022
+Revises: 0021
+Create Date: 2026-04-26
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0022"
+down_revision: Union[str, None] = "0021"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ACTIVE_DEDUPE_INDEX = "ux_background_jobs_active_dedupe_key"
+ACTIVE_WHERE = "status IN ('queued', 'running')"
+
+
+def _retire_duplicate_active_jobs(conn) -> None:
+    # 旧的 SELECT-then-INSERT 去重有竞态，可能留下同 key 的多个活跃任务；
+    # 每个 key 保留最早的一条，其余标为 dead，唯一索引才能建立
+    rows = conn.execute(
+        sa.text(
+            "SELECT id, dedupe_key FROM background_jobs "
+            f"WHERE dedupe_key IS NOT NULL AND {ACTIVE_WHERE} "
+            "ORDER BY dedupe_key, created_at, id"
+        )
+    ).all()
+    seen: set[str] = set()
+    duplicates = []
+    for job_id, dedupe_key in rows:
+        if dedupe_key in seen:
+            duplicates.append(job_id)
+        seen.add(dedupe_key)
+    for job_id in duplicates:
+        conn.execute(
+            sa.text(
+                "UPDATE background_jobs SET status = 'dead', "
+                "last_error = 'duplicate dedupe_key', locked_by = NULL, locked_at = NULL "
+                "WHERE id = :id"
+            ),
+            {"id": job_id},
+        )
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    columns = {column["name"] for column in inspector.get_columns("background_jobs")}
+    if "claim_token" not in columns:
+        op.add_column(
+            "background_jobs",
+            sa.Column("claim_token", sa.String(length=36), nullable=True),
+        )
+
+    indexes = {index["name"] for index in inspector.get_indexes("background_jobs")}
+    if ACTIVE_DEDUPE_INDEX not in indexes:
+        _retire_duplicate_active_jobs(conn)
+        op.create_index(
+            ACTIVE_DEDUPE_INDEX,
+            "background_jobs",
+            ["dedupe_key"],
+            unique=True,
+            postgresql_where=sa.text(ACTIVE_WHERE),
+            sqlite_where=sa.text(ACTIVE_WHERE),
+        )
+
+
+def downgrade() -> None:
+    op.drop_index(ACTIVE_DEDUPE_INDEX, table_name="background_jobs")
+    op.drop_column("background_jobs", "claim_token")
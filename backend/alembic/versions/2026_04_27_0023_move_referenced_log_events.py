@@ -0,0 +1,109 @@
+"""move plan-referenced view and privacy events out of relationship_events
+
+Revision ID: 0023
+Revises: 0022
+Create Date: 2026-04-27
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0023"
+down_revision: Union[str, None] = "0022"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+EVENT_COLUMNS = (
+    "id",
+    "pair_id",
+    "user_id",
+    "event_type",
+    "entity_type",
+    "entity_id",
+    "source",
+    "payload",
+    "idempotency_key",
+    "occurred_at",
+    "created_at",
+)
+
+# (热表, 归档表, 事件族条件)，与 0019 一致
+EVENT_LOG_TABLES = (
+    (
+        "relationship_view_events",
+        "relationship_view_events_archive",
+        "event_type NOT LIKE 'privacy.%' AND "
+        "(event_type LIKE '%.viewed' OR event_type LIKE '%!_viewed' ESCAPE '!')",
+    ),
+    (
+        "privacy_audit_events",
+        "privacy_audit_events_archive",
+        "event_type LIKE 'privacy.%'",
+    ),
+)
+
+
+def upgrade() -> None:
+    # 0019 把被干预计划引用的浏览/隐私事件留在了 relationship_events，
+    # 隐私事件列表、保留期清扫和账号清除都看不到它们。这里解除计划引用后迁出：
+    # 计划只应由业务事件触发，trigger_event_id 置空不影响计划本身
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    if "relationship_events" not in existing_tables:
+        return
+
+    columns = ", ".join(EVENT_COLUMNS)
+    for hot_table, archive_table, condition in EVENT_LOG_TABLES:
+        if hot_table not in existing_tables:
+            continue
+        legacy = f"SELECT id FROM relationship_events WHERE {condition}"
+        conn.execute(
+            sa.text(
+                "UPDATE intervention_plans SET trigger_event_id = NULL "
+                f"WHERE trigger_event_id IN ({legacy})"
+            )
+        )
+
+        # 归档层的行都比热表旧：不晚于归档层最新一行的旧事件进归档，其余进热表
+        archive_latest = conn.execute(
+            sa.text(f"SELECT max(occurred_at) FROM {archive_table}")
+        ).scalar()
+        if archive_latest is not None:
+            conn.execute(
+                sa.text(
+                    f"INSERT INTO {archive_table} ({columns}) "
+                    f"SELECT {columns} FROM relationship_events "
+                    f"WHERE {condition} AND occurred_at <= :latest"
+                ),
+                {"latest": archive_latest},
+            )
+            conn.execute(
+                sa.text(
+                    f"DELETE FROM relationship_events "
+                    f"WHERE {condition} AND occurred_at <= :latest"
+                ),
+                {"latest": archive_latest},
+            )
+        conn.execute(
+            sa.text(
+                f"INSERT INTO {hot_table} ({columns}) "
+                f"SELECT {columns} FROM relationship_events WHERE {condition}"
+            )
+        )
+        conn.execute(sa.text(f"DELETE FROM relationship_events WHERE {condition}"))
+
+
+def downgrade() -> None:
+    # upgrade 置空了 trigger_event_id，原引用没有留存，无法恢复；
+    # 静默放行会让回滚后的计划悄悄丢失触发事件，所以明确拒绝
+    raise RuntimeError(
+        "0023 is irreversible: the intervention plan references it cleared "
+        "cannot be restored. Restore a pre-0023 backup to go below 0023."
+    )
@@ -0,0 +1,42 @@
+"""add agent context summary cursor id
+
+Revision ID: 0024
+Revises: 0023
+Create Date: 2026-04-28
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0024"
+down_revision: Union[str, None] = "0023"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    # 摘要游标改为 (created_at, id)：同一时间戳的消息不会因只比较 created_at 而被跳过。
+    # 旧会话该列为空，下次折叠前仍按 created_at 比较。
+    session_columns = {
+        column["name"] for column in inspector.get_columns("agent_chat_sessions")
+    }
+    if "context_summary_until_id" not in session_columns:
+        op.add_column(
+            "agent_chat_sessions",
+            sa.Column(
+                "context_summary_until_id", postgresql.UUID(as_uuid=True), nullable=True
+            ),
+        )
+
+
+def downgrade() -> None:
+    op.drop_column("agent_chat_sessions", "context_summary_until_id")
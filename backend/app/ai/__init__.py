@@ -2,13 +2,20 @@
 
 import json
 import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
 from openai import AsyncOpenAI
+from openai.types.chat import ChatCompletion
 from app.core.config import settings
+from app.services.ai_governor import ai_call_slot, estimate_tokens
+from app.services.llm_cache import llm_cache_get, llm_cache_key, llm_cache_set, llm_cache_ttl
 from app.services.privacy_sandbox import redact_message_payload
 from app.services.privacy_audit import (
     get_privacy_audit_context,
     log_privacy_ai_chat,
     log_privacy_transcription,
+    privacy_audit_scope,
 )
 
 
@@ -31,6 +38,32 @@ def _resolve_provider_name() -> str:
     return "compatible-gateway"
 
 
+_TOKEN_USAGE: ContextVar[dict | None] = ContextVar("ai_token_usage", default=None)
+
+
+@contextmanager
+def track_token_usage():
+    """统计代码块内模型调用的 token 用量（以服务商返回的 usage 为准）"""
+    usage = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    token = _TOKEN_USAGE.set(usage)
+    try:
+        yield usage
+    finally:
+        _TOKEN_USAGE.reset(token)
+
+
+def _record_token_usage(response) -> None:
+    meter = _TOKEN_USAGE.get()
+    if meter is None:
+        return
+    meter["calls"] += 1
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+        meter[key] += int(getattr(usage, key, 0) or 0)
+
+
 client = AsyncOpenAI(
     api_key=_resolve_api_key(),
     base_url=_resolve_base_url(),
@@ -59,20 +92,61 @@ async def create_chat_completion(
     """统一聊天出口，便于挂载隐私沙盒与后续审计。"""
     safe_messages = redact_message_payload(messages)
     audit_context = get_privacy_audit_context()
+    run_type = str(audit_context.get("run_type") or "chat_completion")
     started_at = time.perf_counter()
-    try:
-        response = await client.chat.completions.create(
+
+    cache_key = None
+    cache_ttl = 0 if kwargs.get("stream") else llm_cache_ttl(run_type)
+    if cache_ttl:
+        cache_key = llm_cache_key(
             model=model,
             messages=safe_messages,
             temperature=temperature,
-            **kwargs,
+            options=kwargs,
         )
+        cached = await llm_cache_get(cache_key)
+        if cached is not None:
+            response = ChatCompletion.model_validate(cached)
+            await log_privacy_ai_chat(
+                audit_context.get("db"),
+                model=model,
+                provider=_resolve_provider_name(),
+                run_type=run_type,
+                scope=str(audit_context.get("scope") or "solo"),
+                user_id=audit_context.get("user_id"),
+                pair_id=audit_context.get("pair_id"),
+                raw_messages=messages,
+                redacted_messages=safe_messages,
+                raw_output=response.choices[0].message.content if response.choices else None,
+                latency_ms=int((time.perf_counter() - started_at) * 1000),
+                status="cache_hit",
+            )
+            return response
+
+    try:
+        async with ai_call_slot(
+            model=model,
+            audit_context=audit_context,
+            run_type=run_type,
+            estimated_tokens=estimate_tokens(
+                safe_messages, max_tokens=kwargs.get("max_tokens")
+            ),
+        ) as usage:
+            response = await client.chat.completions.create(
+                model=model,
+                messages=safe_messages,
+                temperature=temperature,
+                **kwargs,
+            )
+            usage["total_tokens"] = getattr(
+                getattr(response, "usage", None), "total_tokens", None
+            )
     except Exception as exc:
         await log_privacy_ai_chat(
             audit_context.get("db"),
             model=model,
             provider=_resolve_provider_name(),
-            run_type=str(audit_context.get("run_type") or "chat_completion"),
+            run_type=run_type,
             scope=str(audit_context.get("scope") or "solo"),
             user_id=audit_context.get("user_id"),
             pair_id=audit_context.get("pair_id"),
@@ -85,6 +159,7 @@ async def create_chat_completion(
         )
         raise
 
+    _record_token_usage(response)
     output_preview = None
     if getattr(response, "choices", None):
         message = response.choices[0].message
@@ -94,7 +169,7 @@ async def create_chat_completion(
         audit_context.get("db"),
         model=model,
         provider=_resolve_provider_name(),
-        run_type=str(audit_context.get("run_type") or "chat_completion"),
+        run_type=run_type,
         scope=str(audit_context.get("scope") or "solo"),
         user_id=audit_context.get("user_id"),
         pair_id=audit_context.get("pair_id"),
@@ -104,9 +179,134 @@ async def create_chat_completion(
         latency_ms=int((time.perf_counter() - started_at) * 1000),
         status="completed",
     )
+    if cache_key:
+        await llm_cache_set(cache_key, response.model_dump(mode="json"), cache_ttl)
     return response
 
 
+_STREAM_STATS = {"streams": 0, "errors": 0}
+_STREAM_TTFT_MS: deque[int] = deque(maxlen=500)
+
+
+def _merge_tool_call_deltas(tool_calls: dict[int, dict], deltas) -> None:
+    for delta in deltas or []:
+        entry = tool_calls.setdefault(
+            delta.index,
+            {"id": "", "type": "function", "function": {"name": "", "arguments": ""}},
+        )
+        if delta.id:
+            entry["id"] = delta.id
+        if delta.function is not None:
+            if delta.function.name:
+                entry["function"]["name"] += delta.function.name
+            if delta.function.arguments:
+                entry["function"]["arguments"] += delta.function.arguments
+
+
+async def stream_chat_completion(
+    model: str,
+    messages: list[dict],
+    temperature: float = 0.7,
+    **kwargs,
+):
+    """流式聊天出口：逐段产出 {"type": "delta"}，结束时产出 {"type": "done"}（含完整消息与首字耗时）。"""
+    safe_messages = redact_message_payload(messages)
+    audit_context = get_privacy_audit_context()
+    run_type = str(audit_context.get("run_type") or "chat_completion")
+    started_at = time.perf_counter()
+    ttft_ms = None
+    content_parts: list[str] = []
+    tool_calls: dict[int, dict] = {}
+    _STREAM_STATS["streams"] += 1
+
+    try:
+        async with ai_call_slot(
+            model=model,
+            audit_context=audit_context,
+            run_type=run_type,
+            estimated_tokens=estimate_tokens(
+                safe_messages, max_tokens=kwargs.get("max_tokens")
+            ),
+        ) as usage:
+            stream = await client.chat.completions.create(
+                model=model,
+                messages=safe_messages,
+                temperature=temperature,
+                stream=True,
+                **kwargs,
+            )
+            async for chunk in stream:
+                if getattr(chunk, "usage", None) is not None:
+                    usage["total_tokens"] = chunk.usage.total_tokens
+                    _record_token_usage(chunk)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if ttft_ms is None and (delta.content or delta.tool_calls):
+                    ttft_ms = int((time.perf_counter() - started_at) * 1000)
+                    _STREAM_TTFT_MS.append(ttft_ms)
+                _merge_tool_call_deltas(tool_calls, delta.tool_calls)
+                if delta.content:
+                    content_parts.append(delta.content)
+                    yield {"type": "delta", "content": delta.content}
+    except Exception as exc:
+        _STREAM_STATS["errors"] += 1
+        await log_privacy_ai_chat(
+            audit_context.get("db"),
+            model=model,
+            provider=_resolve_provider_name(),
+            run_type=run_type,
+            scope=str(audit_context.get("scope") or "solo"),
+            user_id=audit_context.get("user_id"),
+            pair_id=audit_context.get("pair_id"),
+            raw_messages=messages,
+            redacted_messages=safe_messages,
+            raw_output="".join(content_parts) or str(exc),
+            latency_ms=int((time.perf_counter() - started_at) * 1000),
+            ttft_ms=ttft_ms,
+            status="error",
+            error_code=exc.__class__.__name__,
+        )
+        raise
+
+    message = {"role": "assistant", "content": "".join(content_parts)}
+    if tool_calls:
+        message["tool_calls"] = [tool_calls[index] for index in sorted(tool_calls)]
+    latency_ms = int((time.perf_counter() - started_at) * 1000)
+    await log_privacy_ai_chat(
+        audit_context.get("db"),
+        model=model,
+        provider=_resolve_provider_name(),
+        run_type=run_type,
+        scope=str(audit_context.get("scope") or "solo"),
+        user_id=audit_context.get("user_id"),
+        pair_id=audit_context.get("pair_id"),
+        raw_messages=messages,
+        redacted_messages=safe_messages,
+        raw_output=message["content"] or json.dumps(message, ensure_ascii=False),
+        latency_ms=latency_ms,
+        ttft_ms=ttft_ms,
+        status="completed",
+    )
+    yield {"type": "done", "message": message, "ttft_ms": ttft_ms, "latency_ms": latency_ms}
+
+
+def get_chat_stream_stats() -> dict[str, int | None]:
+    samples = sorted(_STREAM_TTFT_MS)
+
+    def percentile(ratio: float) -> int | None:
+        if not samples:
+            return None
+        return samples[min(int(len(samples) * ratio), len(samples) - 1)]
+
+    return {
+        **_STREAM_STATS,
+        "ttft_ms_p50": percentile(0.5),
+        "ttft_ms_p95": percentile(0.95),
+        "ttft_ms_max": samples[-1] if samples else None,
+    }
+
+
 async def analyze_sentiment(text: str) -> dict:
     """情感分析（使用DeepSeek，性价比高）"""
     messages = [
@@ -116,7 +316,8 @@ async def analyze_sentiment(text: str) -> dict:
         },
         {"role": "user", "content": text},
     ]
-    result = await chat_completion(settings.AI_TEXT_MODEL, messages, temperature=0.3)
+    with privacy_audit_scope(run_type="sentiment_analysis"):
+        result = await chat_completion(settings.AI_TEXT_MODEL, messages, temperature=0.3)
     try:
         return json.loads(result)
     except json.JSONDecodeError:
@@ -128,10 +329,15 @@ async def transcribe_audio(file_path: str) -> str:
     audit_context = get_privacy_audit_context()
     started_at = time.perf_counter()
     try:
-        with open(file_path, "rb") as audio_file:
-            response = await client.audio.transcriptions.create(
-                model="whisper-1", file=audio_file, language="zh", response_format="text"
-            )
+        async with ai_call_slot(
+            model="whisper-1",
+            audit_context=audit_context,
+            run_type=audit_context.get("run_type"),
+        ):
+            with open(file_path, "rb") as audio_file:
+                response = await client.audio.transcriptions.create(
+                    model="whisper-1", file=audio_file, language="zh", response_format="text"
+                )
     except Exception as exc:
         await log_privacy_transcription(
             audit_context.get("db"),
@@ -3,6 +3,7 @@
 import json
 from app.ai import chat_completion
 from app.core.config import settings
+from app.services.privacy_audit import privacy_audit_scope
 
 
 ATTACHMENT_ANALYSIS_PROMPT = """你是一位精通鲍尔比依恋理论的心理学专家。请根据以下用户近期的打卡数据，分析其依恋类型。
@@ -88,7 +89,8 @@ async def analyze_attachment_style(
         {"role": "system", "content": "你是依恋理论研究专家。严格以JSON格式输出分析结果。"},
         {"role": "user", "content": prompt},
     ]
-    result = await chat_completion(settings.AI_TEXT_MODEL, messages, temperature=0.4)
+    with privacy_audit_scope(run_type="attachment_style"):
+        result = await chat_completion(settings.AI_TEXT_MODEL, messages, temperature=0.4)
     return _parse_json(result, {
         "primary_type": "secure",
         "confidence": 0.5,
@@ -5,6 +5,7 @@ import base64
 import os
 from app.ai import chat_completion, create_chat_completion
 from app.core.config import settings
+from app.services.privacy_audit import privacy_audit_scope
 
 
 # ── 专业心理学系统 Prompt ──
@@ -332,7 +333,8 @@ async def generate_milestone_report(
         {"role": "system", "content": SYSTEM_PROMPT},
         {"role": "user", "content": prompt},
     ]
-    result = await chat_completion(settings.AI_TEXT_MODEL, messages, temperature=0.7)
+    with privacy_audit_scope(run_type="milestone_report"):
+        result = await chat_completion(settings.AI_TEXT_MODEL, messages, temperature=0.7)
     return _parse_ai_json(result, {
         "growth_story": "你们的故事正在被书写中...",
         "blessing": "愿每一天都比昨天更好 ❤️",
@@ -1,5 +1,6 @@
 """API 依赖注入：获取当前用户"""
 import uuid
+from dataclasses import dataclass
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
@@ -9,6 +10,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.core.security import decode_access_token
 from app.models import User, Pair, PairStatus
+from app.services.keyset import decode_cursor
+from app.services.pair_access import (
+    PairMembership,
+    get_pair_membership,
+    remember_pair_membership,
+)
+from app.services.user_cache import load_cached_user, remember_user
 
 security_scheme = HTTPBearer()
 
@@ -29,10 +37,16 @@ def _parse_uuid_or_raise(
         raise HTTPException(status_code=status_code, detail=detail) from exc
 
 
-async def get_current_user(
+@dataclass(frozen=True, slots=True)
+class CurrentPrincipal:
+    """仅含令牌中的用户 ID，给只需要 user.id 的接口用，不查库。"""
+
+    id: uuid.UUID
+
+
+async def get_current_principal(
     credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
-    db: AsyncSession = Depends(get_db),
-) -> User:
+) -> CurrentPrincipal:
     user_id = decode_access_token(credentials.credentials)
     if not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="无效的认证令牌")
@@ -41,32 +55,86 @@ async def get_current_user(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="无效的认证令牌",
     )
-    result = await db.execute(select(User).where(User.id == normalized_user_id))
+    return CurrentPrincipal(id=normalized_user_id)
+
+
+async def get_current_user(
+    principal: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    # 先查短 TTL 用户缓存；注意缓存对象不含 password_hash，需要时请 refresh
+    user = await load_cached_user(db, principal.id)
+    if user is not None:
+        return user
+    result = await db.execute(select(User).where(User.id == principal.id))
     user = result.scalar_one_or_none()
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="用户不存在")
+    await remember_user(user)
     return user
 
 
+def _ensure_pair_member(
+    membership: PairMembership | None,
+    user: User | CurrentPrincipal,
+    *,
+    require_active: bool,
+) -> PairMembership:
+    if membership is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="配对不存在")
+    if require_active and membership.status != PairStatus.ACTIVE:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="配对不存在或未激活")
+    if not membership.has_member(user.id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="无权访问该配对")
+    return membership
+
+
+async def authorize_pair(
+    pair_id: str | uuid.UUID,
+    user: User | CurrentPrincipal,
+    db: AsyncSession,
+    *,
+    require_active: bool = True,
+) -> PairMembership:
+    """验证当前用户是否属于指定配对；走成员关系缓存，命中时不查库。
+
+    只需要成员/状态/类型的接口用它；需要配对其他字段时用 validate_pair_access。
+    """
+    normalized_pair_id = _parse_uuid_or_raise(
+        pair_id,
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="配对不存在",
+    )
+    membership = await get_pair_membership(db, normalized_pair_id)
+    return _ensure_pair_member(membership, user, require_active=require_active)
+
+
 async def validate_pair_access(
-    pair_id: str,
-    user: User,
+    pair_id: str | uuid.UUID,
+    user: User | CurrentPrincipal,
     db: AsyncSession,
     *,
     require_active: bool = True,
 ) -> Pair:
-    """验证当前用户是否属于指定配对。"""
+    """验证当前用户是否属于指定配对，并返回完整的 Pair 行。"""
     normalized_pair_id = _parse_uuid_or_raise(
         pair_id,
         status_code=status.HTTP_404_NOT_FOUND,
         detail="配对不存在",
     )
-    result = await db.execute(select(Pair).where(Pair.id == normalized_pair_id))
-    pair = result.scalar_one_or_none()
-    if not pair:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="配对不存在")
-    if require_active and pair.status != PairStatus.ACTIVE:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="配对不存在或未激活")
-    if str(user.id) not in (str(pair.user_a_id), str(pair.user_b_id)):
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="无权访问该配对")
+    pair = await db.get(Pair, normalized_pair_id)
+    membership = PairMembership.from_pair(pair) if pair else None
+    if membership is not None:
+        await remember_pair_membership(membership)
+    _ensure_pair_member(membership, user, require_active=require_active)
     return pair
+
+
+def parse_page_cursor(cursor: str | None, columns) -> tuple | None:
+    """解析分页游标；格式不合法时返回 400。"""
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor, columns)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无效的分页游标") from exc
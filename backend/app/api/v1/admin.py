@@ -2,8 +2,10 @@
 
 from fastapi import APIRouter
 
-from .admin_routes import policies, privacy
+from .admin_routes import jobs, policies, privacy, runtime
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 router.include_router(policies.router)
 router.include_router(privacy.router)
+router.include_router(runtime.router)
+router.include_router(jobs.router)
@@ -0,0 +1,89 @@
+"""Admin endpoints for the background job queue."""
+
+from __future__ import annotations
+
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import desc, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.models import BackgroundJob, User
+from app.schemas import AdminBackgroundJobResponse, AdminJobQueueStatsResponse
+from app.services.job_queue import (
+    JOB_STATUS_DEAD,
+    get_job_queue_stats,
+    job_concurrency,
+    registered_job_types,
+    retry_dead_job,
+)
+
+from .shared import get_admin_user
+
+router = APIRouter(tags=["admin"])
+
+
+@router.get("/jobs", response_model=list[AdminBackgroundJobResponse])
+async def get_admin_jobs(
+    status: str | None = None,
+    job_type: str | None = None,
+    limit: int = Query(default=50, ge=1, le=200),
+    admin_user: User = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_db),
+):
+    del admin_user
+    stmt = select(BackgroundJob)
+    if status:
+        stmt = stmt.where(BackgroundJob.status == status)
+    if job_type:
+        stmt = stmt.where(BackgroundJob.job_type == job_type)
+    result = await db.execute(stmt.order_by(desc(BackgroundJob.created_at)).limit(limit))
+    return result.scalars().all()
+
+
+@router.get("/jobs/stats", response_model=AdminJobQueueStatsResponse)
+async def get_admin_job_stats(
+    admin_user: User = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_db),
+):
+    del admin_user
+    job_types = registered_job_types()
+    return AdminJobQueueStatsResponse(
+        registered_job_types=job_types,
+        concurrency={job_type: job_concurrency(job_type) for job_type in job_types},
+        counts=await get_job_queue_stats(db),
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=AdminBackgroundJobResponse)
+async def get_admin_job(
+    job_id: uuid.UUID,
+    admin_user: User = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_db),
+):
+    del admin_user
+    job = await db.get(BackgroundJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    return job
+
+
+@router.post("/jobs/{job_id}/retry", response_model=AdminBackgroundJobResponse)
+async def retry_admin_job(
+    job_id: uuid.UUID,
+    admin_user: User = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_db),
+):
+    del admin_user
+    job = await db.get(BackgroundJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    if job.status != JOB_STATUS_DEAD:
+        raise HTTPException(status_code=400, detail="仅死信任务可以重新入队")
+    try:
+        await retry_dead_job(db, job)
+    except ValueError:
+        raise HTTPException(status_code=409, detail="已有相同去重键的任务在排队或运行")
+    await db.commit()
+    return job
@@ -5,11 +5,12 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import desc, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.api.deps import parse_page_cursor
+from app.core.database import get_admin_db, get_db
 from app.models import PrivacyDeletionRequest, RelationshipEvent, User
 from app.schemas import (
     AdminPrivacyAuditEntryResponse,
@@ -17,10 +18,17 @@ from app.schemas import (
     PrivacyDeleteReviewRequest,
     PrivacyRetentionSweepResponse,
 )
-from app.services.privacy_audit import list_privacy_events, log_privacy_event, serialize_privacy_audit_entry
+from app.services.keyset import NEXT_CURSOR_HEADER, split_page
+from app.services.privacy_audit import (
+    PRIVACY_EVENT_ORDER,
+    list_privacy_events,
+    log_privacy_event,
+    serialize_privacy_audit_entry,
+)
 from app.services.privacy_retention import (
     execute_privacy_deletion_request,
     process_due_deletion_requests,
+    remove_purged_uploads,
     run_privacy_retention_sweep,
 )
 
@@ -51,11 +59,13 @@ def _serialize_admin_delete_request(
 
 @router.get("/privacy/audits", response_model=list[AdminPrivacyAuditEntryResponse])
 async def get_admin_privacy_audits(
+    response: Response,
     event_type: str | None = None,
     user_id: str | None = None,
     pair_id: str | None = None,
     since: datetime | None = None,
     limit: int = Query(default=50, ge=1, le=200),
+    cursor: str | None = None,
     admin_user: User = Depends(get_admin_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -66,8 +76,12 @@ async def get_admin_privacy_audits(
         pair_id=pair_id,
         event_type=event_type,
         since=since,
-        limit=limit,
+        limit=limit + 1,
+        after=parse_page_cursor(cursor, PRIVACY_EVENT_ORDER),
     )
+    events, next_cursor = split_page(events, PRIVACY_EVENT_ORDER, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     payloads = []
     for event in events:
         item = serialize_privacy_audit_entry(event)
@@ -125,13 +139,15 @@ async def approve_privacy_delete_request(
     if row.status not in {"pending", "manual_review"}:
         raise HTTPException(status_code=400, detail="当前状态不允许执行")
 
-    await execute_privacy_deletion_request(
+    _, upload_paths = await execute_privacy_deletion_request(
         db,
         request_row=row,
         reviewer_id=admin_user.id,
         review_note=(req.note if req else None) or "管理员批准后执行。",
     )
     await db.commit()
+    # 提交成功后才删除文件，事务回滚时文件仍在
+    await remove_purged_uploads(upload_paths)
     user = await db.get(User, row.user_id)
     return AdminPrivacyDeleteRequestResponse(
         **_serialize_admin_delete_request(row, user)
@@ -182,7 +198,7 @@ async def reject_privacy_delete_request(
 async def admin_run_privacy_retention_sweep(
     dry_run: bool = True,
     admin_user: User = Depends(get_admin_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_admin_db),
 ):
     retention_summary = await run_privacy_retention_sweep(
         db,
@@ -196,10 +212,17 @@ async def admin_run_privacy_retention_sweep(
     )
     if not dry_run:
         await db.commit()
+    if due_summary["upload_paths"]:
+        purge_counts = due_summary["counts"]
+        purge_counts["local_uploads_removed"] = purge_counts.get(
+            "local_uploads_removed", 0
+        ) + await remove_purged_uploads(due_summary["upload_paths"])
 
     return PrivacyRetentionSweepResponse(
         **retention_summary,
         due_requests=due_summary["due_requests"],
         executed=due_summary["executed"],
         manual_review=due_summary["manual_review"],
+        failed=due_summary["failed"],
+        purge_counts=due_summary["counts"],
     )
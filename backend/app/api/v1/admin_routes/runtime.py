@@ -0,0 +1,45 @@
+"""Admin endpoints exposing in-process runtime counters."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends
+
+from app.ai import get_chat_stream_stats
+from app.core.database import get_db_pool_stats
+from app.models import User
+from app.schemas import AdminRuntimeMetricsResponse
+from app.services.ai_governor import get_ai_governor_stats
+from app.services.llm_cache import get_llm_cache_stats
+from app.services.pair_access import get_pair_access_stats
+from app.services.privacy_audit_writer import get_privacy_audit_writer_stats
+from app.services.profile_refresh import get_profile_refresh_stats
+from app.services.request_memo import get_request_memo_stats
+from app.services.today_status import get_today_status_stats
+from app.services.upload_access import get_signed_url_cache_stats
+from app.services.user_cache import get_user_cache_stats
+from app.services.view_telemetry import get_view_telemetry_stats
+
+from .shared import get_admin_user
+
+router = APIRouter(tags=["admin"])
+
+
+@router.get("/runtime/metrics", response_model=AdminRuntimeMetricsResponse)
+async def get_admin_runtime_metrics(
+    admin_user: User = Depends(get_admin_user),
+):
+    del admin_user
+    return AdminRuntimeMetricsResponse(
+        request_memo=get_request_memo_stats(),
+        profile_refresh=get_profile_refresh_stats(),
+        llm_cache=get_llm_cache_stats(),
+        ai_governor=get_ai_governor_stats(),
+        chat_stream=get_chat_stream_stats(),
+        db_pools=get_db_pool_stats(),
+        user_cache=get_user_cache_stats(),
+        pair_access=get_pair_access_stats(),
+        today_status=get_today_status_stats(),
+        view_telemetry=get_view_telemetry_stats(),
+        privacy_audit=get_privacy_audit_writer_stats(),
+        signed_upload_urls=get_signed_url_cache_stats(),
+    )
@@ -2,13 +2,21 @@
 
 import json
 import logging
+import time
 from datetime import date
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.api.deps import get_current_user, validate_pair_access
+from app.api.deps import (
+    CurrentPrincipal,
+    authorize_pair,
+    get_current_principal,
+    get_current_user,
+    validate_pair_access,
+)
 from app.models import (
     User,
     Pair,
@@ -26,13 +34,14 @@ from app.schemas import (
     MessageSimulationRequest,
     MessageSimulationResponse,
 )
-from app.ai import create_chat_completion
+from app.ai import create_chat_completion, stream_chat_completion
 from app.ai.message_simulator import simulate_message_preview
 from app.core.config import settings
 from app.core.security import create_realtime_ws_ticket
+from app.services.agent_context import build_agent_context
+from app.services.profile_refresh import request_profile_refresh
 from app.services.relationship_intelligence import (
     record_relationship_event,
-    refresh_profile_and_plan,
     refresh_profile_snapshot,
 )
 from app.services.privacy_audit import privacy_audit_scope
@@ -91,7 +100,7 @@ tools = [
 
 @router.post("/asr/ws-ticket", response_model=AgentRealtimeTicketResponse)
 async def create_agent_asr_ws_ticket(
-    user: User = Depends(get_current_user),
+    user: CurrentPrincipal = Depends(get_current_principal),
 ):
     """签发短时实时 ASR WebSocket 票据，避免把长期 JWT 放进 URL。"""
     return AgentRealtimeTicketResponse(
@@ -126,7 +135,7 @@ async def create_or_get_session(
 ):
     """获取今天的 Agent 会话，如果没有则创建一个新的"""
     if pair_id:
-        await validate_pair_access(pair_id, user, db, require_active=True)
+        await authorize_pair(pair_id, user, db, require_active=True)
 
     today = date.today()
 
@@ -161,7 +170,7 @@ async def create_or_get_session(
 )
 async def get_session_messages(
     session_id: str,
-    user: User = Depends(get_current_user),
+    user: CurrentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """获取特定会话的历史消息"""
@@ -185,6 +194,102 @@ async def get_session_messages(
     ]
 
 
+async def _get_owned_session(
+    db: AsyncSession, session_id: str, user: User
+) -> AgentChatSession:
+    session = await db.get(AgentChatSession, session_id)
+    if not session or session.user_id != user.id:
+        raise HTTPException(status_code=404, detail="会话不存在")
+    return session
+
+
+async def _prepare_chat_turn(
+    db: AsyncSession, session: AgentChatSession, content: str
+) -> list[dict]:
+    """记录用户消息并组装发给大模型的上下文（滚动摘要 + 最近消息，受 token 预算约束）"""
+    user_msg = AgentChatMessage(session_id=session.id, role="user", content=content)
+    db.add(user_msg)
+    await db.flush()
+
+    context = await build_agent_context(db, session, system_prompt=SYSTEM_PROMPT)
+    return context.messages
+
+
+def _agent_audit_scope(db: AsyncSession, session: AgentChatSession, user: User, run_type: str):
+    return privacy_audit_scope(
+        db=db,
+        user_id=user.id,
+        pair_id=session.pair_id,
+        scope="pair" if session.pair_id else "solo",
+        run_type=run_type,
+    )
+
+
+async def _run_checkin_tool(
+    db: AsyncSession,
+    session: AgentChatSession,
+    user: User,
+    background_tasks: BackgroundTasks,
+    *,
+    content: str,
+    tool_call: dict,
+) -> str | None:
+    """落库 AI 的工具调用并执行打卡提取；返回工具回执，非打卡工具返回 None"""
+    func_name = tool_call["function"]["name"]
+    func_args = json.loads(tool_call["function"]["arguments"] or "{}")
+
+    # 存下 AI 这一轮带 function call 的回复
+    assistant_msg = AgentChatMessage(
+        session_id=session.id,
+        role="assistant",
+        content=content or "",
+        payload={"tool_calls": [tool_call]},
+    )
+    db.add(assistant_msg)
+
+    if func_name != "extract_checkin_data":
+        return None
+
+    # --- 执行提取打卡的逻辑 ---
+    from app.api.v1.checkins import create_checkin
+    from app.schemas import CheckinRequest
+
+    checkin_req = CheckinRequest(
+        pair_id=session.pair_id,
+        content=func_args.get("diary_content", "通过对话生成的今日打卡..."),
+        mood_score=func_args.get("mood_score", 5),
+        interaction_freq=func_args.get("interaction_freq", 3),
+        interaction_initiative="both",
+        deep_conversation=func_args.get("deep_conversation", False),
+        task_completed=False,
+    )
+
+    try:
+        # 复用核心打卡业务逻辑（其中自带触发生成每日合拍报告等）
+        await create_checkin(
+            req=checkin_req,
+            background_tasks=background_tasks,
+            mode="solo" if not session.pair_id else None,
+            user=user,
+            db=db,
+        )
+        session.has_extracted_checkin = True
+        tool_result_content = "打卡成功生成入库！可以跟用户说一声辛苦了或者晚安。"
+    except Exception as e:
+        tool_result_content = f"保存打卡失败：{str(e)}"
+
+    # 记录 Tool 回执
+    tool_msg = AgentChatMessage(
+        session_id=session.id,
+        role="tool",
+        content=tool_result_content,
+        payload={"tool_call_id": tool_call["id"]},
+    )
+    db.add(tool_msg)
+    await db.flush()
+    return tool_result_content
+
+
 @router.post("/sessions/{session_id}/chat", response_model=AgentChatResponse)
 async def chat_with_agent(
     session_id: str,
@@ -194,57 +299,16 @@ async def chat_with_agent(
     db: AsyncSession = Depends(get_db),
 ):
     """向智能伴侣发送消息并获取回复"""
-    session = await db.get(AgentChatSession, session_id)
-    if not session or session.user_id != user.id:
-        raise HTTPException(status_code=404, detail="会话不存在")
+    session = await _get_owned_session(db, session_id, user)
 
-    # 1. 记录用户的消息
-    user_msg = AgentChatMessage(session_id=session.id, role="user", content=req.content)
-    db.add(user_msg)
-    await db.flush()
+    # 1. 记录用户的消息，组装历史消息传递给大模型
+    messages_for_llm = await _prepare_chat_turn(db, session, req.content)
 
-    # 2. 组装历史消息传递给大模型
-    result = await db.execute(
-        select(AgentChatMessage)
-        .where(AgentChatMessage.session_id == session.id)
-        .order_by(AgentChatMessage.created_at.asc())
-    )
-    history = result.scalars().all()
-
-    messages_for_llm = [{"role": "system", "content": SYSTEM_PROMPT}]
-    for msg in history:
-        tool_call_id = str((msg.payload or {}).get("tool_call_id") or "")
-        # OpenAI 格式要求如果有 tool_calls 需要特殊处理，这里简易适配
-        if msg.role == "assistant" and msg.payload and "tool_calls" in msg.payload:
-            messages_for_llm.append(
-                {
-                    "role": "assistant",
-                    "content": msg.content or "",
-                    "tool_calls": msg.payload["tool_calls"],
-                }
-            )
-        elif msg.role == "tool":
-            messages_for_llm.append(
-                {
-                    "role": "tool",
-                    "content": msg.content,
-                    "tool_call_id": tool_call_id,
-                }
-            )
-        else:
-            messages_for_llm.append({"role": msg.role, "content": msg.content})
-
-    # 3. 调用 AI (若今日已提取过打卡，就不带 tools 了，纯聊天)
+    # 2. 调用 AI (若今日已提取过打卡，就不带 tools 了，纯聊天)
     current_tools = tools if not session.has_extracted_checkin else None
 
     try:
-        with privacy_audit_scope(
-            db=db,
-            user_id=user.id,
-            pair_id=session.pair_id,
-            scope="pair" if session.pair_id else "solo",
-            run_type="agent_chat",
-        ):
+        with _agent_audit_scope(db, session, user, "agent_chat"):
             response = await create_chat_completion(
                 model=settings.AI_TEXT_MODEL,
                 messages=messages_for_llm,
@@ -254,74 +318,26 @@ async def chat_with_agent(
             )
         ai_msg = response.choices[0].message
 
-        # 4. 判断 AI 是否决意调用工具（提取打卡）
+        # 3. 判断 AI 是否决意调用工具（提取打卡）
         if ai_msg.tool_calls:
-            # 存下 AI 这一轮带 function call 的回复
             t_call = ai_msg.tool_calls[0]
-            func_name = t_call.function.name
-            func_args = json.loads(t_call.function.arguments)
-
-            assistant_msg = AgentChatMessage(
-                session_id=session.id,
-                role="assistant",
+            tool_result_content = await _run_checkin_tool(
+                db,
+                session,
+                user,
+                background_tasks,
                 content=ai_msg.content or "",
-                payload={
-                    "tool_calls": [
-                        {
-                            "id": t_call.id,
-                            "type": "function",
-                            "function": {
-                                "name": func_name,
-                                "arguments": t_call.function.arguments,
-                            },
-                        }
-                    ]
+                tool_call={
+                    "id": t_call.id,
+                    "type": "function",
+                    "function": {
+                        "name": t_call.function.name,
+                        "arguments": t_call.function.arguments,
+                    },
                 },
             )
-            db.add(assistant_msg)
-
-            # --- 执行提取打卡的逻辑 ---
-            if func_name == "extract_checkin_data":
-                # 这里引入 Checkin 的写入逻辑
-                from app.api.v1.checkins import create_checkin
-                from app.schemas import CheckinRequest
-
-                checkin_req = CheckinRequest(
-                    pair_id=session.pair_id,
-                    content=func_args.get("diary_content", "通过对话生成的今日打卡..."),
-                    mood_score=func_args.get("mood_score", 5),
-                    interaction_freq=func_args.get("interaction_freq", 3),
-                    interaction_initiative="both",
-                    deep_conversation=func_args.get("deep_conversation", False),
-                    task_completed=False,
-                )
-
-                try:
-                    # 复用核心打卡业务逻辑（其中自带触发生成每日合拍报告等）
-                    await create_checkin(
-                        req=checkin_req,
-                        background_tasks=background_tasks,
-                        mode="solo" if not session.pair_id else None,
-                        user=user,
-                        db=db,
-                    )
-                    session.has_extracted_checkin = True
-                    tool_result_content = (
-                        "打卡成功生成入库！可以跟用户说一声辛苦了或者晚安。"
-                    )
-                except Exception as e:
-                    tool_result_content = f"保存打卡失败：{str(e)}"
-
-                # 记录 Tool 回执
-                tool_msg = AgentChatMessage(
-                    session_id=session.id,
-                    role="tool",
-                    content=tool_result_content,
-                    payload={"tool_call_id": t_call.id},
-                )
-                db.add(tool_msg)
-                await db.flush()
 
+            if tool_result_content is not None:
                 # 带上回执再次让大模型生成最终文本答复
                 messages_for_llm.append(ai_msg.model_dump())
                 messages_for_llm.append(
@@ -332,13 +348,7 @@ async def chat_with_agent(
                     }
                 )
 
-                with privacy_audit_scope(
-                    db=db,
-                    user_id=user.id,
-                    pair_id=session.pair_id,
-                    scope="pair" if session.pair_id else "solo",
-                    run_type="agent_chat_followup",
-                ):
+                with _agent_audit_scope(db, session, user, "agent_chat_followup"):
                     second_response = await create_chat_completion(
                         model=settings.AI_TEXT_MODEL,
                         messages=messages_for_llm,
@@ -372,6 +382,112 @@ async def chat_with_agent(
         raise HTTPException(status_code=500, detail="AI 服务暂时不可用，请稍后再试")
 
 
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/sessions/{session_id}/chat/stream")
+async def stream_chat_with_agent(
+    session_id: str,
+    req: AgentChatRequest,
+    background_tasks: BackgroundTasks,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """流式对话（SSE）：delta 事件逐段推送回复，tool 事件提示打卡提取，done 事件给出最终结果与首字耗时"""
+    session = await _get_owned_session(db, session_id, user)
+    messages_for_llm = await _prepare_chat_turn(db, session, req.content)
+    current_tools = tools if not session.has_extracted_checkin else None
+
+    started_at = time.perf_counter()
+
+    async def event_stream():
+        action = "chat"
+        ttft_ms = None
+
+        def delta(content: str) -> str:
+            nonlocal ttft_ms
+            if ttft_ms is None:
+                ttft_ms = int((time.perf_counter() - started_at) * 1000)
+            return _sse("delta", {"content": content})
+
+        try:
+            final_message = None
+            with _agent_audit_scope(db, session, user, "agent_chat"):
+                async for item in stream_chat_completion(
+                    model=settings.AI_TEXT_MODEL,
+                    messages=messages_for_llm,
+                    temperature=0.7,
+                    tools=current_tools,
+                    tool_choice="auto" if current_tools else "none",
+                ):
+                    if item["type"] == "delta":
+                        yield delta(item["content"])
+                    else:
+                        final_message = item["message"]
+
+            reply_content = final_message["content"]
+            tool_calls = final_message.get("tool_calls") or []
+            tool_result_content = None
+            if tool_calls:
+                yield _sse("tool", {"name": tool_calls[0]["function"]["name"], "status": "running"})
+                tool_result_content = await _run_checkin_tool(
+                    db,
+                    session,
+                    user,
+                    background_tasks,
+                    content=reply_content,
+                    tool_call=tool_calls[0],
+                )
+
+            if tool_result_content is not None:
+                action = "checkin_extracted"
+                yield _sse("tool", {"name": "extract_checkin_data", "status": "done"})
+                messages_for_llm.append(
+                    {"role": "assistant", "content": reply_content, "tool_calls": tool_calls[:1]}
+                )
+                messages_for_llm.append(
+                    {
+                        "role": "tool",
+                        "tool_call_id": tool_calls[0]["id"],
+                        "content": tool_result_content,
+                    }
+                )
+                reply_parts = []
+                with _agent_audit_scope(db, session, user, "agent_chat_followup"):
+                    async for item in stream_chat_completion(
+                        model=settings.AI_TEXT_MODEL,
+                        messages=messages_for_llm,
+                        temperature=0.7,
+                    ):
+                        if item["type"] == "delta":
+                            reply_parts.append(item["content"])
+                            yield delta(item["content"])
+                reply_content = "".join(reply_parts)
+
+            if not reply_content:
+                reply_content = "抱歉，我刚刚走神了。"
+                yield delta(reply_content)
+            db.add(
+                AgentChatMessage(session_id=session.id, role="assistant", content=reply_content)
+            )
+            await db.commit()
+            yield _sse(
+                "done",
+                {"reply": reply_content, "action": action, "ttft_ms": ttft_ms},
+            )
+        except Exception:
+            await db.rollback()
+            logger.exception("agent chat stream failed")
+            yield _sse("error", {"detail": "AI 服务暂时不可用，请稍后再试"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/simulate-message", response_model=MessageSimulationResponse)
 async def simulate_message(
     req: MessageSimulationRequest,
@@ -463,7 +579,7 @@ async def simulate_message(
         },
     )
 
-    await refresh_profile_and_plan(db, pair_id=pair.id)
+    await request_profile_refresh(db, pair_id=pair.id)
 
     return MessageSimulationResponse(
         draft=req.draft,
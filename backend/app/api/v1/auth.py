@@ -10,7 +10,14 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.core.security import hash_password, verify_password, create_access_token
+from app.core.security import (
+    create_access_token,
+    hash_password,
+    hash_password_async,
+    hash_phone_code,
+    verify_password_async,
+    verify_phone_code,
+)
 from app.api.deps import get_current_user
 from app.models import User
 from app.schemas import (
@@ -27,6 +34,7 @@ from app.core.config import settings
 from app.services.phone_code_store import PhoneCodeEntry, get_phone_code_store
 from app.services.product_prefs import normalize_product_prefs
 from app.services.privacy_sandbox import sanitize_log_value
+from app.services.user_cache import invalidate_cached_user
 
 router = APIRouter(prefix="/auth", tags=["认证"])
 logger = logging.getLogger(__name__)
@@ -96,7 +104,7 @@ async def register(req: RegisterRequest, db: AsyncSession = Depends(get_db)):
     user = User(
         email=normalized_email,
         nickname=req.nickname,
-        password_hash=hash_password(req.password),
+        password_hash=await hash_password_async(req.password),
     )
     db.add(user)
     await db.flush()
@@ -130,9 +138,9 @@ async def login(req: LoginRequest, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.email == normalized_email))
     user = result.scalar_one_or_none()
     if not user:
-        verify_password(req.password, DUMMY_PASSWORD_HASH)
+        await verify_password_async(req.password, DUMMY_PASSWORD_HASH)
         _raise_invalid_login_error()
-    if not verify_password(req.password, user.password_hash):
+    if not await verify_password_async(req.password, user.password_hash):
         attempt["count"] += 1
         if attempt["count"] >= 5:
             attempt["locked_until"] = now + timedelta(minutes=15)
@@ -183,7 +191,7 @@ async def wechat_login(req: WechatLoginRequest, db: AsyncSession = Depends(get_d
         user = User(
             email=f"wx_{openid}@qinjian.local",
             nickname=req.nickname or "微信用户",
-            password_hash=hash_password(secrets.token_urlsafe(32)),
+            password_hash=await hash_password_async(secrets.token_urlsafe(32)),
             avatar_url=req.avatar_url,
             wechat_openid=openid,
             wechat_unionid=unionid,
@@ -205,6 +213,7 @@ async def wechat_login(req: WechatLoginRequest, db: AsyncSession = Depends(get_d
             updated = True
         if updated:
             await db.flush()
+            invalidate_cached_user(db, user.id)
 
     token = create_access_token(str(user.id))
     return {
@@ -242,7 +251,7 @@ async def send_phone_code(req: PhoneSendCodeRequest):
     await store.set(
         phone,
         PhoneCodeEntry(
-            code_hash=hash_password(code),
+            code_hash=hash_phone_code(phone, code),
             requested_at=now,
             expires_at=now + timedelta(minutes=settings.PHONE_CODE_EXPIRE_MINUTES),
             attempts_left=settings.PHONE_CODE_MAX_ATTEMPTS,
@@ -279,7 +288,7 @@ async def phone_login(req: PhoneLoginRequest, db: AsyncSession = Depends(get_db)
         await store.delete(phone)
         raise HTTPException(status_code=400, detail="验证码尝试次数过多，请重新获取")
 
-    if not verify_password(req.code.strip(), entry.code_hash):
+    if not await verify_phone_code(phone, req.code.strip(), entry.code_hash):
         updated = await store.decrement_attempts(phone)
         if updated and updated.attempts_left <= 0:
             await store.delete(phone)
@@ -294,7 +303,7 @@ async def phone_login(req: PhoneLoginRequest, db: AsyncSession = Depends(get_db)
             email=f"phone_{phone}@qinjian.local",
             phone=phone,
             nickname=f"手机用户{phone[-4:]}",
-            password_hash=hash_password(secrets.token_urlsafe(32)),
+            password_hash=await hash_password_async(secrets.token_urlsafe(32)),
         )
         db.add(user)
         await db.flush()
@@ -346,6 +355,7 @@ async def update_me(
         user.product_prefs = prefs
 
     await db.flush()
+    invalidate_cached_user(db, user.id)
     return _serialize_user_response(user)
 
 
@@ -356,7 +366,9 @@ async def change_password(
     db: AsyncSession = Depends(get_db),
 ):
     """修改当前用户密码"""
-    if not verify_password(req.current_password, user.password_hash):
+    # 缓存的用户对象不带 password_hash
+    await db.refresh(user, attribute_names=["password_hash"])
+    if not await verify_password_async(req.current_password, user.password_hash):
         raise HTTPException(status_code=400, detail="当前密码错误")
 
     if len(req.new_password) < MIN_PASSWORD_LENGTH:
@@ -368,6 +380,7 @@ async def change_password(
     if req.new_password == req.current_password:
         raise HTTPException(status_code=400, detail="新密码不能与当前密码相同")
 
-    user.password_hash = hash_password(req.new_password)
+    user.password_hash = await hash_password_async(req.new_password)
     await db.flush()
+    invalidate_cached_user(db, user.id)
     return {"message": "密码修改成功"}
@@ -1,20 +1,38 @@
 """打卡系统接口（Phase 3 增强：支持非对称打卡 + 个人情感日记）"""
 
 import logging
-from datetime import date, timedelta
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy import select, func
+import uuid
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Header, Query, Response
+from sqlalchemy import select, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.api.deps import get_current_user, validate_pair_access
-from app.models import User, Pair, Checkin, Report, PairStatus, ReportType, ReportStatus
+from app.api.deps import (
+    CurrentPrincipal,
+    authorize_pair,
+    get_current_principal,
+    parse_page_cursor,
+)
+from app.models import Pair, Checkin, Report, PairStatus, ReportType, ReportStatus
 from app.schemas import CheckinRequest, CheckinResponse
 from app.ai import analyze_sentiment
 from app.ai.reporter import generate_daily_report, generate_solo_report
+from app.services.checkin_streak import load_checkin_streak, record_checkin_streak
+from app.services.job_queue import enqueue_job, job_handler
+from app.services.keyset import NEXT_CURSOR_HEADER, keyset_page_query, split_page
+from app.services.pair_access import get_pair_membership
+from app.services.profile_refresh import request_profile_refresh
+from app.services.today_status import (
+    etag_matches,
+    load_today_status,
+    record_not_modified,
+    today_status_etag,
+)
+from app.services.upload_access import assign_uploads_to_pair
 from app.services.relationship_intelligence import (
     record_relationship_event,
-    refresh_profile_and_plan,
+    record_relationship_events,
 )
 
 router = APIRouter(prefix="/checkins", tags=["打卡"])
@@ -87,7 +105,7 @@ async def create_checkin(
     req: CheckinRequest,
     background_tasks: BackgroundTasks,
     mode: str | None = None,
-    user: User = Depends(get_current_user),
+    user: CurrentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """提交每日打卡（含自动AI情感分析 + 双方完成检测 + 单方solo日记）"""
@@ -96,11 +114,8 @@ async def create_checkin(
     if not is_solo:
         if not req.pair_id:
             raise HTTPException(status_code=422, detail="缺少配对ID")
-        result = await db.execute(
-            select(Pair).where(Pair.id == req.pair_id, Pair.status == PairStatus.ACTIVE)
-        )
-        pair = result.scalar_one_or_none()
-        if not pair or (pair.user_a_id != user.id and pair.user_b_id != user.id):
+        pair = await get_pair_membership(db, req.pair_id)
+        if not pair or pair.status != PairStatus.ACTIVE or not pair.has_member(user.id):
             raise HTTPException(status_code=403, detail="你不属于该配对")
 
     # 检查今日是否已打卡
@@ -142,14 +157,33 @@ async def create_checkin(
     )
     db.add(checkin)
     await db.flush()
+    if checkin.pair_id:
+        # 配对打卡里的图片和语音对伴侣可见
+        await assign_uploads_to_pair(
+            db,
+            [checkin.image_url, checkin.voice_url],
+            pair_id=checkin.pair_id,
+            owner_user_id=user.id,
+        )
+    await record_checkin_streak(
+        db, user_id=user.id, pair_id=checkin.pair_id, checkin_date=today
+    )
 
-    # 异步执行 AI 情感分析（不阻塞响应）
-    background_tasks.add_task(_run_sentiment_analysis, str(checkin.id), req.content)
+    # 异步执行 AI 情感分析（入队，由 worker 处理）
+    await enqueue_job(
+        db,
+        "checkin.sentiment",
+        {"checkin_id": str(checkin.id)},
+        dedupe_key=f"checkin.sentiment:{checkin.id}",
+    )
 
     partner_checkin = None
     if is_solo:
-        background_tasks.add_task(
-            _auto_generate_solo, None, "solo", checkin.content, str(user.id)
+        await enqueue_job(
+            db,
+            "report.auto_solo",
+            {"checkin_id": str(checkin.id)},
+            dedupe_key=f"report.auto_solo:user:{user.id}:{today}",
         )
     else:
         # 检查对方是否也打卡完毕
@@ -163,30 +197,18 @@ async def create_checkin(
         partner_checkin = partner_result.scalar_one_or_none()
 
         if partner_checkin and pair:
-            checkin_a_content = (
-                checkin.content
-                if user.id == pair.user_a_id
-                else partner_checkin.content
-            )
-            checkin_b_content = (
-                partner_checkin.content
-                if user.id == pair.user_a_id
-                else checkin.content
-            )
-            background_tasks.add_task(
-                _auto_generate_daily,
-                str(req.pair_id),
-                pair.type.value,
-                checkin_a_content,
-                checkin_b_content,
+            await enqueue_job(
+                db,
+                "report.auto_daily",
+                {"pair_id": str(req.pair_id), "report_date": today.isoformat()},
+                dedupe_key=f"report.auto_daily:{req.pair_id}:{today}",
             )
         else:
-            background_tasks.add_task(
-                _auto_generate_solo,
-                str(req.pair_id),
-                pair.type.value if pair else "solo",
-                checkin.content,
-                str(user.id),
+            await enqueue_job(
+                db,
+                "report.auto_solo",
+                {"checkin_id": str(checkin.id)},
+                dedupe_key=f"report.auto_solo:pair:{req.pair_id}:{today}",
             )
 
     # 关系树成长
@@ -199,418 +221,401 @@ async def create_checkin(
 
     context = _context_value(req)
 
+    events = []
     if context:
-        await record_relationship_event(
-            db,
-            event_type="client.precheck.completed",
-            pair_id=str(req.pair_id) if req.pair_id and not is_solo else None,
-            user_id=user.id,
-            entity_type="checkin",
-            entity_id=checkin.id,
-            source="client",
-            payload={
-                "intent": context.get("intent"),
-                "risk_level": context.get("risk_level"),
-                "upload_policy": context.get("upload_policy"),
-                "privacy_mode": context.get("privacy_mode"),
-                "client_tags": context.get("client_tags") or [],
-                "pii_summary": context.get("pii_summary") or {},
-            },
-            idempotency_key=f"checkin:{checkin.id}:client-precheck",
-        )
-
-        if str(context.get("risk_level") or "none") in {"watch", "high"}:
-            await record_relationship_event(
-                db,
-                event_type="client.risk.flagged",
-                pair_id=str(req.pair_id) if req.pair_id and not is_solo else None,
-                user_id=user.id,
-                entity_type="checkin",
-                entity_id=checkin.id,
+        events.append(
+            dict(
+                event_type="client.precheck.completed",
                 source="client",
                 payload={
                     "intent": context.get("intent"),
                     "risk_level": context.get("risk_level"),
-                    "risk_hits": context.get("risk_hits") or [],
-                },
-                idempotency_key=f"checkin:{checkin.id}:risk-flagged",
-            )
-
-        if str(context.get("privacy_mode") or "cloud") == "local_first":
-            await record_relationship_event(
-                db,
-                event_type="checkin.local_saved",
-                pair_id=str(req.pair_id) if req.pair_id and not is_solo else None,
-                user_id=user.id,
-                entity_type="checkin",
-                entity_id=checkin.id,
-                source="client",
-                payload={
                     "upload_policy": context.get("upload_policy"),
                     "privacy_mode": context.get("privacy_mode"),
+                    "client_tags": context.get("client_tags") or [],
+                    "pii_summary": context.get("pii_summary") or {},
                 },
-                idempotency_key=f"checkin:{checkin.id}:local-saved",
+                idempotency_key=f"checkin:{checkin.id}:client-precheck",
             )
-            if str(context.get("upload_policy") or "full") != "local_only":
-                await record_relationship_event(
-                    db,
-                    event_type="checkin.synced",
-                    pair_id=str(req.pair_id) if req.pair_id and not is_solo else None,
-                    user_id=user.id,
-                    entity_type="checkin",
-                    entity_id=checkin.id,
+        )
+
+        if str(context.get("risk_level") or "none") in {"watch", "high"}:
+            events.append(
+                dict(
+                    event_type="client.risk.flagged",
+                    source="client",
+                    payload={
+                        "intent": context.get("intent"),
+                        "risk_level": context.get("risk_level"),
+                        "risk_hits": context.get("risk_hits") or [],
+                    },
+                    idempotency_key=f"checkin:{checkin.id}:risk-flagged",
+                )
+            )
+
+        if str(context.get("privacy_mode") or "cloud") == "local_first":
+            events.append(
+                dict(
+                    event_type="checkin.local_saved",
                     source="client",
                     payload={
                         "upload_policy": context.get("upload_policy"),
                         "privacy_mode": context.get("privacy_mode"),
                     },
-                    idempotency_key=f"checkin:{checkin.id}:synced",
+                    idempotency_key=f"checkin:{checkin.id}:local-saved",
+                )
+            )
+            if str(context.get("upload_policy") or "full") != "local_only":
+                events.append(
+                    dict(
+                        event_type="checkin.synced",
+                        source="client",
+                        payload={
+                            "upload_policy": context.get("upload_policy"),
+                            "privacy_mode": context.get("privacy_mode"),
+                        },
+                        idempotency_key=f"checkin:{checkin.id}:synced",
+                    )
                 )
 
         if str(context.get("risk_level") or "none") == "high":
-            await record_relationship_event(
-                db,
-                event_type="safety.crisis_gate_opened",
-                pair_id=str(req.pair_id) if req.pair_id and not is_solo else None,
-                user_id=user.id,
-                entity_type="checkin",
-                entity_id=checkin.id,
-                source="client",
-                payload={
-                    "risk_hits": context.get("risk_hits") or [],
-                    "intent": context.get("intent"),
-                },
-                idempotency_key=f"checkin:{checkin.id}:crisis-gate",
+            events.append(
+                dict(
+                    event_type="safety.crisis_gate_opened",
+                    source="client",
+                    payload={
+                        "risk_hits": context.get("risk_hits") or [],
+                        "intent": context.get("intent"),
+                    },
+                    idempotency_key=f"checkin:{checkin.id}:crisis-gate",
+                )
             )
 
-    await record_relationship_event(
+    events.append(
+        dict(
+            event_type="checkin.created",
+            payload={
+                "mode": "solo" if is_solo else "pair",
+                "mood_score": req.mood_score,
+                "interaction_freq": req.interaction_freq,
+                "deep_conversation": req.deep_conversation,
+                "task_completed": req.task_completed,
+                "client_context": context,
+            },
+            idempotency_key=f"checkin:{checkin.id}:created",
+        )
+    )
+
+    # 本次打卡的事件一次查重、一次批量写入
+    await record_relationship_events(
         db,
-        event_type="checkin.created",
-        pair_id=str(req.pair_id) if req.pair_id and not is_solo else None,
-        user_id=user.id,
-        entity_type="checkin",
-        entity_id=checkin.id,
-        payload={
-            "mode": "solo" if is_solo else "pair",
-            "mood_score": req.mood_score,
-            "interaction_freq": req.interaction_freq,
-            "deep_conversation": req.deep_conversation,
-            "task_completed": req.task_completed,
-            "client_context": context,
-        },
-        idempotency_key=f"checkin:{checkin.id}:created",
+        [
+            {
+                "pair_id": str(req.pair_id) if req.pair_id and not is_solo else None,
+                "user_id": user.id,
+                "entity_type": "checkin",
+                "entity_id": checkin.id,
+                **event,
+            }
+            for event in events
+        ],
     )
 
-    await refresh_profile_and_plan(
+    await request_profile_refresh(
         db,
         pair_id=str(req.pair_id) if req.pair_id and not is_solo else None,
         user_id=str(user.id) if is_solo else None,
     )
 
+    # 后台任务会在依赖提交事务之前运行，这里先提交
+    await db.commit()
+
     return _serialize_checkin_response(checkin, context)
 
 
 @router.get("/today", response_model=dict)
 async def get_today_status(
+    response: Response,
     pair_id: str | None = None,
     mode: str | None = None,
-    user: User = Depends(get_current_user),
+    if_none_match: str | None = Header(default=None),
+    user: CurrentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
-    """查询今日打卡状态"""
+    """查询今日打卡状态（支持 ETag / If-None-Match，未变化时返回 304）"""
     today = date.today()
     is_solo = mode == "solo"
 
-    if is_solo:
-        result = await db.execute(
-            select(Checkin).where(
-                Checkin.pair_id.is_(None),
-                Checkin.user_id == user.id,
-                Checkin.checkin_date == today,
-            )
-        )
-        checkins = result.scalars().all()
-        my_checkin = checkins[0] if checkins else None
-        my_done = len(checkins) > 0
-        partner_done = False
-        both_done = False
-        report_result = await db.execute(
-            select(Report).where(
-                Report.user_id == user.id,
-                Report.report_date == today,
-                Report.type == ReportType.SOLO,
-            )
-        )
-        has_report = report_result.scalar_one_or_none() is not None
-        return {
-            "date": str(today),
-            "my_done": my_done,
-            "partner_done": partner_done,
-            "both_done": both_done,
-            "has_report": has_report,
-            "has_solo_report": has_report,
-            "my_checkin": {
-                "mood_score": my_checkin.mood_score if my_checkin else None,
-                "interaction_freq": my_checkin.interaction_freq if my_checkin else None,
-                "deep_conversation": my_checkin.deep_conversation
-                if my_checkin
-                else None,
-                "task_completed": my_checkin.task_completed if my_checkin else None,
-                "content": my_checkin.content if my_checkin else None,
-            },
-        }
-
-    if not pair_id:
-        raise HTTPException(status_code=422, detail="缺少配对ID")
-
-    await validate_pair_access(pair_id, user, db, require_active=True)
+    membership = None
+    if not is_solo:
+        if not pair_id:
+            raise HTTPException(status_code=422, detail="缺少配对ID")
+        membership = await authorize_pair(pair_id, user, db, require_active=True)
 
-    result = await db.execute(
-        select(Checkin).where(Checkin.pair_id == pair_id, Checkin.checkin_date == today)
+    etag = await today_status_etag(
+        db,
+        viewer_id=user.id,
+        pair_id=membership.id if membership else None,
+        today=today,
     )
-    checkins = result.scalars().all()
-
-    my_checkin = next((c for c in checkins if c.user_id == user.id), None)
-    my_done = my_checkin is not None
-    partner_done = any(c.user_id != user.id for c in checkins)
-    both_done = my_done and partner_done
-
-    report_result = await db.execute(
-        select(Report).where(
-            Report.pair_id == pair_id,
-            Report.report_date == today,
-            Report.type == ReportType.DAILY,
+    if etag_matches(if_none_match, etag):
+        record_not_modified()
+        return Response(
+            status_code=304,
+            headers={"ETag": etag, "Cache-Control": "private, no-cache"},
         )
-    )
-    has_report = report_result.scalar_one_or_none() is not None
 
-    solo_result = await db.execute(
-        select(Report).where(
-            Report.pair_id == pair_id,
-            Report.report_date == today,
-            Report.type == ReportType.SOLO,
-        )
+    status = await load_today_status(
+        db,
+        viewer_id=user.id,
+        pair_id=membership.id if membership else None,
+        today=today,
     )
-    has_solo_report = solo_result.scalar_one_or_none() is not None
-
-    return {
-        "date": str(today),
-        "my_done": my_done,
-        "partner_done": partner_done,
-        "both_done": both_done,
-        "has_report": has_report,
-        "has_solo_report": has_solo_report,
-        "my_checkin": {
-            "mood_score": my_checkin.mood_score if my_checkin else None,
-            "interaction_freq": my_checkin.interaction_freq if my_checkin else None,
-            "deep_conversation": my_checkin.deep_conversation if my_checkin else None,
-            "task_completed": my_checkin.task_completed if my_checkin else None,
-            "content": my_checkin.content if my_checkin else None,
-        },
-    }
+    # no-cache：浏览器会带 If-None-Match 重新验证，前端轮询无需改动
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    return status
 
 
 @router.get("/history", response_model=list[CheckinResponse])
 async def get_checkin_history(
+    response: Response,
     pair_id: str | None = None,
     mode: str | None = None,
-    limit: int = 14,
-    user: User = Depends(get_current_user),
+    limit: int = Query(default=14, ge=1, le=100),
+    cursor: str | None = None,
+    user: CurrentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
-    """获取打卡历史（隐私保护：仅返回自己的原始内容）"""
+    """获取打卡历史（隐私保护：仅返回自己的原始内容）
+
+    按 (checkin_date, id) 倒序分页；响应头 X-Next-Cursor 为下一页游标，
+    作为 cursor 参数传回即可继续翻页，没有更多时不返回该响应头。
+    """
     is_solo = mode == "solo"
+    order_columns = (Checkin.checkin_date, Checkin.id)
+    after = parse_page_cursor(cursor, order_columns)
 
     if is_solo:
-        result = await db.execute(
-            select(Checkin)
-            .where(Checkin.pair_id.is_(None), Checkin.user_id == user.id)
-            .order_by(Checkin.checkin_date.desc())
-            .limit(limit)
-        )
-        return result.scalars().all()
-
-    if not pair_id:
-        raise HTTPException(status_code=422, detail="缺少配对ID")
-
-    await validate_pair_access(pair_id, user, db, require_active=True)
+        query = select(Checkin).where(Checkin.pair_id.is_(None), Checkin.user_id == user.id)
+    else:
+        if not pair_id:
+            raise HTTPException(status_code=422, detail="缺少配对ID")
+        await authorize_pair(pair_id, user, db, require_active=True)
+        query = select(Checkin).where(Checkin.pair_id == pair_id, Checkin.user_id == user.id)
 
     result = await db.execute(
-        select(Checkin)
-        .where(Checkin.pair_id == pair_id, Checkin.user_id == user.id)
-        .order_by(Checkin.checkin_date.desc())
-        .limit(limit)
+        keyset_page_query(query, order_columns, after=after, limit=limit)
     )
-    return result.scalars().all()
+    checkins, next_cursor = split_page(result.scalars().all(), order_columns, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return checkins
 
 
 @router.get("/streak", response_model=dict)
 async def get_checkin_streak(
     pair_id: str | None = None,
     mode: str | None = None,
-    user: User = Depends(get_current_user),
+    user: CurrentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
-    """获取连续打卡天数"""
+    """获取连续打卡天数（读取增量维护的连续打卡状态）"""
     is_solo = mode == "solo"
 
-    if is_solo:
-        result = await db.execute(
-            select(Checkin.checkin_date)
-            .where(Checkin.pair_id.is_(None), Checkin.user_id == user.id)
-            .distinct()
-            .order_by(Checkin.checkin_date.desc())
-        )
-    else:
+    if not is_solo:
         if not pair_id:
             raise HTTPException(status_code=422, detail="缺少配对ID")
-        await validate_pair_access(pair_id, user, db, require_active=True)
-        result = await db.execute(
-            select(Checkin.checkin_date)
-            .where(Checkin.pair_id == pair_id, Checkin.user_id == user.id)
-            .distinct()
-            .order_by(Checkin.checkin_date.desc())
-        )
+        await authorize_pair(pair_id, user, db, require_active=True)
 
-    dates = [row[0] for row in result.all()]
-
-    streak = 0
-    expected = date.today()
-    for d in dates:
-        if d == expected:
-            streak += 1
-            expected -= timedelta(days=1)
-        elif d < expected:
-            break
-
-    return {"streak": streak, "total_checkins": len(dates)}
+    summary = await load_checkin_streak(
+        db, user_id=user.id, pair_id=None if is_solo else pair_id
+    )
+    return {
+        "streak": summary.streak_on(date.today()),
+        "longest_streak": summary.longest_streak,
+        "total_checkins": summary.total_checkins,
+    }
 
 
 # ── 后台任务 ──
 
 
-async def _run_sentiment_analysis(checkin_id: str, content: str):
+@job_handler("checkin.sentiment", concurrency=4)
+async def _run_sentiment_analysis(checkin_id: str):
     """后台 AI 情感分析（更新 sentiment_score）"""
+    from app.core.database import background_session
+
+    checkin_uuid = uuid.UUID(checkin_id)
+    # 只读出内容就归还连接，模型调用期间不占用连接池
+    async with background_session() as db:
+        content = await db.scalar(select(Checkin.content).where(Checkin.id == checkin_uuid))
+    if not content:
+        return
     try:
         result = await analyze_sentiment(content)
-        from app.core.database import async_session
-
-        async with async_session() as db:
-            from sqlalchemy import update
-
-            await db.execute(
-                update(Checkin)
-                .where(Checkin.id == checkin_id)
-                .values(sentiment_score=result.get("score", 5.0))
-            )
-            await db.commit()
     except Exception:
         logger.exception("后台 AI 情感分析任务失败")
+        raise
+    async with background_session() as db:
+        await db.execute(
+            update(Checkin)
+            .where(Checkin.id == checkin_uuid)
+            .values(sentiment_score=result.get("score", 5.0))
+        )
+        await db.commit()
 
 
-async def _auto_generate_daily(
-    pair_id: str, pair_type: str, checkin_a_content: str, checkin_b_content: str
-):
+async def _get_resumable_report(db: AsyncSession, query) -> tuple[Report | None, bool]:
+    """返回当日已有报告；已完成则跳过，未完成（重试场景）则继续生成。"""
+    result = await db.execute(query.order_by(Report.created_at.desc()).limit(1))
+    report = result.scalars().first()
+    if report and report.status == ReportStatus.COMPLETED:
+        return report, True
+    return report, False
+
+
+@job_handler("report.auto_daily", concurrency=2)
+async def _auto_generate_daily(pair_id: str, report_date: str):
     """后台自动生成每日报告"""
-    try:
-        from app.core.database import async_session
-        from app.services.crisis_processor import process_crisis_from_report
+    from app.core.database import background_session
+    from app.services.crisis_processor import process_crisis_from_report
 
-        async with async_session() as db:
-            today = date.today()
-            result = await db.execute(
-                select(Report)
-                .where(
-                    Report.pair_id == pair_id,
+    try:
+        async with background_session() as db:
+            today = date.fromisoformat(report_date)
+            pair = await db.get(Pair, uuid.UUID(pair_id))
+            if not pair:
+                return
+            report, done = await _get_resumable_report(
+                db,
+                select(Report).where(
+                    Report.pair_id == pair.id,
                     Report.report_date == today,
                     Report.type == ReportType.DAILY,
-                )
-                .order_by(Report.created_at.desc())
-                .limit(1)
+                ),
             )
-            if result.scalars().first():
+            if done:
                 return
 
-            report = Report(
-                pair_id=pair_id,
-                type=ReportType.DAILY,
-                status=ReportStatus.PENDING,
-                content=None,
-                report_date=today,
+            result = await db.execute(
+                select(Checkin).where(
+                    Checkin.pair_id == pair.id,
+                    Checkin.checkin_date == today,
+                )
             )
-            db.add(report)
-            await db.commit()
-            await db.refresh(report)
+            checkins = {checkin.user_id: checkin for checkin in result.scalars().all()}
+            checkin_a = checkins.get(pair.user_a_id)
+            checkin_b = checkins.get(pair.user_b_id)
+            if not checkin_a or not checkin_b:
+                return
+
+            if report is None:
+                report = Report(
+                    pair_id=pair.id,
+                    type=ReportType.DAILY,
+                    status=ReportStatus.PENDING,
+                    content=None,
+                    report_date=today,
+                )
+                db.add(report)
+                await db.commit()
+                await db.refresh(report)
 
             report_content = await generate_daily_report(
-                pair_type, checkin_a_content, checkin_b_content
+                pair.type.value, checkin_a.content, checkin_b.content
             )
             report.content = report_content
             report.health_score = report_content.get("health_score")
             report.status = ReportStatus.COMPLETED
 
             # 自动处理危机预警
-            pair = await db.get(Pair, pair_id)
-            if pair:
-                await process_crisis_from_report(db, report, pair)
+            await process_crisis_from_report(db, report, pair)
 
+            await record_relationship_event(
+                db,
+                event_type="report.completed",
+                pair_id=report.pair_id,
+                entity_type="report",
+                entity_id=report.id,
+                payload={
+                    "report_type": report.type.value,
+                    "health_score": report.health_score,
+                    "crisis_level": (report.content or {}).get("crisis_level"),
+                },
+                idempotency_key=f"report:{report.id}:completed",
+            )
             await db.commit()
     except Exception:
         logger.exception("后台自动生成日报任务失败")
+        raise
 
 
-async def _auto_generate_solo(
-    pair_id: str | None, pair_type: str, content: str, user_id: str
-):
+@job_handler("report.auto_solo", concurrency=2)
+async def _auto_generate_solo(checkin_id: str):
     """后台自动生成个人情感日记（单方打卡时）"""
-    try:
-        from app.core.database import async_session
+    from app.core.database import background_session
 
-        async with async_session() as db:
-            today = date.today()
+    try:
+        async with background_session() as db:
+            checkin = await db.get(Checkin, uuid.UUID(checkin_id))
+            if not checkin:
+                return
+            today = checkin.checkin_date
             # 检查是否已有
-            if pair_id:
-                result = await db.execute(
-                    select(Report)
-                    .where(
-                        Report.pair_id == pair_id,
-                        Report.report_date == today,
-                        Report.type == ReportType.SOLO,
-                    )
-                    .order_by(Report.created_at.desc())
-                    .limit(1)
+            if checkin.pair_id:
+                query = select(Report).where(
+                    Report.pair_id == checkin.pair_id,
+                    Report.report_date == today,
+                    Report.type == ReportType.SOLO,
                 )
             else:
-                result = await db.execute(
-                    select(Report)
-                    .where(
-                        Report.user_id == user_id,
-                        Report.report_date == today,
-                        Report.type == ReportType.SOLO,
-                    )
-                    .order_by(Report.created_at.desc())
-                    .limit(1)
+                query = select(Report).where(
+                    Report.user_id == checkin.user_id,
+                    Report.report_date == today,
+                    Report.type == ReportType.SOLO,
                 )
-            if result.scalars().first():
+            report, done = await _get_resumable_report(db, query)
+            if done:
                 return
 
-            report = Report(
-                pair_id=pair_id,
-                user_id=user_id,
-                type=ReportType.SOLO,
-                status=ReportStatus.PENDING,
-                content=None,
-                report_date=today,
-            )
-            db.add(report)
-            await db.commit()
-            await db.refresh(report)
+            pair_type = "solo"
+            if checkin.pair_id:
+                pair = await db.get(Pair, checkin.pair_id)
+                pair_type = pair.type.value if pair else "solo"
+
+            if report is None:
+                report = Report(
+                    pair_id=checkin.pair_id,
+                    user_id=checkin.user_id,
+                    type=ReportType.SOLO,
+                    status=ReportStatus.PENDING,
+                    content=None,
+                    report_date=today,
+                )
+                db.add(report)
+                await db.commit()
+                await db.refresh(report)
 
-            report_content = await generate_solo_report(pair_type, content)
+            report_content = await generate_solo_report(pair_type, checkin.content)
             report.content = report_content
             report.health_score = report_content.get("health_score")
             report.status = ReportStatus.COMPLETED
+            await record_relationship_event(
+                db,
+                event_type="report.completed",
+                pair_id=report.pair_id,
+                user_id=report.user_id,
+                entity_type="report",
+                entity_id=report.id,
+                payload={
+                    "report_type": report.type.value,
+                    "health_score": report.health_score,
+                },
+                idempotency_key=f"report:{report.id}:completed",
+            )
             await db.commit()
             # Solo 报告不触发 crisis 预警（单方数据不足以判断）
     except Exception:
         logger.exception("后台自动生成个人日记任务失败")
+        raise
@@ -2,15 +2,22 @@
 
 import logging
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import select, desc, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.api.deps import get_current_user
+from app.api.deps import (
+    CurrentPrincipal,
+    get_current_principal,
+    get_current_user,
+    parse_page_cursor,
+)
 from app.models import User, Pair, PairStatus, CommunityTip, UserNotification
 from app.ai import chat_completion
 from app.core.config import settings
+from app.services.keyset import NEXT_CURSOR_HEADER, keyset_page_query, split_page
+from app.services.privacy_audit import privacy_audit_scope
 
 router = APIRouter(prefix="/community", tags=["社群"])
 logger = logging.getLogger(__name__)
@@ -81,7 +88,8 @@ async def generate_ai_tip(
         {"role": "system", "content": "你是亲密关系经营专家。请生成一条简短、实用的关系经营技巧。"},
         {"role": "user", "content": f"为一对{type_label}生成一条关系经营小贴士。要求：标题10字内，内容100字内，具体可执行，语气温暖。JSON格式：{{\"title\": \"标题\", \"content\": \"内容\"}}"},
     ]
-    result = await chat_completion(settings.AI_TEXT_MODEL, messages, temperature=0.9)
+    with privacy_audit_scope(run_type="community_tip"):
+        result = await chat_completion(settings.AI_TEXT_MODEL, messages, temperature=0.9)
 
     import json
     try:
@@ -107,18 +115,26 @@ async def generate_ai_tip(
 
 @router.get("/notifications")
 async def get_notifications(
-    limit: int = 20,
-    user: User = Depends(get_current_user),
+    response: Response,
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = None,
+    user: CurrentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
-    """获取通知列表"""
+    """获取通知列表，按 (created_at, id) 倒序游标分页，见 X-Next-Cursor"""
+    order_columns = (UserNotification.created_at, UserNotification.id)
+    after = parse_page_cursor(cursor, order_columns)
     result = await db.execute(
-        select(UserNotification)
-        .where(UserNotification.user_id == user.id)
-        .order_by(desc(UserNotification.created_at))
-        .limit(limit)
+        keyset_page_query(
+            select(UserNotification).where(UserNotification.user_id == user.id),
+            order_columns,
+            after=after,
+            limit=limit,
+        )
     )
-    notifications = result.scalars().all()
+    notifications, next_cursor = split_page(result.scalars().all(), order_columns, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
 
     return [
         {
@@ -134,7 +150,7 @@ async def get_notifications(
 
 @router.post("/notifications/read-all")
 async def mark_all_read(
-    user: User = Depends(get_current_user),
+    user: CurrentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """标记所有通知为已读"""
@@ -6,7 +6,7 @@ from sqlalchemy import select, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.api.deps import get_current_user, validate_pair_access
+from app.api.deps import authorize_pair, get_current_user, validate_pair_access
 from app.models import (
     User,
     Pair,
@@ -48,7 +48,7 @@ async def get_crisis_status(
     db: AsyncSession = Depends(get_db),
 ):
     """获取当前危机等级 — 优先从 CrisisAlert 表读取，回退到 Report.content"""
-    await validate_pair_access(pair_id, user, db, require_active=True)
+    await authorize_pair(pair_id, user, db, require_active=True)
 
     # 优先查 CrisisAlert 表（active 状态）
     result = await db.execute(
@@ -122,7 +122,7 @@ async def get_crisis_history(
     db: AsyncSession = Depends(get_db),
 ):
     """获取危机等级历史趋势 — 合并 CrisisAlert 记录 + Report.content"""
-    await validate_pair_access(pair_id, user, db, require_active=True)
+    await authorize_pair(pair_id, user, db, require_active=True)
 
     history = []
 
@@ -202,7 +202,7 @@ async def get_crisis_alerts(
     db: AsyncSession = Depends(get_db),
 ):
     """获取预警记录列表（可按状态筛选）"""
-    await validate_pair_access(pair_id, user, db, require_active=True)
+    await authorize_pair(pair_id, user, db, require_active=True)
 
     query = select(CrisisAlert).where(CrisisAlert.pair_id == pair_id)
     if status:
@@ -295,7 +295,7 @@ async def acknowledge_alert(
         raise HTTPException(status_code=404, detail="预警记录不存在")
 
     # 验证权限
-    await validate_pair_access(str(alert.pair_id), user, db, require_active=True)
+    await authorize_pair(str(alert.pair_id), user, db, require_active=True)
 
     if alert.status not in (CrisisAlertStatus.ACTIVE,):
         raise HTTPException(status_code=400, detail="该预警已处理")
@@ -320,7 +320,7 @@ async def resolve_alert(
     if not alert:
         raise HTTPException(status_code=404, detail="预警记录不存在")
 
-    await validate_pair_access(str(alert.pair_id), user, db, require_active=True)
+    await authorize_pair(str(alert.pair_id), user, db, require_active=True)
 
     if alert.status == CrisisAlertStatus.RESOLVED:
         raise HTTPException(status_code=400, detail="该预警已解决")
@@ -345,7 +345,7 @@ async def escalate_alert(
     if not alert:
         raise HTTPException(status_code=404, detail="预警记录不存在")
 
-    await validate_pair_access(str(alert.pair_id), user, db, require_active=True)
+    await authorize_pair(str(alert.pair_id), user, db, require_active=True)
 
     alert.status = CrisisAlertStatus.ESCALATED
     alert.resolve_note = (
@@ -10,10 +10,8 @@ from app.ai.narrative_alignment import generate_narrative_alignment
 from app.core.database import get_db
 from app.models import User
 from app.schemas import NarrativeAlignmentResponse
-from app.services.relationship_intelligence import (
-    record_relationship_event,
-    refresh_profile_and_plan,
-)
+from app.services.profile_refresh import request_profile_refresh
+from app.services.relationship_intelligence import record_relationship_event
 from app.services.privacy_audit import privacy_audit_scope
 
 from .shared import (
@@ -122,7 +120,7 @@ async def get_latest_narrative_alignment(
             "bridge_actions": alignment.get("bridge_actions") or [],
         },
     )
-    await refresh_profile_and_plan(db, pair_id=pair.id)
+    await request_profile_refresh(db, pair_id=pair.id)
     await db.commit()
 
     return NarrativeAlignmentResponse(
@@ -95,5 +95,4 @@ async def get_methodology(
             "theory_count": len(payload["theory_basis"]),
         },
     )
-    await db.commit()
     return MethodologyResponse(**payload)
@@ -187,9 +187,6 @@ async def build_policy_decision_audit(
     }
 
     for event in recent_events:
-        if event.event_type.endswith(".viewed") or event.event_type == "timeline.event_detail_viewed":
-            continue
-
         payload = event.payload or {}
         if event.event_type == "task.generated" and (
             payload.get("policy_selection_mode") or payload.get("policy_schedule_mode")
@@ -366,7 +363,6 @@ async def get_plan_scorecard(
             "momentum": scorecard["momentum"],
         },
     )
-    await db.commit()
     return InterventionScorecardResponse(**scorecard)
 
 
@@ -404,7 +400,6 @@ async def get_plan_evaluation(
             "confidence_level": evaluation["confidence_level"],
         },
     )
-    await db.commit()
     return InterventionEvaluationResponse(**evaluation)
 
 
@@ -444,7 +439,6 @@ async def get_plan_experiment_ledger(
             "policy_signature": experiment["current_policy"]["signature"],
         },
     )
-    await db.commit()
     return InterventionExperimentLedgerResponse(**experiment)
 
 
@@ -488,7 +482,6 @@ async def get_plan_policy_registry(
             ),
         },
     )
-    await db.commit()
     return PolicyRegistrySnapshotResponse(**registry)
 
 
@@ -532,7 +525,6 @@ async def get_plan_policy_schedule(
             ),
         },
     )
-    await db.commit()
     return PolicyScheduleResponse(**schedule)
 
 
@@ -577,5 +569,4 @@ async def get_plan_policy_audit(
             ),
         },
     )
-    await db.commit()
     return PolicyDecisionAuditResponse(**audit)
@@ -75,7 +75,6 @@ async def get_active_playbook(
             },
             idempotency_key=f"playbook-transition:{latest_transition['id']}",
         )
-    await db.commit()
     return RelationshipPlaybookResponse(**playbook)
 
 
@@ -115,6 +114,5 @@ async def get_relationship_playbook_history(
             "limit": limit,
         },
     )
-    await db.commit()
     return PlaybookHistoryResponse(**history)
 
@@ -8,6 +8,7 @@ from app.api.deps import get_current_user
 from app.core.database import get_db
 from app.models import RelationshipProfileSnapshot, User
 from app.schemas import RelationshipProfileSnapshotResponse
+from app.services.profile_refresh import ensure_profile_fresh
 from app.services.relationship_intelligence import refresh_profile_snapshot
 
 from .shared import profile_scope_query, resolve_scope
@@ -39,6 +40,7 @@ async def get_latest_profile(
             window_days=window_days,
         )
 
+    await ensure_profile_fresh(db, pair_id=pair_scope_id, user_id=user_scope_id)
     result = await db.execute(
         select(RelationshipProfileSnapshot)
         .where(
@@ -43,6 +43,5 @@ async def get_safety_status(
         entity_id=f"{pair_scope_id or user_scope_id}",
         payload={"risk_level": payload.get("risk_level")},
     )
-    await db.commit()
     return SafetyStatusResponse(**payload)
 
@@ -4,7 +4,7 @@ from fastapi import HTTPException
 from sqlalchemy import desc, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import validate_pair_access
+from app.api.deps import authorize_pair
 from app.models import (
     Checkin,
     InterventionPlan,
@@ -15,6 +15,7 @@ from app.models import (
     ReportStatus,
     User,
 )
+from app.services.profile_refresh import ensure_profile_fresh
 from app.services.relationship_intelligence import refresh_profile_snapshot
 
 
@@ -31,7 +32,7 @@ async def resolve_scope(
     if not pair_id:
         raise HTTPException(status_code=422, detail="缺少配对ID")
 
-    await validate_pair_access(pair_id, user, db, require_active=False)
+    await authorize_pair(pair_id, user, db, require_active=False)
     return pair_id, None
 
 
@@ -372,6 +373,7 @@ def format_bool(value: bool | None) -> str | None:
 async def get_latest_pair_snapshot(
     db: AsyncSession, pair_id: str
 ) -> RelationshipProfileSnapshot:
+    await ensure_profile_fresh(db, pair_id=pair_id)
     result = await db.execute(
         select(RelationshipProfileSnapshot)
         .where(
@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user, validate_pair_access
+from app.api.deps import authorize_pair, get_current_user, parse_page_cursor
 from app.core.database import get_db
 from app.models import (
     Checkin,
@@ -24,6 +24,7 @@ from app.schemas import (
     RelationshipTimelineResponse,
 )
 from app.services.intervention_effectiveness import build_intervention_scorecard
+from app.services.keyset import keyset_page_query, split_page
 from app.services.playbook_runtime import sync_active_playbook_runtime
 from app.services.relationship_intelligence import record_relationship_event
 
@@ -48,7 +49,7 @@ async def get_accessible_timeline_event(
         raise HTTPException(status_code=404, detail="时间轴节点不存在")
 
     if event.pair_id:
-        await validate_pair_access(str(event.pair_id), user, db, require_active=False)
+        await authorize_pair(str(event.pair_id), user, db, require_active=False)
         return event
 
     if event.user_id and str(event.user_id) == str(user.id):
@@ -335,6 +336,7 @@ async def get_relationship_timeline(
     pair_id: str | None = None,
     mode: str | None = None,
     limit: int = 24,
+    cursor: str | None = None,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -342,19 +344,23 @@ async def get_relationship_timeline(
         pair_id=pair_id, mode=mode, user=user, db=db
     )
     bounded_limit = max(6, min(limit, 60))
+    # 按 (occurred_at, id) 倒序游标分页，next_cursor 传回 cursor 参数可继续翻页
+    order_columns = (RelationshipEvent.occurred_at, RelationshipEvent.id)
+    after = parse_page_cursor(cursor, order_columns)
     result = await db.execute(
-        select(RelationshipEvent)
-        .where(
-            *event_scope_query(pair_scope_id, user_scope_id),
-            RelationshipEvent.event_type.not_like("%.viewed"),
+        keyset_page_query(
+            # 浏览埋点与隐私审计已分表存放，业务事件表可直接按范围分页
+            select(RelationshipEvent).where(
+                *event_scope_query(pair_scope_id, user_scope_id)
+            ),
+            order_columns,
+            after=after,
+            limit=bounded_limit,
         )
-        .order_by(
-            RelationshipEvent.occurred_at.desc(),
-            RelationshipEvent.created_at.desc(),
-        )
-        .limit(bounded_limit)
     )
-    events = result.scalars().all()
+    events, next_cursor = split_page(
+        result.scalars().all(), order_columns, bounded_limit
+    )
     serialized_events = [serialize_timeline_event(event) for event in events]
     highlights = [item["summary"] for item in serialized_events[:3]]
 
@@ -371,8 +377,6 @@ async def get_relationship_timeline(
             "event_count": len(serialized_events),
         },
     )
-    await db.commit()
-
     return RelationshipTimelineResponse(
         scope="pair" if pair_scope_id else "solo",
         pair_id=pair_scope_id,
@@ -381,6 +385,7 @@ async def get_relationship_timeline(
         latest_event_at=events[0].occurred_at if events else None,
         highlights=highlights,
         events=serialized_events,
+        next_cursor=next_cursor,
     )
 
 
@@ -409,5 +414,4 @@ async def get_relationship_timeline_event_detail(
         },
         idempotency_key=f"timeline-detail:{event.id}:{user.id}",
     )
-    await db.commit()
     return RelationshipTimelineEventDetailResponse(**detail)
@@ -6,8 +6,9 @@ from sqlalchemy import select, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.api.deps import get_current_user, validate_pair_access
+from app.api.deps import authorize_pair, get_current_user
 from app.models import User, Pair, PairStatus, LongDistanceActivity, Checkin, Report
+from app.services.relationship_intelligence import record_relationship_event
 from sqlalchemy import func
 
 router = APIRouter(prefix="/longdistance", tags=["异地关系"])
@@ -23,7 +24,7 @@ async def create_activity(
     db: AsyncSession = Depends(get_db),
 ):
     """创建异地互动活动"""
-    await validate_pair_access(pair_id, user, db, require_active=True)
+    await authorize_pair(pair_id, user, db, require_active=True)
 
     ACTIVITY_TITLES = {
         "movie": "一起看电影 🎬",
@@ -41,6 +42,16 @@ async def create_activity(
     )
     db.add(activity)
     await db.flush()
+    await record_relationship_event(
+        db,
+        event_type="longdistance.activity_created",
+        pair_id=pair_id,
+        user_id=user.id,
+        entity_type="longdistance_activity",
+        entity_id=activity.id,
+        payload={"activity_type": activity.type},
+        idempotency_key=f"longdistance:{activity.id}:created",
+    )
 
     return {
         "id": str(activity.id),
@@ -59,7 +70,7 @@ async def get_activities(
     db: AsyncSession = Depends(get_db),
 ):
     """获取异地互动活动列表"""
-    await validate_pair_access(pair_id, user, db, require_active=True)
+    await authorize_pair(pair_id, user, db, require_active=True)
 
     result = await db.execute(
         select(LongDistanceActivity)
@@ -93,10 +104,20 @@ async def complete_activity(
     if not activity:
         raise HTTPException(status_code=404, detail="活动不存在")
 
-    await validate_pair_access(str(activity.pair_id), user, db, require_active=True)
+    await authorize_pair(str(activity.pair_id), user, db, require_active=True)
 
     activity.status = "completed"
     activity.completed_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    await record_relationship_event(
+        db,
+        event_type="longdistance.activity_completed",
+        pair_id=activity.pair_id,
+        user_id=user.id,
+        entity_type="longdistance_activity",
+        entity_id=activity.id,
+        payload={"activity_type": activity.type},
+        idempotency_key=f"longdistance:{activity.id}:completed",
+    )
     return {"message": "活动完成 🎉", "status": "completed"}
 
 
@@ -107,7 +128,7 @@ async def get_health_index(
     db: AsyncSession = Depends(get_db),
 ):
     """异地关系健康指数（聚焦沟通及时性和情感表达频率）"""
-    pair = await validate_pair_access(pair_id, user, db, require_active=True)
+    pair = await authorize_pair(pair_id, user, db, require_active=True)
 
     # 近14天打卡数据
     from datetime import date, timedelta
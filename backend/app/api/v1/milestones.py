@@ -6,7 +6,7 @@ from sqlalchemy import select, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.api.deps import get_current_user, validate_pair_access
+from app.api.deps import authorize_pair, get_current_user
 from app.models import User, Pair, PairStatus, Milestone, Report, ReportType, ReportStatus
 from app.ai.reporter import generate_milestone_report
 
@@ -24,7 +24,7 @@ async def create_milestone(
     db: AsyncSession = Depends(get_db),
 ):
     """创建关系里程碑"""
-    await validate_pair_access(pair_id, user, db, require_active=True)
+    await authorize_pair(pair_id, user, db, require_active=True)
 
     from datetime import date
     try:
@@ -57,7 +57,7 @@ async def get_milestones(
     db: AsyncSession = Depends(get_db),
 ):
     """获取里程碑列表"""
-    await validate_pair_access(pair_id, user, db, require_active=True)
+    await authorize_pair(pair_id, user, db, require_active=True)
 
     result = await db.execute(
         select(Milestone)
@@ -95,7 +95,7 @@ async def generate_review(
     if not milestone:
         raise HTTPException(status_code=404, detail="里程碑不存在")
 
-    pair = await validate_pair_access(str(milestone.pair_id), user, db, require_active=True)
+    pair = await authorize_pair(str(milestone.pair_id), user, db, require_active=True)
 
     # 获取该里程碑期间的报告数据
     result = await db.execute(
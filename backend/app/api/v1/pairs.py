@@ -7,8 +7,9 @@ from sqlalchemy import select, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.api.deps import get_current_user
+from app.api.deps import CurrentPrincipal, get_current_principal, get_current_user
 from app.models import User, Pair, PairType, PairStatus
+from app.services.pair_access import invalidate_pair_membership
 from app.schemas import (
     PairCreateRequest,
     PairJoinRequest,
@@ -101,6 +102,7 @@ async def join_pair(
     pair.user_b_id = user.id
     pair.status = PairStatus.ACTIVE
     await db.flush()
+    invalidate_pair_membership(db, pair.id)
 
     partner = await db.get(User, pair.user_a_id)
     return _build_pair_response(pair, user, partner)
@@ -167,7 +169,7 @@ async def get_pair_summary(
 @router.post("/request-unbind", response_model=dict)
 async def request_unbind(
     pair_id: str,
-    user: User = Depends(get_current_user),
+    user: CurrentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """发起解绑请求（对方需确认，或等待7天冷静期自动生效）"""
@@ -194,7 +196,7 @@ async def request_unbind(
 @router.post("/confirm-unbind", response_model=dict)
 async def confirm_unbind(
     pair_id: str,
-    user: User = Depends(get_current_user),
+    user: CurrentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """确认解绑（对方发起后确认，或发起方在冷静期后确认）"""
@@ -220,6 +222,7 @@ async def confirm_unbind(
         pair.unbind_requested_by = None
         pair.unbind_requested_at = None
         await db.flush()
+        invalidate_pair_membership(db, pair.id)
         return {"message": "双方确认，配对已解除"}
 
     # 情况2：发起方自己确认 → 需满7天冷静期
@@ -230,6 +233,7 @@ async def confirm_unbind(
         pair.unbind_requested_by = None
         pair.unbind_requested_at = None
         await db.flush()
+        invalidate_pair_membership(db, pair.id)
         return {"message": "冷静期已过，配对已解除"}
 
     remaining = (
@@ -243,7 +247,7 @@ async def confirm_unbind(
 @router.post("/cancel-unbind", response_model=dict)
 async def cancel_unbind(
     pair_id: str,
-    user: User = Depends(get_current_user),
+    user: CurrentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """撤回解绑请求（仅发起方可撤回）"""
@@ -270,7 +274,7 @@ async def cancel_unbind(
 @router.get("/unbind-status", response_model=dict)
 async def get_unbind_status(
     pair_id: str,
-    user: User = Depends(get_current_user),
+    user: CurrentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """查询当前解绑状态"""
@@ -3,13 +3,13 @@
 import uuid
 import logging
 from datetime import date, timedelta
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import desc, select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db, async_session
-from app.api.deps import get_current_user
-from app.models import User, Pair, Checkin, Report, ReportType, PairStatus, ReportStatus
+from app.core.database import background_session, get_db
+from app.api.deps import authorize_pair, get_current_user, parse_page_cursor
+from app.models import User, Pair, Checkin, Report, ReportType, ReportStatus
 from app.schemas import ReportResponse
 from app.ai.reporter import (
     generate_daily_report,
@@ -17,10 +17,10 @@ from app.ai.reporter import (
     generate_monthly_report,
     generate_solo_report,
 )
-from app.services.relationship_intelligence import (
-    record_relationship_event,
-    refresh_profile_and_plan,
-)
+from app.services.job_queue import enqueue_job, job_handler
+from app.services.keyset import NEXT_CURSOR_HEADER, keyset_page_query, split_page
+from app.services.profile_refresh import request_profile_refresh
+from app.services.relationship_intelligence import record_relationship_event
 from app.services.safety_summary import build_safety_status
 from app.services.privacy_audit import privacy_audit_scope
 
@@ -28,30 +28,12 @@ router = APIRouter(prefix="/reports", tags=["报告"])
 logger = logging.getLogger(__name__)
 
 
-async def _get_authorized_pair(
-    db: AsyncSession,
-    pair_id: str,
-    user: User,
-    *,
-    require_active: bool,
-) -> Pair:
-    result = await db.execute(select(Pair).where(Pair.id == pair_id))
-    pair = result.scalar_one_or_none()
-    if not pair:
-        raise HTTPException(status_code=404, detail="配对不存在")
-    if str(user.id) not in (str(pair.user_a_id), str(pair.user_b_id)):
-        raise HTTPException(status_code=403, detail="无权访问该配对数据")
-    if require_active and pair.status != PairStatus.ACTIVE:
-        raise HTTPException(status_code=404, detail="配对不存在或未激活")
-    return pair
-
-
 async def _process_daily_report(
     report_id: uuid.UUID, pair_id: str, pair_type: str, content_a: str, content_b: str
 ):
     from app.services.crisis_processor import process_crisis_from_report
 
-    async with async_session() as db:
+    async with background_session() as db:
         result = await db.execute(select(Report).where(Report.id == report_id))
         report = result.scalar_one_or_none()
         if not report:
@@ -84,7 +66,7 @@ async def _process_daily_report(
                     },
                     idempotency_key=f"report:{report.id}:completed",
                 )
-                await refresh_profile_and_plan(db, user_id=report.user_id)
+                await request_profile_refresh(db, user_id=report.user_id)
                 await db.commit()
                 return
 
@@ -120,13 +102,14 @@ async def _process_daily_report(
                 },
                 idempotency_key=f"report:{report.id}:completed",
             )
-            await refresh_profile_and_plan(db, pair_id=report.pair_id)
+            await request_profile_refresh(db, pair_id=report.pair_id)
 
             await db.commit()
         except Exception as e:
             logger.error(f"Daily report generation failed for {report_id}: {str(e)}")
             report.status = ReportStatus.FAILED
             await db.commit()
+            raise
 
 
 async def _process_weekly_report(
@@ -134,7 +117,7 @@ async def _process_weekly_report(
 ):
     from app.services.crisis_processor import process_crisis_from_report
 
-    async with async_session() as db:
+    async with background_session() as db:
         result = await db.execute(select(Report).where(Report.id == report_id))
         report = result.scalar_one_or_none()
         if not report:
@@ -169,13 +152,14 @@ async def _process_weekly_report(
                 },
                 idempotency_key=f"report:{report.id}:completed",
             )
-            await refresh_profile_and_plan(db, pair_id=report.pair_id)
+            await request_profile_refresh(db, pair_id=report.pair_id)
 
             await db.commit()
         except Exception as e:
             logger.error(f"Weekly report generation failed for {report_id}: {str(e)}")
             report.status = ReportStatus.FAILED
             await db.commit()
+            raise
 
 
 async def _process_monthly_report(
@@ -183,7 +167,7 @@ async def _process_monthly_report(
 ):
     from app.services.crisis_processor import process_crisis_from_report
 
-    async with async_session() as db:
+    async with background_session() as db:
         result = await db.execute(select(Report).where(Report.id == report_id))
         report = result.scalar_one_or_none()
         if not report:
@@ -218,18 +202,111 @@ async def _process_monthly_report(
                 },
                 idempotency_key=f"report:{report.id}:completed",
             )
-            await refresh_profile_and_plan(db, pair_id=report.pair_id)
+            await request_profile_refresh(db, pair_id=report.pair_id)
 
             await db.commit()
         except Exception as e:
             logger.error(f"Monthly report generation failed for {report_id}: {str(e)}")
             report.status = ReportStatus.FAILED
             await db.commit()
+            raise
+
+
+@job_handler("report.daily", concurrency=2)
+async def _run_daily_report_job(report_id: str):
+    async with background_session() as db:
+        report = await db.get(Report, uuid.UUID(report_id))
+        if not report or report.status == ReportStatus.COMPLETED:
+            return
+        if report.type == ReportType.SOLO:
+            result = await db.execute(
+                select(Checkin).where(
+                    Checkin.user_id == report.user_id,
+                    Checkin.pair_id.is_(None),
+                    Checkin.checkin_date == report.report_date,
+                )
+            )
+            checkin = result.scalars().first()
+            if not checkin:
+                return
+            args = (report.id, "solo", "solo", checkin.content, "")
+        else:
+            pair = await db.get(Pair, report.pair_id)
+            result = await db.execute(
+                select(Checkin).where(
+                    Checkin.pair_id == report.pair_id,
+                    Checkin.checkin_date == report.report_date,
+                )
+            )
+            checkins = result.scalars().all()
+            if not pair or len(checkins) < 2:
+                return
+            checkin_a = next(
+                (c for c in checkins if c.user_id == pair.user_a_id), checkins[0]
+            )
+            checkin_b = next(
+                (c for c in checkins if c.user_id == pair.user_b_id), checkins[-1]
+            )
+            args = (
+                report.id,
+                str(report.pair_id),
+                pair.type.value,
+                checkin_a.content,
+                checkin_b.content,
+            )
+    await _process_daily_report(*args)
+
+
+async def _load_period_report_inputs(
+    report_id: str, *, source_type: ReportType, days: int
+) -> tuple[Report, Pair, list] | None:
+    async with background_session() as db:
+        report = await db.get(Report, uuid.UUID(report_id))
+        if not report or report.status == ReportStatus.COMPLETED:
+            return None
+        pair = await db.get(Pair, report.pair_id)
+        if not pair:
+            return None
+        result = await db.execute(
+            select(Report)
+            .where(
+                Report.pair_id == report.pair_id,
+                Report.report_date >= report.report_date - timedelta(days=days),
+                Report.type == source_type,
+                Report.status == ReportStatus.COMPLETED,
+            )
+            .order_by(Report.report_date)
+        )
+        contents = [r.content for r in result.scalars().all() if r.content]
+        return report, pair, contents
+
+
+@job_handler("report.weekly", concurrency=1)
+async def _run_weekly_report_job(report_id: str):
+    inputs = await _load_period_report_inputs(
+        report_id, source_type=ReportType.DAILY, days=7
+    )
+    if inputs:
+        report, pair, daily_reports = inputs
+        await _process_weekly_report(
+            report.id, str(pair.id), pair.type.value, daily_reports
+        )
+
+
+@job_handler("report.monthly", concurrency=1)
+async def _run_monthly_report_job(report_id: str):
+    inputs = await _load_period_report_inputs(
+        report_id, source_type=ReportType.WEEKLY, days=30
+    )
+    if inputs:
+        report, pair, weekly_reports = inputs
+        await _process_monthly_report(
+            report.id, str(pair.id), pair.type.value, weekly_reports
+        )
 
 
 @router.post("/generate-daily", response_model=ReportResponse)
 async def trigger_daily_report(
-    background_tasks: BackgroundTasks,
     pair_id: str | None = None,
     mode: str | None = None,
     user: User = Depends(get_current_user),
@@ -275,19 +352,16 @@ async def trigger_daily_report(
             report_date=today,
         )
         db.add(report)
+        await db.flush()
+        await enqueue_job(db, "report.daily", {"report_id": str(report.id)})
         await db.commit()
         await db.refresh(report)
-
-        if background_tasks:
-            background_tasks.add_task(
-                _process_daily_report, report.id, "solo", "solo", checkin.content, ""
-            )
         return report
 
     if not pair_id:
         raise HTTPException(status_code=422, detail="缺少配对ID")
 
-    pair = await _get_authorized_pair(db, pair_id, user, require_active=True)
+    await authorize_pair(pair_id, user, db, require_active=True)
 
     result = await db.execute(
         select(Checkin).where(Checkin.pair_id == pair_id, Checkin.checkin_date == today)
@@ -313,9 +387,6 @@ async def trigger_daily_report(
         else:
             return existing
 
-    checkin_a = next((c for c in checkins if c.user_id == pair.user_a_id), checkins[0])
-    checkin_b = next((c for c in checkins if c.user_id == pair.user_b_id), checkins[-1])
-
     report = Report(
         pair_id=pair_id,
         type=ReportType.DAILY,
@@ -325,25 +396,16 @@ async def trigger_daily_report(
         report_date=today,
     )
     db.add(report)
+    await db.flush()
+    await enqueue_job(db, "report.daily", {"report_id": str(report.id)})
     await db.commit()
     await db.refresh(report)
 
-    if background_tasks:
-        background_tasks.add_task(
-            _process_daily_report,
-            report.id,
-            pair_id,
-            pair.type.value,
-            checkin_a.content,
-            checkin_b.content,
-        )
-
     return report
 
 
 @router.post("/generate-weekly", response_model=ReportResponse)
 async def trigger_weekly_report(
-    background_tasks: BackgroundTasks,
     pair_id: str | None = None,
     mode: str | None = None,
     user: User = Depends(get_current_user),
@@ -357,7 +419,7 @@ async def trigger_weekly_report(
         raise HTTPException(status_code=422, detail="缺少配对ID")
     week_ago = today - timedelta(days=7)
 
-    pair = await _get_authorized_pair(db, pair_id, user, require_active=True)
+    await authorize_pair(pair_id, user, db, require_active=True)
 
     result = await db.execute(
         select(Report)
@@ -403,20 +465,16 @@ async def trigger_weekly_report(
         report_date=today,
     )
     db.add(report)
+    await db.flush()
+    await enqueue_job(db, "report.weekly", {"report_id": str(report.id)})
     await db.commit()
     await db.refresh(report)
 
-    if background_tasks:
-        background_tasks.add_task(
-            _process_weekly_report, report.id, pair_id, pair.type.value, daily_reports
-        )
-
     return report
 
 
 @router.post("/generate-monthly", response_model=ReportResponse)
 async def trigger_monthly_report(
-    background_tasks: BackgroundTasks,
     pair_id: str | None = None,
     mode: str | None = None,
     user: User = Depends(get_current_user),
@@ -430,7 +488,7 @@ async def trigger_monthly_report(
         raise HTTPException(status_code=422, detail="缺少配对ID")
     month_ago = today - timedelta(days=30)
 
-    pair = await _get_authorized_pair(db, pair_id, user, require_active=True)
+    await authorize_pair(pair_id, user, db, require_active=True)
 
     result = await db.execute(
         select(Report)
@@ -474,14 +532,11 @@ async def trigger_monthly_report(
         report_date=today,
     )
     db.add(report)
+    await db.flush()
+    await enqueue_job(db, "report.monthly", {"report_id": str(report.id)})
     await db.commit()
     await db.refresh(report)
 
-    if background_tasks:
-        background_tasks.add_task(
-            _process_monthly_report, report.id, pair_id, pair.type.value, weekly_reports
-        )
-
     return report
 
 
@@ -502,7 +557,7 @@ async def get_latest_report(
     else:
         if not pair_id:
             raise HTTPException(status_code=422, detail="缺少配对ID")
-        await _get_authorized_pair(db, pair_id, user, require_active=False)
+        await authorize_pair(pair_id, user, db, require_active=False)
         query = select(Report).where(Report.pair_id == pair_id)
         if report_type in ("daily", "weekly", "monthly"):
             query = query.where(Report.type == ReportType(report_type))
@@ -538,15 +593,19 @@ async def get_latest_report(
 
 @router.get("/history", response_model=list[ReportResponse])
 async def get_report_history(
+    response: Response,
     pair_id: str | None = None,
     mode: str | None = None,
     report_type: str = "daily",
-    limit: int = 7,
+    limit: int = Query(default=7, ge=1, le=100),
+    cursor: str | None = None,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """获取报告历史（仅返回生成的）"""
+    """获取报告历史（仅返回生成的），按 (report_date, id) 倒序游标分页，见 X-Next-Cursor"""
     is_solo = mode == "solo"
+    order_columns = (Report.report_date, Report.id)
+    after = parse_page_cursor(cursor, order_columns)
     if is_solo:
         query = select(Report).where(
             Report.user_id == user.id,
@@ -556,16 +615,20 @@ async def get_report_history(
     else:
         if not pair_id:
             raise HTTPException(status_code=422, detail="缺少配对ID")
-        await _get_authorized_pair(db, pair_id, user, require_active=False)
+        await authorize_pair(pair_id, user, db, require_active=False)
         query = select(Report).where(
             Report.pair_id == pair_id, Report.status == ReportStatus.COMPLETED
         )
         if report_type in ("daily", "weekly", "monthly"):
             query = query.where(Report.type == ReportType(report_type))
-    query = query.order_by(Report.report_date.desc()).limit(limit)
 
-    result = await db.execute(query)
-    return result.scalars().all()
+    result = await db.execute(
+        keyset_page_query(query, order_columns, after=after, limit=limit)
+    )
+    reports, next_cursor = split_page(result.scalars().all(), order_columns, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return reports
 
 
 @router.get("/trend", response_model=dict)
@@ -593,7 +656,7 @@ async def get_health_trend(
     else:
         if not pair_id:
             raise HTTPException(status_code=422, detail="缺少配对ID")
-        await _get_authorized_pair(db, pair_id, user, require_active=False)
+        await authorize_pair(pair_id, user, db, require_active=False)
         result = await db.execute(
             select(Report.report_date, Report.health_score)
             .where(
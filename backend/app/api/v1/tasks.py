@@ -12,7 +12,6 @@ from app.api.deps import get_current_user, validate_pair_access
 from app.models import (
     RelationshipEvent,
     User,
-    Pair,
     PairStatus,
     Checkin,
     RelationshipTask,
@@ -27,10 +26,9 @@ from app.services.task_adaptation import (
     personalize_task_payloads,
 )
 from app.services.task_feedback import get_latest_task_feedback_map
-from app.services.relationship_intelligence import (
-    record_relationship_event,
-    refresh_profile_and_plan,
-)
+from app.services.pair_access import PairMembership, get_pair_membership
+from app.services.profile_refresh import request_profile_refresh
+from app.services.relationship_intelligence import record_relationship_event
 
 router = APIRouter(prefix="/tasks", tags=["关系任务"])
 logger = logging.getLogger(__name__)
@@ -48,7 +46,9 @@ def _task_visible_to_user(task: RelationshipTask, user: User) -> bool:
     return task.user_id is None or str(task.user_id) == str(user.id)
 
 
-def _ensure_task_operator(task: RelationshipTask, user: User, pair: Pair | None) -> None:
+def _ensure_task_operator(
+    task: RelationshipTask, user: User, pair: PairMembership | None
+) -> None:
     if not pair or str(user.id) not in (str(pair.user_a_id), str(pair.user_b_id)):
         raise HTTPException(status_code=403, detail="无权操作")
     if task.user_id is not None and str(task.user_id) != str(user.id):
@@ -263,7 +263,7 @@ async def complete_task(
         raise HTTPException(status_code=404, detail="任务不存在")
 
     # 验证用户属于该配对
-    pair = await db.get(Pair, str(task.pair_id))
+    pair = await get_pair_membership(db, task.pair_id)
     _ensure_task_operator(task, user, pair)
 
     task.status = TaskStatus.COMPLETED
@@ -285,7 +285,7 @@ async def complete_task(
         idempotency_key=f"task:{task.id}:completed",
         occurred_at=task.completed_at,
     )
-    await refresh_profile_and_plan(db, pair_id=task.pair_id)
+    await request_profile_refresh(db, pair_id=task.pair_id)
     return {"message": "任务已完成 ✅", "task": _task_to_dict(task)}
 
 
@@ -300,7 +300,7 @@ async def submit_task_feedback(
     if not task:
         raise HTTPException(status_code=404, detail="任务不存在")
 
-    pair = await db.get(Pair, str(task.pair_id))
+    pair = await get_pair_membership(db, task.pair_id)
     _ensure_task_operator(task, user, pair)
     if task.status != TaskStatus.COMPLETED:
         raise HTTPException(status_code=400, detail="请先完成任务，再提交反馈")
@@ -345,7 +345,7 @@ async def submit_task_feedback(
         )
 
     await db.flush()
-    await refresh_profile_and_plan(db, pair_id=task.pair_id)
+    await request_profile_refresh(db, pair_id=task.pair_id)
 
     return TaskFeedbackResponse(
         task_id=task.id,
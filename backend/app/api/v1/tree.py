@@ -6,7 +6,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.api.deps import get_current_user, validate_pair_access
+from app.api.deps import authorize_pair, get_current_user
 from app.models import (
     User,
     Pair,
@@ -77,7 +77,7 @@ async def get_tree_status(
     except ValueError:
         raise HTTPException(status_code=400, detail="无效的配对ID格式")
 
-    await validate_pair_access(pair_id, user, db, require_active=True)
+    await authorize_pair(pair_id, user, db, require_active=True)
 
     tree = await _get_or_create_tree(pair_id, db)
 
@@ -128,7 +128,7 @@ async def water_tree(
     except ValueError:
         raise HTTPException(status_code=400, detail="无效的配对ID格式")
 
-    await validate_pair_access(pair_id, user, db, require_active=True)
+    await authorize_pair(pair_id, user, db, require_active=True)
 
     tree = await _get_or_create_tree(pair_id, db)
 
@@ -164,9 +164,9 @@ async def water_tree(
 
 async def grow_tree_on_checkin(pair_id: str, both_done: bool, streak: int):
     """打卡后触发关系树成长（从 checkins.py 调用）"""
-    from app.core.database import async_session
+    from app.core.database import background_session
 
-    async with async_session() as db:
+    async with background_session() as db:
         tree = await _get_or_create_tree(pair_id, db)
 
         points = 10  # 单方打卡 +10
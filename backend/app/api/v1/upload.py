@@ -9,13 +9,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.database import get_db
-from app.api.deps import get_current_user
-from app.models import User
+from app.api.deps import CurrentPrincipal, get_current_principal
 from app.ai import transcribe_audio
 from app.services.privacy_audit import log_privacy_event, privacy_audit_scope
 from app.services.upload_access import (
     build_scoped_upload_response_payload,
     guess_upload_media_type,
+    register_upload,
     resolve_upload_file_path,
     verify_upload_access,
 )
@@ -87,7 +87,7 @@ async def _verify_magic_bytes(file: UploadFile, allowed_types: set) -> bool:
 @router.post("/image")
 async def upload_image(
     file: UploadFile = File(...),
-    user: User = Depends(get_current_user),
+    user: CurrentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """上传图片，返回相对URL"""
@@ -120,7 +120,7 @@ async def upload_image(
 @router.post("/voice")
 async def upload_voice(
     file: UploadFile = File(...),
-    user: User = Depends(get_current_user),
+    user: CurrentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """上传语音，返回相对URL"""
@@ -181,6 +181,7 @@ async def _save_file(
             await f.write(chunk)
 
     storage_path = f"/uploads/{subdir}/{filename}"
+    register_upload(db, storage_path, owner_user_id=actor_user_id, size=total_size)
     return await build_scoped_upload_response_payload(
         db,
         storage_path,
@@ -235,7 +236,7 @@ async def access_uploaded_file(
 @router.post("/transcribe")
 async def transcribe_voice(
     file: UploadFile = File(...),
-    user: User = Depends(get_current_user),
+    user: CurrentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """上传语音文件并转录为文字 - 使用 Whisper API"""
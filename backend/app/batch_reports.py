@@ -0,0 +1,61 @@
+"""夜间批量报告入口：python -m app.batch_reports
+
+建议在低峰期由 cron 触发，为所有活跃配对补齐日报、周报、月报。
+中途中断后重新执行即可从未完成的报告继续。
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+from datetime import date
+
+from app.core.database import dispose_engines
+from app.models import ReportType
+from app.services.llm_cache import close_llm_cache
+from app.services.phone_code_store import close_phone_code_store
+from app.services.report_batch import BATCH_REPORT_KINDS, run_report_batch
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="批量生成配对报告")
+    parser.add_argument("--date", type=date.fromisoformat, default=None, help="运行日期，默认今天")
+    parser.add_argument(
+        "--kinds",
+        default=",".join(kind.value for kind in BATCH_REPORT_KINDS),
+        help="报告类型，逗号分隔：daily,weekly,monthly",
+    )
+    parser.add_argument("--concurrency", type=int, default=None, help="模型调用并发上限")
+    parser.add_argument("--token-budget", type=int, default=None, help="本次运行的 token 上限，0 表示不限")
+    parser.add_argument("--dry-run", action="store_true", help="只统计待生成的报告，不调用模型")
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    kinds = [ReportType(value.strip()) for value in args.kinds.split(",") if value.strip()]
+    try:
+        stats = await run_report_batch(
+            run_date=args.date,
+            kinds=kinds,
+            concurrency=args.concurrency,
+            token_budget=args.token_budget,
+            dry_run=args.dry_run,
+        )
+    finally:
+        await close_phone_code_store()
+        await close_llm_cache()
+        await dispose_engines()
+    return stats.as_dict()
+
+
+def main(argv=None) -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    result = asyncio.run(run(_parse_args(argv)))
+    print(json.dumps(result, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
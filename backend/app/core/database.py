@@ -1,11 +1,139 @@
-"""数据库引擎与会话管理"""
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+"""数据库引擎与会话管理
+
+按用途拆成三个连接池，互不抢占：
+
+* ``interactive``：API 请求（``get_db``），即 ``engine`` / ``async_session``；
+* ``background``：后台任务、job worker、画像刷新、批量报告（``background_session``）；
+* ``admin``：管理员清理 / 批量删除等长事务（``admin_session`` / ``get_admin_db``）。
+
+每个池的大小、溢出、等待超时、回收周期和服务端语句超时都可通过 ``DB_*``
+配置调整，``DB_ROLE_POOLS`` 按角色覆盖。连接获取等待时间计入
+``get_db_pool_stats()``，供管理后台运行指标查看。
+"""
+import time
+from typing import Any
+
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
 
-engine = create_async_engine(settings.DATABASE_URL, echo=settings.DEBUG)
+DB_ROLE_INTERACTIVE = "interactive"
+DB_ROLE_BACKGROUND = "background"
+DB_ROLE_ADMIN = "admin"
+DB_ROLES = (DB_ROLE_INTERACTIVE, DB_ROLE_BACKGROUND, DB_ROLE_ADMIN)
+
+CHECKOUT_WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """记录每次取连接的等待时间（含新建连接）和超时次数。"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_stats: dict[str, Any] = {
+            "checkouts": 0,
+            "timeouts": 0,
+            "wait_ms_buckets": [0] * (len(CHECKOUT_WAIT_BUCKETS_MS) + 1),
+            "wait_ms_sum": 0.0,
+            "wait_ms_max": 0.0,
+        }
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        except sa_exc.TimeoutError:
+            self.checkout_stats["timeouts"] += 1
+            raise
+        finally:
+            self._observe_wait((time.perf_counter() - started_at) * 1000)
+
+    def _observe_wait(self, wait_ms: float) -> None:
+        stats = self.checkout_stats
+        index = next(
+            (i for i, bound in enumerate(CHECKOUT_WAIT_BUCKETS_MS) if wait_ms <= bound),
+            len(CHECKOUT_WAIT_BUCKETS_MS),
+        )
+        stats["wait_ms_buckets"][index] += 1
+        stats["checkouts"] += 1
+        stats["wait_ms_sum"] += wait_ms
+        stats["wait_ms_max"] = max(stats["wait_ms_max"], wait_ms)
+
+
+def db_pool_options(role: str, *, settings_obj=settings) -> dict[str, float]:
+    """合并全局 DB_* 配置与 DB_ROLE_POOLS[role] 的覆盖项。"""
+
+    options = {
+        "pool_size": settings_obj.DB_POOL_SIZE,
+        "max_overflow": settings_obj.DB_MAX_OVERFLOW,
+        "pool_timeout_seconds": settings_obj.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle_seconds": settings_obj.DB_POOL_RECYCLE_SECONDS,
+        "statement_timeout_ms": settings_obj.DB_STATEMENT_TIMEOUT_MS,
+    }
+    overrides = (getattr(settings_obj, "DB_ROLE_POOLS", None) or {}).get(role) or {}
+    options.update({key: value for key, value in overrides.items() if key in options})
+    return options
+
+
+def _statement_timeout_connect_args(driver: str, timeout_ms: int) -> dict[str, Any]:
+    if timeout_ms <= 0:
+        return {}
+    if driver == "asyncpg":
+        return {"server_settings": {"statement_timeout": str(timeout_ms)}}
+    if driver in {"psycopg", "psycopg_async"}:
+        return {"options": f"-c statement_timeout={timeout_ms}"}
+    return {}
+
+
+def build_engine(
+    role: str,
+    *,
+    database_url: str | None = None,
+    settings_obj=settings,
+) -> AsyncEngine:
+    url = make_url(database_url or settings_obj.DATABASE_URL)
+    kwargs: dict[str, Any] = {"echo": settings_obj.DEBUG}
+    # 内存 SQLite 只能用单连接池，不套用连接池参数
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return create_async_engine(url, **kwargs)
+
+    options = db_pool_options(role, settings_obj=settings_obj)
+    kwargs.update(
+        poolclass=TimedQueuePool,
+        pool_size=max(int(options["pool_size"]), 1),
+        max_overflow=max(int(options["max_overflow"]), 0),
+        pool_timeout=float(options["pool_timeout_seconds"]),
+        pool_recycle=int(options["pool_recycle_seconds"]),
+        pool_pre_ping=bool(settings_obj.DB_POOL_PRE_PING),
+    )
+    if url.get_backend_name() == "postgresql":
+        connect_args = _statement_timeout_connect_args(
+            url.get_driver_name(), int(options["statement_timeout_ms"])
+        )
+        if connect_args:
+            kwargs["connect_args"] = connect_args
+    return create_async_engine(url, **kwargs)
+
+
+engine = build_engine(DB_ROLE_INTERACTIVE)
+background_engine = build_engine(DB_ROLE_BACKGROUND)
+admin_engine = build_engine(DB_ROLE_ADMIN)
+
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+background_session = async_sessionmaker(
+    background_engine, class_=AsyncSession, expire_on_commit=False
+)
+admin_session = async_sessionmaker(admin_engine, class_=AsyncSession, expire_on_commit=False)
+
+_ENGINES = {
+    DB_ROLE_INTERACTIVE: engine,
+    DB_ROLE_BACKGROUND: background_engine,
+    DB_ROLE_ADMIN: admin_engine,
+}
 
 
 class Base(DeclarativeBase):
@@ -21,3 +149,43 @@ async def get_db():
         except Exception:
             await session.rollback()
             raise
+
+
+async def get_admin_db():
+    """管理员清理类接口使用独立连接池，长事务不占用普通请求的连接。"""
+    async with admin_session() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+
+def get_db_pool_stats() -> dict[str, dict[str, Any]]:
+    stats: dict[str, dict[str, Any]] = {}
+    for role, role_engine in _ENGINES.items():
+        pool = role_engine.sync_engine.pool
+        checkout_stats = getattr(pool, "checkout_stats", None)
+        if checkout_stats is None:
+            stats[role] = {"pooled": False}
+            continue
+        checkouts = checkout_stats["checkouts"]
+        stats[role] = {
+            "pooled": True,
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "checkouts": checkouts,
+            "timeouts": checkout_stats["timeouts"],
+            "wait_ms_bounds": list(CHECKOUT_WAIT_BUCKETS_MS),
+            "wait_ms_buckets": list(checkout_stats["wait_ms_buckets"]),
+            "wait_ms_avg": round(checkout_stats["wait_ms_sum"] / checkouts, 3) if checkouts else 0.0,
+            "wait_ms_max": round(checkout_stats["wait_ms_max"], 3),
+        }
+    return stats
+
+
+async def dispose_engines() -> None:
+    for role_engine in _ENGINES.values():
+        await role_engine.dispose()
@@ -1,4 +1,8 @@
 """安全模块：密码哈希 + JWT"""
+import asyncio
+import hashlib
+import hmac
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 import uuid
 
@@ -23,6 +27,64 @@ def verify_password(plain: str, hashed: str) -> bool:
         return False
 
 
+# bcrypt 在 C 层释放 GIL，放进有界线程池即可并行计算且不阻塞事件循环
+_password_executor: ThreadPoolExecutor | None = None
+
+
+def _get_password_executor() -> ThreadPoolExecutor:
+    global _password_executor
+    if _password_executor is None:
+        _password_executor = ThreadPoolExecutor(
+            max_workers=max(1, settings.PASSWORD_HASH_WORKERS),
+            thread_name_prefix="password-hash",
+        )
+    return _password_executor
+
+
+async def hash_password_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_password_executor(), hash_password, password)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_password_executor(), verify_password, plain, hashed
+    )
+
+
+def close_password_executor() -> None:
+    global _password_executor
+    if _password_executor is None:
+        return
+    _password_executor.shutdown(wait=False, cancel_futures=True)
+    _password_executor = None
+
+
+PHONE_CODE_HASH_PREFIX = "hmac-sha256$"
+
+
+def _phone_code_key() -> bytes:
+    return hmac.new(
+        settings.SECRET_KEY.encode("utf-8"), b"qinjian.phone-code", hashlib.sha256
+    ).digest()
+
+
+def hash_phone_code(phone: str, code: str) -> str:
+    """短信验证码只存活几分钟，用带密钥的 HMAC 代替 bcrypt，微秒级且不可离线撞库"""
+    digest = hmac.new(
+        _phone_code_key(), f"{phone}:{code}".encode("utf-8"), hashlib.sha256
+    ).hexdigest()
+    return f"{PHONE_CODE_HASH_PREFIX}{digest}"
+
+
+async def verify_phone_code(phone: str, code: str, code_hash: str) -> bool:
+    if code_hash.startswith(PHONE_CODE_HASH_PREFIX):
+        return hmac.compare_digest(hash_phone_code(phone, code), code_hash)
+    # 兼容升级前写入 Redis、仍在有效期内的 bcrypt 验证码
+    return await verify_password_async(code, code_hash)
+
+
 def create_access_token(user_id: str) -> str:
     issued_at = datetime.now(timezone.utc)
     expire = issued_at + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
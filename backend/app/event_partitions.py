@@ -0,0 +1,72 @@
+"""事件日志分区维护入口：python -m app.event_partitions
+
+建议每天由 cron 执行：在 Postgres 上为浏览埋点和隐私审计热表提前创建月度分区，
+并把早于 EVENT_HOT_RETENTION_DAYS 的整月日志转入归档层（Postgres 直接挂载分区，
+其他数据库搬移行）。--dry-run 只报告将归档的数量，不做修改。
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.core.database import admin_session, dispose_engines
+from app.services.event_store import archive_event_logs, ensure_event_partitions
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="维护事件日志分区与归档层")
+    parser.add_argument(
+        "--months-ahead",
+        type=int,
+        default=settings.EVENT_PARTITION_MONTHS_AHEAD,
+        help="提前创建的月度分区数",
+    )
+    parser.add_argument(
+        "--hot-days",
+        type=int,
+        default=settings.EVENT_HOT_RETENTION_DAYS,
+        help="热表保留天数，更早的整月日志转入归档层",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="只报告，不修改")
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(
+        days=max(int(args.hot_days), 1)
+    )
+    try:
+        async with admin_session() as db:
+            created = []
+            if not args.dry_run:
+                created = await ensure_event_partitions(
+                    db, months_ahead=max(int(args.months_ahead), 0)
+                )
+            archived = await archive_event_logs(db, before=cutoff, dry_run=args.dry_run)
+            if not args.dry_run:
+                await db.commit()
+        return {
+            "dry_run": args.dry_run,
+            "created_partitions": created,
+            "archived": archived,
+        }
+    finally:
+        await dispose_engines()
+
+
+def main(argv=None) -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    result = asyncio.run(run(_parse_args(argv)))
+    print(json.dumps(result, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
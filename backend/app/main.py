@@ -1,5 +1,6 @@
 """亲健 API 应用入口"""
 
+import asyncio
 import os
 from contextlib import asynccontextmanager
 
@@ -11,9 +12,28 @@ from sqlalchemy.engine import make_url
 
 from app.api.v1 import api_router
 from app.core.config import settings
-from app.core.database import Base, engine
+from app.core.database import Base, dispose_engines, engine
+from app.core.security import close_password_executor
+from app.services.job_queue import JobWorker
+from app.services.keyset import NEXT_CURSOR_HEADER
+from app.services.llm_cache import close_llm_cache
+from app.services.pair_access import close_pair_access_cache
 from app.services.phone_code_store import close_phone_code_store
+from app.services.privacy_audit_writer import (
+    close_privacy_audit_writer,
+    start_privacy_audit_writer,
+)
+from app.services.profile_refresh import (
+    close_profile_refresh_scheduler,
+    start_profile_refresh_scheduler,
+)
+from app.services.tiered_cache import wait_for_invalidations
 from app.services.upload_access import public_upload_access_enabled
+from app.services.user_cache import close_user_cache
+from app.services.view_telemetry import (
+    close_view_telemetry_sink,
+    start_view_telemetry_sink,
+)
 
 APP_DESCRIPTION = """
 亲健 API 面向关系健康场景，覆盖账号认证、关系打卡、危机预警、关系智能画像、
@@ -87,10 +107,30 @@ async def lifespan(app: FastAPI):
         await conn.run_sync(Base.metadata.create_all)
     # 创建上传目录
     _ensure_upload_dirs()
+    start_profile_refresh_scheduler()
+    start_view_telemetry_sink()
+    start_privacy_audit_writer()
+    # 默认 Web 进程只负责入队；本地开发可开启内嵌 worker 免去单独启动 app.worker
+    worker_stop = asyncio.Event()
+    worker_task = None
+    if settings.JOB_WORKER_EMBEDDED:
+        worker_task = asyncio.create_task(JobWorker().run_forever(worker_stop))
     try:
         yield
     finally:
+        if worker_task is not None:
+            worker_stop.set()
+            await worker_task
+        await close_profile_refresh_scheduler()
+        await close_view_telemetry_sink()
+        await close_privacy_audit_writer()
         await close_phone_code_store()
+        await close_llm_cache()
+        await wait_for_invalidations()
+        await close_user_cache()
+        await close_pair_access_cache()
+        close_password_executor()
+        await dispose_engines()
 
 api_docs_enabled = settings.api_docs_enabled()
 app = FastAPI(
@@ -116,6 +156,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # 静态文件：仅在显式开启兼容模式时公开暴露上传目录
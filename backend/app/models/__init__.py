@@ -4,7 +4,7 @@ import uuid
 from datetime import date, datetime, timezone
 from enum import Enum as PyEnum
 
-from sqlalchemy import String, Text, ForeignKey, Date, Enum, Float, JSON, Integer
+from sqlalchemy import DDL, String, Text, ForeignKey, Date, Enum, Float, JSON, Integer, Index, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -182,6 +182,22 @@ class Checkin(Base):
     pair: Mapped["Pair"] = relationship(back_populates="checkins")
 
 
+# 打卡历史按 (checkin_date, id) 倒序 keyset 分页；单人打卡为 pair_id IS NULL
+Index(
+    "ix_checkins_user_id_pair_id_checkin_date_id",
+    Checkin.user_id,
+    Checkin.pair_id,
+    Checkin.checkin_date,
+    Checkin.id,
+)
+# 配对按日期范围读取打卡（今日状态、报告生成、画像重建）
+Index(
+    "ix_checkins_pair_id_checkin_date",
+    Checkin.pair_id,
+    Checkin.checkin_date,
+)
+
+
 class Report(Base):
     __tablename__ = "reports"
 
@@ -209,6 +225,25 @@ class Report(Base):
     pair: Mapped["Pair"] = relationship(back_populates="reports")
 
 
+# 报告历史按 (report_date, id) 倒序 keyset 分页，配对与单人各一条
+Index(
+    "ix_reports_pair_id_type_status_report_date_id",
+    Report.pair_id,
+    Report.type,
+    Report.status,
+    Report.report_date,
+    Report.id,
+)
+Index(
+    "ix_reports_user_id_type_status_report_date_id",
+    Report.user_id,
+    Report.type,
+    Report.status,
+    Report.report_date,
+    Report.id,
+)
+
+
 # ── 关系树（游戏化） ──
 
 
@@ -309,6 +344,14 @@ class LongDistanceActivity(Base):
     )
 
 
+# 异地活动按配对倒序列出、按创建时间范围重建画像
+Index(
+    "ix_long_distance_activities_pair_id_created_at",
+    LongDistanceActivity.pair_id,
+    LongDistanceActivity.created_at,
+)
+
+
 # ── 关系里程碑（Phase 4：关键节点服务） ──
 
 
@@ -364,6 +407,15 @@ class UserNotification(Base):
     )
 
 
+# 通知列表按 (created_at, id) 倒序 keyset 分页
+Index(
+    "ix_user_notifications_user_id_created_at_id",
+    UserNotification.user_id,
+    UserNotification.created_at,
+    UserNotification.id,
+)
+
+
 # ── 危机预警记录（Crisis Level Grading System） ──
 
 
@@ -410,6 +462,15 @@ class CrisisAlert(Base):
     report: Mapped["Report"] = relationship()
 
 
+# 当前预警按 (pair_id, status) 过滤、created_at 倒序
+Index(
+    "ix_crisis_alerts_pair_id_status_created_at",
+    CrisisAlert.pair_id,
+    CrisisAlert.status,
+    CrisisAlert.created_at,
+)
+
+
 # ── AI Agent 聊天会话存储 (Phase 5：陪伴打卡升级) ──
 
 
@@ -429,6 +490,13 @@ class AgentChatSession(Base):
     has_extracted_checkin: Mapped[bool] = mapped_column(default=False)
     # 本次会话相关日期（归档用）
     session_date: Mapped[date] = mapped_column(Date, default=date.today)
+    # (created_at, id) 不晚于 (context_summary_until, context_summary_until_id) 的消息
+    # 已折叠进滚动摘要，不再逐条发给模型
+    context_summary: Mapped[str | None] = mapped_column(Text, nullable=True)
+    context_summary_until: Mapped[datetime | None] = mapped_column(nullable=True)
+    context_summary_until_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), nullable=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         default=lambda: datetime.now(timezone.utc).replace(tzinfo=None)
     )
@@ -468,6 +536,14 @@ class AgentChatMessage(Base):
     session: Mapped["AgentChatSession"] = relationship(back_populates="messages")
 
 
+# 上下文组装按 (session_id, created_at) 做 keyset 倒序读取
+Index(
+    "ix_agent_chat_messages_session_id_created_at",
+    AgentChatMessage.session_id,
+    AgentChatMessage.created_at,
+)
+
+
 # ── 关系智能层（Relationship Intelligence Layer） ──
 
 
@@ -502,6 +578,123 @@ class RelationshipEvent(Base):
     user: Mapped["User"] = relationship()
 
 
+# 时间线按 (occurred_at, id) 倒序 keyset 分页，配对与单人范围各一条
+Index(
+    "ix_relationship_events_pair_id_occurred_at_id",
+    RelationshipEvent.pair_id,
+    RelationshipEvent.occurred_at,
+    RelationshipEvent.id,
+)
+Index(
+    "ix_relationship_events_user_id_occurred_at_id",
+    RelationshipEvent.user_id,
+    RelationshipEvent.occurred_at,
+    RelationshipEvent.id,
+)
+# 按事件类型读取某配对的事件（反馈、评估、模拟记录等）
+Index(
+    "ix_relationship_events_pair_id_event_type_occurred_at",
+    RelationshipEvent.pair_id,
+    RelationshipEvent.event_type,
+    RelationshipEvent.occurred_at,
+)
+
+
+# ── 事件日志（浏览埋点、隐私审计） ──
+# 只追加、按时间读取的事件族从 relationship_events 拆出，各有热表和归档表。
+# Postgres 上按 occurred_at 月度范围分区（分区键必须在主键里，所以主键是
+# (id, occurred_at)）；日志要在关联数据删除后保留，因此不设外键。
+
+
+class EventLogMixin:
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    pair_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    user_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    event_type: Mapped[str] = mapped_column(String(50))
+    entity_type: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    entity_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    source: Mapped[str] = mapped_column(String(30), default="system")
+    payload: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    idempotency_key: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    occurred_at: Mapped[datetime] = mapped_column(
+        primary_key=True,
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=None)
+    )
+
+
+class RelationshipViewEvent(EventLogMixin, Base):
+    __tablename__ = "relationship_view_events"
+    __table_args__ = {"postgresql_partition_by": "RANGE (occurred_at)"}
+
+
+class RelationshipViewEventArchive(EventLogMixin, Base):
+    __tablename__ = "relationship_view_events_archive"
+    __table_args__ = {"postgresql_partition_by": "RANGE (occurred_at)"}
+
+
+class PrivacyAuditEvent(EventLogMixin, Base):
+    __tablename__ = "privacy_audit_events"
+    __table_args__ = {"postgresql_partition_by": "RANGE (occurred_at)"}
+
+
+class PrivacyAuditEventArchive(EventLogMixin, Base):
+    __tablename__ = "privacy_audit_events_archive"
+    __table_args__ = {"postgresql_partition_by": "RANGE (occurred_at)"}
+
+
+for _event_log in (RelationshipViewEvent, RelationshipViewEventArchive):
+    _table = _event_log.__tablename__
+    # 幂等去重查找；按用户清理单人埋点
+    Index(f"ix_{_table}_idempotency_key", _event_log.idempotency_key)
+    Index(
+        f"ix_{_table}_user_id_occurred_at",
+        _event_log.user_id,
+        _event_log.occurred_at,
+    )
+
+for _event_log in (PrivacyAuditEvent, PrivacyAuditEventArchive):
+    _table = _event_log.__tablename__
+    # 审计列表按 (occurred_at, id) 倒序分页，可按用户、配对或类型筛选
+    Index(f"ix_{_table}_occurred_at_id", _event_log.occurred_at, _event_log.id)
+    Index(
+        f"ix_{_table}_user_id_occurred_at_id",
+        _event_log.user_id,
+        _event_log.occurred_at,
+        _event_log.id,
+    )
+    Index(
+        f"ix_{_table}_pair_id_occurred_at_id",
+        _event_log.pair_id,
+        _event_log.occurred_at,
+        _event_log.id,
+    )
+    Index(
+        f"ix_{_table}_event_type_occurred_at",
+        _event_log.event_type,
+        _event_log.occurred_at,
+    )
+
+for _event_log in (
+    RelationshipViewEvent,
+    RelationshipViewEventArchive,
+    PrivacyAuditEvent,
+    PrivacyAuditEventArchive,
+):
+    # 默认分区兜底：月度分区由 python -m app.event_partitions 提前创建
+    event.listen(
+        _event_log.__table__,
+        "after_create",
+        DDL(
+            "CREATE TABLE IF NOT EXISTS %(table)s_default PARTITION OF %(table)s DEFAULT"
+        ).execute_if(dialect="postgresql"),
+    )
+
+
 class RelationshipProfileSnapshot(Base):
     __tablename__ = "relationship_profile_snapshots"
 
@@ -530,6 +723,63 @@ class RelationshipProfileSnapshot(Base):
     user: Mapped["User"] = relationship()
 
 
+class RelationshipProfileState(Base):
+    __tablename__ = "relationship_profile_states"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    pair_id: Mapped[uuid.UUID | None] = mapped_column(
+        ForeignKey("pairs.id"), nullable=True, unique=True, index=True
+    )
+    user_id: Mapped[uuid.UUID | None] = mapped_column(
+        ForeignKey("users.id"), nullable=True, index=True
+    )
+    covered_from: Mapped[date] = mapped_column(Date)
+    day_buckets: Mapped[dict] = mapped_column(JSON, default=dict)
+    last_rebuilt_at: Mapped[datetime | None] = mapped_column(nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=None)
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+        onupdate=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+    )
+
+
+class CheckinStreak(Base):
+    __tablename__ = "checkin_streaks"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"))
+    pair_id: Mapped[uuid.UUID | None] = mapped_column(
+        ForeignKey("pairs.id"), nullable=True
+    )
+    scope_key: Mapped[str] = mapped_column(String(40))  # 配对 ID 或 "solo"
+    current_streak: Mapped[int] = mapped_column(Integer, default=0)  # 截至 last_checkin_date
+    longest_streak: Mapped[int] = mapped_column(Integer, default=0)
+    total_checkins: Mapped[int] = mapped_column(Integer, default=0)  # 打卡天数
+    last_checkin_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=None)
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+        onupdate=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+    )
+
+
+# 每个打卡范围（配对或单人）一行连续打卡状态，打卡时增量更新
+Index(
+    "ix_checkin_streaks_user_id_scope_key",
+    CheckinStreak.user_id,
+    CheckinStreak.scope_key,
+    unique=True,
+)
+
+
 class InterventionPlan(Base):
     __tablename__ = "intervention_plans"
 
@@ -708,3 +958,85 @@ class PrivacyDeletionRequest(Base):
 
     user: Mapped["User"] = relationship(foreign_keys=[user_id])
     reviewer: Mapped["User"] = relationship(foreign_keys=[reviewed_by])
+
+
+class BackgroundJob(Base):
+    __tablename__ = "background_jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    job_type: Mapped[str] = mapped_column(String(60), index=True)
+    payload: Mapped[dict] = mapped_column(JSON, default=dict)
+    status: Mapped[str] = mapped_column(String(20), default="queued", index=True)
+    dedupe_key: Mapped[str | None] = mapped_column(
+        String(160), nullable=True, index=True
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=3)
+    run_after: Mapped[datetime] = mapped_column(
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+        index=True,
+    )
+    locked_by: Mapped[str | None] = mapped_column(String(80), nullable=True)
+    locked_at: Mapped[datetime | None] = mapped_column(nullable=True)
+    claim_token: Mapped[str | None] = mapped_column(String(36), nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=None)
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+        onupdate=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+    )
+
+
+# worker 每秒轮询到期任务；部分索引只覆盖排队中的任务，已完成任务不计入
+Index(
+    "ix_background_jobs_queued_job_type_run_after",
+    BackgroundJob.job_type,
+    BackgroundJob.run_after,
+    postgresql_where=BackgroundJob.status == "queued",
+    sqlite_where=BackgroundJob.status == "queued",
+)
+
+# 同一 dedupe_key 最多一个排队/运行中的任务，enqueue 依赖它做 ON CONFLICT DO NOTHING
+Index(
+    "ux_background_jobs_active_dedupe_key",
+    BackgroundJob.dedupe_key,
+    unique=True,
+    postgresql_where=BackgroundJob.status.in_(("queued", "running")),
+    sqlite_where=BackgroundJob.status.in_(("queued", "running")),
+)
+
+
+# 长时间维护任务（分批清扫等）的断点，中断后从记录的位置继续
+class MaintenanceCheckpoint(Base):
+    __tablename__ = "maintenance_checkpoints"
+
+    name: Mapped[str] = mapped_column(String(80), primary_key=True)
+    state: Mapped[dict] = mapped_column(JSON, default=dict)
+    updated_at: Mapped[datetime] = mapped_column(
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+        onupdate=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+    )
+
+
+# 上传文件归属：上传时写入，签名访问链接时按路径批量解析，不再反查头像和打卡记录
+class Upload(Base):
+    __tablename__ = "uploads"
+
+    path: Mapped[str] = mapped_column(String(500), primary_key=True)
+    owner_user_id: Mapped[uuid.UUID | None] = mapped_column(
+        ForeignKey("users.id"), nullable=True, index=True
+    )
+    # 用在配对打卡里后归属整个配对，双方都能访问
+    pair_id: Mapped[uuid.UUID | None] = mapped_column(
+        ForeignKey("pairs.id"), nullable=True, index=True
+    )
+    kind: Mapped[str] = mapped_column(String(20))  # images / voices
+    size: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=None)
+    )
@@ -0,0 +1,147 @@
+"""连续打卡状态回填/校验入口：python -m app.rebuild_streaks
+
+上线连续打卡状态表后执行一次，为已有打卡历史的用户补齐状态行；之后可定期以
+--verify 运行，用全量扫描结果核对增量维护的状态，发现不一致时不带 --verify
+重跑即可修复。
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from app.core.database import admin_session, dispose_engines
+from app.models import Checkin, CheckinStreak
+from app.services.checkin_streak import (
+    apply_summary,
+    get_checkin_streak_state,
+    rebuild_checkin_streak,
+    streak_scope_key,
+    summarize_checkin_dates,
+    summary_of,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="回填或校验连续打卡状态")
+    parser.add_argument("--batch-size", type=int, default=500, help="每个事务处理的用户数")
+    parser.add_argument("--verify", action="store_true", help="只核对并报告不一致，不写入")
+    return parser.parse_args(argv)
+
+
+async def _seed_state(db, *, user_id, pair_id, summary) -> None:
+    state = CheckinStreak(
+        user_id=user_id,
+        pair_id=pair_id,
+        scope_key=streak_scope_key(pair_id),
+    )
+    apply_summary(state, summary)
+    try:
+        async with db.begin_nested():
+            db.add(state)
+    except IntegrityError:
+        # 并发打卡先建了这一行：锁住后重新扫描
+        existing = await get_checkin_streak_state(
+            db, user_id=user_id, pair_id=pair_id, for_update=True
+        )
+        if existing is None:
+            raise
+        await rebuild_checkin_streak(db, user_id=user_id, pair_id=pair_id, state=existing)
+
+
+async def _rebuild_users(user_ids: list, *, verify: bool, stats: dict[str, int]) -> None:
+    async with admin_session() as db:
+        # 写入时先锁状态行再扫描打卡：create_checkin 在 FOR UPDATE 下推进状态行，
+        # 拿到锁之后的扫描已包含这些提交，覆盖写入不会丢掉并发的打卡
+        stmt = select(CheckinStreak).where(CheckinStreak.user_id.in_(user_ids))
+        if not verify:
+            stmt = stmt.order_by(CheckinStreak.id).with_for_update()
+        result = await db.execute(stmt)
+        states = {
+            (state.user_id, state.scope_key): state for state in result.scalars().all()
+        }
+
+        result = await db.execute(
+            select(Checkin.user_id, Checkin.pair_id, Checkin.checkin_date)
+            .where(Checkin.user_id.in_(user_ids))
+            .distinct()
+        )
+        scopes: dict[tuple, list] = {}
+        for user_id, pair_id, checkin_date in result.all():
+            scopes.setdefault((user_id, pair_id), []).append(checkin_date)
+
+        for (user_id, pair_id), dates in scopes.items():
+            stats["scopes"] += 1
+            summary = summarize_checkin_dates(dates)
+            state = states.get((user_id, streak_scope_key(pair_id)))
+            if state is None:
+                stats["missing"] += 1
+            elif summary_of(state) == summary:
+                stats["ok"] += 1
+                continue
+            else:
+                stats["mismatched"] += 1
+                logger.warning(
+                    "streak mismatch user=%s scope=%s stored=%s scanned=%s",
+                    user_id,
+                    streak_scope_key(pair_id),
+                    summary_of(state),
+                    summary,
+                )
+            if verify:
+                continue
+            if state is None:
+                await _seed_state(db, user_id=user_id, pair_id=pair_id, summary=summary)
+            else:
+                apply_summary(state, summary)
+            stats["written"] += 1
+        if not verify:
+            await db.commit()
+
+
+async def rebuild_streaks(*, batch_size: int = 500, verify: bool = False) -> dict[str, int]:
+    """按用户 ID 分页扫描打卡历史，每页一个短事务。"""
+
+    stats = {"scopes": 0, "ok": 0, "missing": 0, "mismatched": 0, "written": 0}
+    last_user_id = None
+    while True:
+        async with admin_session() as db:
+            stmt = select(Checkin.user_id).distinct().order_by(Checkin.user_id)
+            if last_user_id is not None:
+                stmt = stmt.where(Checkin.user_id > last_user_id)
+            user_ids = list((await db.execute(stmt.limit(batch_size))).scalars().all())
+        if not user_ids:
+            return stats
+        await _rebuild_users(user_ids, verify=verify, stats=stats)
+        last_user_id = user_ids[-1]
+
+
+async def run(args: argparse.Namespace) -> dict:
+    try:
+        return await rebuild_streaks(
+            batch_size=max(int(args.batch_size), 1),
+            verify=args.verify,
+        )
+    finally:
+        await dispose_engines()
+
+
+def main(argv=None) -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    args = _parse_args(argv)
+    result = asyncio.run(run(args))
+    print(json.dumps(result, ensure_ascii=False))
+    if args.verify and (result["missing"] or result["mismatched"]):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -328,9 +328,17 @@ class PrivacyRetentionSweepResponse(BaseModel):
     dry_run: bool
     expired_privacy_events: int
     stale_temp_files: int
+    dropped_partitions: int | None = None
+    batches: int | None = None
+    rows_per_second: float | None = None
+    elapsed_seconds: float | None = None
+    resumed: bool | None = None
+    completed: bool | None = None
     due_requests: int | None = None
     executed: int | None = None
     manual_review: int | None = None
+    failed: int | None = None
+    purge_counts: dict[str, int] | None = None
 
 
 # ── 关系任务 ──
@@ -519,6 +527,7 @@ class RelationshipTimelineResponse(BaseModel):
     latest_event_at: datetime | None = None
     highlights: list[str] = Field(default_factory=list)
     events: list[RelationshipTimelineEventResponse] = Field(default_factory=list)
+    next_cursor: str | None = None
 
 
 class RelationshipTimelineMetricResponse(BaseModel):
@@ -955,6 +964,46 @@ class PolicyScheduleResponse(BaseModel):
     clinical_disclaimer: str
 
 
+class AdminRuntimeMetricsResponse(BaseModel):
+    request_memo: dict[str, int]
+    profile_refresh: dict[str, int]
+    llm_cache: dict[str, int]
+    ai_governor: dict[str, Any]
+    chat_stream: dict[str, int | None]
+    db_pools: dict[str, dict[str, Any]]
+    user_cache: dict[str, int]
+    pair_access: dict[str, int]
+    today_status: dict[str, int]
+    view_telemetry: dict[str, int]
+    privacy_audit: dict[str, Any]
+    signed_upload_urls: dict[str, int]
+
+
+class AdminBackgroundJobResponse(BaseModel):
+    id: uuid.UUID
+    job_type: str
+    status: str
+    payload: dict = Field(default_factory=dict)
+    dedupe_key: str | None = None
+    attempts: int
+    max_attempts: int
+    run_after: datetime
+    locked_by: str | None = None
+    locked_at: datetime | None = None
+    last_error: str | None = None
+    finished_at: datetime | None = None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class AdminJobQueueStatsResponse(BaseModel):
+    registered_job_types: list[str] = Field(default_factory=list)
+    concurrency: dict[str, int] = Field(default_factory=dict)
+    counts: dict[str, dict[str, int]] = Field(default_factory=dict)
+
+
 class PolicyDecisionAuditTrailResponse(BaseModel):
     occurred_at: datetime
     summary: str
@@ -3,8 +3,10 @@
 from app.services.relationship_intelligence import (
     maybe_create_intervention_plan,
     record_relationship_event,
+    record_relationship_events,
     refresh_profile_and_plan,
     refresh_profile_snapshot,
+    verify_profile_state,
 )
 from app.services.intervention_evaluation import build_intervention_evaluation
 from app.services.intervention_experimentation import (
@@ -42,6 +44,7 @@ from app.services.privacy_center import (
 from app.services.privacy_retention import (
     execute_privacy_deletion_request,
     process_due_deletion_requests,
+    remove_purged_uploads,
     run_privacy_retention_sweep,
 )
 from app.services.playbook_runtime import (
@@ -106,9 +109,12 @@ __all__ = [
     "log_privacy_transcription",
     "privacy_audit_scope",
     "record_relationship_event",
+    "record_relationship_events",
     "refresh_profile_and_plan",
     "refresh_profile_snapshot",
+    "verify_profile_state",
     "process_due_deletion_requests",
+    "remove_purged_uploads",
     "run_privacy_retention_sweep",
     "serialize_privacy_audit_entry",
     "sync_active_playbook_runtime",
@@ -0,0 +1,249 @@
+"""Bounded conversation context for agent chat sessions.
+
+Each turn used to load and resend the whole session, so latency, token cost
+and DB load grew with session length. The context sent to the model is now
+
+    system prompt + rolling summary + recent unsummarized messages
+
+where the recent messages come from one keyset query (``(created_at, id)``
+after the session's summary cursor, newest first, bounded ``LIMIT``) and are
+trimmed to ``AGENT_CONTEXT_TOKEN_BUDGET``. Once more than
+``AGENT_CONTEXT_RECENT_MESSAGES + AGENT_CONTEXT_SUMMARY_BATCH`` messages are
+unsummarized, a background job folds everything but the most recent
+``AGENT_CONTEXT_RECENT_MESSAGES`` into the summary, so the chat request never
+waits on summarization. The fold job releases its connection while the model
+writes the summary.
+"""
+
+from __future__ import annotations
+
+import json
+import uuid
+from dataclasses import dataclass
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.ai import chat_completion
+from app.core.config import settings
+from app.core.database import background_session
+from app.models import AgentChatMessage, AgentChatSession
+from app.services.ai_governor import estimate_tokens
+from app.services.job_queue import enqueue_job, job_handler
+from app.services.privacy_audit import privacy_audit_scope
+
+SUMMARY_JOB_TYPE = "agent.context_summary"
+_FOLD_PAGE_SIZE = 50
+
+SUMMARY_PROMPT = """你在为一段情感陪伴对话维护“前情摘要”，供后续对话参考。
+请把【已有摘要】和【新增对话】合并成一段新的中文摘要，不超过{max_chars}字。
+保留：用户提到的关键事件、情绪变化、与伴侣的互动情况、尚未完成的话题或承诺、是否已完成今日打卡。
+不要编造内容，不要输出摘要以外的文字。
+
+【已有摘要】
+{summary}
+
+【新增对话】
+{transcript}"""
+
+
+@dataclass
+class AgentContext:
+    messages: list[dict]
+    estimated_tokens: int
+    unsummarized: int
+    dropped: int
+
+
+def message_to_llm(msg: AgentChatMessage) -> dict:
+    # OpenAI 格式要求如果有 tool_calls 需要特殊处理，这里简易适配
+    if msg.role == "assistant" and msg.payload and "tool_calls" in msg.payload:
+        return {
+            "role": "assistant",
+            "content": msg.content or "",
+            "tool_calls": msg.payload["tool_calls"],
+        }
+    if msg.role == "tool":
+        return {
+            "role": "tool",
+            "content": msg.content,
+            "tool_call_id": str((msg.payload or {}).get("tool_call_id") or ""),
+        }
+    return {"role": msg.role, "content": msg.content}
+
+
+def _after_summary_cursor(stmt, session: AgentChatSession):
+    if session.context_summary_until is None:
+        return stmt
+    if session.context_summary_until_id is None:
+        # 迁移前写下的游标只有时间戳
+        return stmt.where(AgentChatMessage.created_at > session.context_summary_until)
+    return stmt.where(
+        tuple_(AgentChatMessage.created_at, AgentChatMessage.id)
+        > tuple_(session.context_summary_until, session.context_summary_until_id)
+    )
+
+
+def _summary_message(summary: str) -> dict:
+    return {"role": "system", "content": f"此前对话摘要：{summary}"}
+
+
+async def load_unsummarized_messages(
+    db: AsyncSession,
+    session: AgentChatSession,
+    *,
+    limit: int,
+) -> list[AgentChatMessage]:
+    """Newest ``limit`` messages after the summary cursor, oldest first."""
+
+    stmt = _after_summary_cursor(
+        select(AgentChatMessage).where(AgentChatMessage.session_id == session.id), session
+    )
+    result = await db.execute(
+        stmt.order_by(AgentChatMessage.created_at.desc(), AgentChatMessage.id.desc()).limit(
+            max(int(limit), 1)
+        )
+    )
+    return list(reversed(result.scalars().all()))
+
+
+async def build_agent_context(
+    db: AsyncSession,
+    session: AgentChatSession,
+    *,
+    system_prompt: str,
+    token_budget: int | None = None,
+) -> AgentContext:
+    """Assemble the model context for the session's next reply.
+
+    Queues a summary fold (in ``db``'s transaction) when the unsummarized tail
+    has outgrown the verbatim window.
+    """
+
+    recent = max(int(settings.AGENT_CONTEXT_RECENT_MESSAGES), 1)
+    batch = max(int(settings.AGENT_CONTEXT_SUMMARY_BATCH), 1)
+    budget = int(token_budget or settings.AGENT_CONTEXT_TOKEN_BUDGET)
+
+    rows = await load_unsummarized_messages(db, session, limit=recent + batch + 1)
+    head = [{"role": "system", "content": system_prompt}]
+    if session.context_summary:
+        head.append(_summary_message(session.context_summary))
+    used = estimate_tokens(head, max_tokens=0)
+
+    # Walk back from the newest message until the budget is spent; the newest
+    # message (the user's turn) is always kept.
+    kept: list[dict] = []
+    for msg in reversed(rows):
+        item = message_to_llm(msg)
+        cost = estimate_tokens([item], max_tokens=0)
+        if kept and used + cost > budget:
+            break
+        kept.append(item)
+        used += cost
+    kept.reverse()
+    # A window must not open on a tool result whose tool call was cut off.
+    while len(kept) > 1 and kept[0]["role"] == "tool":
+        used -= estimate_tokens([kept.pop(0)], max_tokens=0)
+
+    dropped = len(rows) - len(kept)
+    if len(rows) > recent + batch or dropped:
+        await enqueue_job(
+            db,
+            SUMMARY_JOB_TYPE,
+            {"session_id": str(session.id)},
+            dedupe_key=f"agent-context:{session.id}",
+        )
+    return AgentContext(
+        messages=head + kept,
+        estimated_tokens=used,
+        unsummarized=len(rows),
+        dropped=dropped,
+    )
+
+
+def _transcript(messages: list[AgentChatMessage]) -> str:
+    labels = {"user": "用户", "assistant": "AI", "tool": "系统"}
+    lines = []
+    for msg in messages:
+        content = msg.content or ""
+        if not content and msg.payload and "tool_calls" in msg.payload:
+            content = f"（调用工具 {json.dumps(msg.payload['tool_calls'], ensure_ascii=False)[:200]}）"
+        lines.append(f"{labels.get(msg.role, msg.role)}：{content}")
+    return "\n".join(lines)
+
+
+async def fold_session_context(db: AsyncSession, session: AgentChatSession) -> int:
+    """Fold all but the most recent messages into the rolling summary.
+
+    Pages through the backlog with a ``(created_at, id)`` keyset and commits
+    after each page, so a crash keeps the progress made so far. The read
+    transaction is committed before each model call, so no connection is held
+    while the summary is written. Returns the number of messages folded.
+    """
+
+    recent = max(int(settings.AGENT_CONTEXT_RECENT_MESSAGES), 1)
+    max_chars = int(settings.AGENT_CONTEXT_SUMMARY_MAX_CHARS)
+
+    boundary_stmt = (
+        select(AgentChatMessage.created_at, AgentChatMessage.id)
+        .where(AgentChatMessage.session_id == session.id)
+        .order_by(AgentChatMessage.created_at.desc(), AgentChatMessage.id.desc())
+        .offset(recent - 1)
+        .limit(1)
+    )
+    boundary = (await db.execute(boundary_stmt)).one_or_none()
+    if boundary is None:
+        await db.commit()
+        return 0
+
+    folded = 0
+    while True:
+        stmt = _after_summary_cursor(
+            select(AgentChatMessage).where(
+                AgentChatMessage.session_id == session.id,
+                tuple_(AgentChatMessage.created_at, AgentChatMessage.id) < tuple_(*boundary),
+            ),
+            session,
+        )
+        page = (
+            await db.execute(
+                stmt.order_by(AgentChatMessage.created_at.asc(), AgentChatMessage.id.asc())
+                .limit(_FOLD_PAGE_SIZE)
+            )
+        ).scalars().all()
+        # 结束读事务、归还连接，再等模型生成摘要
+        await db.commit()
+        if not page:
+            return folded
+
+        prompt = SUMMARY_PROMPT.format(
+            max_chars=max_chars,
+            summary=session.context_summary or "（无）",
+            transcript=_transcript(page),
+        )
+        with privacy_audit_scope(
+            db=db,
+            user_id=session.user_id,
+            pair_id=session.pair_id,
+            scope="pair" if session.pair_id else "solo",
+            run_type="agent_context_summary",
+        ):
+            summary = await chat_completion(
+                settings.AI_TEXT_MODEL,
+                [{"role": "user", "content": prompt}],
+                temperature=0.2,
+            )
+        session.context_summary = (summary or "").strip()[: max_chars * 2] or session.context_summary
+        session.context_summary_until = page[-1].created_at
+        session.context_summary_until_id = page[-1].id
+        await db.commit()
+        folded += len(page)
+
+
+@job_handler(SUMMARY_JOB_TYPE, concurrency=2)
+async def _run_context_summary_job(session_id: str):
+    async with background_session() as db:
+        session = await db.get(AgentChatSession, uuid.UUID(session_id))
+        if not session:
+            return
+        await fold_session_context(db, session)
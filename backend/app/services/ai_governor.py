@@ -0,0 +1,340 @@
+"""Process-wide admission control for model gateway calls.
+
+Every chat completion and transcription goes through one governor that
+
+* caps the number of in-flight gateway calls (``AI_MAX_IN_FLIGHT``);
+* keeps each model under a tokens-per-minute budget (``AI_MODEL_TPM_LIMITS``)
+  using a sliding 60s window of estimated, then actual, token usage;
+* serves waiters by priority first (interactive run types such as agent chat
+  before background reports and sentiment), then round-robin across tenants
+  (pair, else user) so one busy pair cannot starve the others.
+
+Token admission happens in the same dispatcher as slot admission, so an
+interactive call never queues behind background calls for a model's budget.
+A reservation is settled with the actual usage, or released when the call
+fails or is cancelled before reporting any.
+
+Queue depth and wait-time histograms are exposed through
+``get_ai_governor_stats`` for the admin runtime metrics endpoint.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from app.core.config import settings
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BACKGROUND = "background"
+_PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND)
+
+WAIT_BUCKETS_SECONDS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+_TPM_WINDOW_SECONDS = 60.0
+
+
+def estimate_tokens(messages: list[dict], *, max_tokens: int | None = None) -> int:
+    """Rough pre-call estimate: ~2 characters per token for mostly-Chinese text."""
+
+    chars = len(json.dumps(messages, ensure_ascii=False, default=str))
+    return chars // 2 + (512 if max_tokens is None else int(max_tokens))
+
+
+def _new_histogram() -> dict[str, Any]:
+    return {"buckets": [0] * (len(WAIT_BUCKETS_SECONDS) + 1), "count": 0, "sum": 0.0}
+
+
+class _TokenWindow:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._entries: deque[list[float]] = deque()
+        self._used = 0
+
+    def _expire(self, now: float) -> None:
+        while self._entries and self._entries[0][0] <= now - _TPM_WINDOW_SECONDS:
+            self._used -= int(self._entries.popleft()[1])
+
+    def wait_seconds(self, tokens: int, now: float) -> float:
+        self._expire(now)
+        # An oversized request still runs once the window is empty.
+        if not self._entries or self._used + tokens <= self.limit:
+            return 0.0
+        return max(self._entries[0][0] + _TPM_WINDOW_SECONDS - now, 0.01)
+
+    def reserve(self, tokens: int, now: float) -> list[float]:
+        entry = [now, float(tokens)]
+        self._entries.append(entry)
+        self._used += tokens
+        return entry
+
+    def _holds(self, entry: list[float]) -> bool:
+        return any(held is entry for held in self._entries)
+
+    def settle(self, entry: list[float], actual_tokens: int) -> None:
+        if self._holds(entry):
+            self._used += actual_tokens - int(entry[1])
+            entry[1] = float(actual_tokens)
+
+    def release(self, entry: list[float]) -> None:
+        if self._holds(entry):
+            self._entries = deque(held for held in self._entries if held is not entry)
+            self._used -= int(entry[1])
+
+    @property
+    def used(self) -> int:
+        self._expire(time.monotonic())
+        return self._used
+
+
+@dataclass(eq=False)
+class _Waiter:
+    future: asyncio.Future
+    model: str
+    tokens: int
+    tpm_blocked: bool = False
+
+
+class AIGovernor:
+    def __init__(self, *, max_in_flight: int, tpm_limits: dict[str, int] | None = None):
+        self.max_in_flight = max(int(max_in_flight), 1)
+        self.in_flight = 0
+        self._waiters: dict[str, OrderedDict[str, deque[_Waiter]]] = {
+            priority: OrderedDict() for priority in _PRIORITIES
+        }
+        self._windows = {
+            model: _TokenWindow(int(limit))
+            for model, limit in (tpm_limits or {}).items()
+            if int(limit or 0) > 0
+        }
+        self._retry_handle: asyncio.TimerHandle | None = None
+        self.stats: dict[str, Any] = {
+            "admitted": 0,
+            "tpm_waits": 0,
+            "wait_seconds": {priority: _new_histogram() for priority in _PRIORITIES},
+        }
+
+    def queue_depth(self) -> dict[str, int]:
+        return {
+            priority: sum(len(queue) for queue in tenants.values())
+            for priority, tenants in self._waiters.items()
+        }
+
+    def _observe_wait(self, priority: str, seconds: float) -> None:
+        histogram = self.stats["wait_seconds"][priority]
+        index = next(
+            (i for i, bound in enumerate(WAIT_BUCKETS_SECONDS) if seconds <= bound),
+            len(WAIT_BUCKETS_SECONDS),
+        )
+        histogram["buckets"][index] += 1
+        histogram["count"] += 1
+        histogram["sum"] += seconds
+
+    def _dispatch(self) -> None:
+        """Admit waiters in priority, then tenant round-robin, order.
+
+        A waiter whose model is over its TPM budget stays queued, and later
+        waiters for that model are held behind it so the window stays fair;
+        waiters for other models keep flowing. A timer re-runs the dispatcher
+        when the earliest blocked window frees up.
+        """
+
+        blocked_models: set[str] = set()
+        retry_after: float | None = None
+        for priority in _PRIORITIES:
+            tenants = self._waiters[priority]
+            progressed = True
+            while progressed and self.in_flight < self.max_in_flight:
+                progressed = False
+                for tenant in list(tenants):
+                    if self.in_flight >= self.max_in_flight:
+                        break
+                    queue = tenants[tenant]
+                    while queue and queue[0].future.cancelled():
+                        queue.popleft()
+                    if not queue:
+                        del tenants[tenant]
+                        continue
+                    waiter = queue[0]
+                    if waiter.model in blocked_models:
+                        continue
+                    window = self._windows.get(waiter.model)
+                    reservation = None
+                    if window is not None:
+                        now = time.monotonic()
+                        delay = window.wait_seconds(waiter.tokens, now)
+                        if delay > 0:
+                            blocked_models.add(waiter.model)
+                            if not waiter.tpm_blocked:
+                                waiter.tpm_blocked = True
+                                self.stats["tpm_waits"] += 1
+                            retry_after = (
+                                delay if retry_after is None else min(retry_after, delay)
+                            )
+                            continue
+                        reservation = window.reserve(waiter.tokens, now)
+                    queue.popleft()
+                    # Round robin: a tenant with more waiters goes to the back.
+                    if queue:
+                        tenants.move_to_end(tenant)
+                    else:
+                        del tenants[tenant]
+                    self.in_flight += 1
+                    waiter.future.set_result(reservation)
+                    progressed = True
+        self._schedule_retry(retry_after)
+
+    def _schedule_retry(self, delay: float | None) -> None:
+        if self._retry_handle is not None:
+            self._retry_handle.cancel()
+            self._retry_handle = None
+        if delay is not None:
+            self._retry_handle = asyncio.get_running_loop().call_later(
+                delay, self._dispatch
+            )
+
+    async def _acquire(
+        self, *, priority: str, tenant: str, model: str, tokens: int
+    ) -> list[float] | None:
+        waiter = _Waiter(
+            future=asyncio.get_running_loop().create_future(),
+            model=model,
+            tokens=tokens,
+        )
+        self._waiters[priority].setdefault(tenant, deque()).append(waiter)
+        self._dispatch()
+        try:
+            return await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Admitted just as the caller was cancelled: hand everything back.
+                self._release(model, waiter.future.result())
+            else:
+                queue = self._waiters[priority].get(tenant)
+                if queue and waiter in queue:
+                    queue.remove(waiter)
+                    if not queue:
+                        del self._waiters[priority][tenant]
+                self._dispatch()
+            raise
+
+    def _release(self, model: str, reservation: list[float] | None) -> None:
+        if reservation is not None:
+            self._windows[model].release(reservation)
+        self.in_flight = max(self.in_flight - 1, 0)
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        *,
+        model: str,
+        estimated_tokens: int = 0,
+        priority: str = PRIORITY_BACKGROUND,
+        tenant: str = "global",
+    ):
+        if priority not in self._waiters:
+            priority = PRIORITY_BACKGROUND
+        started_at = time.monotonic()
+        reservation = await self._acquire(
+            priority=priority, tenant=tenant, model=model, tokens=estimated_tokens
+        )
+        self._observe_wait(priority, time.monotonic() - started_at)
+        self.stats["admitted"] += 1
+        usage = {"total_tokens": None}
+        completed = False
+        try:
+            yield usage
+            completed = True
+        finally:
+            if reservation is not None and usage["total_tokens"] is not None:
+                self._windows[model].settle(reservation, int(usage["total_tokens"]))
+                reservation = None
+            elif completed:
+                # No usage reported: keep the estimate charged to the window.
+                reservation = None
+            self._release(model, reservation)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth(),
+            "admitted": self.stats["admitted"],
+            "tpm_waits": self.stats["tpm_waits"],
+            "tpm_used": {model: window.used for model, window in self._windows.items()},
+            "wait_seconds": {
+                "bounds": list(WAIT_BUCKETS_SECONDS),
+                **{
+                    priority: {
+                        "buckets": list(histogram["buckets"]),
+                        "count": histogram["count"],
+                        "sum": round(histogram["sum"], 4),
+                    }
+                    for priority, histogram in self.stats["wait_seconds"].items()
+                },
+            },
+        }
+
+
+_GOVERNOR: AIGovernor | None = None
+
+
+def get_ai_governor(*, settings_obj=settings) -> AIGovernor | None:
+    global _GOVERNOR
+    max_in_flight = int(getattr(settings_obj, "AI_MAX_IN_FLIGHT", 0) or 0)
+    if max_in_flight <= 0:
+        return None
+    if _GOVERNOR is None:
+        _GOVERNOR = AIGovernor(
+            max_in_flight=max_in_flight,
+            tpm_limits=getattr(settings_obj, "AI_MODEL_TPM_LIMITS", None) or {},
+        )
+    return _GOVERNOR
+
+
+def classify_ai_priority(run_type: str | None, *, settings_obj=settings) -> str:
+    interactive = getattr(settings_obj, "AI_INTERACTIVE_RUN_TYPES", None) or []
+    return PRIORITY_INTERACTIVE if run_type in interactive else PRIORITY_BACKGROUND
+
+
+def ai_tenant_key(audit_context: dict[str, Any]) -> str:
+    if audit_context.get("pair_id"):
+        return f"pair:{audit_context['pair_id']}"
+    if audit_context.get("user_id"):
+        return f"user:{audit_context['user_id']}"
+    return "global"
+
+
+@asynccontextmanager
+async def ai_call_slot(
+    *,
+    model: str,
+    audit_context: dict[str, Any],
+    run_type: str | None,
+    estimated_tokens: int = 0,
+):
+    """Hold a governor slot for one gateway call; yields a usage dict to fill in."""
+
+    governor = get_ai_governor()
+    if governor is None:
+        yield {"total_tokens": None}
+        return
+    async with governor.slot(
+        model=model,
+        estimated_tokens=estimated_tokens,
+        priority=classify_ai_priority(run_type),
+        tenant=ai_tenant_key(audit_context),
+    ) as usage:
+        yield usage
+
+
+def get_ai_governor_stats() -> dict[str, Any]:
+    governor = _GOVERNOR
+    if governor is None:
+        return {"enabled": False}
+    return {"enabled": True, **governor.snapshot()}
@@ -0,0 +1,209 @@
+"""Incremental checkin streak state.
+
+``GET /checkins/streak`` used to load every distinct ``checkin_date`` of the
+scope and walk them in Python, so its cost grew with account age. Each scope
+(user in a pair, or solo user) now owns one ``CheckinStreak`` row holding the
+run ending at ``last_checkin_date``, the longest run and the number of checkin
+days. ``record_checkin_streak`` advances it inside the checkin transaction.
+
+The scan over checkin history remains the seed/repair path: a scope without a
+row gets one from its next checkin, and ``python -m app.rebuild_streaks``
+seeds, recomputes (or verifies) every scope in bulk. Until then reads of such
+a scope fall back to a read-only scan; ``GET /checkins/streak`` never writes.
+"""
+
+from __future__ import annotations
+
+import uuid
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Checkin, CheckinStreak
+
+SOLO_SCOPE_KEY = "solo"
+
+
+@dataclass(frozen=True, slots=True)
+class StreakSummary:
+    current_streak: int = 0
+    longest_streak: int = 0
+    total_checkins: int = 0
+    last_checkin_date: date | None = None
+
+    def streak_on(self, today: date) -> int:
+        """Consecutive days ending ``today``; 0 once a day has been missed."""
+
+        return self.current_streak if self.last_checkin_date == today else 0
+
+
+def streak_scope_key(pair_id: uuid.UUID | str | None) -> str:
+    return str(pair_id) if pair_id else SOLO_SCOPE_KEY
+
+
+def summarize_checkin_dates(dates: Iterable[date]) -> StreakSummary:
+    """Full scan over a scope's checkin dates (any order, duplicates allowed)."""
+
+    ordered = sorted(set(dates))
+    if not ordered:
+        return StreakSummary()
+    run = longest = 1
+    for previous, current in zip(ordered, ordered[1:]):
+        run = run + 1 if current - previous == timedelta(days=1) else 1
+        longest = max(longest, run)
+    return StreakSummary(
+        current_streak=run,
+        longest_streak=longest,
+        total_checkins=len(ordered),
+        last_checkin_date=ordered[-1],
+    )
+
+
+def summary_of(state: CheckinStreak) -> StreakSummary:
+    return StreakSummary(
+        current_streak=state.current_streak or 0,
+        longest_streak=state.longest_streak or 0,
+        total_checkins=state.total_checkins or 0,
+        last_checkin_date=state.last_checkin_date,
+    )
+
+
+def apply_summary(state: CheckinStreak, summary: StreakSummary) -> None:
+    state.current_streak = summary.current_streak
+    state.longest_streak = summary.longest_streak
+    state.total_checkins = summary.total_checkins
+    state.last_checkin_date = summary.last_checkin_date
+
+
+def advance_streak(state: CheckinStreak, checkin_date: date) -> bool:
+    """Count a new checkin day; ``False`` if it is older than the stored state.
+
+    A repeat of ``last_checkin_date`` is a no-op. Days before it cannot be
+    merged incrementally and need a rebuild.
+    """
+
+    last = state.last_checkin_date
+    if last is not None and checkin_date < last:
+        return False
+    if last == checkin_date:
+        return True
+    if last is not None and checkin_date - last == timedelta(days=1):
+        state.current_streak = (state.current_streak or 0) + 1
+    else:
+        state.current_streak = 1
+    state.longest_streak = max(state.longest_streak or 0, state.current_streak)
+    state.total_checkins = (state.total_checkins or 0) + 1
+    state.last_checkin_date = checkin_date
+    return True
+
+
+async def scan_checkin_dates(
+    db: AsyncSession,
+    *,
+    user_id: uuid.UUID,
+    pair_id: uuid.UUID | str | None,
+) -> list[date]:
+    scope_filter = Checkin.pair_id == pair_id if pair_id else Checkin.pair_id.is_(None)
+    result = await db.execute(
+        select(Checkin.checkin_date)
+        .where(scope_filter, Checkin.user_id == user_id)
+        .distinct()
+    )
+    return [row[0] for row in result.all()]
+
+
+async def get_checkin_streak_state(
+    db: AsyncSession,
+    *,
+    user_id: uuid.UUID,
+    pair_id: uuid.UUID | str | None,
+    for_update: bool = False,
+) -> CheckinStreak | None:
+    stmt = select(CheckinStreak).where(
+        CheckinStreak.user_id == user_id,
+        CheckinStreak.scope_key == streak_scope_key(pair_id),
+    )
+    if for_update:
+        stmt = stmt.with_for_update()
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def rebuild_checkin_streak(
+    db: AsyncSession,
+    *,
+    user_id: uuid.UUID,
+    pair_id: uuid.UUID | str | None,
+    state: CheckinStreak | None = None,
+) -> CheckinStreak:
+    """Seed or repair a scope's row from its checkin history."""
+
+    summary = summarize_checkin_dates(
+        await scan_checkin_dates(db, user_id=user_id, pair_id=pair_id)
+    )
+    if state is not None:
+        apply_summary(state, summary)
+        return state
+
+    state = CheckinStreak(
+        user_id=user_id,
+        pair_id=uuid.UUID(str(pair_id)) if pair_id else None,
+        scope_key=streak_scope_key(pair_id),
+    )
+    apply_summary(state, summary)
+    try:
+        async with db.begin_nested():
+            db.add(state)
+    except IntegrityError:
+        # A concurrent request seeded the same scope first: lock its row and
+        # rescan, since the scan above may predate that request's checkin.
+        existing = await get_checkin_streak_state(
+            db, user_id=user_id, pair_id=pair_id, for_update=True
+        )
+        if existing is None:
+            raise
+        apply_summary(
+            existing,
+            summarize_checkin_dates(
+                await scan_checkin_dates(db, user_id=user_id, pair_id=pair_id)
+            ),
+        )
+        return existing
+    return state
+
+
+async def record_checkin_streak(
+    db: AsyncSession,
+    *,
+    user_id: uuid.UUID,
+    pair_id: uuid.UUID | str | None,
+    checkin_date: date,
+) -> CheckinStreak:
+    """Advance the scope's streak for a checkin flushed in this transaction."""
+
+    state = await get_checkin_streak_state(
+        db, user_id=user_id, pair_id=pair_id, for_update=True
+    )
+    if state is None or not advance_streak(state, checkin_date):
+        state = await rebuild_checkin_streak(
+            db, user_id=user_id, pair_id=pair_id, state=state
+        )
+    return state
+
+
+async def load_checkin_streak(
+    db: AsyncSession,
+    *,
+    user_id: uuid.UUID,
+    pair_id: uuid.UUID | str | None,
+) -> StreakSummary:
+    state = await get_checkin_streak_state(db, user_id=user_id, pair_id=pair_id)
+    if state is None:
+        return summarize_checkin_dates(
+            await scan_checkin_dates(db, user_id=user_id, pair_id=pair_id)
+        )
+    return summary_of(state)
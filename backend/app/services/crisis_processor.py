@@ -15,7 +15,10 @@ from app.models import (
     Report,
     UserNotification,
 )
-from app.services.relationship_intelligence import record_relationship_event
+from app.services.relationship_intelligence import (
+    record_relationship_event,
+    record_relationship_events,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -103,22 +106,24 @@ async def process_crisis_from_report(
         return last_active
 
     # 如果之前有 active 预警但级别变了，把旧的标记为 resolved
+    events = []
     if last_active:
         last_active.status = CrisisAlertStatus.RESOLVED
         last_active.resolved_at = datetime.now(timezone.utc).replace(tzinfo=None)
         last_active.resolve_note = f"危机等级变更：{CRISIS_LEVEL_LABELS.get(previous_level_str, previous_level_str)} → {CRISIS_LEVEL_LABELS.get(crisis_level_str, crisis_level_str)}"
-        await record_relationship_event(
-            db,
-            event_type="crisis.resolved",
-            pair_id=report.pair_id,
-            entity_type="crisis_alert",
-            entity_id=last_active.id,
-            payload={
-                "level": previous_level_str,
-                "status": last_active.status.value,
-                "reason": "level_changed",
-            },
-            idempotency_key=f"crisis:{last_active.id}:resolved:{report.id}",
+        events.append(
+            dict(
+                event_type="crisis.resolved",
+                pair_id=report.pair_id,
+                entity_type="crisis_alert",
+                entity_id=last_active.id,
+                payload={
+                    "level": previous_level_str,
+                    "status": last_active.status.value,
+                    "reason": "level_changed",
+                },
+                idempotency_key=f"crisis:{last_active.id}:resolved:{report.id}",
+            )
         )
 
     # 创建新的 CrisisAlert
@@ -140,20 +145,22 @@ async def process_crisis_from_report(
     )
     db.add(alert)
     await db.flush()
-    await record_relationship_event(
-        db,
-        event_type="crisis.raised",
-        pair_id=report.pair_id,
-        entity_type="crisis_alert",
-        entity_id=alert.id,
-        payload={
-            "level": crisis_level_str,
-            "previous_level": previous_level_str,
-            "health_score": alert.health_score,
-            "status": alert.status.value,
-        },
-        idempotency_key=f"crisis:{alert.id}:raised",
+    events.append(
+        dict(
+            event_type="crisis.raised",
+            pair_id=report.pair_id,
+            entity_type="crisis_alert",
+            entity_id=alert.id,
+            payload={
+                "level": crisis_level_str,
+                "previous_level": previous_level_str,
+                "health_score": alert.health_score,
+                "status": alert.status.value,
+            },
+            idempotency_key=f"crisis:{alert.id}:raised",
+        )
     )
+    await record_relationship_events(db, events)
 
     # 创建通知（向配对双方）
     await _create_crisis_notifications(db, pair, crisis_level_str, previous_level_str)
@@ -176,23 +183,27 @@ async def _auto_resolve_active_alerts(db: AsyncSession, pair_id: str):
     )
     active_alerts = result.scalars().all()
     now = datetime.now(timezone.utc).replace(tzinfo=None)
+    events = []
     for alert in active_alerts:
         alert.status = CrisisAlertStatus.RESOLVED
         alert.resolved_at = now
         alert.resolve_note = "关系状态恢复正常，预警自动解除"
-        await record_relationship_event(
-            db,
-            event_type="crisis.resolved",
-            pair_id=pair_id,
-            entity_type="crisis_alert",
-            entity_id=alert.id,
-            payload={
-                "level": alert.level.value,
-                "status": alert.status.value,
-                "reason": "auto_recovered",
-            },
-            idempotency_key=f"crisis:{alert.id}:auto_resolved",
+        events.append(
+            dict(
+                event_type="crisis.resolved",
+                pair_id=pair_id,
+                entity_type="crisis_alert",
+                entity_id=alert.id,
+                payload={
+                    "level": alert.level.value,
+                    "status": alert.status.value,
+                    "reason": "auto_recovered",
+                },
+                idempotency_key=f"crisis:{alert.id}:auto_resolved",
+            )
         )
+    if events:
+        await record_relationship_events(db, events)
     if active_alerts:
         logger.info(
             f"Auto-resolved {len(active_alerts)} crisis alerts for pair={pair_id}"
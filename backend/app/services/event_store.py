@@ -0,0 +1,333 @@
+"""Event families and storage tiers for the relationship event stream.
+
+``relationship_events`` used to receive every event, so the timeline and profile
+builders had to skip telemetry with ``NOT LIKE '%.viewed'`` while the privacy
+audit list scanned for ``LIKE 'privacy.%'``. Events are now routed by family:
+
+- business events stay in ``relationship_events``. They are read by the
+  timeline, profile and plan builders, referenced by ``intervention_plans`` and
+  deduplicated by a unique idempotency key;
+- view telemetry (``*.viewed`` / ``*_viewed``) goes to
+  ``relationship_view_events``;
+- privacy audit records (``privacy.*``) go to ``privacy_audit_events``.
+
+Each log family has a hot table and an ``*_archive`` table. On Postgres both
+are range-partitioned by month on ``occurred_at``. Archiving detaches whole
+monthly partitions from the hot table and attaches them to the archive, so no
+rows are copied; it can also move them to a cheaper tablespace. On other
+databases archiving moves the rows. Only rows older than the cutoff are
+archived, so every archived row is older than every hot row. Readers page
+through the hot table first and continue into the archive only when the page is
+not yet full. Retention drops whole expired partitions and deletes the remaining
+expired rows in key-ordered chunks.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime
+from typing import Callable, Sequence
+
+from sqlalchemy import delete, func, insert, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import (
+    PrivacyAuditEvent,
+    PrivacyAuditEventArchive,
+    RelationshipEvent,
+    RelationshipViewEvent,
+    RelationshipViewEventArchive,
+)
+
+logger = logging.getLogger(__name__)
+
+BUSINESS_EVENTS = "business"
+VIEW_EVENTS = "view"
+PRIVACY_EVENTS = "privacy"
+
+# 日志事件族：(热表, 归档表)
+EVENT_LOG_TIERS = {
+    VIEW_EVENTS: (RelationshipViewEvent, RelationshipViewEventArchive),
+    PRIVACY_EVENTS: (PrivacyAuditEvent, PrivacyAuditEventArchive),
+}
+
+EventFilters = Callable[[type], Sequence]
+
+
+def event_family(event_type: str) -> str:
+    event_type = str(event_type)
+    if event_type.startswith("privacy."):
+        return PRIVACY_EVENTS
+    if event_type.endswith((".viewed", "_viewed")):
+        return VIEW_EVENTS
+    return BUSINESS_EVENTS
+
+
+def event_model(event_type: str) -> type:
+    """Model new events of ``event_type`` are written to."""
+
+    family = event_family(event_type)
+    if family == BUSINESS_EVENTS:
+        return RelationshipEvent
+    return EVENT_LOG_TIERS[family][0]
+
+
+async def fetch_event_log_page(
+    db: AsyncSession,
+    family: str,
+    filters: EventFilters,
+    *,
+    limit: int,
+    after: tuple[datetime, object] | None = None,
+) -> list:
+    """Newest-first ``(occurred_at, id)`` page across the hot and archive tiers.
+
+    ``filters(model)`` returns the WHERE clauses for one tier's model.
+    """
+
+    rows: list = []
+    for model in EVENT_LOG_TIERS[family]:
+        order = (model.occurred_at, model.id)
+        stmt = select(model).where(*filters(model))
+        resume = (rows[-1].occurred_at, rows[-1].id) if rows else after
+        if resume is not None:
+            stmt = stmt.where(tuple_(*order) < tuple_(*resume))
+        stmt = stmt.order_by(*(column.desc() for column in order))
+        result = await db.execute(stmt.limit(limit - len(rows)))
+        rows.extend(result.scalars().all())
+        if len(rows) >= limit:
+            break
+    return rows
+
+
+async def count_event_log_rows(
+    db: AsyncSession, family: str, filters: EventFilters
+) -> int:
+    total = 0
+    for model in EVENT_LOG_TIERS[family]:
+        stmt = select(func.count()).select_from(model).where(*filters(model))
+        total += int((await db.execute(stmt)).scalar_one() or 0)
+    return total
+
+
+async def delete_event_log_rows(
+    db: AsyncSession, family: str, filters: EventFilters
+) -> int:
+    deleted = 0
+    for model in EVENT_LOG_TIERS[family]:
+        result = await db.execute(delete(model).where(*filters(model)))
+        deleted += int(result.rowcount or 0)
+    return deleted
+
+
+async def delete_event_log_chunk(
+    db: AsyncSession,
+    model: type,
+    *,
+    before: datetime,
+    after: tuple[datetime, object] | None = None,
+    limit: int,
+) -> tuple[int, tuple[datetime, object] | None]:
+    """Delete the next ``limit`` rows of ``model`` older than ``before``.
+
+    Rows go in ascending ``(occurred_at, id)`` order starting after ``after``,
+    and the chunk is deleted as one key range rather than an id list. Returns
+    the deleted count and the last key covered, or ``None`` as the key once no
+    older rows remain.
+    """
+
+    key = tuple_(model.occurred_at, model.id)
+    window = [model.occurred_at < before]
+    if after is not None:
+        window.append(key > tuple_(*after))
+    boundary = (
+        await db.execute(
+            select(model.occurred_at, model.id)
+            .where(*window)
+            .order_by(model.occurred_at, model.id)
+            .offset(max(limit, 1) - 1)
+            .limit(1)
+        )
+    ).first()
+    if boundary is not None:
+        window.append(key <= tuple_(*boundary))
+    result = await db.execute(delete(model).where(*window))
+    deleted = int(result.rowcount or 0)
+    if boundary is None:
+        return deleted, None
+    return deleted, (boundary.occurred_at, boundary.id)
+
+
+# ── 分区维护 ──
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def _partition_month(table: str, name: str) -> date | None:
+    suffix = name.removeprefix(f"{table}_p")
+    if suffix == name or len(suffix) != 6 or not suffix.isdigit():
+        return None
+    return date(int(suffix[:4]), int(suffix[4:]), 1)
+
+
+def _bounds(month: date) -> str:
+    return f"FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+
+
+async def list_partitions(db: AsyncSession, table: str) -> list[str]:
+    result = await db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :table"
+        ),
+        {"table": table},
+    )
+    return sorted(result.scalars().all())
+
+
+async def _create_month_partition(db: AsyncSession, table: str, month: date) -> None:
+    name = partition_name(table, month)
+    default = f"{table}_default"
+    window = {"lower": month, "upper": add_months(month, 1)}
+    in_range = "occurred_at >= :lower AND occurred_at < :upper"
+    create = f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {_bounds(month)}"
+    stray = await db.execute(
+        text(f"SELECT 1 FROM {default} WHERE {in_range} LIMIT 1"), window
+    )
+    if stray.first() is None:
+        await db.execute(text(create))
+        return
+
+    # 默认分区已有该月的行时不能直接建分区：先摘下默认分区，建好后把行搬回
+    logger.warning("moving %s rows of %s out of the default partition", table, month)
+    await db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+    await db.execute(text(create))
+    await db.execute(
+        text(f"INSERT INTO {name} SELECT * FROM {default} WHERE {in_range}"), window
+    )
+    await db.execute(text(f"DELETE FROM {default} WHERE {in_range}"), window)
+    await db.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+
+
+async def ensure_event_partitions(
+    db: AsyncSession,
+    *,
+    months_ahead: int | None = None,
+    today: date | None = None,
+) -> list[str]:
+    """Create monthly partitions of the hot log tables up to ``months_ahead``."""
+
+    if db.get_bind().dialect.name != "postgresql":
+        return []
+    if months_ahead is None:
+        months_ahead = settings.EVENT_PARTITION_MONTHS_AHEAD
+    current = month_start(today or date.today())
+    created: list[str] = []
+    for hot, _archive in EVENT_LOG_TIERS.values():
+        table = hot.__tablename__
+        existing = set(await list_partitions(db, table))
+        for offset in range(max(months_ahead, 0) + 1):
+            month = add_months(current, offset)
+            if partition_name(table, month) in existing:
+                continue
+            await _create_month_partition(db, table, month)
+            created.append(partition_name(table, month))
+    return created
+
+
+async def archive_event_logs(
+    db: AsyncSession,
+    *,
+    before: datetime,
+    dry_run: bool = False,
+) -> dict[str, int]:
+    """Move log months that ended before ``before`` into the archive tier.
+
+    Postgres moves whole partitions and returns the partition count per table.
+    Other databases move rows and return the row count.
+    """
+
+    boundary = month_start(before.date())
+    postgres = db.get_bind().dialect.name == "postgresql"
+    moved: dict[str, int] = {}
+    for hot, archive in EVENT_LOG_TIERS.values():
+        table = hot.__tablename__
+        if not postgres:
+            old_rows = hot.occurred_at < datetime.combine(boundary, datetime.min.time())
+            columns = [column.name for column in hot.__table__.columns]
+            count = select(func.count()).select_from(hot).where(old_rows)
+            moved[table] = int((await db.execute(count)).scalar_one() or 0)
+            if moved[table] and not dry_run:
+                await db.execute(
+                    insert(archive).from_select(columns, select(hot).where(old_rows))
+                )
+                await db.execute(delete(hot).where(old_rows))
+            continue
+
+        moved[table] = 0
+        for name in await list_partitions(db, table):
+            month = _partition_month(table, name)
+            if month is None or add_months(month, 1) > boundary:
+                continue
+            moved[table] += 1
+            if dry_run:
+                continue
+            await db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            tablespace = settings.EVENT_ARCHIVE_TABLESPACE
+            if tablespace:
+                await db.execute(
+                    text(f"ALTER TABLE {name} SET TABLESPACE {tablespace}")
+                )
+            await db.execute(
+                text(
+                    f"ALTER TABLE {archive.__tablename__} ATTACH PARTITION {name} "
+                    f"FOR VALUES {_bounds(month)}"
+                )
+            )
+    return moved
+
+
+async def drop_expired_partitions(
+    db: AsyncSession,
+    family: str,
+    *,
+    before: datetime,
+    dry_run: bool = False,
+) -> dict[str, int]:
+    """Drop monthly partitions of both tiers whose whole month ended by ``before``.
+
+    Postgres only. Dropping a partition frees its month without writing a row to
+    WAL. Returns the row count of each dropped partition.
+    """
+
+    if db.get_bind().dialect.name != "postgresql":
+        return {}
+    hot_table = EVENT_LOG_TIERS[family][0].__tablename__
+    dropped: dict[str, int] = {}
+    for model in EVENT_LOG_TIERS[family]:
+        for name in await list_partitions(db, model.__tablename__):
+            # 归档层挂载的仍是热表命名的月分区
+            month = _partition_month(hot_table, name)
+            if month is None:
+                continue
+            if datetime.combine(add_months(month, 1), datetime.min.time()) > before:
+                continue
+            count = await db.execute(text(f"SELECT count(*) FROM {name}"))
+            dropped[name] = int(count.scalar_one() or 0)
+            if not dry_run:
+                await db.execute(text(f"DROP TABLE {name}"))
+    return dropped
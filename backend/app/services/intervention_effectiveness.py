@@ -15,6 +15,7 @@ from app.models import (
     ReportStatus,
     TaskStatus,
 )
+from app.services.request_memo import SCORECARD_TABLES, session_memoized
 from app.services.task_feedback import summarize_feedback_map
 
 RISK_ORDER = {
@@ -255,6 +256,7 @@ async def _get_health_current(
     return None
 
 
+@session_memoized(tables=SCORECARD_TABLES)
 async def build_intervention_scorecard(
     db: AsyncSession,
     *,
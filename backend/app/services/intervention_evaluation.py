@@ -5,6 +5,7 @@ import uuid
 from app.services.intervention_effectiveness import build_intervention_scorecard
 from app.services.intervention_theory import build_evaluation_theory_basis
 from app.services.playbook_runtime import sync_active_playbook_runtime
+from app.services.request_memo import PLAYBOOK_RUNTIME_TABLES, session_memoized
 
 RISK_ORDER = {
     "none": 0,
@@ -411,6 +412,7 @@ def _recommendation(
     )
 
 
+@session_memoized(tables=PLAYBOOK_RUNTIME_TABLES)
 async def build_intervention_evaluation(
     db,
     *,
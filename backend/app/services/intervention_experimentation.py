@@ -17,6 +17,7 @@ from app.services.intervention_theory import (
 )
 from app.services.playbook_runtime import sync_active_playbook_runtime
 from app.services.relationship_intelligence import record_relationship_event
+from app.services.request_memo import PLAYBOOK_RUNTIME_TABLES, session_memoized
 from app.services.task_adaptation import compose_task_adaptation_strategy
 from app.services.task_feedback import build_feedback_preference_profile
 
@@ -499,6 +500,7 @@ def _snapshot_payload(
     return observation
 
 
+@session_memoized(tables=PLAYBOOK_RUNTIME_TABLES, refresh_on=("persist_snapshot",))
 async def build_intervention_experiment_ledger(
     db: AsyncSession,
     *,
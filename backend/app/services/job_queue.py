@@ -0,0 +1,523 @@
+"""Database-backed background job queue.
+
+The web process only inserts ``background_jobs`` rows inside the request
+transaction; a separate worker (``python -m app.worker``) claims them, runs the
+registered handler and records the outcome. Claiming uses
+``SELECT ... FOR UPDATE SKIP LOCKED`` on PostgreSQL so several workers can share
+one queue, and a compare-and-set ``UPDATE`` on SQLite, which has no row locks.
+Every claim gets a fresh token; the running job refreshes ``locked_at`` on a
+heartbeat and records its outcome only while it still holds that token, so a
+job requeued after a lost heartbeat cannot be overwritten by its old runner.
+Failed jobs are retried with exponential backoff and dead-lettered once their
+attempts are exhausted.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+import os
+import socket
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import background_session
+from app.models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUS_QUEUED = "queued"
+JOB_STATUS_RUNNING = "running"
+JOB_STATUS_SUCCEEDED = "succeeded"
+JOB_STATUS_DEAD = "dead"
+ACTIVE_JOB_STATUSES = (JOB_STATUS_QUEUED, JOB_STATUS_RUNNING)
+
+# Modules whose import registers job handlers; the worker loads them on start.
+JOB_HANDLER_MODULES = (
+    "app.api.v1.checkins",
+    "app.api.v1.reports",
+    "app.services.agent_context",
+)
+
+JobHandler = Callable[..., Awaitable[Any]]
+
+
+@dataclass(frozen=True)
+class JobDefinition:
+    job_type: str
+    handler: JobHandler
+    concurrency: int = 1
+    max_attempts: int = 3
+
+
+@dataclass(frozen=True)
+class ClaimedJob:
+    id: uuid.UUID
+    job_type: str
+    payload: dict
+    attempts: int
+    max_attempts: int
+    claim_token: str
+
+
+_JOB_REGISTRY: dict[str, JobDefinition] = {}
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def job_handler(job_type: str, *, concurrency: int = 1, max_attempts: int = 3):
+    """Register an async function as the handler for ``job_type``.
+
+    The job payload is passed as keyword arguments, so it must be JSON-safe and
+    match the handler's parameter names. Handlers signal failure by raising.
+    """
+
+    def decorator(func: JobHandler) -> JobHandler:
+        _JOB_REGISTRY[job_type] = JobDefinition(
+            job_type=job_type,
+            handler=func,
+            concurrency=max(int(concurrency), 1),
+            max_attempts=max(int(max_attempts), 1),
+        )
+        return func
+
+    return decorator
+
+
+def load_job_handlers() -> list[str]:
+    for module_name in JOB_HANDLER_MODULES:
+        importlib.import_module(module_name)
+    return registered_job_types()
+
+
+def get_job_definition(job_type: str) -> JobDefinition | None:
+    return _JOB_REGISTRY.get(job_type)
+
+
+def registered_job_types() -> list[str]:
+    return sorted(_JOB_REGISTRY)
+
+
+def job_concurrency(job_type: str) -> int:
+    override = (settings.JOB_CONCURRENCY_OVERRIDES or {}).get(job_type)
+    if override is not None:
+        return max(int(override), 0)
+    definition = _JOB_REGISTRY.get(job_type)
+    return definition.concurrency if definition else 1
+
+
+def retry_delay_seconds(attempts: int) -> int:
+    base = max(int(settings.JOB_RETRY_BASE_SECONDS), 1)
+    ceiling = max(int(settings.JOB_RETRY_MAX_SECONDS), base)
+    return min(base * (2 ** max(attempts - 1, 0)), ceiling)
+
+
+async def enqueue_job(
+    db: AsyncSession,
+    job_type: str,
+    payload: dict | None = None,
+    *,
+    dedupe_key: str | None = None,
+    run_after: datetime | None = None,
+    max_attempts: int | None = None,
+) -> BackgroundJob:
+    """Add a job to the caller's transaction; it becomes visible on commit.
+
+    A ``dedupe_key`` collapses the request onto a queued or running job with the
+    same key instead of adding a second one. The check is an
+    ``INSERT ... ON CONFLICT DO NOTHING`` against the partial unique index on
+    active dedupe keys, so concurrent enqueues cannot both insert.
+    """
+
+    definition = _JOB_REGISTRY.get(job_type)
+    values = {
+        "job_type": job_type,
+        "payload": payload or {},
+        "status": JOB_STATUS_QUEUED,
+        "dedupe_key": dedupe_key,
+        "attempts": 0,
+        "max_attempts": max_attempts or (definition.max_attempts if definition else 3),
+        "run_after": run_after or _utcnow(),
+    }
+    if not dedupe_key:
+        job = BackgroundJob(**values)
+        db.add(job)
+        await db.flush()
+        return job
+
+    dialect = db.get_bind().dialect.name
+    insert_factory = pg_insert if dialect == "postgresql" else sqlite_insert
+    statement = (
+        insert_factory(BackgroundJob)
+        .values(**values)
+        .on_conflict_do_nothing(
+            index_elements=[BackgroundJob.dedupe_key],
+            index_where=BackgroundJob.status.in_(ACTIVE_JOB_STATUSES),
+        )
+        .returning(BackgroundJob.id)
+    )
+    inserted_id = (await db.execute(statement)).scalar_one_or_none()
+    if inserted_id is not None:
+        return await db.get(BackgroundJob, inserted_id)
+
+    existing = (
+        await db.execute(
+            select(BackgroundJob)
+            .where(
+                BackgroundJob.dedupe_key == dedupe_key,
+                BackgroundJob.status.in_(ACTIVE_JOB_STATUSES),
+            )
+            .limit(1)
+        )
+    ).scalar_one_or_none()
+    if existing is None:
+        # 冲突的任务恰好在两条语句之间结束；再插一次即可
+        return await enqueue_job(
+            db,
+            job_type,
+            payload,
+            dedupe_key=dedupe_key,
+            run_after=run_after,
+            max_attempts=max_attempts,
+        )
+    return existing
+
+
+async def claim_jobs(
+    db: AsyncSession,
+    *,
+    job_type: str,
+    worker_id: str,
+    limit: int,
+) -> list[ClaimedJob]:
+    """Mark up to ``limit`` due jobs of one type as running for ``worker_id``."""
+
+    if limit <= 0:
+        return []
+
+    now = _utcnow()
+    due = (
+        select(BackgroundJob)
+        .where(
+            BackgroundJob.job_type == job_type,
+            BackgroundJob.status == JOB_STATUS_QUEUED,
+            BackgroundJob.run_after <= now,
+        )
+        .order_by(BackgroundJob.run_after.asc(), BackgroundJob.created_at.asc())
+        .limit(limit)
+    )
+
+    if db.get_bind().dialect.name == "postgresql":
+        result = await db.execute(due.with_for_update(skip_locked=True))
+        jobs = list(result.scalars().all())
+        for job in jobs:
+            job.status = JOB_STATUS_RUNNING
+            job.locked_by = worker_id
+            job.locked_at = now
+            job.claim_token = uuid.uuid4().hex
+            job.attempts = int(job.attempts or 0) + 1
+    else:
+        candidate_ids = (
+            await db.execute(due.with_only_columns(BackgroundJob.id))
+        ).scalars().all()
+        jobs = []
+        for job_id in candidate_ids:
+            claimed = await db.execute(
+                update(BackgroundJob)
+                .where(
+                    BackgroundJob.id == job_id,
+                    BackgroundJob.status == JOB_STATUS_QUEUED,
+                )
+                .values(
+                    status=JOB_STATUS_RUNNING,
+                    locked_by=worker_id,
+                    locked_at=now,
+                    claim_token=uuid.uuid4().hex,
+                    attempts=BackgroundJob.attempts + 1,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            if claimed.rowcount == 1:
+                job = await db.get(BackgroundJob, job_id, populate_existing=True)
+                if job is not None:
+                    jobs.append(job)
+
+    claimed_jobs = [
+        ClaimedJob(
+            id=job.id,
+            job_type=job.job_type,
+            payload=dict(job.payload or {}),
+            attempts=int(job.attempts or 0),
+            max_attempts=int(job.max_attempts or 1),
+            claim_token=job.claim_token,
+        )
+        for job in jobs
+    ]
+    await db.commit()
+    return claimed_jobs
+
+
+async def requeue_stale_jobs(db: AsyncSession) -> int:
+    """Release running jobs whose claim outlived the lock timeout (worker crash or restart)."""
+
+    cutoff = _utcnow() - timedelta(seconds=max(int(settings.JOB_LOCK_TIMEOUT_SECONDS), 1))
+    stale = (
+        BackgroundJob.status == JOB_STATUS_RUNNING,
+        BackgroundJob.locked_at < cutoff,
+    )
+    dead = await db.execute(
+        update(BackgroundJob)
+        .where(*stale, BackgroundJob.attempts >= BackgroundJob.max_attempts)
+        .values(
+            status=JOB_STATUS_DEAD,
+            locked_by=None,
+            locked_at=None,
+            claim_token=None,
+            finished_at=_utcnow(),
+            last_error="worker lock expired",
+        )
+        .execution_options(synchronize_session=False)
+    )
+    released = await db.execute(
+        update(BackgroundJob)
+        .where(*stale)
+        .values(
+            status=JOB_STATUS_QUEUED,
+            locked_by=None,
+            locked_at=None,
+            claim_token=None,
+            run_after=_utcnow(),
+            last_error="worker lock expired",
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return int(dead.rowcount or 0) + int(released.rowcount or 0)
+
+
+async def heartbeat_job(job: ClaimedJob) -> bool:
+    """Refresh ``locked_at`` for a running job; ``False`` once the claim is lost."""
+
+    async with background_session() as db:
+        result = await db.execute(
+            update(BackgroundJob)
+            .where(
+                BackgroundJob.id == job.id,
+                BackgroundJob.status == JOB_STATUS_RUNNING,
+                BackgroundJob.claim_token == job.claim_token,
+            )
+            .values(locked_at=_utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+    return result.rowcount == 1
+
+
+async def _heartbeat_loop(job: ClaimedJob) -> None:
+    interval = max(float(settings.JOB_HEARTBEAT_SECONDS), 0.01)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if not await heartbeat_job(job):
+                logger.warning(
+                    "background job %s (%s) lost its claim; its result will be discarded",
+                    job.id,
+                    job.job_type,
+                )
+                return
+        except Exception:
+            logger.exception("heartbeat for background job %s failed", job.id)
+
+
+async def _finish_job(
+    job: ClaimedJob,
+    *,
+    worker_id: str,
+    error: BaseException | None,
+) -> bool:
+    now = _utcnow()
+    if error is None:
+        values: dict[str, Any] = {
+            "status": JOB_STATUS_SUCCEEDED,
+            "finished_at": now,
+            "last_error": None,
+        }
+    elif job.attempts >= job.max_attempts:
+        values = {
+            "status": JOB_STATUS_DEAD,
+            "finished_at": now,
+            "last_error": _format_error(error),
+        }
+    else:
+        values = {
+            "status": JOB_STATUS_QUEUED,
+            "run_after": now + timedelta(seconds=retry_delay_seconds(job.attempts)),
+            "last_error": _format_error(error),
+        }
+    values.update({"locked_by": None, "locked_at": None, "claim_token": None})
+
+    async with background_session() as db:
+        result = await db.execute(
+            update(BackgroundJob)
+            .where(
+                BackgroundJob.id == job.id,
+                BackgroundJob.status == JOB_STATUS_RUNNING,
+                BackgroundJob.locked_by == worker_id,
+                BackgroundJob.claim_token == job.claim_token,
+            )
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+    if result.rowcount != 1:
+        logger.warning(
+            "background job %s (%s) was reclaimed before worker %s finished it",
+            job.id,
+            job.job_type,
+            worker_id,
+        )
+        return False
+    return True
+
+
+def _format_error(error: BaseException) -> str:
+    return f"{type(error).__name__}: {error}"[:2000]
+
+
+async def run_claimed_job(job: ClaimedJob, *, worker_id: str) -> bool:
+    definition = _JOB_REGISTRY.get(job.job_type)
+    error: BaseException | None = None
+    if definition is None:
+        error = LookupError(f"no handler registered for job type {job.job_type}")
+    else:
+        heartbeat = asyncio.create_task(_heartbeat_loop(job))
+        try:
+            await definition.handler(**job.payload)
+        except Exception as exc:
+            error = exc
+            logger.exception(
+                "background job %s (%s) failed on attempt %s/%s",
+                job.id,
+                job.job_type,
+                job.attempts,
+                job.max_attempts,
+            )
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+    await _finish_job(job, worker_id=worker_id, error=error)
+    return error is None
+
+
+async def retry_dead_job(db: AsyncSession, job: BackgroundJob) -> BackgroundJob:
+    """Move a dead-lettered job back to the queue with a fresh attempt budget."""
+
+    if job.status != JOB_STATUS_DEAD:
+        raise ValueError("only dead jobs can be retried")
+    if job.dedupe_key:
+        active = await db.scalar(
+            select(BackgroundJob.id)
+            .where(
+                BackgroundJob.dedupe_key == job.dedupe_key,
+                BackgroundJob.status.in_(ACTIVE_JOB_STATUSES),
+            )
+            .limit(1)
+        )
+        if active is not None:
+            raise ValueError("an active job with the same dedupe key already exists")
+    job.status = JOB_STATUS_QUEUED
+    job.attempts = 0
+    job.run_after = _utcnow()
+    job.finished_at = None
+    job.locked_by = None
+    job.locked_at = None
+    job.claim_token = None
+    await db.flush()
+    return job
+
+
+async def get_job_queue_stats(db: AsyncSession) -> dict[str, dict[str, int]]:
+    result = await db.execute(
+        select(BackgroundJob.job_type, BackgroundJob.status, func.count())
+        .group_by(BackgroundJob.job_type, BackgroundJob.status)
+    )
+    stats: dict[str, dict[str, int]] = {}
+    for job_type, status, count in result.all():
+        stats.setdefault(job_type, {})[status] = int(count)
+    return stats
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+@dataclass
+class JobWorker:
+    """Polls the queue and runs jobs within each type's concurrency limit."""
+
+    worker_id: str = field(default_factory=default_worker_id)
+    poll_seconds: float = field(
+        default_factory=lambda: max(float(settings.JOB_WORKER_POLL_SECONDS), 0.05)
+    )
+    job_types: tuple[str, ...] | None = None
+    _running: dict[str, set[asyncio.Task]] = field(default_factory=dict)
+
+    def _types(self) -> list[str]:
+        return list(self.job_types) if self.job_types else registered_job_types()
+
+    async def run_once(self) -> int:
+        started = 0
+        for job_type in self._types():
+            active = self._running.setdefault(job_type, set())
+            capacity = job_concurrency(job_type) - len(active)
+            if capacity <= 0:
+                continue
+            async with background_session() as db:
+                jobs = await claim_jobs(
+                    db, job_type=job_type, worker_id=self.worker_id, limit=capacity
+                )
+            for job in jobs:
+                task = asyncio.create_task(run_claimed_job(job, worker_id=self.worker_id))
+                active.add(task)
+                task.add_done_callback(active.discard)
+                started += 1
+        return started
+
+    async def drain(self) -> None:
+        tasks = [task for active in self._running.values() for task in active]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run_forever(self, stop: asyncio.Event) -> None:
+        logger.info(
+            "job worker %s started for %s", self.worker_id, ", ".join(self._types())
+        )
+        last_recovery = 0.0
+        loop = asyncio.get_running_loop()
+        while not stop.is_set():
+            try:
+                if loop.time() - last_recovery >= 60:
+                    async with background_session() as db:
+                        await requeue_stale_jobs(db)
+                    last_recovery = loop.time()
+                await self.run_once()
+            except Exception:
+                logger.exception("job worker %s poll failed", self.worker_id)
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+        await self.drain()
+        logger.info("job worker %s stopped", self.worker_id)
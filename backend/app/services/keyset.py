@@ -0,0 +1,89 @@
+"""Keyset (cursor) pagination for newest-first history lists.
+
+Pages are ordered descending by a sort column plus the primary key as a tie
+breaker, e.g. ``(checkin_date, id)``. The next page resumes with a row-value
+comparison ``(sort, id) < (last_sort, last_id)`` that a composite index on the
+scope columns followed by ``(sort, id)`` answers with a bounded range scan, so
+deep pages cost the same as the first one (unlike ``OFFSET``).
+
+Cursors are opaque URL-safe strings carrying the last row's key values. They
+grant nothing by themselves: every query still applies its own scope filters.
+List endpoints return the next cursor in the ``X-Next-Cursor`` header so the
+response bodies stay unchanged.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import uuid
+from datetime import date, datetime
+from typing import Any, Sequence
+
+from sqlalchemy import Select, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return value.hex
+    return value
+
+
+def _decode_value(column, value: Any) -> Any:
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is uuid.UUID:
+        return uuid.UUID(value)
+    return python_type(value)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> tuple:
+    """Typed key values for ``columns``; ``ValueError`` for malformed cursors."""
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (UnicodeError, ValueError) as exc:
+        raise ValueError("invalid cursor") from exc
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("invalid cursor")
+    try:
+        return tuple(_decode_value(column, value) for column, value in zip(columns, values))
+    except (TypeError, ValueError) as exc:
+        raise ValueError("invalid cursor") from exc
+
+
+def keyset_page_query(
+    stmt: Select,
+    columns: Sequence,
+    *,
+    after: tuple | None,
+    limit: int,
+) -> Select:
+    """Order newest-first by ``columns`` and fetch one extra row past ``limit``."""
+
+    if after is not None:
+        stmt = stmt.where(tuple_(*columns) < tuple_(*after))
+    return stmt.order_by(*(column.desc() for column in columns)).limit(limit + 1)
+
+
+def split_page(rows: Sequence, columns: Sequence, limit: int) -> tuple[list, str | None]:
+    """Trim the look-ahead row and build the cursor for the next page."""
+
+    page = list(rows[:limit])
+    if len(rows) <= limit or not page:
+        return page, None
+    last = page[-1]
+    return page, encode_cursor([getattr(last, column.key) for column in columns])
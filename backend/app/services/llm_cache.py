@@ -0,0 +1,270 @@
+"""Content-addressed cache for chat completion responses.
+
+Keys hash the model, the *redacted* messages, the temperature and any extra
+request options (tools, response_format, ...), so identical prompts share one
+entry and raw user text never appears in a key. Caching is opt-in twice over:
+``LLM_CACHE_ENABLED`` must be set and the call's audit ``run_type`` needs a
+positive TTL in ``LLM_CACHE_TTLS``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_LLM_CACHE_STATS = {
+    "hits": 0,
+    "misses": 0,
+    "stores": 0,
+    "evictions": 0,
+    "errors": 0,
+}
+
+
+def llm_cache_ttl(run_type: str, *, settings_obj=settings) -> int:
+    if not getattr(settings_obj, "LLM_CACHE_ENABLED", False):
+        return 0
+    ttls = getattr(settings_obj, "LLM_CACHE_TTLS", None) or {}
+    return max(int(ttls.get(run_type, 0) or 0), 0)
+
+
+def llm_cache_key(
+    *,
+    model: str,
+    messages: list[dict],
+    temperature: float,
+    options: dict[str, Any] | None = None,
+) -> str:
+    material = json.dumps(
+        {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "options": options or {},
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class MemoryLLMCache:
+    def __init__(self, *, max_entries: int):
+        self.max_entries = max(int(max_entries), 1)
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    async def get(self, key: str) -> dict | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.time():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: dict, ttl_seconds: int) -> None:
+        self._entries[key] = (time.time() + ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            _LLM_CACHE_STATS["evictions"] += 1
+
+    async def close(self) -> None:
+        self._entries.clear()
+
+
+class SQLiteLLMCache:
+    """Single-file cache shared by the web and worker processes on one host."""
+
+    def __init__(self, path: str, *, max_entries: int):
+        self.max_entries = max(int(max_entries), 1)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_llm_cache_accessed_at ON llm_cache (accessed_at)"
+        )
+        self._conn.commit()
+
+    def _get(self, key: str) -> dict | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def _set(self, key: str, value: dict, ttl_seconds: int) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now + ttl_seconds, now),
+            )
+            evicted = self._conn.execute(
+                "DELETE FROM llm_cache WHERE expires_at <= ? OR key IN ("
+                "SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (now, self.max_entries),
+            ).rowcount
+            self._conn.commit()
+        if evicted > 0:
+            _LLM_CACHE_STATS["evictions"] += evicted
+
+    async def get(self, key: str) -> dict | None:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: dict, ttl_seconds: int) -> None:
+        await asyncio.to_thread(self._set, key, value, ttl_seconds)
+
+    async def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RedisLLMCache:
+    """Redis-backed cache; a sorted-set index caps the number of entries."""
+
+    def __init__(self, client: Any, *, key_prefix: str, max_entries: int):
+        self._client = client
+        self._key_prefix = key_prefix
+        self._index_key = f"{key_prefix}index"
+        self.max_entries = max(int(max_entries), 1)
+
+    def _key(self, key: str) -> str:
+        return f"{self._key_prefix}{key}"
+
+    async def get(self, key: str) -> dict | None:
+        payload = await self._client.get(self._key(key))
+        if not payload:
+            return None
+        if isinstance(payload, bytes):
+            payload = payload.decode("utf-8")
+        await self._client.zadd(self._index_key, {key: time.time()})
+        return json.loads(payload)
+
+    async def set(self, key: str, value: dict, ttl_seconds: int) -> None:
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.set(self._key(key), json.dumps(value, ensure_ascii=False), ex=ttl_seconds)
+            pipe.zadd(self._index_key, {key: time.time()})
+            pipe.zcard(self._index_key)
+            results = await pipe.execute()
+        overflow = int(results[-1]) - self.max_entries
+        if overflow <= 0:
+            return
+        stale = await self._client.zpopmin(self._index_key, overflow)
+        if stale:
+            await self._client.delete(*(self._key(member) for member, _ in stale))
+            _LLM_CACHE_STATS["evictions"] += len(stale)
+
+    async def close(self) -> None:
+        close = getattr(self._client, "aclose", None)
+        if close:
+            await close()
+
+
+_LLM_CACHE: MemoryLLMCache | SQLiteLLMCache | RedisLLMCache | None = None
+
+
+def build_llm_cache(*, settings_obj=settings):
+    backend = str(getattr(settings_obj, "LLM_CACHE_BACKEND", "memory") or "memory").lower()
+    max_entries = int(getattr(settings_obj, "LLM_CACHE_MAX_ENTRIES", 2000) or 2000)
+
+    if backend == "sqlite":
+        path = str(
+            getattr(settings_obj, "LLM_CACHE_SQLITE_PATH", "") or "./cache/llm_cache.sqlite3"
+        )
+        return SQLiteLLMCache(path, max_entries=max_entries)
+
+    if backend != "redis":
+        return MemoryLLMCache(max_entries=max_entries)
+
+    redis_url = str(getattr(settings_obj, "REDIS_URL", "") or "").strip()
+    if not redis_url:
+        raise ValueError("REDIS_URL is required when LLM_CACHE_BACKEND=redis")
+
+    try:
+        from redis import asyncio as redis_asyncio
+    except ImportError as exc:
+        raise RuntimeError("Redis support requires the 'redis' package") from exc
+
+    client = redis_asyncio.from_url(redis_url, decode_responses=True)
+    key_prefix = str(
+        getattr(settings_obj, "LLM_CACHE_REDIS_PREFIX", "qinjian:llm-cache:")
+        or "qinjian:llm-cache:"
+    )
+    return RedisLLMCache(client, key_prefix=key_prefix, max_entries=max_entries)
+
+
+def get_llm_cache():
+    global _LLM_CACHE
+    if _LLM_CACHE is None:
+        _LLM_CACHE = build_llm_cache(settings_obj=settings)
+    return _LLM_CACHE
+
+
+async def close_llm_cache() -> None:
+    global _LLM_CACHE
+    if _LLM_CACHE is None:
+        return
+    await _LLM_CACHE.close()
+    _LLM_CACHE = None
+
+
+async def llm_cache_get(key: str) -> dict | None:
+    """Look up a cached response; backend failures count as a miss."""
+
+    try:
+        value = await get_llm_cache().get(key)
+    except Exception:
+        _LLM_CACHE_STATS["errors"] += 1
+        logger.warning("llm cache lookup failed", exc_info=True)
+        value = None
+    _LLM_CACHE_STATS["hits" if value is not None else "misses"] += 1
+    return value
+
+
+async def llm_cache_set(key: str, value: dict, ttl_seconds: int) -> None:
+    try:
+        await get_llm_cache().set(key, value, ttl_seconds)
+    except Exception:
+        _LLM_CACHE_STATS["errors"] += 1
+        logger.warning("llm cache store failed", exc_info=True)
+        return
+    _LLM_CACHE_STATS["stores"] += 1
+
+
+def get_llm_cache_stats() -> dict[str, int]:
+    return dict(_LLM_CACHE_STATS)
@@ -0,0 +1,172 @@
+"""Cached pair membership for route authorization.
+
+Most pair-scoped routes only need to know who is in a pair and whether it is
+active before running their own queries, yet each one re-fetched the whole
+``Pair`` row, sometimes several times per request. ``get_pair_membership``
+answers that from a short-TTL cache of ``(user_a, user_b, status, type)``
+keyed by pair id (``PAIR_ACCESS_CACHE_*``; Redis tier optional).
+
+Entries are invalidated when membership changes (join and confirmed unbind
+in ``app/api/v1/pairs.py``), after the change commits; with the in-process
+tier only, other processes may keep serving the old membership for up to the
+TTL.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import uuid
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import Pair, PairStatus, PairType
+from app.services.tiered_cache import (
+    TieredCache,
+    build_tiered_cache,
+    invalidate_after_commit,
+    new_cache_stats,
+)
+
+logger = logging.getLogger(__name__)
+
+_PAIR_ACCESS_STATS = new_cache_stats()
+_PAIR_ACCESS_CACHE: TieredCache | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class PairMembership:
+    id: uuid.UUID
+    user_a_id: uuid.UUID
+    user_b_id: uuid.UUID | None
+    status: PairStatus
+    type: PairType
+
+    def has_member(self, user_id: uuid.UUID | str) -> bool:
+        return str(user_id) in (str(self.user_a_id), str(self.user_b_id))
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "id": str(self.id),
+                "user_a_id": str(self.user_a_id),
+                "user_b_id": str(self.user_b_id) if self.user_b_id else None,
+                "status": self.status.value,
+                "type": self.type.value,
+            }
+        )
+
+    @classmethod
+    def from_json(cls, payload: str) -> "PairMembership":
+        data = json.loads(payload)
+        return cls(
+            id=uuid.UUID(data["id"]),
+            user_a_id=uuid.UUID(data["user_a_id"]),
+            user_b_id=uuid.UUID(data["user_b_id"]) if data.get("user_b_id") else None,
+            status=PairStatus(data["status"]),
+            type=PairType(data["type"]),
+        )
+
+    @classmethod
+    def from_pair(cls, pair: Pair) -> "PairMembership":
+        return cls(
+            id=pair.id,
+            user_a_id=pair.user_a_id,
+            user_b_id=pair.user_b_id,
+            status=pair.status,
+            type=pair.type,
+        )
+
+
+def build_pair_access_cache(*, settings_obj=settings) -> TieredCache | None:
+    return build_tiered_cache(
+        ttl_seconds=int(getattr(settings_obj, "PAIR_ACCESS_CACHE_TTL_SECONDS", 0) or 0),
+        max_entries=int(getattr(settings_obj, "PAIR_ACCESS_CACHE_MAX_ENTRIES", 5000) or 5000),
+        backend=str(getattr(settings_obj, "PAIR_ACCESS_CACHE_BACKEND", "memory") or "memory"),
+        backend_setting="PAIR_ACCESS_CACHE_BACKEND",
+        redis_prefix=str(
+            getattr(settings_obj, "PAIR_ACCESS_CACHE_REDIS_PREFIX", "qinjian:pair-access:")
+            or "qinjian:pair-access:"
+        ),
+        redis_ttl_seconds=int(
+            getattr(settings_obj, "PAIR_ACCESS_CACHE_REDIS_TTL_SECONDS", 300) or 300
+        ),
+        stats=_PAIR_ACCESS_STATS,
+        settings_obj=settings_obj,
+    )
+
+
+def get_pair_access_cache() -> TieredCache | None:
+    global _PAIR_ACCESS_CACHE
+    if _PAIR_ACCESS_CACHE is None:
+        _PAIR_ACCESS_CACHE = build_pair_access_cache(settings_obj=settings)
+    return _PAIR_ACCESS_CACHE
+
+
+async def close_pair_access_cache() -> None:
+    global _PAIR_ACCESS_CACHE
+    if _PAIR_ACCESS_CACHE is None:
+        return
+    await _PAIR_ACCESS_CACHE.close()
+    _PAIR_ACCESS_CACHE = None
+
+
+async def remember_pair_membership(membership: PairMembership) -> None:
+    cache = get_pair_access_cache()
+    if cache is None:
+        return
+    try:
+        await cache.set(str(membership.id), membership.to_json())
+    except Exception:
+        _PAIR_ACCESS_STATS["errors"] += 1
+        logger.warning("pair access cache store failed", exc_info=True)
+
+
+async def get_pair_membership(
+    db: AsyncSession, pair_id: uuid.UUID
+) -> PairMembership | None:
+    cache = get_pair_access_cache()
+    if cache is not None:
+        try:
+            payload = await cache.get(str(pair_id))
+        except Exception:
+            _PAIR_ACCESS_STATS["errors"] += 1
+            logger.warning("pair access cache lookup failed", exc_info=True)
+            payload = None
+        if payload is not None:
+            return PairMembership.from_json(payload)
+
+    row = (
+        await db.execute(
+            select(Pair.id, Pair.user_a_id, Pair.user_b_id, Pair.status, Pair.type).where(
+                Pair.id == pair_id
+            )
+        )
+    ).one_or_none()
+    if row is None:
+        return None
+    membership = PairMembership(
+        id=row.id,
+        user_a_id=row.user_a_id,
+        user_b_id=row.user_b_id,
+        status=row.status,
+        type=row.type,
+    )
+    await remember_pair_membership(membership)
+    return membership
+
+
+def invalidate_pair_membership(db: AsyncSession, pair_id: uuid.UUID | str) -> None:
+    """Drop the cached membership once ``db`` commits the change to it."""
+
+    cache = get_pair_access_cache()
+    if cache is None:
+        return
+    invalidate_after_commit(db, cache, str(pair_id))
+
+
+def get_pair_access_stats() -> dict[str, int]:
+    return dict(_PAIR_ACCESS_STATS)
@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import PlaybookRun, PlaybookTransition
 from app.services.relationship_playbook import BRANCH_LABELS, build_relationship_playbook
+from app.services.request_memo import PLAYBOOK_RUNTIME_TABLES, session_memoized
 
 
 def _utcnow() -> datetime:
@@ -171,6 +172,7 @@ async def _close_superseded_runs(
         run.last_synced_at = synced_at
 
 
+@session_memoized(tables=PLAYBOOK_RUNTIME_TABLES, refresh_on=("viewed",))
 async def sync_active_playbook_runtime(
     db: AsyncSession,
     *,
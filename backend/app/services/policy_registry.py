@@ -13,6 +13,7 @@ from app.services.intervention_effectiveness import build_intervention_scorecard
 from app.services.intervention_experimentation import (
     build_intervention_experiment_ledger,
 )
+from app.services.request_memo import POLICY_TABLES, session_memoized
 
 POLICY_REGISTRY = [
     {
@@ -366,6 +367,7 @@ def _fallback_policy_card(experiment_policy: dict) -> dict:
     }
 
 
+@session_memoized(tables=POLICY_TABLES)
 async def build_policy_registry_snapshot(
     db: AsyncSession,
     *,
@@ -13,6 +13,7 @@ from app.services.policy_registry import (
     build_policy_registry_snapshot,
     list_registered_policies,
 )
+from app.services.request_memo import POLICY_TABLES, session_memoized
 
 SCHEDULE_LABELS = {
     "collect_more_evidence": "继续跑完当前观察周期",
@@ -403,6 +404,7 @@ def build_policy_schedule_preview(*, scorecard: dict | None, strategy: dict) ->
     }
 
 
+@session_memoized(tables=POLICY_TABLES)
 async def build_policy_schedule(
     db: AsyncSession,
     *,
@@ -8,13 +8,15 @@ import uuid
 from contextlib import contextmanager
 from contextvars import ContextVar
 from datetime import datetime, timezone
-from typing import Any
+from functools import partial
+from typing import Any, Callable
 
-from sqlalchemy import desc, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.models import RelationshipEvent
+from app.models import PrivacyAuditEvent
+from app.services.event_store import PRIVACY_EVENTS, fetch_event_log_page
+from app.services.privacy_audit_writer import submit_privacy_audit
 from app.services.privacy_sandbox import redact_sensitive_text
 from app.services.relationship_intelligence import record_relationship_event
 
@@ -36,6 +38,9 @@ PRIVACY_EVENT_LABELS = {
     "privacy.retention.purged": "执行了一次隐私保留清扫",
 }
 
+# 审计列表的分页键：(occurred_at, id) 倒序；热表与归档表列名一致
+PRIVACY_EVENT_ORDER = (PrivacyAuditEvent.occurred_at, PrivacyAuditEvent.id)
+
 USER_VISIBLE_PRIVACY_EVENT_TYPES = {
     "privacy.ai.chat.logged",
     "privacy.ai.transcription.logged",
@@ -143,6 +148,48 @@ def get_privacy_audit_context() -> dict[str, Any]:
     return dict(_PRIVACY_AUDIT_CONTEXT.get() or {})
 
 
+def _privacy_event_payload(
+    event_type: str, payload: dict[str, Any] | None, summary: str | None
+) -> dict[str, Any]:
+    normalized_payload = dict(payload or {})
+    normalized_payload.setdefault(
+        "event_label", PRIVACY_EVENT_LABELS.get(event_type, event_type)
+    )
+    if summary:
+        normalized_payload["summary"] = _truncate_text(summary)
+    return normalized_payload
+
+
+def _privacy_event_row(
+    *,
+    event_type: str,
+    user_id: str | uuid.UUID | None,
+    pair_id: str | uuid.UUID | None = None,
+    entity_type: str = "privacy_event",
+    entity_id: str | uuid.UUID | None = None,
+    payload: dict[str, Any] | None = None,
+    summary: str | None = None,
+    source: str = "privacy",
+    occurred_at: datetime | None = None,
+) -> dict[str, Any]:
+    """Column values for a ``PrivacyAuditEvent`` written by the audit writer."""
+
+    now = _utcnow()
+    return {
+        "id": uuid.uuid4(),
+        "pair_id": uuid.UUID(str(pair_id)) if pair_id not in (None, "") else None,
+        "user_id": uuid.UUID(str(user_id)) if user_id not in (None, "") else None,
+        "event_type": event_type,
+        "entity_type": entity_type,
+        "entity_id": str(entity_id) if entity_id is not None else None,
+        "source": source,
+        "payload": _privacy_event_payload(event_type, payload, summary),
+        "idempotency_key": None,
+        "occurred_at": occurred_at or now,
+        "created_at": now,
+    }
+
+
 async def log_privacy_event(
     db: AsyncSession | None,
     *,
@@ -155,17 +202,10 @@ async def log_privacy_event(
     summary: str | None = None,
     source: str = "privacy",
     occurred_at: datetime | None = None,
-) -> RelationshipEvent | None:
+) -> PrivacyAuditEvent | None:
     if not db or not privacy_audit_enabled():
         return None
 
-    normalized_payload = dict(payload or {})
-    normalized_payload.setdefault(
-        "event_label", PRIVACY_EVENT_LABELS.get(event_type, event_type)
-    )
-    if summary:
-        normalized_payload["summary"] = _truncate_text(summary)
-
     return await record_relationship_event(
         db,
         event_type=event_type,
@@ -173,31 +213,38 @@ async def log_privacy_event(
         user_id=user_id,
         entity_type=entity_type,
         entity_id=entity_id,
-        payload=normalized_payload,
+        payload=_privacy_event_payload(event_type, payload, summary),
         source=source,
         occurred_at=occurred_at or _utcnow(),
     )
 
 
-async def log_privacy_ai_chat(
-    db: AsyncSession | None,
+async def _log_deferred_privacy_event(
+    db: AsyncSession, event: Callable[[], dict[str, Any]]
+) -> PrivacyAuditEvent | None:
+    # 交给后台写入器时，哈希与摘要在写入器里计算；写入器未运行时同步写入
+    if await submit_privacy_audit(lambda: _privacy_event_row(**event())):
+        return None
+    return await log_privacy_event(db, **event())
+
+
+def _ai_chat_event(
     *,
     model: str,
     provider: str,
     run_type: str,
     scope: str,
     user_id: str | uuid.UUID | None,
-    pair_id: str | uuid.UUID | None = None,
+    pair_id: str | uuid.UUID | None,
     raw_messages: list[dict],
     redacted_messages: list[dict],
-    raw_output: Any = None,
-    latency_ms: int | None = None,
-    status: str = "completed",
-    error_code: str | None = None,
-) -> RelationshipEvent | None:
-    if not db or not privacy_audit_enabled():
-        return None
-
+    raw_output: Any,
+    latency_ms: int | None,
+    ttft_ms: int | None,
+    status: str,
+    error_code: str | None,
+    occurred_at: datetime,
+) -> dict[str, Any]:
     payload = {
         "scope": scope,
         "user_id": _normalize_uuid_str(user_id),
@@ -215,39 +262,84 @@ async def log_privacy_ai_chat(
         "status": status,
         "error_code": error_code,
     }
-    summary = (
-        f"{run_type} 使用 {model} 完成一次 {status} 调用"
-        if status == "completed"
-        else f"{run_type} 使用 {model} 调用失败"
-    )
-    return await log_privacy_event(
-        db,
+    if ttft_ms is not None:
+        payload["ttft_ms"] = ttft_ms
+    if status == "completed":
+        summary = f"{run_type} 使用 {model} 完成一次 {status} 调用"
+    elif status == "cache_hit":
+        summary = f"{run_type} 使用 {model} 命中响应缓存"
+    else:
+        summary = f"{run_type} 使用 {model} 调用失败"
+    return dict(
         event_type="privacy.ai.chat.logged",
         user_id=user_id,
         pair_id=pair_id,
         entity_type="privacy_ai_chat",
         payload=payload,
         summary=summary,
+        occurred_at=occurred_at,
     )
 
 
-async def log_privacy_transcription(
+async def log_privacy_ai_chat(
     db: AsyncSession | None,
     *,
+    model: str,
+    provider: str,
+    run_type: str,
     scope: str,
     user_id: str | uuid.UUID | None,
     pair_id: str | uuid.UUID | None = None,
-    provider: str,
-    model: str,
-    file_name: str,
-    raw_output: str | None,
+    raw_messages: list[dict],
+    redacted_messages: list[dict],
+    raw_output: Any = None,
     latency_ms: int | None = None,
+    ttft_ms: int | None = None,
     status: str = "completed",
     error_code: str | None = None,
-) -> RelationshipEvent | None:
+) -> PrivacyAuditEvent | None:
+    """Audit one AI chat call; returns the event only when written synchronously."""
+
     if not db or not privacy_audit_enabled():
         return None
 
+    return await _log_deferred_privacy_event(
+        db,
+        partial(
+            _ai_chat_event,
+            model=model,
+            provider=provider,
+            run_type=run_type,
+            scope=scope,
+            user_id=user_id,
+            pair_id=pair_id,
+            # 调用方（如 Agent 工具循环）之后还会追加消息，先拍下当前列表
+            raw_messages=list(raw_messages),
+            redacted_messages=redacted_messages,
+            raw_output=raw_output,
+            latency_ms=latency_ms,
+            ttft_ms=ttft_ms,
+            status=status,
+            error_code=error_code,
+            occurred_at=_utcnow(),
+        ),
+    )
+
+
+def _transcription_event(
+    *,
+    scope: str,
+    user_id: str | uuid.UUID | None,
+    pair_id: str | uuid.UUID | None,
+    provider: str,
+    model: str,
+    file_name: str,
+    raw_output: str | None,
+    latency_ms: int | None,
+    status: str,
+    error_code: str | None,
+    occurred_at: datetime,
+) -> dict[str, Any]:
     payload = {
         "scope": scope,
         "user_id": _normalize_uuid_str(user_id),
@@ -265,18 +357,56 @@ async def log_privacy_transcription(
         "status": status,
         "error_code": error_code,
     }
-    return await log_privacy_event(
-        db,
+    return dict(
         event_type="privacy.ai.transcription.logged",
         user_id=user_id,
         pair_id=pair_id,
         entity_type="privacy_ai_transcription",
         payload=payload,
         summary=f"语音转录 {status}",
+        occurred_at=occurred_at,
     )
 
 
-def serialize_privacy_audit_entry(event: RelationshipEvent) -> dict[str, Any]:
+async def log_privacy_transcription(
+    db: AsyncSession | None,
+    *,
+    scope: str,
+    user_id: str | uuid.UUID | None,
+    pair_id: str | uuid.UUID | None = None,
+    provider: str,
+    model: str,
+    file_name: str,
+    raw_output: str | None,
+    latency_ms: int | None = None,
+    status: str = "completed",
+    error_code: str | None = None,
+) -> PrivacyAuditEvent | None:
+    """Audit one transcription call; returns the event only when written synchronously."""
+
+    if not db or not privacy_audit_enabled():
+        return None
+
+    return await _log_deferred_privacy_event(
+        db,
+        partial(
+            _transcription_event,
+            scope=scope,
+            user_id=user_id,
+            pair_id=pair_id,
+            provider=provider,
+            model=model,
+            file_name=file_name,
+            raw_output=raw_output,
+            latency_ms=latency_ms,
+            status=status,
+            error_code=error_code,
+            occurred_at=_utcnow(),
+        ),
+    )
+
+
+def serialize_privacy_audit_entry(event: PrivacyAuditEvent) -> dict[str, Any]:
     payload = dict(event.payload or {})
     return {
         "event_id": event.id,
@@ -306,16 +436,26 @@ async def list_privacy_events(
     event_type: str | None = None,
     since: datetime | None = None,
     limit: int = 20,
-) -> list[RelationshipEvent]:
-    stmt = select(RelationshipEvent).where(RelationshipEvent.event_type.like("privacy.%"))
-    if user_id not in (None, ""):
-        stmt = stmt.where(RelationshipEvent.user_id == user_id)
-    if pair_id not in (None, ""):
-        stmt = stmt.where(RelationshipEvent.pair_id == pair_id)
-    if event_type:
-        stmt = stmt.where(RelationshipEvent.event_type == event_type)
-    if since:
-        stmt = stmt.where(RelationshipEvent.occurred_at >= since)
-    stmt = stmt.order_by(desc(RelationshipEvent.occurred_at)).limit(max(limit, 1))
-    result = await db.execute(stmt)
-    return list(result.scalars().all())
+    after: tuple[datetime, uuid.UUID] | None = None,
+) -> list[PrivacyAuditEvent]:
+    """Newest-first privacy events; ``after`` resumes below an ``(occurred_at, id)`` key.
+
+    Reads the hot audit table first and continues into the archive tier only
+    when the page is not full.
+    """
+
+    def filters(model) -> list:
+        clauses = []
+        if user_id not in (None, ""):
+            clauses.append(model.user_id == user_id)
+        if pair_id not in (None, ""):
+            clauses.append(model.pair_id == pair_id)
+        if event_type:
+            clauses.append(model.event_type == event_type)
+        if since:
+            clauses.append(model.occurred_at >= since)
+        return clauses
+
+    return await fetch_event_log_page(
+        db, PRIVACY_EVENTS, filters, limit=max(limit, 1), after=after
+    )
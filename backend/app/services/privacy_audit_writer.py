@@ -0,0 +1,567 @@
+"""Write-behind pipeline for AI and transcription privacy audit records.
+
+``log_privacy_ai_chat`` and ``log_privacy_transcription`` used to hash the raw
+and redacted message lists, build the redacted summaries and insert the audit
+event inline, after every LLM call and inside the caller's transaction. They now
+capture a lightweight record (the call's arguments and a builder) and put it on
+a bounded in-process queue. A background task builds the audit rows off the
+event loop and bulk-inserts them on its own session, every
+``PRIVACY_AUDIT_FLUSH_SECONDS`` or as soon as ``PRIVACY_AUDIT_BATCH_SIZE``
+records are waiting.
+
+Audit records are not dropped:
+
+- when the queue is full (``PRIVACY_AUDIT_MAX_BUFFER``) the caller writes its
+  record directly, which applies backpressure instead of losing it;
+- a batch that fails on a data error is split in halves until the bad row is
+  isolated, so one poisoned row does not hold back the rest;
+- failed records are retried with exponential backoff, and after
+  ``_MAX_ATTEMPTS`` their rows are appended to the dead-letter file
+  (``PRIVACY_AUDIT_DEAD_LETTER_PATH``) for an operator to re-import;
+- ``stop()`` keeps flushing, waiting out the backoff, until every record is
+  either committed or dead-lettered.
+
+Durability mode (``PRIVACY_AUDIT_SPOOL_DIR``) also survives a crash. The row is
+built on capture and appended to a per-process spool segment, which is fsync'd
+before the call returns. Only the finished, redacted audit row is spooled, never
+the raw messages. Segments rotate every ``_SPOOL_SEGMENT_ROWS`` rows; once all
+of a segment's rows are committed it is deleted, or truncated if it is still
+the one being appended to, so a flush never rewrites the spool. On start, spool
+segments left behind by dead processes are replayed. Rows whose event id is
+already stored are skipped, so a replay never duplicates audit entries. Without
+a running writer (scripts, tests) records are written synchronously as before.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import InterfaceError, OperationalError
+
+from app.core.config import settings
+from app.core.database import background_session
+from app.models import PrivacyAuditEvent
+
+try:
+    import fcntl
+except ImportError:  # Windows：无法判断其他进程是否存活，不重放它们的落盘文件
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_MAX_ATTEMPTS = 3
+_RETRY_BACKOFF_SECONDS = 1.0
+_RETRY_BACKOFF_MAX_SECONDS = 30.0
+_SPOOL_PREFIX = "privacy-audit-"
+_SPOOL_SEGMENT_ROWS = 1000
+# 连接类故障与具体某一行无关，整批退避重试，不拆分
+_TRANSIENT_ERRORS = (OperationalError, InterfaceError, OSError)
+
+_AUDIT_STATS = {
+    "captured": 0,
+    "written": 0,
+    "flushes": 0,
+    "inline": 0,
+    "retried": 0,
+    "failed": 0,
+    "split": 0,
+    "dead_lettered": 0,
+    "dropped": 0,
+    "spooled": 0,
+    "replayed": 0,
+    "last_lag_ms": 0,
+    "max_lag_ms": 0,
+}
+
+AuditRowBuilder = Callable[[], dict[str, Any]]
+
+
+@dataclass(slots=True)
+class AuditRecord:
+    """One captured audit call; ``row`` is built lazily by the writer."""
+
+    build: AuditRowBuilder | None
+    captured_at: float
+    row: dict[str, Any] | None = None
+    attempts: int = 0
+    retry_at: float = 0.0
+
+    def materialize(self) -> dict[str, Any]:
+        if self.row is None:
+            self.row = self.build()
+            self.build = None
+        return self.row
+
+
+# ── 本地落盘（持久模式） ──
+
+
+def _encode_row(row: dict[str, Any]) -> str:
+    def default(value: Any) -> str:
+        return value.isoformat() if isinstance(value, datetime) else str(value)
+
+    return json.dumps(row, ensure_ascii=False, default=default)
+
+
+def _decode_row(line: str) -> dict[str, Any]:
+    row = json.loads(line)
+    for key in ("id", "pair_id", "user_id"):
+        if row.get(key):
+            row[key] = uuid.UUID(row[key])
+    for key in ("occurred_at", "created_at"):
+        if row.get(key):
+            row[key] = datetime.fromisoformat(row[key])
+    return row
+
+
+def _read_rows(path: Path) -> list[dict[str, Any]]:
+    rows = []
+    try:
+        with path.open(encoding="utf-8") as handle:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rows.append(_decode_row(line))
+                except (ValueError, TypeError):
+                    # 崩溃时可能留下写了一半的最后一行
+                    logger.warning("skipping unreadable privacy audit spool line in %s", path)
+    except FileNotFoundError:
+        return []
+    return rows
+
+
+class AuditSpool:
+    """Append-only, fsync'd spool of audit rows owned by one process.
+
+    Rows go to numbered segment files that share the process's stem. The owner
+    holds an exclusive lock on the ``<stem>.lock`` sidecar; segments whose lock
+    can be taken belong to a process that is gone and may be replayed.
+    """
+
+    def __init__(self, directory: str | Path, *, segment_rows: int = _SPOOL_SEGMENT_ROWS):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        token = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.stem = f"{_SPOOL_PREFIX}{token}"
+        self.segment_rows = max(int(segment_rows), 1)
+        self._lock_path = self.directory / f"{self.stem}.lock"
+        self._lock_handle = self._lock_path.open("w")
+        if fcntl is not None:
+            fcntl.flock(self._lock_handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        self._mutex = threading.Lock()
+        self._sequence = 0
+        self._appended = 0
+        self._pending: dict[int, set[uuid.UUID]] = {}
+        self._segment_of: dict[uuid.UUID, int] = {}
+        self._handle = self._open_segment()
+
+    @property
+    def path(self) -> Path:
+        """The segment currently being appended to."""
+
+        return self._segment_path(self._sequence)
+
+    @property
+    def pending(self) -> int:
+        return len(self._segment_of)
+
+    def _segment_path(self, sequence: int) -> Path:
+        return self.directory / f"{self.stem}.{sequence:06d}.jsonl"
+
+    def _open_segment(self):
+        self._sequence += 1
+        self._appended = 0
+        self._pending[self._sequence] = set()
+        return self._segment_path(self._sequence).open("a", encoding="utf-8")
+
+    def append(self, row: dict[str, Any]) -> None:
+        line = _encode_row(row) + "\n"
+        with self._mutex:
+            if self._appended >= self.segment_rows:
+                self._handle.close()
+                self._handle = self._open_segment()
+            self._handle.write(line)
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+            self._appended += 1
+            self._pending[self._sequence].add(row["id"])
+            self._segment_of[row["id"]] = self._sequence
+
+    def discard(self, committed_ids: set[uuid.UUID]) -> None:
+        """Forget committed rows and drop segments that have none left.
+
+        Costs O(len(committed_ids)): sealed segments are unlinked and the active
+        one is truncated in place. Neither is fsync'd; if a crash undoes it, the
+        replay finds the rows already stored and skips them.
+        """
+
+        with self._mutex:
+            emptied = set()
+            for row_id in committed_ids:
+                sequence = self._segment_of.pop(row_id, None)
+                if sequence is None:
+                    continue
+                pending = self._pending[sequence]
+                pending.discard(row_id)
+                if not pending:
+                    emptied.add(sequence)
+            for sequence in emptied:
+                if sequence == self._sequence:
+                    self._handle.truncate(0)
+                    self._appended = 0
+                else:
+                    del self._pending[sequence]
+                    self._segment_path(sequence).unlink(missing_ok=True)
+
+    def orphans(self) -> dict[Path, list[Path]]:
+        """Lock file -> spool segments of processes that no longer hold it."""
+
+        if fcntl is None:
+            return {}
+        found = {}
+        for lock_path in sorted(self.directory.glob(f"{_SPOOL_PREFIX}*.lock")):
+            if lock_path == self._lock_path:
+                continue
+            with lock_path.open("a") as handle:
+                try:
+                    fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    continue
+                fcntl.flock(handle, fcntl.LOCK_UN)
+            stem = lock_path.stem
+            # <stem>.jsonl 是分段之前的单文件格式
+            segments = sorted(self.directory.glob(f"{stem}.*.jsonl"))
+            legacy = self.directory / f"{stem}.jsonl"
+            found[lock_path] = ([legacy] if legacy.exists() else []) + segments
+        return found
+
+    def close(self) -> None:
+        """Release the lock; segments are removed only if nothing is pending."""
+
+        with self._mutex:
+            self._handle.close()
+            remove = not self._segment_of
+            if remove:
+                for sequence in self._pending:
+                    self._segment_path(sequence).unlink(missing_ok=True)
+        self._lock_handle.close()
+        if remove:
+            self._lock_path.unlink(missing_ok=True)
+
+
+def _append_dead_letters(path: Path, rows: list[dict[str, Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = "".join(_encode_row(row) + "\n" for row in rows).encode("utf-8")
+    # 单次 O_APPEND 写入，多个进程共用同一个文件时行不会交错
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# ── 后台写入 ──
+
+
+class PrivacyAuditWriter:
+    """Queues audit records and bulk-inserts them on a background task."""
+
+    def __init__(
+        self,
+        *,
+        flush_seconds: float,
+        batch_size: int,
+        max_buffer: int,
+        spool: AuditSpool | None = None,
+        dead_letter_path: str | Path | None = None,
+    ):
+        self.flush_seconds = max(float(flush_seconds), 0.01)
+        self.batch_size = max(int(batch_size), 1)
+        self.max_buffer = max(int(max_buffer), self.batch_size)
+        self.spool = spool
+        self.dead_letter_path = Path(dead_letter_path) if dead_letter_path else None
+        self._buffer: list[AuditRecord] = []
+        self._retrying: list[AuditRecord] = []
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._flush_lock = asyncio.Lock()
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def __len__(self) -> int:
+        return len(self._buffer) + len(self._retrying)
+
+    def oldest_pending_seconds(self) -> float:
+        captured = [r.captured_at for r in self._buffer[:1] + self._retrying]
+        if not captured:
+            return 0.0
+        return round(time.monotonic() - min(captured), 3)
+
+    def start(self) -> None:
+        if not self.running:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def submit(self, build: AuditRowBuilder) -> None:
+        record = AuditRecord(build=build, captured_at=time.monotonic())
+        _AUDIT_STATS["captured"] += 1
+        if self.spool is not None:
+            await asyncio.to_thread(self._spool_record, record)
+        if len(self) >= self.max_buffer:
+            # 队列已满时由调用方直接写入，宁可变慢也不丢审计
+            _AUDIT_STATS["inline"] += 1
+            await self._write_batch([record])
+            return
+        self._buffer.append(record)
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def _spool_record(self, record: AuditRecord) -> None:
+        self.spool.append(record.materialize())
+        _AUDIT_STATS["spooled"] += 1
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await task
+        await self.drain()
+        if self.spool is not None:
+            # 死信文件写不进去时行仍留在落盘文件中，下次启动时重放
+            self.spool.close()
+
+    async def _run(self) -> None:
+        if self.spool is not None:
+            await self._replay_orphans()
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write everything queued and due for retry; returns the rows inserted."""
+
+        async with self._flush_lock:
+            now = time.monotonic()
+            due = [r for r in self._retrying if r.retry_at <= now]
+            self._retrying = [r for r in self._retrying if r.retry_at > now]
+            records, self._buffer = due + self._buffer, []
+            written = 0
+            for offset in range(0, len(records), self.batch_size):
+                batch = records[offset : offset + self.batch_size]
+                written += await self._write_batch(batch)
+            return written
+
+    async def drain(self) -> int:
+        """Flush until nothing is pending, sleeping through retry backoff.
+
+        Each record is either committed or dead-lettered after ``_MAX_ATTEMPTS``,
+        so this returns after a bounded number of rounds.
+        """
+
+        written = 0
+        while len(self):
+            written += await self.flush()
+            if self._retrying and not self._buffer:
+                delay = min(r.retry_at for r in self._retrying) - time.monotonic()
+                await asyncio.sleep(max(delay, 0.0))
+        return written
+
+    async def _write_batch(self, records: list[AuditRecord]) -> int:
+        try:
+            rows = await asyncio.to_thread(lambda: [r.materialize() for r in records])
+            async with background_session() as db:
+                try:
+                    await db.execute(insert(PrivacyAuditEvent), rows)
+                    await db.commit()
+                except Exception:
+                    await db.rollback()
+                    raise
+        except Exception as exc:
+            if len(records) > 1 and not isinstance(exc, _TRANSIENT_ERRORS):
+                # 一行坏数据会让整批失败：对半拆开重写，把坏行隔离出来
+                _AUDIT_STATS["split"] += 1
+                middle = len(records) // 2
+                return await self._write_batch(records[:middle]) + await self._write_batch(
+                    records[middle:]
+                )
+            logger.warning(
+                "privacy audit write failed for %d records", len(records), exc_info=True
+            )
+            _AUDIT_STATS["failed"] += len(records)
+            await self._retry_later(records)
+            return 0
+
+        lag_ms = int((time.monotonic() - min(r.captured_at for r in records)) * 1000)
+        _AUDIT_STATS["last_lag_ms"] = lag_ms
+        _AUDIT_STATS["max_lag_ms"] = max(_AUDIT_STATS["max_lag_ms"], lag_ms)
+        _AUDIT_STATS["flushes"] += 1
+        _AUDIT_STATS["written"] += len(rows)
+        if self.spool is not None:
+            await asyncio.to_thread(self.spool.discard, {row["id"] for row in rows})
+        return len(rows)
+
+    async def _retry_later(self, records: list[AuditRecord]) -> None:
+        now = time.monotonic()
+        exhausted = []
+        for record in records:
+            record.attempts += 1
+            if record.attempts >= _MAX_ATTEMPTS:
+                exhausted.append(record)
+                continue
+            backoff = _RETRY_BACKOFF_SECONDS * 2 ** (record.attempts - 1)
+            record.retry_at = now + min(backoff, _RETRY_BACKOFF_MAX_SECONDS)
+            self._retrying.append(record)
+            _AUDIT_STATS["retried"] += 1
+        if exhausted:
+            await asyncio.to_thread(self._dead_letter, exhausted)
+
+    def _dead_letter(self, records: list[AuditRecord]) -> None:
+        rows = [r.row for r in records if r.row is not None]
+        if len(rows) < len(records):
+            # 构建失败的记录只有原始消息，不能落盘
+            unbuilt = len(records) - len(rows)
+            _AUDIT_STATS["dropped"] += unbuilt
+            logger.error("dropping %d privacy audit records that could not be built", unbuilt)
+        if not rows:
+            return
+        if self.dead_letter_path is None:
+            if self.spool is None:
+                _AUDIT_STATS["dropped"] += len(rows)
+                logger.error(
+                    "dropping %d privacy audit rows after %d attempts", len(rows), _MAX_ATTEMPTS
+                )
+            return
+        try:
+            _append_dead_letters(self.dead_letter_path, rows)
+        except OSError:
+            logger.exception("privacy audit dead-letter write to %s failed", self.dead_letter_path)
+            if self.spool is None:
+                _AUDIT_STATS["dropped"] += len(rows)
+            return
+        _AUDIT_STATS["dead_lettered"] += len(rows)
+        logger.error(
+            "wrote %d privacy audit rows to %s after %d attempts",
+            len(rows),
+            self.dead_letter_path,
+            _MAX_ATTEMPTS,
+        )
+        if self.spool is not None:
+            self.spool.discard({row["id"] for row in rows})
+
+    async def _replay_orphans(self) -> None:
+        orphans = await asyncio.to_thread(self.spool.orphans)
+        for lock_path, segments in orphans.items():
+            rows = []
+            for path in segments:
+                rows.extend(await asyncio.to_thread(_read_rows, path))
+            try:
+                replayed = await _insert_missing(rows)
+            except Exception:
+                logger.exception("privacy audit spool replay failed for %s", lock_path)
+                continue
+            _AUDIT_STATS["replayed"] += replayed
+            logger.info("replayed %d privacy audit rows from %s", replayed, lock_path)
+            for path in segments:
+                path.unlink(missing_ok=True)
+            lock_path.unlink(missing_ok=True)
+
+
+async def _insert_missing(rows: list[dict[str, Any]]) -> int:
+    if not rows:
+        return 0
+    async with background_session() as db:
+        result = await db.execute(
+            select(PrivacyAuditEvent.id).where(
+                PrivacyAuditEvent.id.in_({row["id"] for row in rows})
+            )
+        )
+        stored = set(result.scalars().all())
+        missing = {row["id"]: row for row in rows if row["id"] not in stored}
+        if missing:
+            await db.execute(insert(PrivacyAuditEvent), list(missing.values()))
+        await db.commit()
+    return len(missing)
+
+
+_WRITER: PrivacyAuditWriter | None = None
+
+
+def get_privacy_audit_writer() -> PrivacyAuditWriter | None:
+    return _WRITER
+
+
+def start_privacy_audit_writer(*, settings_obj=settings) -> PrivacyAuditWriter | None:
+    global _WRITER
+    flush_seconds = float(getattr(settings_obj, "PRIVACY_AUDIT_FLUSH_SECONDS", 0) or 0)
+    if flush_seconds <= 0:
+        return None
+    if _WRITER is None:
+        spool_dir = getattr(settings_obj, "PRIVACY_AUDIT_SPOOL_DIR", "")
+        _WRITER = PrivacyAuditWriter(
+            flush_seconds=flush_seconds,
+            batch_size=settings_obj.PRIVACY_AUDIT_BATCH_SIZE,
+            max_buffer=settings_obj.PRIVACY_AUDIT_MAX_BUFFER,
+            spool=AuditSpool(spool_dir) if spool_dir else None,
+            dead_letter_path=getattr(settings_obj, "PRIVACY_AUDIT_DEAD_LETTER_PATH", ""),
+        )
+    _WRITER.start()
+    return _WRITER
+
+
+async def close_privacy_audit_writer() -> None:
+    global _WRITER
+    if _WRITER is None:
+        return
+    writer = _WRITER
+    _WRITER = None
+    await writer.stop()
+
+
+async def submit_privacy_audit(build: AuditRowBuilder) -> bool:
+    """Queue an audit row for the background writer.
+
+    ``build`` returns the ``PrivacyAuditEvent`` column values. Returns ``False``
+    when no writer is running and the caller should write the row itself.
+    """
+
+    writer = _WRITER
+    if writer is None or not writer.running:
+        return False
+    await writer.submit(build)
+    return True
+
+
+def get_privacy_audit_writer_stats() -> dict[str, Any]:
+    writer = _WRITER
+    return {
+        **_AUDIT_STATS,
+        "pending": len(writer) if writer is not None else 0,
+        "oldest_pending_seconds": (
+            writer.oldest_pending_seconds() if writer is not None else 0.0
+        ),
+        "durable": bool(writer is not None and writer.spool is not None),
+    }
@@ -2,33 +2,55 @@
 
 from __future__ import annotations
 
+import asyncio
+import logging
 import os
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from pathlib import Path
 from typing import Any
 
-from sqlalchemy import delete, desc, func, or_, select
+from sqlalchemy import delete, desc, func, null, or_, select, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.database import admin_session
 from app.models import (
     AgentChatMessage,
     AgentChatSession,
     Checkin,
+    CheckinStreak,
     Pair,
     PlaybookRun,
     PlaybookTransition,
     PrivacyDeletionRequest,
     RelationshipEvent,
     RelationshipProfileSnapshot,
+    RelationshipProfileState,
     Report,
     User,
     UserNotification,
     InterventionPlan,
+    MaintenanceCheckpoint,
+    Upload,
+)
+from app.services.event_store import (
+    EVENT_LOG_TIERS,
+    PRIVACY_EVENTS,
+    VIEW_EVENTS,
+    count_event_log_rows,
+    delete_event_log_chunk,
+    delete_event_log_rows,
+    drop_expired_partitions,
 )
 from app.services.privacy_audit import log_privacy_event
 from app.services.upload_access import is_local_upload_path, resolve_upload_file_path
+from app.services.user_cache import invalidate_cached_user
+
+logger = logging.getLogger(__name__)
+
+RETENTION_SWEEP_CHECKPOINT = "privacy_retention_sweep"
 
 
 def _utcnow() -> datetime:
@@ -39,143 +61,201 @@ def _temp_transcription_dir() -> str:
     return os.path.abspath(settings.PRIVACY_TRANSCRIPTION_TEMP_DIR)
 
 
-def _safe_remove_local_upload(upload_path: str | None) -> bool:
+def _local_upload_file(upload_path: str | None) -> str | None:
     if not upload_path or not is_local_upload_path(upload_path):
-        return False
+        return None
     try:
-        file_path = resolve_upload_file_path(upload_path)
+        return resolve_upload_file_path(upload_path)
     except ValueError:
+        return None
+
+
+def _safe_remove_local_upload(upload_path: str | None) -> bool:
+    file_path = _local_upload_file(upload_path)
+    if file_path is None:
         return False
-    if os.path.exists(file_path):
+    try:
         os.remove(file_path)
-        return True
-    return False
-
+    except FileNotFoundError:
+        return False
+    except OSError:
+        # 此时删除已提交，文件删不掉只记日志，不回滚
+        logger.warning("could not remove purged upload %s", file_path, exc_info=True)
+        return False
+    return True
 
-async def _user_has_shared_pair_data(db: AsyncSession, user_id: uuid.UUID) -> bool:
-    stmt = select(Pair.id).where(
-        or_(Pair.user_a_id == user_id, Pair.user_b_id == user_id)
-    ).limit(1)
-    result = await db.execute(stmt)
-    return result.scalar_one_or_none() is not None
 
+def _local_upload_exists(upload_path: str | None) -> bool:
+    file_path = _local_upload_file(upload_path)
+    return file_path is not None and os.path.isfile(file_path)
 
-async def _collect_private_uploads(db: AsyncSession, user_id: uuid.UUID) -> list[str]:
-    uploads: list[str] = []
 
-    user = await db.get(User, user_id)
-    if user:
-        uploads.extend([user.avatar_url, user.wechat_avatar])
+def _remove_local_uploads(upload_paths: list[str], *, dry_run: bool = False) -> int:
+    """Remove (or, on a dry run, count) local upload files on a small thread pool."""
 
-    checkins_result = await db.execute(
-        select(Checkin).where(Checkin.user_id == user_id, Checkin.pair_id.is_(None))
-    )
-    for checkin in checkins_result.scalars().all():
-        uploads.extend([checkin.image_url, checkin.voice_url])
+    if not upload_paths:
+        return 0
+    handle = _local_upload_exists if dry_run else _safe_remove_local_upload
+    workers = min(max(settings.PRIVACY_PURGE_FILE_WORKERS, 1), len(upload_paths))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(handle, upload_paths))
 
-    return [path for path in uploads if path]
 
+async def remove_purged_uploads(upload_paths: list[str]) -> int:
+    """Delete the local files of a purge; call only after its ``commit()``."""
 
-async def _purge_user_private_data(
-    db: AsyncSession,
-    *,
-    user_id: uuid.UUID,
-) -> dict[str, int]:
-    counts = {
-        "solo_checkins": 0,
-        "solo_reports": 0,
-        "notifications": 0,
-        "agent_sessions": 0,
-        "agent_messages": 0,
-        "events": 0,
-        "snapshots": 0,
-        "plans": 0,
-        "playbook_runs": 0,
-        "playbook_transitions": 0,
-        "local_uploads_removed": 0,
-    }
+    return await asyncio.to_thread(_remove_local_uploads, upload_paths)
 
-    for upload_path in await _collect_private_uploads(db, user_id):
-        counts["local_uploads_removed"] += int(_safe_remove_local_upload(upload_path))
 
-    session_ids_result = await db.execute(
-        select(AgentChatSession.id).where(
-            AgentChatSession.user_id == user_id,
-            AgentChatSession.pair_id.is_(None),
+async def _users_with_shared_pair_data(
+    db: AsyncSession, user_ids: set[uuid.UUID]
+) -> set[uuid.UUID]:
+    if not user_ids:
+        return set()
+    result = await db.execute(
+        select(Pair.user_a_id, Pair.user_b_id).where(
+            or_(Pair.user_a_id.in_(user_ids), Pair.user_b_id.in_(user_ids))
         )
     )
-    session_ids = list(session_ids_result.scalars().all())
+    return {user_id for row in result.all() for user_id in row} & user_ids
 
-    if session_ids:
-        message_delete = await db.execute(
-            delete(AgentChatMessage).where(AgentChatMessage.session_id.in_(session_ids))
-        )
-        counts["agent_messages"] = int(message_delete.rowcount or 0)
 
-    session_delete = await db.execute(
-        delete(AgentChatSession).where(
-            AgentChatSession.user_id == user_id,
-            AgentChatSession.pair_id.is_(None),
+async def _collect_private_uploads(db: AsyncSession, user_id: uuid.UUID) -> list[str]:
+    result = await db.execute(
+        union_all(
+            select(User.avatar_url, User.wechat_avatar).where(User.id == user_id),
+            select(Checkin.image_url, Checkin.voice_url).where(
+                Checkin.user_id == user_id, Checkin.pair_id.is_(None)
+            ),
+            # 上传后未被引用的文件也一并清理
+            select(Upload.path, null()).where(
+                Upload.owner_user_id == user_id, Upload.pair_id.is_(None)
+            ),
         )
     )
-    counts["agent_sessions"] = int(session_delete.rowcount or 0)
+    return list(dict.fromkeys(path for row in result.all() for path in row if path))
 
-    checkin_delete = await db.execute(
-        delete(Checkin).where(Checkin.user_id == user_id, Checkin.pair_id.is_(None))
-    )
-    counts["solo_checkins"] = int(checkin_delete.rowcount or 0)
 
-    report_delete = await db.execute(
-        delete(Report).where(Report.user_id == user_id, Report.pair_id.is_(None))
-    )
-    counts["solo_reports"] = int(report_delete.rowcount or 0)
+def _purge_plan(user_id: uuid.UUID) -> list[tuple[str, type, tuple]]:
+    """(计数键, 模型, 删除条件)，按外键依赖排列：子表在前，父表在后。"""
 
-    notification_delete = await db.execute(
-        delete(UserNotification).where(UserNotification.user_id == user_id)
+    solo_sessions = select(AgentChatSession.id).where(
+        AgentChatSession.user_id == user_id,
+        AgentChatSession.pair_id.is_(None),
     )
-    counts["notifications"] = int(notification_delete.rowcount or 0)
-
-    snapshot_delete = await db.execute(
-        delete(RelationshipProfileSnapshot).where(
-            RelationshipProfileSnapshot.user_id == user_id,
-            RelationshipProfileSnapshot.pair_id.is_(None),
-        )
+    solo_plans = select(InterventionPlan.id).where(
+        InterventionPlan.user_id == user_id,
+        InterventionPlan.pair_id.is_(None),
     )
-    counts["snapshots"] = int(snapshot_delete.rowcount or 0)
+    return [
+        (
+            "agent_messages",
+            AgentChatMessage,
+            (AgentChatMessage.session_id.in_(solo_sessions),),
+        ),
+        (
+            "agent_sessions",
+            AgentChatSession,
+            (AgentChatSession.user_id == user_id, AgentChatSession.pair_id.is_(None)),
+        ),
+        (
+            "solo_checkins",
+            Checkin,
+            (Checkin.user_id == user_id, Checkin.pair_id.is_(None)),
+        ),
+        (
+            "checkin_streaks",
+            CheckinStreak,
+            (CheckinStreak.user_id == user_id, CheckinStreak.pair_id.is_(None)),
+        ),
+        (
+            "solo_reports",
+            Report,
+            (Report.user_id == user_id, Report.pair_id.is_(None)),
+        ),
+        ("notifications", UserNotification, (UserNotification.user_id == user_id,)),
+        (
+            "snapshots",
+            RelationshipProfileSnapshot,
+            (
+                RelationshipProfileSnapshot.user_id == user_id,
+                RelationshipProfileSnapshot.pair_id.is_(None),
+            ),
+        ),
+        (
+            "profile_states",
+            RelationshipProfileState,
+            (
+                RelationshipProfileState.user_id == user_id,
+                RelationshipProfileState.pair_id.is_(None),
+            ),
+        ),
+        (
+            "playbook_transitions",
+            PlaybookTransition,
+            (PlaybookTransition.plan_id.in_(solo_plans),),
+        ),
+        ("playbook_runs", PlaybookRun, (PlaybookRun.plan_id.in_(solo_plans),)),
+        (
+            "plans",
+            InterventionPlan,
+            (InterventionPlan.user_id == user_id, InterventionPlan.pair_id.is_(None)),
+        ),
+        # 隐私审计记录单独存放并保留；业务事件和浏览埋点一并删除
+        (
+            "events",
+            RelationshipEvent,
+            (RelationshipEvent.user_id == user_id, RelationshipEvent.pair_id.is_(None)),
+        ),
+        ("uploads", Upload, (Upload.owner_user_id == user_id, Upload.pair_id.is_(None))),
+    ]
 
-    plan_ids_result = await db.execute(
-        select(InterventionPlan.id).where(
-            InterventionPlan.user_id == user_id,
-            InterventionPlan.pair_id.is_(None),
-        )
-    )
-    plan_ids = list(plan_ids_result.scalars().all())
-    if plan_ids:
-        transition_delete = await db.execute(
-            delete(PlaybookTransition).where(PlaybookTransition.plan_id.in_(plan_ids))
-        )
-        counts["playbook_transitions"] = int(transition_delete.rowcount or 0)
-        run_delete = await db.execute(
-            delete(PlaybookRun).where(PlaybookRun.plan_id.in_(plan_ids))
-        )
-        counts["playbook_runs"] = int(run_delete.rowcount or 0)
 
-    plan_delete = await db.execute(
-        delete(InterventionPlan).where(
-            InterventionPlan.user_id == user_id,
-            InterventionPlan.pair_id.is_(None),
+async def _purge_user_private_data(
+    db: AsyncSession,
+    *,
+    user_id: uuid.UUID,
+    dry_run: bool = False,
+) -> tuple[dict[str, int], list[str]]:
+    """Delete a user's private rows; returns the counts and their upload files.
+
+    Files are left in place: a rolled-back purge must not lose them, so they
+    are removed with ``remove_purged_uploads`` once the transaction commits.
+    """
+
+    plan = _purge_plan(user_id)
+
+    def solo_view_events(model) -> tuple:
+        return (model.user_id == user_id, model.pair_id.is_(None))
+
+    upload_paths = await _collect_private_uploads(db, user_id)
+
+    counts: dict[str, int] = {}
+    if dry_run:
+        # 所有计数合并为一条查询
+        result = await db.execute(
+            select(
+                *(
+                    select(func.count())
+                    .select_from(model)
+                    .where(*conditions)
+                    .scalar_subquery()
+                    .label(key)
+                    for key, model, conditions in plan
+                )
+            )
         )
-    )
-    counts["plans"] = int(plan_delete.rowcount or 0)
-
-    event_delete = await db.execute(
-        delete(RelationshipEvent).where(
-            RelationshipEvent.user_id == user_id,
-            RelationshipEvent.pair_id.is_(None),
-            ~RelationshipEvent.event_type.like("privacy.%"),
+        counts.update({key: int(value or 0) for key, value in result.one()._mapping.items()})
+        counts["view_events"] = await count_event_log_rows(db, VIEW_EVENTS, solo_view_events)
+        counts["local_uploads_removed"] = await asyncio.to_thread(
+            _remove_local_uploads, upload_paths, dry_run=True
         )
-    )
-    counts["events"] = int(event_delete.rowcount or 0)
+        return counts, []
+
+    for key, model, conditions in plan:
+        result = await db.execute(delete(model).where(*conditions))
+        counts[key] = int(result.rowcount or 0)
+    counts["view_events"] = await delete_event_log_rows(db, VIEW_EVENTS, solo_view_events)
 
     user = await db.get(User, user_id)
     if user:
@@ -187,8 +267,9 @@ async def _purge_user_private_data(
         user.wechat_openid = None
         user.wechat_unionid = None
         user.wechat_avatar = None
+        invalidate_cached_user(db, user.id)
 
-    return counts
+    return counts, upload_paths
 
 
 async def execute_privacy_deletion_request(
@@ -197,8 +278,14 @@ async def execute_privacy_deletion_request(
     request_row: PrivacyDeletionRequest,
     reviewer_id: uuid.UUID | None = None,
     review_note: str | None = None,
-) -> dict[str, Any]:
-    counts = await _purge_user_private_data(db, user_id=request_row.user_id)
+) -> tuple[dict[str, Any], list[str]]:
+    """Purge the request's user on ``db`` without committing.
+
+    Returns the purge counts and the local upload paths, which the caller
+    removes with ``remove_purged_uploads`` after it has committed.
+    """
+
+    counts, upload_paths = await _purge_user_private_data(db, user_id=request_row.user_id)
     now = _utcnow()
     request_row.status = "executed"
     request_row.executed_at = now
@@ -216,11 +303,69 @@ async def execute_privacy_deletion_request(
         payload={
             "delete_status": request_row.status,
             "counts": counts,
+            "local_uploads": len(upload_paths),
         },
         summary="已执行私有数据删除和账号匿名化。",
         occurred_at=now,
     )
-    return counts
+    return counts, upload_paths
+
+
+async def _execute_user_requests_isolated(
+    request_ids: list[uuid.UUID],
+    *,
+    reviewer_id: uuid.UUID | None,
+    review_note: str,
+) -> list[dict[str, Any]] | None:
+    """Execute one user's due requests in their own admin transaction.
+
+    Returns the counts for each request executed, or ``None`` when the purge
+    failed and was rolled back. Requests that were executed or locked by a
+    concurrent sweep in the meantime are skipped. Upload files are removed
+    only after the commit succeeds.
+    """
+
+    async with admin_session() as db:
+        try:
+            executed = []
+            for request_id in request_ids:
+                row = (
+                    await db.execute(
+                        select(PrivacyDeletionRequest)
+                        .where(
+                            PrivacyDeletionRequest.id == request_id,
+                            PrivacyDeletionRequest.status == "pending",
+                        )
+                        .with_for_update(skip_locked=True)
+                    )
+                ).scalar_one_or_none()
+                if row is None:
+                    continue
+                executed.append(
+                    await execute_privacy_deletion_request(
+                        db,
+                        request_row=row,
+                        reviewer_id=reviewer_id,
+                        review_note=review_note,
+                    )
+                )
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            logger.exception(
+                "privacy deletion failed for requests %s",
+                ", ".join(str(request_id) for request_id in request_ids),
+            )
+            return None
+
+    for counts, upload_paths in executed:
+        counts["local_uploads_removed"] = await remove_purged_uploads(upload_paths)
+    return [counts for counts, _ in executed]
+
+
+def _add_counts(total: dict[str, int], counts: dict[str, int]) -> None:
+    for key, value in counts.items():
+        total[key] = total.get(key, 0) + value
 
 
 async def process_due_deletion_requests(
@@ -229,8 +374,24 @@ async def process_due_deletion_requests(
     dry_run: bool = False,
     now: datetime | None = None,
     reviewer_id: uuid.UUID | None = None,
+    concurrency: int | None = None,
 ) -> dict[str, Any]:
+    """Execute every pending deletion request whose grace period has ended.
+
+    Users who still share pair data go to manual review. With
+    ``concurrency`` (default ``PRIVACY_PURGE_CONCURRENCY``) above 1, each
+    user's requests are purged in a separate admin session and committed on
+    their own. A failure then rolls back only that user and is counted in
+    ``failed``. With 1, or on SQLite, everything runs on ``db``: the caller
+    commits and then passes ``upload_paths`` to ``remove_purged_uploads``.
+    A dry run changes nothing and reports the exact rows and files that would
+    be removed in ``counts``.
+    """
+
     reference_now = now or _utcnow()
+    if concurrency is None:
+        concurrency = settings.PRIVACY_PURGE_CONCURRENCY
+    review_note = "宽限期到期后自动执行。"
     stmt = (
         select(PrivacyDeletionRequest)
         .where(
@@ -242,108 +403,240 @@ async def process_due_deletion_requests(
     result = await db.execute(stmt)
     requests = list(result.scalars().all())
 
-    stats = {
+    stats: dict[str, Any] = {
         "due_requests": len(requests),
         "executed": 0,
         "manual_review": 0,
+        "failed": 0,
+        "counts": {},
+        "upload_paths": [],
     }
 
+    shared_users = await _users_with_shared_pair_data(
+        db, {row.user_id for row in requests}
+    )
+    due_by_user: dict[uuid.UUID, list[PrivacyDeletionRequest]] = {}
     for row in requests:
-        if await _user_has_shared_pair_data(db, row.user_id):
-            stats["manual_review"] += 1
-            if dry_run:
-                continue
-            row.status = "manual_review"
-            row.reviewed_by = reviewer_id
-            row.review_note = "存在共享关系数据，已转入人工复核。"
-            await db.flush()
-            await log_privacy_event(
-                db,
-                event_type="privacy.delete.manual_review",
-                user_id=row.user_id,
-                entity_type="privacy_delete_request",
-                entity_id=row.id,
-                payload={"delete_status": row.status},
-                summary="检测到共享关系数据，删除请求已转入人工复核。",
-            )
+        if row.user_id not in shared_users:
+            due_by_user.setdefault(row.user_id, []).append(row)
             continue
-
-        stats["executed"] += 1
+        stats["manual_review"] += 1
         if dry_run:
             continue
-        await execute_privacy_deletion_request(
+        row.status = "manual_review"
+        row.reviewed_by = reviewer_id
+        row.review_note = "存在共享关系数据，已转入人工复核。"
+        await db.flush()
+        await log_privacy_event(
             db,
-            request_row=row,
-            reviewer_id=reviewer_id,
-            review_note="宽限期到期后自动执行。",
+            event_type="privacy.delete.manual_review",
+            user_id=row.user_id,
+            entity_type="privacy_delete_request",
+            entity_id=row.id,
+            payload={"delete_status": row.status},
+            summary="检测到共享关系数据，删除请求已转入人工复核。",
         )
 
+    if dry_run:
+        for user_id, rows in due_by_user.items():
+            stats["executed"] += len(rows)
+            counts, _ = await _purge_user_private_data(db, user_id=user_id, dry_run=True)
+            _add_counts(stats["counts"], counts)
+        return stats
+
+    # SQLite 只允许一个写事务，并行会话只会互相等锁
+    if concurrency <= 1 or db.get_bind().dialect.name == "sqlite":
+        for rows in due_by_user.values():
+            for row in rows:
+                stats["executed"] += 1
+                counts, upload_paths = await execute_privacy_deletion_request(
+                    db,
+                    request_row=row,
+                    reviewer_id=reviewer_id,
+                    review_note=review_note,
+                )
+                _add_counts(stats["counts"], counts)
+                stats["upload_paths"].extend(upload_paths)
+        return stats
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def purge_user(rows: list[PrivacyDeletionRequest]):
+        async with semaphore:
+            return await _execute_user_requests_isolated(
+                [row.id for row in rows],
+                reviewer_id=reviewer_id,
+                review_note=review_note,
+            )
+
+    user_rows = list(due_by_user.values())
+    outcomes = await asyncio.gather(*(purge_user(rows) for rows in user_rows))
+    for rows, executed in zip(user_rows, outcomes):
+        if executed is None:
+            stats["failed"] += len(rows)
+            continue
+        stats["executed"] += len(executed)
+        for counts in executed:
+            _add_counts(stats["counts"], counts)
     return stats
 
 
-def _list_stale_temp_files(reference_now: datetime) -> list[Path]:
-    root = Path(_temp_transcription_dir())
-    if not root.exists():
-        return []
-    threshold = reference_now - timedelta(
-        hours=max(settings.PRIVACY_TEMP_FILE_RETENTION_HOURS, 1)
-    )
-    stale_files: list[Path] = []
-    for path in root.rglob("*"):
-        if not path.is_file():
+def _scan_stale_temp_files(reference_now: datetime) -> list[str]:
+    threshold = (
+        reference_now
+        - timedelta(hours=max(settings.PRIVACY_TEMP_FILE_RETENTION_HOURS, 1))
+    ).replace(tzinfo=timezone.utc).timestamp()
+    stale_files: list[str] = []
+    pending = [_temp_transcription_dir()]
+    while pending:
+        try:
+            entries = os.scandir(pending.pop())
+        except (FileNotFoundError, NotADirectoryError):
             continue
-        modified_at = datetime.fromtimestamp(path.stat().st_mtime, tz=timezone.utc).replace(
-            tzinfo=None
-        )
-        if modified_at <= threshold:
-            stale_files.append(path)
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    if entry.stat(follow_symlinks=False).st_mtime <= threshold:
+                        stale_files.append(entry.path)
     return stale_files
 
 
+def _remove_files(paths: list[str]) -> int:
+    removed = 0
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            continue
+        except OSError:
+            # 审计事件的分块删除已提交，单个临时文件删不掉不能中断清扫
+            logger.warning("could not remove stale temp file %s", path, exc_info=True)
+            continue
+        removed += 1
+    return removed
+
+
+def _decode_sweep_key(value: list | None) -> tuple[datetime, uuid.UUID] | None:
+    if not value:
+        return None
+    return datetime.fromisoformat(value[0]), uuid.UUID(value[1])
+
+
+async def _save_sweep_checkpoint(db: AsyncSession, state: dict[str, Any]) -> None:
+    checkpoint = await db.get(MaintenanceCheckpoint, RETENTION_SWEEP_CHECKPOINT)
+    if checkpoint is None:
+        db.add(MaintenanceCheckpoint(name=RETENTION_SWEEP_CHECKPOINT, state=state))
+    else:
+        checkpoint.state = state
+    await db.commit()
+
+
 async def run_privacy_retention_sweep(
     db: AsyncSession,
     *,
     dry_run: bool = False,
     now: datetime | None = None,
     actor_user_id: uuid.UUID | None = None,
+    batch_size: int | None = None,
+    pause_seconds: float | None = None,
+    time_budget_seconds: float | None = None,
 ) -> dict[str, Any]:
-    reference_now = now or _utcnow()
-    event_cutoff = reference_now - timedelta(
-        days=max(settings.PRIVACY_AUDIT_RETENTION_DAYS, 1)
-    )
+    """Purge expired privacy audit events and stale transcription temp files.
 
-    event_count_result = await db.execute(
-        select(func.count(RelationshipEvent.id)).where(
-            RelationshipEvent.event_type.like("privacy.%"),
-            RelationshipEvent.occurred_at < event_cutoff,
-        )
-    )
-    expired_event_count = int(event_count_result.scalar_one() or 0)
-    stale_temp_files = _list_stale_temp_files(reference_now)
+    On Postgres, fully expired monthly partitions are dropped first. The
+    remaining expired rows are deleted in ``(occurred_at, id)`` order, in chunks
+    of ``batch_size``, with each chunk committed on its own and a pause between
+    chunks. Progress and the cutoff are checkpointed after every chunk. A run
+    that hits ``time_budget_seconds`` or dies part-way resumes from that point,
+    with the same cutoff, on the next call.
+    """
 
-    summary = {
-        "dry_run": dry_run,
-        "expired_privacy_events": expired_event_count,
-        "stale_temp_files": len(stale_temp_files),
-    }
-
-    if not dry_run and expired_event_count:
+    reference_now = now or _utcnow()
+    batch_size = max(int(batch_size or settings.PRIVACY_RETENTION_BATCH_SIZE), 1)
+    if pause_seconds is None:
+        pause_seconds = settings.PRIVACY_RETENTION_BATCH_PAUSE_SECONDS
+    if time_budget_seconds is None:
+        time_budget_seconds = settings.PRIVACY_RETENTION_TIME_BUDGET_SECONDS
+
+    checkpoint = await db.get(MaintenanceCheckpoint, RETENTION_SWEEP_CHECKPOINT)
+    state = dict(checkpoint.state or {}) if checkpoint and not dry_run else {}
+    resumed = bool(state)
+    if resumed:
+        event_cutoff = datetime.fromisoformat(state["cutoff"])
+    else:
+        event_cutoff = reference_now - timedelta(
+            days=max(settings.PRIVACY_AUDIT_RETENTION_DAYS, 1)
+        )
+        state = {"cutoff": event_cutoff.isoformat(), "deleted": 0, "tiers": {}}
+
+    stale_temp_files = await asyncio.to_thread(_scan_stale_temp_files, reference_now)
+
+    if dry_run:
+        def expired(model) -> tuple:
+            return (model.occurred_at < event_cutoff,)
+
+        return {
+            "dry_run": True,
+            "expired_privacy_events": await count_event_log_rows(
+                db, PRIVACY_EVENTS, expired
+            ),
+            "stale_temp_files": len(stale_temp_files),
+        }
+
+    started = time.perf_counter()
+    dropped = await drop_expired_partitions(db, PRIVACY_EVENTS, before=event_cutoff)
+    deleted = sum(dropped.values())
+    batches = 0
+    completed = True
+    for model in EVENT_LOG_TIERS[PRIVACY_EVENTS]:
+        tier = model.__tablename__
+        if state["tiers"].get(tier) == "done":
+            continue
+        after = _decode_sweep_key(state["tiers"].get(tier))
+        while True:
+            count, after = await delete_event_log_chunk(
+                db, model, before=event_cutoff, after=after, limit=batch_size
+            )
+            deleted += count
+            batches += 1
+            state["deleted"] += count
+            state["tiers"][tier] = (
+                "done" if after is None else [after[0].isoformat(), str(after[1])]
+            )
+            await _save_sweep_checkpoint(db, state)
+            if after is None:
+                break
+            if time_budget_seconds and time.perf_counter() - started >= time_budget_seconds:
+                completed = False
+                break
+            if pause_seconds:
+                await asyncio.sleep(pause_seconds)
+        if not completed:
+            break
+
+    if completed:
         await db.execute(
-            delete(RelationshipEvent).where(
-                RelationshipEvent.event_type.like("privacy.%"),
-                RelationshipEvent.occurred_at < event_cutoff,
+            delete(MaintenanceCheckpoint).where(
+                MaintenanceCheckpoint.name == RETENTION_SWEEP_CHECKPOINT
             )
         )
+    removed_files = await asyncio.to_thread(_remove_files, stale_temp_files)
+    elapsed = time.perf_counter() - started
+    summary = {
+        "dry_run": False,
+        "expired_privacy_events": deleted,
+        "stale_temp_files": removed_files,
+        "dropped_partitions": len(dropped),
+        "batches": batches,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(deleted / elapsed, 1) if elapsed > 0 else 0.0,
+        "resumed": resumed,
+        "completed": completed,
+    }
 
-    deleted_temp_files = 0
-    if not dry_run:
-        for path in stale_temp_files:
-            if path.exists():
-                path.unlink()
-                deleted_temp_files += 1
-        summary["stale_temp_files"] = deleted_temp_files
-
-    if not dry_run and actor_user_id:
+    if actor_user_id:
         await log_privacy_event(
             db,
             event_type="privacy.retention.purged",
@@ -1,10 +1,32 @@
-"""Privacy sandbox helpers for log masking and outbound AI redaction."""
+"""Privacy sandbox helpers for log masking and outbound AI redaction.
+
+``redact_sensitive_text`` applies the rules in ``_REDACTION_RULES`` one after
+another (phone, email, UUID, JWT, long number), each pass seeing the output of
+the previous one. Rules whose trigger (a digit, ``@``, ``-`` or ``eyJ``) is
+absent are skipped, so plain prose costs a couple of substring checks. In a
+long text where several rules apply, one scan with an alternation of all of
+them locates the few candidate tokens and the passes run over those tokens
+only. Every rule matches within a run of word characters and ``.%+@-``, and
+the characters around such a run are neither word characters nor digits, so
+word boundaries and the digit lookarounds behave there as at the ends of a
+string. Redacting token by token therefore gives exactly the output of
+whole-text passes.
+
+``redact_message_payload`` memoizes redacted strings in a bounded LRU keyed
+by the SHA-256 of the input, so the cache never holds raw text and the
+unchanged history resent on every agent turn is not scanned again. It also
+passes image and audio parts (base64 data URIs) through untouched instead of
+walking and copying them.
+"""
 
 from __future__ import annotations
 
 import copy
+import hashlib
 import re
+from collections import OrderedDict
 from collections.abc import Mapping, Sequence
+from functools import lru_cache
 from typing import Any
 
 from app.core.config import settings
@@ -17,6 +39,32 @@ UUID_PATTERN = re.compile(
 JWT_PATTERN = re.compile(r"\beyJ[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\b")
 LONG_NUMBER_PATTERN = re.compile(r"(?<!\d)\d{15,19}(?!\d)")
 
+# (name, first-character class, pattern, replacement, required substrings,
+# needs a digit), in the order the passes run.
+_REDACTION_RULES = (
+    ("phone", "1", PHONE_PATTERN, r"\1****\2", (), True),
+    (
+        "email",
+        r"A-Za-z0-9._%+\-",
+        EMAIL_PATTERN,
+        lambda match: f"{match.group(1)}***{match.group(3)}",
+        ("@",),
+        False,
+    ),
+    ("uuid", "0-9a-fA-F", UUID_PATTERN, "[UUID]", ("-",), True),
+    ("jwt", "e", JWT_PATTERN, "[TOKEN]", ("eyJ",), False),
+    ("long_number", r"\d", LONG_NUMBER_PATTERN, "[LONG_NUMBER]", (), True),
+)
+# Every rule's characters fall inside this class.
+_TOKEN_CHAR_PATTERN = re.compile(r"[\w.%+@-]")
+_TOKEN_PATTERN = re.compile(r"[\w.%+@-]*")
+# Short or dense texts are cheaper to redact with whole-text passes.
+_TOKEN_PASS_MIN_LENGTH = 512
+_TOKEN_PASS_LIMIT = 8
+_DIGIT_PATTERN = re.compile(r"\d")
+_BINARY_PART_TYPES = frozenset({"image_url", "input_audio"})
+_REDACTION_CACHE_SIZE = 2048
+
 
 def privacy_sandbox_enabled() -> bool:
     return bool(settings.PRIVACY_SANDBOX_ENABLED)
@@ -60,15 +108,74 @@ def mask_token(token: str | None) -> str:
     return f"{value[:6]}...{value[-4:]}"
 
 
+@lru_cache(maxsize=None)
+def _redaction_scanner(rules: tuple[str, ...]) -> re.Pattern[str]:
+    # The leading lookahead lets the regex engine skip straight to characters
+    # that can start a match instead of trying every alternative everywhere.
+    selected = [rule for rule in _REDACTION_RULES if rule[0] in rules]
+    first_chars = "".join(rule[1] for rule in selected)
+    alternatives = "|".join(f"(?:{rule[2].pattern})" for rule in selected)
+    return re.compile(f"(?=[{first_chars}])(?:{alternatives})")
+
+
+def _apply_rules(text: str, rules: tuple[str, ...]) -> str:
+    for name, _, pattern, replacement, _, _ in _REDACTION_RULES:
+        if name in rules:
+            text = pattern.sub(replacement, text)
+    return text
+
+
 def redact_sensitive_text(text: str) -> str:
     if not text:
         return text
 
-    redacted = PHONE_PATTERN.sub(r"\1****\2", text)
-    redacted = EMAIL_PATTERN.sub(lambda match: f"{match.group(1)}***{match.group(3)}", redacted)
-    redacted = UUID_PATTERN.sub("[UUID]", redacted)
-    redacted = JWT_PATTERN.sub("[TOKEN]", redacted)
-    redacted = LONG_NUMBER_PATTERN.sub("[LONG_NUMBER]", redacted)
+    has_digit = _DIGIT_PATTERN.search(text) is not None
+    rules = tuple(
+        name
+        for name, _, _, _, required, needs_digit in _REDACTION_RULES
+        if (has_digit or not needs_digit) and all(part in text for part in required)
+    )
+    if len(rules) <= 1 or len(text) < _TOKEN_PASS_MIN_LENGTH:
+        return _apply_rules(text, rules)
+
+    spans: list[tuple[int, int]] = []
+    done = 0
+    for match in _redaction_scanner(rules).finditer(text):
+        if match.start() < done:
+            continue
+        if len(spans) == _TOKEN_PASS_LIMIT:
+            return _apply_rules(text, rules)
+        start = match.start()
+        while start > done and _TOKEN_CHAR_PATTERN.match(text, start - 1):
+            start -= 1
+        done = _TOKEN_PATTERN.match(text, match.end()).end()
+        spans.append((start, done))
+    if not spans:
+        return text
+
+    pieces: list[str] = []
+    done = 0
+    for start, end in spans:
+        pieces.append(text[done:start])
+        pieces.append(_apply_rules(text[start:end], rules))
+        done = end
+    pieces.append(text[done:])
+    return "".join(pieces)
+
+
+_REDACTION_CACHE: OrderedDict[bytes, str] = OrderedDict()
+
+
+def _redact_cached(text: str) -> str:
+    key = hashlib.sha256(text.encode("utf-8", "surrogatepass")).digest()
+    redacted = _REDACTION_CACHE.get(key)
+    if redacted is not None:
+        _REDACTION_CACHE.move_to_end(key)
+        return redacted
+    redacted = redact_sensitive_text(text)
+    _REDACTION_CACHE[key] = redacted
+    if len(_REDACTION_CACHE) > _REDACTION_CACHE_SIZE:
+        _REDACTION_CACHE.popitem(last=False)
     return redacted
 
 
@@ -108,9 +215,15 @@ def _sanitize_value(value: Any, *, key: str | None = None) -> Any:
     if isinstance(value, str):
         if key == "url":
             return value
-        return redact_sensitive_text(value)
+        return _redact_cached(value)
+
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
 
     if isinstance(value, Mapping):
+        # Image and audio parts carry base64 payloads and no free text.
+        if value.get("type") in _BINARY_PART_TYPES:
+            return value
         return {item_key: _sanitize_value(item_value, key=item_key) for item_key, item_value in value.items()}
 
     if isinstance(value, Sequence) and not isinstance(value, (bytes, bytearray, str)):
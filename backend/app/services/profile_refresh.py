@@ -0,0 +1,287 @@
+"""Coalescing scheduler for profile snapshot + intervention plan refreshes.
+
+Business flows used to call ``refresh_profile_and_plan`` inline, so a burst of
+checkins, task completions and simulations on one pair rebuilt the same profile
+several times within seconds. Callers now enqueue a scope on their session; once
+that session commits, the scope is handed to an in-process worker that runs at
+most one refresh per scope per debounce window. Due scopes are refreshed
+concurrently, up to ``PROFILE_REFRESH_CONCURRENCY`` at a time and each on its
+own session, so one slow rebuild does not hold up other pairs. Endpoints that must observe the
+refreshed snapshot use ``fresh=True`` or ``ensure_profile_fresh``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import background_session
+from app.models import InterventionPlan, RelationshipProfileSnapshot
+from app.services.relationship_intelligence import refresh_profile_and_plan
+
+logger = logging.getLogger(__name__)
+
+_SESSION_INFO_KEY = "qinjian.profile_refresh"
+
+ScopeKey = tuple[str | None, str | None]
+
+_REFRESH_STATS = {
+    "enqueued": 0,
+    "coalesced": 0,
+    "executed": 0,
+    "inline": 0,
+    "failed": 0,
+}
+
+
+def _scope_key(
+    pair_id: str | uuid.UUID | None,
+    user_id: str | uuid.UUID | None,
+) -> ScopeKey:
+    if (not pair_id) == (not user_id):
+        raise ValueError("profile refresh requires exactly one scope")
+    if pair_id:
+        return str(uuid.UUID(str(pair_id))), None
+    return None, str(uuid.UUID(str(user_id)))
+
+
+def _sync_session(db: AsyncSession | Session) -> Session:
+    if isinstance(db, AsyncSession):
+        return db.sync_session
+    return db
+
+
+class ProfileRefreshScheduler:
+    """Debounces committed refresh requests and runs them on a background task."""
+
+    def __init__(self, *, debounce_seconds: float, concurrency: int = 1):
+        self.debounce_seconds = max(float(debounce_seconds), 0.0)
+        self._due: dict[ScopeKey, float] = {}
+        self._running: dict[ScopeKey, asyncio.Task] = {}
+        self._slots = asyncio.Semaphore(max(int(concurrency), 1))
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def __contains__(self, key: ScopeKey) -> bool:
+        return key in self._due
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    def submit(self, key: ScopeKey) -> None:
+        if key in self._due:
+            _REFRESH_STATS["coalesced"] += 1
+            return
+        # The first request in a window fixes the deadline, so a steady stream
+        # of events still gets refreshed once per window instead of starving.
+        self._due[key] = time.monotonic() + self.debounce_seconds
+        self._wakeup.set()
+
+    def discard(self, key: ScopeKey) -> bool:
+        return self._due.pop(key, None) is not None
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._running)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.gather(*self._running.values())
+        pending = list(self._due)
+        self._due.clear()
+        await asyncio.gather(*(self._execute_limited(key) for key in pending))
+
+    async def _run(self) -> None:
+        while True:
+            # A scope that is still refreshing stays queued until that run ends.
+            waiting = [
+                due_at for key, due_at in self._due.items() if key not in self._running
+            ]
+            if not waiting:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            delay = min(waiting) - time.monotonic()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            now = time.monotonic()
+            ready = [
+                key
+                for key, due_at in self._due.items()
+                if due_at <= now and key not in self._running
+            ]
+            for key in ready:
+                self._due.pop(key, None)
+                task = asyncio.create_task(self._execute_limited(key))
+                self._running[key] = task
+                task.add_done_callback(lambda _task, key=key: self._finished(key))
+
+    def _finished(self, key: ScopeKey) -> None:
+        self._running.pop(key, None)
+        self._wakeup.set()
+
+    async def _execute_limited(self, key: ScopeKey) -> None:
+        async with self._slots:
+            await self._execute(key)
+
+    async def _execute(self, key: ScopeKey) -> None:
+        pair_id, user_id = key
+        async with background_session() as db:
+            try:
+                await refresh_profile_and_plan(db, pair_id=pair_id, user_id=user_id)
+                await db.commit()
+                _REFRESH_STATS["executed"] += 1
+            except Exception:
+                await db.rollback()
+                _REFRESH_STATS["failed"] += 1
+                logger.exception("profile refresh failed for scope %s", key)
+
+
+_SCHEDULER: ProfileRefreshScheduler | None = None
+
+
+def get_profile_refresh_scheduler() -> ProfileRefreshScheduler | None:
+    return _SCHEDULER
+
+
+def start_profile_refresh_scheduler(*, settings_obj=settings) -> ProfileRefreshScheduler | None:
+    global _SCHEDULER
+    debounce = float(getattr(settings_obj, "PROFILE_REFRESH_DEBOUNCE_SECONDS", 0) or 0)
+    if debounce <= 0:
+        return None
+    if _SCHEDULER is None:
+        _SCHEDULER = ProfileRefreshScheduler(
+            debounce_seconds=debounce,
+            concurrency=getattr(settings_obj, "PROFILE_REFRESH_CONCURRENCY", 1),
+        )
+    _SCHEDULER.start()
+    return _SCHEDULER
+
+
+async def close_profile_refresh_scheduler() -> None:
+    global _SCHEDULER
+    if _SCHEDULER is None:
+        return
+    scheduler = _SCHEDULER
+    _SCHEDULER = None
+    await scheduler.stop()
+
+
+def _session_pending(session: Session) -> set[ScopeKey]:
+    return session.info.setdefault(_SESSION_INFO_KEY, set())
+
+
+@event.listens_for(Session, "after_commit")
+def _submit_after_commit(session: Session) -> None:
+    pending = session.info.pop(_SESSION_INFO_KEY, None)
+    if not pending:
+        return
+    scheduler = _SCHEDULER
+    if scheduler is None or not scheduler.running:
+        logger.warning("profile refresh scheduler stopped; dropped %d scopes", len(pending))
+        return
+    for key in pending:
+        scheduler.submit(key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_SESSION_INFO_KEY, None)
+
+
+async def request_profile_refresh(
+    db: AsyncSession,
+    *,
+    pair_id: str | uuid.UUID | None = None,
+    user_id: str | uuid.UUID | None = None,
+    fresh: bool = False,
+) -> tuple[RelationshipProfileSnapshot, InterventionPlan | None] | None:
+    """Ask for a scope's profile/plan refresh.
+
+    Returns ``None`` when the refresh was queued for after commit. With
+    ``fresh=True``, or when no scheduler is running, the refresh happens inline
+    on ``db`` and its result is returned (read-your-writes).
+    """
+
+    key = _scope_key(pair_id, user_id)
+    scheduler = _SCHEDULER
+    if fresh or scheduler is None or not scheduler.running:
+        return await _refresh_inline(db, key)
+
+    _REFRESH_STATS["enqueued"] += 1
+    pending = _session_pending(_sync_session(db))
+    if key in pending:
+        _REFRESH_STATS["coalesced"] += 1
+        return None
+    pending.add(key)
+    return None
+
+
+async def ensure_profile_fresh(
+    db: AsyncSession,
+    *,
+    pair_id: str | uuid.UUID | None = None,
+    user_id: str | uuid.UUID | None = None,
+) -> bool:
+    """Run a scope's queued refresh now, before a read that must see it."""
+
+    key = _scope_key(pair_id, user_id)
+    pending = _sync_session(db).info.get(_SESSION_INFO_KEY) or set()
+    scheduler = _SCHEDULER
+    queued = key in pending or (scheduler is not None and key in scheduler)
+    if not queued:
+        return False
+    await _refresh_inline(db, key)
+    return True
+
+
+async def _refresh_inline(
+    db: AsyncSession,
+    key: ScopeKey,
+) -> tuple[RelationshipProfileSnapshot, InterventionPlan | None]:
+    pending = _sync_session(db).info.get(_SESSION_INFO_KEY)
+    if pending:
+        pending.discard(key)
+    scheduler = _SCHEDULER
+    if scheduler is not None:
+        scheduler.discard(key)
+    _REFRESH_STATS["inline"] += 1
+    pair_id, user_id = key
+    return await refresh_profile_and_plan(db, pair_id=pair_id, user_id=user_id)
+
+
+def get_profile_refresh_stats() -> dict[str, int]:
+    scheduler = _SCHEDULER
+    return {
+        **_REFRESH_STATS,
+        "pending": len(scheduler) if scheduler is not None else 0,
+        "in_flight": scheduler.in_flight if scheduler is not None else 0,
+    }
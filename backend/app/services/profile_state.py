@@ -0,0 +1,366 @@
+"""Incremental rolling-window state behind relationship profile snapshots.
+
+Each scope (pair or solo user) owns one ``RelationshipProfileState`` row holding
+per-day buckets of the facts the profile composer needs: checkin moods and
+initiative, report health scores, crisis levels, task and activity statuses,
+message simulations and alignments. Buckets are keyed by entity id, so applying
+the same event twice is harmless and a status change simply overwrites the
+previous contribution.
+
+``record_relationship_event`` feeds business events in here; snapshots then read
+one state row instead of re-scanning seven tables. A full rebuild from the
+business tables remains the seed/repair path.
+"""
+
+from __future__ import annotations
+
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import (
+    Checkin,
+    CrisisAlert,
+    LongDistanceActivity,
+    RelationshipEvent,
+    RelationshipProfileState,
+    RelationshipTask,
+    Report,
+    ReportStatus,
+)
+
+BUCKET_CATEGORIES = (
+    "checkins",
+    "reports",
+    "crisis_alerts",
+    "tasks",
+    "activities",
+    "message_simulations",
+    "alignments",
+)
+
+PROFILE_STATE_EVENT_TYPES = frozenset(
+    {
+        "checkin.created",
+        "report.completed",
+        "crisis.raised",
+        "task.generated",
+        "task.completed",
+        "longdistance.activity_created",
+        "longdistance.activity_completed",
+        "message.simulated",
+        "alignment.generated",
+    }
+)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def profile_state_enabled() -> bool:
+    return bool(settings.PROFILE_INCREMENTAL_ENABLED)
+
+
+def _iso(value: datetime | date | None) -> str | None:
+    return value.isoformat() if value is not None else None
+
+
+def _enum_value(value: Any) -> Any:
+    return getattr(value, "value", value)
+
+
+def empty_bucket() -> dict[str, dict]:
+    return {category: {} for category in BUCKET_CATEGORIES}
+
+
+def bucket_is_empty(bucket: dict | None) -> bool:
+    return not any((bucket or {}).get(category) for category in BUCKET_CATEGORIES)
+
+
+def _bucket_for(days: dict[str, dict], day: date) -> dict[str, dict]:
+    key = day.isoformat()
+    bucket = days.get(key)
+    if bucket is None:
+        bucket = empty_bucket()
+        days[key] = bucket
+    for category in BUCKET_CATEGORIES:
+        bucket.setdefault(category, {})
+    return bucket
+
+
+# ── entry builders (shared with the full rebuild) ──
+
+
+def add_checkin(days: dict[str, dict], checkin: Checkin) -> None:
+    _bucket_for(days, checkin.checkin_date)["checkins"][str(checkin.id)] = {
+        "user_id": str(checkin.user_id),
+        "created_at": _iso(checkin.created_at),
+        "mood_score": checkin.mood_score,
+        "interaction_freq": checkin.interaction_freq,
+        "interaction_initiative": checkin.interaction_initiative,
+        "deep_conversation": checkin.deep_conversation,
+    }
+
+
+def add_report(days: dict[str, dict], report: Report) -> None:
+    bucket = _bucket_for(days, report.report_date)
+    if report.status == ReportStatus.COMPLETED and report.health_score is not None:
+        bucket["reports"][str(report.id)] = {"health_score": float(report.health_score)}
+    else:
+        bucket["reports"].pop(str(report.id), None)
+
+
+def add_crisis_alert(days: dict[str, dict], alert: CrisisAlert) -> None:
+    _bucket_for(days, alert.created_at.date())["crisis_alerts"][str(alert.id)] = {
+        "created_at": _iso(alert.created_at),
+        "level": _enum_value(alert.level),
+    }
+
+
+def add_task(days: dict[str, dict], task: RelationshipTask) -> None:
+    _bucket_for(days, task.due_date)["tasks"][str(task.id)] = {
+        "status": _enum_value(task.status),
+    }
+
+
+def add_activity(days: dict[str, dict], activity: LongDistanceActivity) -> None:
+    _bucket_for(days, activity.created_at.date())["activities"][str(activity.id)] = {
+        "status": activity.status,
+    }
+
+
+def add_message_simulation(days: dict[str, dict], event: RelationshipEvent) -> None:
+    payload = event.payload or {}
+    _bucket_for(days, event.occurred_at.date())["message_simulations"][str(event.id)] = {
+        "occurred_at": _iso(event.occurred_at),
+        "risk_level": payload.get("risk_level"),
+        "conversation_goal": payload.get("conversation_goal"),
+    }
+
+
+def add_alignment(days: dict[str, dict], event: RelationshipEvent) -> None:
+    payload = event.payload or {}
+    _bucket_for(days, event.occurred_at.date())["alignments"][str(event.id)] = {
+        "occurred_at": _iso(event.occurred_at),
+        "alignment_score": payload.get("alignment_score"),
+        "suggested_opening": payload.get("suggested_opening"),
+        "bridge_actions": payload.get("bridge_actions"),
+    }
+
+
+def compact_days(days: dict[str, dict]) -> dict[str, dict]:
+    return {day: bucket for day, bucket in sorted(days.items()) if not bucket_is_empty(bucket)}
+
+
+def window_days_slice(
+    days: dict[str, dict] | None,
+    *,
+    start_date: date,
+    end_date: date,
+) -> dict[str, dict]:
+    start_key = start_date.isoformat()
+    end_key = end_date.isoformat()
+    return compact_days(
+        {day: bucket for day, bucket in (days or {}).items() if start_key <= day <= end_key}
+    )
+
+
+# ── state rows ──
+
+
+async def get_profile_state(
+    db: AsyncSession,
+    *,
+    pair_id: uuid.UUID | None,
+    user_id: uuid.UUID | None,
+    for_update: bool = False,
+) -> RelationshipProfileState | None:
+    """Load a scope's state row; ``for_update`` locks it and reloads its buckets."""
+
+    if pair_id:
+        filters = [RelationshipProfileState.pair_id == pair_id]
+    else:
+        filters = [
+            RelationshipProfileState.user_id == user_id,
+            RelationshipProfileState.pair_id.is_(None),
+        ]
+    stmt = select(RelationshipProfileState).where(*filters).limit(1)
+    if for_update:
+        stmt = stmt.with_for_update().execution_options(populate_existing=True)
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+def state_covers(
+    state: RelationshipProfileState | None,
+    *,
+    start_date: date,
+) -> bool:
+    return bool(state and state.covered_from and state.covered_from <= start_date)
+
+
+def _retention_cutoff(today: date | None = None) -> date:
+    retention = max(int(settings.PROFILE_STATE_RETENTION_DAYS or 0), 1)
+    return (today or date.today()) - timedelta(days=retention - 1)
+
+
+def _write_days(
+    state: RelationshipProfileState,
+    days: dict[str, dict],
+    *,
+    covered_from: date,
+) -> None:
+    cutoff = _retention_cutoff()
+    cutoff_key = cutoff.isoformat()
+    state.day_buckets = compact_days(
+        {day: bucket for day, bucket in days.items() if day >= cutoff_key}
+    )
+    state.covered_from = max(covered_from, cutoff)
+
+
+async def store_rebuilt_days(
+    db: AsyncSession,
+    *,
+    pair_id: uuid.UUID | None,
+    user_id: uuid.UUID | None,
+    rebuilt_days: dict[str, dict],
+    start_date: date,
+    end_date: date,
+    state: RelationshipProfileState | None = None,
+) -> RelationshipProfileState | None:
+    """Seed or repair a scope's state with buckets rebuilt from business tables.
+
+    Only a window reaching today can seed a new state, and a rebuild must touch
+    the covered range, otherwise the state would claim days it never saw.
+    """
+
+    state = state or await get_profile_state(db, pair_id=pair_id, user_id=user_id)
+    if state is None:
+        if end_date < date.today():
+            return None
+        state = RelationshipProfileState(
+            pair_id=pair_id,
+            user_id=None if pair_id else user_id,
+            covered_from=start_date,
+            day_buckets={},
+        )
+        db.add(state)
+        merged: dict[str, dict] = {}
+        covered_from = start_date
+    else:
+        if end_date < state.covered_from - timedelta(days=1):
+            return None
+        start_key = start_date.isoformat()
+        end_key = end_date.isoformat()
+        merged = {
+            day: bucket
+            for day, bucket in (state.day_buckets or {}).items()
+            if not start_key <= day <= end_key
+        }
+        covered_from = min(state.covered_from, start_date)
+
+    merged.update(rebuilt_days)
+    _write_days(state, merged, covered_from=covered_from)
+    state.last_rebuilt_at = _utcnow()
+    return state
+
+
+async def apply_event_to_profile_state(
+    db: AsyncSession,
+    event: RelationshipEvent,
+) -> None:
+    """Fold one business event into its scope's state, if that state is seeded.
+
+    The scope comes from the touched entity rather than the event, so a solo
+    report written inside a pair still lands in the pair's buckets just like
+    the full rebuild would count it.
+    """
+
+    if event.event_type not in PROFILE_STATE_EVENT_TYPES or not profile_state_enabled():
+        return
+
+    event_type = event.event_type
+    entity_id = _parse_uuid(event.entity_id)
+    entity: Any = None
+    if event_type == "checkin.created" and entity_id:
+        entity = await db.get(Checkin, entity_id)
+    elif event_type == "report.completed" and entity_id:
+        entity = await db.get(Report, entity_id)
+    elif event_type == "crisis.raised" and entity_id:
+        entity = await db.get(CrisisAlert, entity_id)
+    elif event_type == "task.completed" and entity_id:
+        entity = await db.get(RelationshipTask, entity_id)
+    elif event_type.startswith("longdistance.activity_") and entity_id:
+        entity = await db.get(LongDistanceActivity, entity_id)
+
+    if entity is not None:
+        pair_id = _parse_uuid(entity.pair_id)
+        user_id = None if pair_id else _parse_uuid(getattr(entity, "user_id", None))
+    else:
+        pair_id = event.pair_id
+        user_id = None
+    if pair_id is None and (
+        user_id is None or not isinstance(entity, (Checkin, Report))
+    ):
+        return
+
+    # day_buckets 是整体读改写：两位伴侣同时打卡时，不加行锁后提交的一方会覆盖先提交的桶
+    state = await get_profile_state(db, pair_id=pair_id, user_id=user_id, for_update=True)
+    if state is None:
+        return
+
+    days = {
+        day: {category: dict(bucket.get(category) or {}) for category in BUCKET_CATEGORIES}
+        for day, bucket in (state.day_buckets or {}).items()
+    }
+    if isinstance(entity, Checkin):
+        add_checkin(days, entity)
+    elif isinstance(entity, Report):
+        add_report(days, entity)
+    elif isinstance(entity, CrisisAlert):
+        add_crisis_alert(days, entity)
+    elif isinstance(entity, RelationshipTask):
+        add_task(days, entity)
+    elif isinstance(entity, LongDistanceActivity):
+        add_activity(days, entity)
+    elif event_type == "task.generated":
+        result = await db.execute(
+            select(RelationshipTask).where(
+                RelationshipTask.pair_id == pair_id,
+                RelationshipTask.due_date == _batch_due_date(event),
+            )
+        )
+        for task in result.scalars().all():
+            add_task(days, task)
+    elif event_type == "message.simulated":
+        add_message_simulation(days, event)
+    elif event_type == "alignment.generated":
+        add_alignment(days, event)
+    else:
+        return
+
+    _write_days(state, days, covered_from=state.covered_from)
+
+
+def _parse_uuid(value: str | uuid.UUID | None) -> uuid.UUID | None:
+    if not value:
+        return None
+    if isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _batch_due_date(event: RelationshipEvent) -> date:
+    _, _, raw_date = str(event.entity_id or "").rpartition(":")
+    try:
+        return date.fromisoformat(raw_date)
+    except ValueError:
+        return event.occurred_at.date()
@@ -6,9 +6,10 @@ derived understanding of a relationship instead of each re-deriving it ad hoc.
 """
 
 import uuid
-from collections.abc import Sequence
-from datetime import date, datetime, timedelta, timezone
+from collections.abc import Iterable, Sequence
+from datetime import date, datetime, time, timedelta, timezone
 from statistics import mean
+from typing import Any
 
 from sqlalchemy import and_, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -16,16 +17,36 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import (
     Checkin,
     CrisisAlert,
+    EventLogMixin,
     InterventionPlan,
     Pair,
     RelationshipEvent,
     RelationshipProfileSnapshot,
     RelationshipTask,
+    RelationshipViewEvent,
     Report,
     ReportStatus,
     TaskStatus,
     LongDistanceActivity,
 )
+from app.services.profile_state import (
+    add_activity,
+    add_alignment,
+    add_checkin,
+    add_crisis_alert,
+    add_message_simulation,
+    add_report,
+    add_task,
+    apply_event_to_profile_state,
+    compact_days,
+    get_profile_state,
+    profile_state_enabled,
+    state_covers,
+    store_rebuilt_days,
+    window_days_slice,
+)
+from app.services.event_store import event_model
+from app.services.view_telemetry import buffer_view_event
 
 
 def _utcnow() -> datetime:
@@ -73,8 +94,7 @@ def _date_window(snapshot_date: date, window_days: int) -> tuple[date, date]:
     return start, snapshot_date
 
 
-async def record_relationship_event(
-    db: AsyncSession,
+def _event_values(
     *,
     event_type: str,
     pair_id: str | uuid.UUID | None = None,
@@ -85,9 +105,7 @@ async def record_relationship_event(
     payload: dict | None = None,
     idempotency_key: str | None = None,
     occurred_at: datetime | None = None,
-) -> RelationshipEvent:
-    """Persist a normalized relationship event and dedupe on idempotency key."""
-
+) -> tuple[type, dict[str, Any]]:
     normalized_pair_id = _normalize_uuid(pair_id)
     normalized_user_id = _normalize_uuid(user_id)
     normalized_entity_id = str(entity_id) if entity_id is not None else None
@@ -99,17 +117,7 @@ async def record_relationship_event(
     ):
         raise ValueError("record_relationship_event requires pair_id or user_id")
 
-    if idempotency_key:
-        result = await db.execute(
-            select(RelationshipEvent).where(
-                RelationshipEvent.idempotency_key == idempotency_key
-            )
-        )
-        existing = result.scalar_one_or_none()
-        if existing:
-            return existing
-
-    event = RelationshipEvent(
+    return event_model(event_type), dict(
         pair_id=normalized_pair_id,
         user_id=normalized_user_id,
         event_type=event_type,
@@ -120,8 +128,102 @@ async def record_relationship_event(
         idempotency_key=idempotency_key,
         occurred_at=occurred_at or _utcnow(),
     )
-    db.add(event)
-    await db.flush()
+
+
+async def record_relationship_events(
+    db: AsyncSession,
+    events: Iterable[dict[str, Any]],
+) -> list[RelationshipEvent | EventLogMixin]:
+    """Persist several events with one idempotency lookup and one flush.
+
+    Each item takes the keyword arguments of ``record_relationship_event``.
+    Idempotency keys are resolved with a single ``IN (...)`` query per target
+    table, repeated keys within the batch collapse to their first event, and the
+    new rows are flushed together so each table gets one batched INSERT.
+    Returns the stored (or already existing) events in input order.
+    """
+
+    stored: list[Any] = []
+    pending: list[tuple[int, type, dict[str, Any]]] = []
+    for spec in events:
+        model, values = _event_values(**spec)
+        if model is RelationshipViewEvent:
+            buffered = buffer_view_event(**values)
+            if buffered is not None:
+                stored.append(buffered)
+                continue
+        pending.append((len(stored), model, values))
+        stored.append(None)
+
+    keys_by_model: dict[type, set[str]] = {}
+    for _, model, values in pending:
+        if values["idempotency_key"]:
+            keys_by_model.setdefault(model, set()).add(values["idempotency_key"])
+    existing: dict[tuple[type, str], Any] = {}
+    for model, keys in keys_by_model.items():
+        result = await db.execute(select(model).where(model.idempotency_key.in_(keys)))
+        for event in result.scalars().all():
+            existing.setdefault((model, event.idempotency_key), event)
+
+    created = []
+    for index, model, values in pending:
+        key = values["idempotency_key"]
+        event = existing.get((model, key)) if key else None
+        if event is None:
+            event = model(**values)
+            db.add(event)
+            created.append(event)
+            if key:
+                existing[(model, key)] = event
+        stored[index] = event
+
+    if created:
+        await db.flush()
+        for event in created:
+            if isinstance(event, RelationshipEvent):
+                await apply_event_to_profile_state(db, event)
+    return stored
+
+
+async def record_relationship_event(
+    db: AsyncSession,
+    *,
+    event_type: str,
+    pair_id: str | uuid.UUID | None = None,
+    user_id: str | uuid.UUID | None = None,
+    entity_type: str | None = None,
+    entity_id: str | uuid.UUID | None = None,
+    source: str = "system",
+    payload: dict | None = None,
+    idempotency_key: str | None = None,
+    occurred_at: datetime | None = None,
+) -> RelationshipEvent | EventLogMixin:
+    """Persist a normalized relationship event and dedupe on idempotency key.
+
+    Business events go to ``relationship_events`` and feed the profile state;
+    view telemetry and privacy audit records go to their own log tables (see
+    ``app.services.event_store``). View events are buffered and written in
+    batches when the telemetry sink is running (``app.services.view_telemetry``).
+    Callers writing several events at once should use
+    ``record_relationship_events``.
+    """
+
+    (event,) = await record_relationship_events(
+        db,
+        [
+            dict(
+                event_type=event_type,
+                pair_id=pair_id,
+                user_id=user_id,
+                entity_type=entity_type,
+                entity_id=entity_id,
+                source=source,
+                payload=payload,
+                idempotency_key=idempotency_key,
+                occurred_at=occurred_at,
+            )
+        ],
+    )
     return event
 
 
@@ -133,8 +235,13 @@ async def refresh_profile_snapshot(
     window_days: int = 7,
     snapshot_date: date | None = None,
     version: str = "v1",
+    rebuild: bool = False,
 ) -> RelationshipProfileSnapshot:
-    """Rebuild a scope's latest profile snapshot from current business tables."""
+    """Refresh a scope's latest profile snapshot.
+
+    Reads the incremental profile state when it covers the window; otherwise, or
+    with ``rebuild=True``, re-scans the business tables and reseeds the state.
+    """
 
     normalized_pair_id = _normalize_uuid(pair_id)
     normalized_user_id = _normalize_uuid(user_id)
@@ -146,33 +253,40 @@ async def refresh_profile_snapshot(
     start_date, end_date = _date_window(resolved_snapshot_date, window_days)
 
     if normalized_pair_id:
-        (
-            metrics,
-            risk_summary,
-            attachment_summary,
-            suggested_focus,
-        ) = await _build_pair_profile(
+        pair = await db.get(Pair, normalized_pair_id)
+        if not pair:
+            raise ValueError("pair not found for profile snapshot")
+        days = await _load_profile_days(
             db,
             pair_id=normalized_pair_id,
+            user_id=None,
             start_date=start_date,
             end_date=end_date,
-            window_days=window_days,
+            rebuild=rebuild,
         )
-        latest_event_at = await _get_latest_event_at(db, pair_id=normalized_pair_id)
-    else:
-        assert normalized_user_id is not None
         (
             metrics,
             risk_summary,
             attachment_summary,
             suggested_focus,
-        ) = await _build_user_profile(
+        ) = _compose_pair_profile(pair, days, window_days=window_days)
+        latest_event_at = await _get_latest_event_at(db, pair_id=normalized_pair_id)
+    else:
+        assert normalized_user_id is not None
+        days = await _load_profile_days(
             db,
+            pair_id=None,
             user_id=_require_uuid(normalized_user_id),
             start_date=start_date,
             end_date=end_date,
-            window_days=window_days,
+            rebuild=rebuild,
         )
+        (
+            metrics,
+            risk_summary,
+            attachment_summary,
+            suggested_focus,
+        ) = _compose_user_profile(days, window_days=window_days)
         latest_event_at = await _get_latest_event_at(
             db, user_id=normalized_user_id, solo_only=True
         )
@@ -345,6 +459,106 @@ async def refresh_profile_and_plan(
     return snapshot, plan
 
 
+async def verify_profile_state(
+    db: AsyncSession,
+    *,
+    pair_id: str | uuid.UUID | None = None,
+    user_id: str | uuid.UUID | None = None,
+    window_days: int = 7,
+    snapshot_date: date | None = None,
+    repair: bool = True,
+) -> dict:
+    """Compare a scope's incremental state with a full rebuild of the same window."""
+
+    normalized_pair_id = _normalize_uuid(pair_id)
+    normalized_user_id = _normalize_uuid(user_id)
+
+    if (normalized_pair_id is None) == (normalized_user_id is None):
+        raise ValueError("verify_profile_state requires exactly one scope")
+
+    resolved_snapshot_date = snapshot_date or date.today()
+    start_date, end_date = _date_window(resolved_snapshot_date, window_days)
+    state = await get_profile_state(
+        db, pair_id=normalized_pair_id, user_id=normalized_user_id
+    )
+    rebuilt = await _collect_profile_days(
+        db,
+        pair_id=normalized_pair_id,
+        user_id=normalized_user_id,
+        start_date=start_date,
+        end_date=end_date,
+    )
+    incremental = (
+        window_days_slice(state.day_buckets, start_date=start_date, end_date=end_date)
+        if state_covers(state, start_date=start_date)
+        else {}
+    )
+    mismatched_days = sorted(
+        day
+        for day in set(rebuilt) | set(incremental)
+        if rebuilt.get(day) != incremental.get(day)
+    )
+
+    repaired = False
+    if repair and (mismatched_days or not state_covers(state, start_date=start_date)):
+        repaired = (
+            await store_rebuilt_days(
+                db,
+                pair_id=normalized_pair_id,
+                user_id=normalized_user_id,
+                rebuilt_days=rebuilt,
+                start_date=start_date,
+                end_date=end_date,
+                state=state,
+            )
+            is not None
+        )
+        await db.flush()
+
+    return {
+        "consistent": state is not None and not mismatched_days,
+        "mismatched_days": mismatched_days,
+        "repaired": repaired,
+    }
+
+
+async def _load_profile_days(
+    db: AsyncSession,
+    *,
+    pair_id: uuid.UUID | None,
+    user_id: uuid.UUID | None,
+    start_date: date,
+    end_date: date,
+    rebuild: bool,
+) -> dict[str, dict]:
+    state = None
+    if profile_state_enabled():
+        state = await get_profile_state(db, pair_id=pair_id, user_id=user_id)
+        if not rebuild and state_covers(state, start_date=start_date):
+            return window_days_slice(
+                state.day_buckets, start_date=start_date, end_date=end_date
+            )
+
+    days = await _collect_profile_days(
+        db,
+        pair_id=pair_id,
+        user_id=user_id,
+        start_date=start_date,
+        end_date=end_date,
+    )
+    if profile_state_enabled():
+        await store_rebuilt_days(
+            db,
+            pair_id=pair_id,
+            user_id=user_id,
+            rebuilt_days=days,
+            start_date=start_date,
+            end_date=end_date,
+            state=state,
+        )
+    return days
+
+
 async def _get_latest_event_at(
     db: AsyncSession,
     *,
@@ -363,52 +577,83 @@ async def _get_latest_event_at(
     return result.scalar_one_or_none()
 
 
-async def _build_pair_profile(
+def _within_days(column, start_date: date, end_date: date) -> tuple:
+    """Range predicates on a timestamp column covering whole days.
+
+    Equivalent to ``func.date(column) BETWEEN start_date AND end_date`` but
+    sargable, so composite indexes ending in the timestamp can be used.
+    """
+
+    return (
+        column >= datetime.combine(start_date, time.min),
+        column < datetime.combine(end_date + timedelta(days=1), time.min),
+    )
+
+
+async def _collect_profile_days(
     db: AsyncSession,
     *,
-    pair_id: uuid.UUID,
+    pair_id: uuid.UUID | None,
+    user_id: uuid.UUID | None,
     start_date: date,
     end_date: date,
-    window_days: int,
-) -> tuple[dict, dict, dict, list[str]]:
-    pair = await db.get(Pair, pair_id)
-    if not pair:
-        raise ValueError("pair not found for profile snapshot")
+) -> dict[str, dict]:
+    """Full rebuild: scan the business tables into the profile-state bucket format."""
+
+    days: dict[str, dict] = {}
+    if pair_id:
+        await _collect_pair_days(
+            db, days, pair_id=pair_id, start_date=start_date, end_date=end_date
+        )
+    else:
+        await _collect_user_days(
+            db,
+            days,
+            user_id=_require_uuid(user_id),
+            start_date=start_date,
+            end_date=end_date,
+        )
+    return compact_days(days)
 
+
+async def _collect_pair_days(
+    db: AsyncSession,
+    days: dict[str, dict],
+    *,
+    pair_id: uuid.UUID,
+    start_date: date,
+    end_date: date,
+) -> None:
     checkin_result = await db.execute(
-        select(Checkin)
-        .where(
+        select(Checkin).where(
             Checkin.pair_id == pair_id,
             Checkin.checkin_date >= start_date,
             Checkin.checkin_date <= end_date,
         )
-        .order_by(Checkin.checkin_date.asc(), Checkin.created_at.asc())
     )
-    checkins = checkin_result.scalars().all()
+    for checkin in checkin_result.scalars().all():
+        add_checkin(days, checkin)
 
     report_result = await db.execute(
-        select(Report)
-        .where(
+        select(Report).where(
             Report.pair_id == pair_id,
             Report.status == ReportStatus.COMPLETED,
             Report.report_date >= start_date,
             Report.report_date <= end_date,
             Report.health_score.isnot(None),
         )
-        .order_by(Report.report_date.asc())
     )
-    reports = report_result.scalars().all()
+    for report in report_result.scalars().all():
+        add_report(days, report)
 
     crisis_result = await db.execute(
-        select(CrisisAlert)
-        .where(
+        select(CrisisAlert).where(
             CrisisAlert.pair_id == pair_id,
-            func.date(CrisisAlert.created_at) >= start_date,
-            func.date(CrisisAlert.created_at) <= end_date,
+            *_within_days(CrisisAlert.created_at, start_date, end_date),
         )
-        .order_by(CrisisAlert.created_at.asc())
     )
-    crisis_alerts = crisis_result.scalars().all()
+    for alert in crisis_result.scalars().all():
+        add_crisis_alert(days, alert)
 
     task_result = await db.execute(
         select(RelationshipTask).where(
@@ -417,56 +662,121 @@ async def _build_pair_profile(
             RelationshipTask.due_date <= end_date,
         )
     )
-    tasks = task_result.scalars().all()
+    for task in task_result.scalars().all():
+        add_task(days, task)
 
     activity_result = await db.execute(
         select(LongDistanceActivity).where(
             LongDistanceActivity.pair_id == pair_id,
-            func.date(LongDistanceActivity.created_at) >= start_date,
-            func.date(LongDistanceActivity.created_at) <= end_date,
+            *_within_days(LongDistanceActivity.created_at, start_date, end_date),
         )
     )
-    activities = activity_result.scalars().all()
+    for activity in activity_result.scalars().all():
+        add_activity(days, activity)
 
     event_result = await db.execute(
-        select(RelationshipEvent)
-        .where(
+        select(RelationshipEvent).where(
             RelationshipEvent.pair_id == pair_id,
-            func.date(RelationshipEvent.occurred_at) >= start_date,
-            func.date(RelationshipEvent.occurred_at) <= end_date,
-            RelationshipEvent.event_type == "message.simulated",
+            *_within_days(RelationshipEvent.occurred_at, start_date, end_date),
+            RelationshipEvent.event_type.in_(
+                ("message.simulated", "alignment.generated")
+            ),
         )
-        .order_by(RelationshipEvent.occurred_at.asc())
     )
-    message_simulations = event_result.scalars().all()
+    for event in event_result.scalars().all():
+        if event.event_type == "message.simulated":
+            add_message_simulation(days, event)
+        else:
+            add_alignment(days, event)
 
-    alignment_result = await db.execute(
-        select(RelationshipEvent)
-        .where(
-            RelationshipEvent.pair_id == pair_id,
-            func.date(RelationshipEvent.occurred_at) >= start_date,
-            func.date(RelationshipEvent.occurred_at) <= end_date,
-            RelationshipEvent.event_type == "alignment.generated",
+
+async def _collect_user_days(
+    db: AsyncSession,
+    days: dict[str, dict],
+    *,
+    user_id: uuid.UUID,
+    start_date: date,
+    end_date: date,
+) -> None:
+    checkin_result = await db.execute(
+        select(Checkin).where(
+            Checkin.user_id == user_id,
+            Checkin.pair_id.is_(None),
+            Checkin.checkin_date >= start_date,
+            Checkin.checkin_date <= end_date,
+        )
+    )
+    for checkin in checkin_result.scalars().all():
+        add_checkin(days, checkin)
+
+    report_result = await db.execute(
+        select(Report).where(
+            Report.user_id == user_id,
+            Report.pair_id.is_(None),
+            Report.status == ReportStatus.COMPLETED,
+            Report.report_date >= start_date,
+            Report.report_date <= end_date,
+            Report.health_score.isnot(None),
+        )
+    )
+    for report in report_result.scalars().all():
+        add_report(days, report)
+
+
+def _day_entries(
+    days: dict[str, dict],
+    category: str,
+    *,
+    order_field: str | None = None,
+) -> list[dict]:
+    """Flatten one bucket category into a stable, chronologically ordered list."""
+
+    entries = [
+        {**entry, "id": entry_id, "day": day}
+        for day, bucket in days.items()
+        for entry_id, entry in (bucket.get(category) or {}).items()
+    ]
+    entries.sort(
+        key=lambda entry: (
+            entry["day"],
+            str(entry.get(order_field) or "") if order_field else "",
+            entry["id"],
         )
-        .order_by(RelationshipEvent.occurred_at.asc())
     )
-    alignments = alignment_result.scalars().all()
+    return entries
 
-    checkins_a = [c for c in checkins if str(c.user_id) == str(pair.user_a_id)]
-    checkins_b = [c for c in checkins if str(c.user_id) == str(pair.user_b_id)]
 
-    moods_a = [c.mood_score for c in checkins_a if c.mood_score is not None]
-    moods_b = [c.mood_score for c in checkins_b if c.mood_score is not None]
+def _compose_pair_profile(
+    pair: Pair,
+    days: dict[str, dict],
+    *,
+    window_days: int,
+) -> tuple[dict, dict, dict, list[str]]:
+    checkins = _day_entries(days, "checkins", order_field="created_at")
+    reports = _day_entries(days, "reports")
+    crisis_alerts = _day_entries(days, "crisis_alerts", order_field="created_at")
+    tasks = _day_entries(days, "tasks")
+    activities = _day_entries(days, "activities")
+    message_simulations = _day_entries(
+        days, "message_simulations", order_field="occurred_at"
+    )
+    alignments = _day_entries(days, "alignments", order_field="occurred_at")
 
-    dates_a = {c.checkin_date for c in checkins_a}
-    dates_b = {c.checkin_date for c in checkins_b}
+    user_a_id = str(pair.user_a_id)
+    checkins_a = [c for c in checkins if c["user_id"] == user_a_id]
+    checkins_b = [c for c in checkins if c["user_id"] == str(pair.user_b_id)]
+
+    moods_a = [c["mood_score"] for c in checkins_a if c["mood_score"] is not None]
+    moods_b = [c["mood_score"] for c in checkins_b if c["mood_score"] is not None]
+    dates_a = {c["day"] for c in checkins_a}
+    dates_b = {c["day"] for c in checkins_b}
     dual_checkin_days = len(dates_a & dates_b)
 
     mood_map_a = {
-        c.checkin_date: c.mood_score for c in checkins_a if c.mood_score is not None
+        c["day"]: c["mood_score"] for c in checkins_a if c["mood_score"] is not None
     }
     mood_map_b = {
-        c.checkin_date: c.mood_score for c in checkins_b if c.mood_score is not None
+        c["day"]: c["mood_score"] for c in checkins_b if c["mood_score"] is not None
     }
     shared_dates = sorted(set(mood_map_a) & set(mood_map_b))
     mood_gaps = [abs(mood_map_a[d] - mood_map_b[d]) for d in shared_dates]
@@ -475,27 +785,29 @@ async def _build_pair_profile(
     initiative_b = 0
     initiative_equal = 0
     for checkin in checkins:
-        if checkin.interaction_initiative == "equal":
+        initiative = checkin["interaction_initiative"]
+        if initiative == "equal":
             initiative_equal += 1
-        elif checkin.interaction_initiative == "me":
-            if str(checkin.user_id) == str(pair.user_a_id):
+        elif initiative == "me":
+            if checkin["user_id"] == user_a_id:
                 initiative_a += 1
             else:
                 initiative_b += 1
-        elif checkin.interaction_initiative == "partner":
-            if str(checkin.user_id) == str(pair.user_a_id):
+        elif initiative == "partner":
+            if checkin["user_id"] == user_a_id:
                 initiative_b += 1
             else:
                 initiative_a += 1
 
     initiative_total = initiative_a + initiative_b + initiative_equal
-    completed_tasks = sum(1 for task in tasks if task.status == TaskStatus.COMPLETED)
+    completed_tasks = sum(
+        1 for task in tasks if task["status"] == TaskStatus.COMPLETED.value
+    )
     completed_activities = sum(
-        1 for activity in activities if activity.status == "completed"
+        1 for activity in activities if activity["status"] == "completed"
     )
     simulation_risks = [
-        str((event.payload or {}).get("risk_level") or "medium")
-        for event in message_simulations
+        str(event.get("risk_level") or "medium") for event in message_simulations
     ]
     simulation_high_risk_count = sum(1 for risk in simulation_risks if risk == "high")
     simulation_medium_risk_count = sum(
@@ -503,15 +815,15 @@ async def _build_pair_profile(
     )
     latest_simulation_goal = next(
         (
-            str((event.payload or {}).get("conversation_goal") or "")
+            str(event.get("conversation_goal") or "")
             for event in reversed(message_simulations)
-            if (event.payload or {}).get("conversation_goal")
+            if event.get("conversation_goal")
         ),
         None,
     )
     alignment_scores = []
     for event in alignments:
-        score = (event.payload or {}).get("alignment_score")
+        score = event.get("alignment_score")
         if score is None:
             continue
         try:
@@ -521,23 +833,23 @@ async def _build_pair_profile(
     alignment_low_score_count = sum(1 for score in alignment_scores if score < 55)
     latest_alignment_opening = next(
         (
-            str((event.payload or {}).get("suggested_opening") or "")
+            str(event.get("suggested_opening") or "")
             for event in reversed(alignments)
-            if (event.payload or {}).get("suggested_opening")
+            if event.get("suggested_opening")
         ),
         None,
     )
     latest_alignment_bridge = next(
         (
-            str(((event.payload or {}).get("bridge_actions") or [None])[0] or "")
+            str((event.get("bridge_actions") or [None])[0] or "")
             for event in reversed(alignments)
-            if (event.payload or {}).get("bridge_actions")
+            if event.get("bridge_actions")
         ),
         None,
     )
 
     latest_crisis = crisis_alerts[-1] if crisis_alerts else None
-    current_level = latest_crisis.level.value if latest_crisis else "none"
+    current_level = latest_crisis["level"] if latest_crisis else "none"
 
     metrics = {
         "window_days": window_days,
@@ -549,7 +861,8 @@ async def _build_pair_profile(
         "mood_stability_a": _stability(moods_a, scale=10.0),
         "mood_stability_b": _stability(moods_b, scale=10.0),
         "deep_conversation_rate": _rate(
-            sum(1 for checkin in checkins if checkin.deep_conversation), len(checkins)
+            sum(1 for checkin in checkins if checkin["deep_conversation"]),
+            len(checkins),
         ),
         "interaction_overlap_rate": _rate(dual_checkin_days, window_days),
         "initiative_a_rate": _rate(initiative_a, initiative_total),
@@ -567,13 +880,7 @@ async def _build_pair_profile(
         "alignment_low_score_count": alignment_low_score_count,
         "last_alignment_opening": latest_alignment_opening,
         "last_alignment_bridge": latest_alignment_bridge,
-        "report_health_avg": _avg(
-            [
-                report.health_score
-                for report in reports
-                if report.health_score is not None
-            ]
-        ),
+        "report_health_avg": _avg([report["health_score"] for report in reports]),
     }
 
     if current_level in ("moderate", "severe") or len(crisis_alerts) >= 2:
@@ -615,47 +922,23 @@ async def _build_pair_profile(
     return metrics, risk_summary, attachment_summary, suggested_focus[:3]
 
 
-async def _build_user_profile(
-    db: AsyncSession,
+def _compose_user_profile(
+    days: dict[str, dict],
     *,
-    user_id: uuid.UUID,
-    start_date: date,
-    end_date: date,
     window_days: int,
 ) -> tuple[dict, dict, dict, list[str]]:
-    checkin_result = await db.execute(
-        select(Checkin)
-        .where(
-            Checkin.user_id == user_id,
-            Checkin.pair_id.is_(None),
-            Checkin.checkin_date >= start_date,
-            Checkin.checkin_date <= end_date,
-        )
-        .order_by(Checkin.checkin_date.asc(), Checkin.created_at.asc())
-    )
-    checkins = checkin_result.scalars().all()
-
-    report_result = await db.execute(
-        select(Report)
-        .where(
-            Report.user_id == user_id,
-            Report.pair_id.is_(None),
-            Report.status == ReportStatus.COMPLETED,
-            Report.report_date >= start_date,
-            Report.report_date <= end_date,
-            Report.health_score.isnot(None),
-        )
-        .order_by(Report.report_date.asc())
-    )
-    reports = report_result.scalars().all()
+    checkins = _day_entries(days, "checkins", order_field="created_at")
+    reports = _day_entries(days, "reports")
 
     moods = [
-        checkin.mood_score for checkin in checkins if checkin.mood_score is not None
+        checkin["mood_score"]
+        for checkin in checkins
+        if checkin["mood_score"] is not None
     ]
     interaction_freq = [
-        checkin.interaction_freq
+        checkin["interaction_freq"]
         for checkin in checkins
-        if checkin.interaction_freq is not None
+        if checkin["interaction_freq"] is not None
     ]
 
     metrics = {
@@ -664,16 +947,11 @@ async def _build_user_profile(
         "mood_avg": _avg(moods),
         "mood_stability": _stability(moods, scale=10.0),
         "deep_conversation_rate": _rate(
-            sum(1 for checkin in checkins if checkin.deep_conversation), len(checkins)
+            sum(1 for checkin in checkins if checkin["deep_conversation"]),
+            len(checkins),
         ),
         "interaction_freq_avg": _avg(interaction_freq),
-        "report_health_avg": _avg(
-            [
-                report.health_score
-                for report in reports
-                if report.health_score is not None
-            ]
-        ),
+        "report_health_avg": _avg([report["health_score"] for report in reports]),
         "crisis_event_count": 0,
         "task_completion_rate": 0.0,
     }
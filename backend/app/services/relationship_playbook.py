@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.intervention_effectiveness import build_intervention_scorecard
 from app.services.intervention_theory import build_playbook_theory_basis
+from app.services.request_memo import SCORECARD_TABLES, session_memoized
 
 PLAYBOOK_TEMPLATES = {
     "low_connection_recovery": {
@@ -425,6 +426,7 @@ def _total_days(start_date: date, end_date: date | None, default_days: int) -> i
     return max(default_days, 1)
 
 
+@session_memoized(tables=SCORECARD_TABLES)
 async def build_relationship_playbook(
     db: AsyncSession,
     *,
@@ -0,0 +1,468 @@
+"""Nightly batch generation of daily/weekly/monthly pair reports.
+
+The interactive ``/reports/generate-*`` endpoints build one report per request
+and pay the full model latency while the user waits. This module runs the same
+generators off-peak for every active pair:
+
+* inputs for a report kind are collected with a handful of set-based queries
+  (active pairs, recent reports, the target day's checkins) and grouped in
+  Python instead of querying per pair;
+* placeholder ``PENDING`` reports are written up front in one flush, which is
+  the resume checkpoint: a rerun after a crash picks up every non-completed
+  report of the period instead of creating duplicates;
+* generation fans out under a global semaphore and stops scheduling new work
+  once the token budget is spent (unscheduled reports stay ``PENDING`` for the
+  next run);
+* results are written back in chunks, one transaction per chunk.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Iterable
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.ai import track_token_usage
+from app.ai.reporter import (
+    generate_daily_report,
+    generate_monthly_report,
+    generate_weekly_report,
+)
+from app.core.config import settings
+from app.core.database import background_session
+from app.models import (
+    BackgroundJob,
+    Checkin,
+    Pair,
+    PairStatus,
+    Report,
+    ReportStatus,
+    ReportType,
+)
+from app.services.privacy_audit import privacy_audit_scope
+from app.services.profile_refresh import request_profile_refresh
+from app.services.relationship_intelligence import record_relationship_events
+
+logger = logging.getLogger(__name__)
+
+BATCH_REPORT_KINDS = (ReportType.DAILY, ReportType.WEEKLY, ReportType.MONTHLY)
+
+# kind -> (source report type, lookback days, minimum sources), mirroring the
+# interactive trigger endpoints.
+_PERIOD_RULES = {
+    ReportType.WEEKLY: (ReportType.DAILY, 7, 3),
+    ReportType.MONTHLY: (ReportType.WEEKLY, 30, 2),
+}
+_REPORT_JOB_TYPES = ("report.daily", "report.weekly", "report.monthly")
+
+
+@dataclass
+class BatchReportItem:
+    pair_id: uuid.UUID
+    pair_type: str
+    kind: ReportType
+    report_date: date
+    inputs: dict[str, Any]
+    report_id: uuid.UUID | None = None
+
+
+@dataclass
+class BatchReportStats:
+    pairs_scanned: int = 0
+    planned: int = 0
+    resumed: int = 0
+    completed: int = 0
+    failed: int = 0
+    skipped_budget: int = 0
+    ai_calls: int = 0
+    tokens: int = 0
+    completed_pairs: set[uuid.UUID] = field(default_factory=set)
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: float | None = None
+
+    @property
+    def elapsed_seconds(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return max(end - self.started_at, 1e-6)
+
+    def as_dict(self) -> dict[str, Any]:
+        minutes = self.elapsed_seconds / 60
+        return {
+            "pairs_scanned": self.pairs_scanned,
+            "planned": self.planned,
+            "resumed": self.resumed,
+            "completed": self.completed,
+            "failed": self.failed,
+            "skipped_budget": self.skipped_budget,
+            "ai_calls": self.ai_calls,
+            "tokens": self.tokens,
+            "elapsed_seconds": round(self.elapsed_seconds, 2),
+            "pairs_per_minute": round(len(self.completed_pairs) / minutes, 2),
+            "tokens_per_minute": round(self.tokens / minutes, 2),
+        }
+
+
+async def _load_active_pairs(db: AsyncSession) -> dict[uuid.UUID, tuple]:
+    result = await db.execute(
+        select(Pair.id, Pair.type, Pair.user_a_id, Pair.user_b_id).where(
+            Pair.status == PairStatus.ACTIVE
+        )
+    )
+    return {row.id: row for row in result.all()}
+
+
+async def _load_busy_report_ids(db: AsyncSession) -> set[str]:
+    """Reports a user-triggered job is already working on."""
+
+    result = await db.execute(
+        select(BackgroundJob.payload).where(
+            BackgroundJob.job_type.in_(_REPORT_JOB_TYPES),
+            BackgroundJob.status.in_(("queued", "running")),
+        )
+    )
+    return {
+        str(payload.get("report_id"))
+        for payload in result.scalars().all()
+        if isinstance(payload, dict) and payload.get("report_id")
+    }
+
+
+async def collect_batch_report_items(
+    db: AsyncSession,
+    kind: ReportType,
+    *,
+    run_date: date,
+) -> tuple[list[BatchReportItem], int]:
+    """Plan every report of ``kind`` that is due on ``run_date``.
+
+    Returns the planned items and the number of active pairs scanned. Daily
+    reports target the day before ``run_date``.
+    """
+
+    if kind not in BATCH_REPORT_KINDS:
+        raise ValueError(f"unsupported batch report kind: {kind}")
+
+    pairs = await _load_active_pairs(db)
+    if not pairs:
+        return [], 0
+    busy = await _load_busy_report_ids(db)
+
+    if kind == ReportType.DAILY:
+        target_date = run_date - timedelta(days=1)
+        since = target_date
+        source_type, source_since = None, None
+    else:
+        source_type, lookback, _ = _PERIOD_RULES[kind]
+        target_date = run_date
+        since = run_date - timedelta(days=lookback)
+        source_since = since
+
+    type_filter = [kind] if source_type is None else [kind, source_type]
+    result = await db.execute(
+        select(
+            Report.id,
+            Report.pair_id,
+            Report.type,
+            Report.status,
+            Report.report_date,
+            Report.content,
+        )
+        .join(Pair, Pair.id == Report.pair_id)
+        .where(
+            Pair.status == PairStatus.ACTIVE,
+            Report.type.in_(type_filter),
+            Report.report_date >= since,
+            or_(Report.type == kind, Report.status == ReportStatus.COMPLETED),
+        )
+        .order_by(Report.report_date, Report.created_at)
+    )
+    existing: dict[uuid.UUID, list] = {}
+    sources: dict[uuid.UUID, list[dict]] = {}
+    for row in result.all():
+        if row.type == kind:
+            if kind != ReportType.DAILY or row.report_date == target_date:
+                existing.setdefault(row.pair_id, []).append(row)
+        elif row.content and row.report_date >= source_since:
+            sources.setdefault(row.pair_id, []).append(row.content)
+
+    checkins: dict[uuid.UUID, dict[uuid.UUID, str]] = {}
+    if kind == ReportType.DAILY:
+        result = await db.execute(
+            select(Checkin.pair_id, Checkin.user_id, Checkin.content)
+            .join(Pair, Pair.id == Checkin.pair_id)
+            .where(
+                Pair.status == PairStatus.ACTIVE,
+                Checkin.checkin_date == target_date,
+            )
+            .order_by(Checkin.created_at)
+        )
+        for row in result.all():
+            checkins.setdefault(row.pair_id, {}).setdefault(row.user_id, row.content)
+
+    items: list[BatchReportItem] = []
+    for pair_id, pair in pairs.items():
+        report_id = None
+        rows = existing.get(pair_id) or []
+        if any(row.status == ReportStatus.COMPLETED for row in rows):
+            continue
+        if rows:
+            latest = rows[-1]
+            if str(latest.id) in busy:
+                continue
+            report_id = latest.id
+
+        if kind == ReportType.DAILY:
+            by_user = checkins.get(pair_id) or {}
+            if pair.user_a_id not in by_user or pair.user_b_id not in by_user:
+                continue
+            inputs = {
+                "content_a": by_user[pair.user_a_id],
+                "content_b": by_user[pair.user_b_id],
+            }
+        else:
+            _, _, minimum = _PERIOD_RULES[kind]
+            pair_sources = sources.get(pair_id) or []
+            if len(pair_sources) < minimum:
+                continue
+            inputs = {"sources": pair_sources}
+
+        items.append(
+            BatchReportItem(
+                pair_id=pair_id,
+                pair_type=pair.type.value,
+                kind=kind,
+                report_date=target_date,
+                inputs=inputs,
+                report_id=report_id,
+            )
+        )
+    return items, len(pairs)
+
+
+async def checkpoint_batch_reports(
+    db: AsyncSession, items: Iterable[BatchReportItem]
+) -> int:
+    """Persist a ``PENDING`` report for every new item; returns how many were resumed."""
+
+    resumed = 0
+    created: list[tuple[BatchReportItem, Report]] = []
+    resume_ids = []
+    for item in items:
+        if item.report_id is not None:
+            resume_ids.append(item.report_id)
+            resumed += 1
+            continue
+        report = Report(
+            pair_id=item.pair_id,
+            type=item.kind,
+            status=ReportStatus.PENDING,
+            content=None,
+            health_score=None,
+            report_date=item.report_date,
+        )
+        db.add(report)
+        created.append((item, report))
+
+    if resume_ids:
+        result = await db.execute(select(Report).where(Report.id.in_(resume_ids)))
+        for report in result.scalars().all():
+            report.status = ReportStatus.PENDING
+    await db.flush()
+    for item, report in created:
+        item.report_id = report.id
+    await db.commit()
+    return resumed
+
+
+async def _generate(item: BatchReportItem) -> dict:
+    if item.kind == ReportType.DAILY:
+        return await generate_daily_report(
+            pair_type=item.pair_type,
+            content_a=item.inputs["content_a"],
+            content_b=item.inputs["content_b"],
+        )
+    if item.kind == ReportType.WEEKLY:
+        return await generate_weekly_report(item.pair_type, item.inputs["sources"])
+    return await generate_monthly_report(item.pair_type, item.inputs["sources"])
+
+
+async def _write_chunk(
+    results: list[tuple[BatchReportItem, dict | None]],
+    stats: BatchReportStats,
+) -> None:
+    from app.services.crisis_processor import process_crisis_from_report
+
+    if not results:
+        return
+    by_id = {item.report_id: (item, content) for item, content in results}
+    async with background_session() as db:
+        reports = (
+            await db.execute(select(Report).where(Report.id.in_(list(by_id))))
+        ).scalars().all()
+        pairs = {
+            pair.id: pair
+            for pair in (
+                await db.execute(
+                    select(Pair).where(
+                        Pair.id.in_({item.pair_id for item, _ in results})
+                    )
+                )
+            ).scalars().all()
+        }
+        completed = []
+        for report in reports:
+            item, content = by_id[report.id]
+            if content is None:
+                report.status = ReportStatus.FAILED
+                continue
+            report.content = content
+            report.health_score = content.get(
+                "health_score" if item.kind == ReportType.DAILY else "overall_health_score"
+            )
+            report.status = ReportStatus.COMPLETED
+            completed.append(report)
+        # One flush emits the report updates as a single batched statement.
+        await db.flush()
+
+        for report in completed:
+            pair = pairs.get(report.pair_id)
+            if pair:
+                await process_crisis_from_report(db, report, pair)
+        # The chunk's completion events share one key lookup and one INSERT.
+        await record_relationship_events(
+            db,
+            [
+                dict(
+                    event_type="report.completed",
+                    pair_id=report.pair_id,
+                    entity_type="report",
+                    entity_id=report.id,
+                    payload={
+                        "report_type": report.type.value,
+                        "health_score": report.health_score,
+                        "crisis_level": (report.content or {}).get("crisis_level"),
+                    },
+                    idempotency_key=f"report:{report.id}:completed",
+                )
+                for report in completed
+            ],
+        )
+        for report in completed:
+            await request_profile_refresh(db, pair_id=report.pair_id)
+        await db.commit()
+
+    stats.completed += len(completed)
+    stats.failed += len(reports) - len(completed)
+    stats.completed_pairs.update(report.pair_id for report in completed)
+
+
+async def run_batch_items(
+    items: list[BatchReportItem],
+    stats: BatchReportStats,
+    *,
+    concurrency: int | None = None,
+    token_budget: int | None = None,
+    write_chunk: int | None = None,
+) -> None:
+    """Generate checkpointed items concurrently and write them back in chunks."""
+
+    concurrency = max(int(concurrency or settings.REPORT_BATCH_CONCURRENCY or 1), 1)
+    budget = int(
+        settings.REPORT_BATCH_TOKEN_BUDGET if token_budget is None else token_budget
+    )
+    chunk_size = max(int(write_chunk or settings.REPORT_BATCH_WRITE_CHUNK or 1), 1)
+    semaphore = asyncio.Semaphore(concurrency)
+    buffer: list[tuple[BatchReportItem, dict | None]] = []
+    write_lock = asyncio.Lock()
+
+    async def flush(force: bool = False) -> None:
+        async with write_lock:
+            while buffer and (force or len(buffer) >= chunk_size):
+                chunk = buffer[:chunk_size]
+                del buffer[:chunk_size]
+                await _write_chunk(chunk, stats)
+
+    async def run_one(item: BatchReportItem) -> None:
+        async with semaphore:
+            if budget > 0 and stats.tokens >= budget:
+                stats.skipped_budget += 1
+                return
+            content = None
+            # Privacy audit rows go through a session owned by this task, since
+            # concurrent generators cannot share one AsyncSession.
+            async with background_session() as audit_db:
+                with track_token_usage() as usage:
+                    try:
+                        with privacy_audit_scope(
+                            db=audit_db,
+                            pair_id=item.pair_id,
+                            scope="pair",
+                            run_type=f"batch_{item.kind.value}_report",
+                        ):
+                            content = await _generate(item)
+                    except Exception as exc:
+                        logger.error(
+                            "batch %s report failed for pair %s: %s",
+                            item.kind.value,
+                            item.pair_id,
+                            exc,
+                        )
+                await audit_db.commit()
+            stats.ai_calls += usage["calls"]
+            stats.tokens += usage["total_tokens"]
+        buffer.append((item, content))
+        await flush()
+
+    await asyncio.gather(*(run_one(item) for item in items))
+    await flush(force=True)
+
+
+async def run_report_batch(
+    *,
+    run_date: date | None = None,
+    kinds: Iterable[ReportType] = BATCH_REPORT_KINDS,
+    concurrency: int | None = None,
+    token_budget: int | None = None,
+    dry_run: bool = False,
+) -> BatchReportStats:
+    """Run one batch pass over every active pair.
+
+    Kinds run in order so a weekly report can use the daily reports written
+    earlier in the same pass.
+    """
+
+    run_date = run_date or date.today()
+    budget = int(
+        settings.REPORT_BATCH_TOKEN_BUDGET if token_budget is None else token_budget
+    )
+    stats = BatchReportStats()
+    for kind in kinds:
+        if budget > 0 and stats.tokens >= budget:
+            logger.info("token budget spent; leaving %s reports for next run", kind.value)
+            break
+        async with background_session() as db:
+            items, scanned = await collect_batch_report_items(
+                db, kind, run_date=run_date
+            )
+            stats.pairs_scanned = max(stats.pairs_scanned, scanned)
+            stats.planned += len(items)
+            if dry_run or not items:
+                continue
+            stats.resumed += await checkpoint_batch_reports(db, items)
+        logger.info("batch %s reports: %d planned", kind.value, len(items))
+        await run_batch_items(
+            items,
+            stats,
+            concurrency=concurrency,
+            token_budget=budget,
+        )
+    stats.finished_at = time.monotonic()
+    logger.info("report batch finished: %s", stats.as_dict())
+    return stats
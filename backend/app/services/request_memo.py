@@ -0,0 +1,215 @@
+"""Per-session memoization for the intervention/policy builder graph.
+
+One insights request walks scorecard -> playbook -> evaluation -> ledger ->
+registry -> schedule, and most of those builders call each other again. The
+memo lives in ``Session.info`` so every builder invoked on the same session can
+reuse an earlier result until a flush writes to one of the tables it reads.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import uuid
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+_SESSION_INFO_KEY = "qinjian.request_memo"
+
+SCORECARD_TABLES = frozenset(
+    {
+        "intervention_plans",
+        "relationship_events",
+        "relationship_profile_snapshots",
+        "relationship_tasks",
+        "reports",
+    }
+)
+PLAYBOOK_RUNTIME_TABLES = SCORECARD_TABLES | {"playbook_runs", "playbook_transitions"}
+POLICY_TABLES = PLAYBOOK_RUNTIME_TABLES | {"intervention_policy_library"}
+
+_MEMO_STATS = {
+    "hits": 0,
+    "misses": 0,
+    "invalidations": 0,
+}
+
+
+class SessionMemo:
+    """Builder results cached for the lifetime of one session transaction."""
+
+    def __init__(self):
+        self._entries: dict[tuple, tuple[frozenset[str], Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, key: tuple) -> tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            _MEMO_STATS["misses"] += 1
+            return False, None
+        self.hits += 1
+        _MEMO_STATS["hits"] += 1
+        return True, entry[1]
+
+    def store(self, key: tuple, tables: frozenset[str], value: Any) -> None:
+        self._entries[key] = (tables, value)
+
+    def invalidate_tables(self, tables: Iterable[str]) -> int:
+        touched = set(tables)
+        if not touched or not self._entries:
+            return 0
+        stale = [key for key, (deps, _) in self._entries.items() if deps & touched]
+        for key in stale:
+            del self._entries[key]
+        _MEMO_STATS["invalidations"] += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        if self._entries:
+            _MEMO_STATS["invalidations"] += len(self._entries)
+        self._entries.clear()
+
+
+def _sync_session(db: AsyncSession | Session) -> Session:
+    if isinstance(db, AsyncSession):
+        return db.sync_session
+    return db
+
+
+def get_session_memo(db: AsyncSession | Session) -> SessionMemo:
+    info = _sync_session(db).info
+    memo = info.get(_SESSION_INFO_KEY)
+    if memo is None:
+        memo = SessionMemo()
+        info[_SESSION_INFO_KEY] = memo
+    return memo
+
+
+def _existing_memo(session: Session) -> SessionMemo | None:
+    return session.info.get(_SESSION_INFO_KEY)
+
+
+def _table_name(instance: Any) -> str | None:
+    table = getattr(type(instance), "__table__", None)
+    return getattr(table, "name", None)
+
+
+def _pending_tables(session: Session) -> set[str]:
+    tables: set[str] = set()
+    for collection in (session.new, session.dirty, session.deleted):
+        for instance in collection:
+            name = _table_name(instance)
+            if name:
+                tables.add(name)
+    return tables
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_after_flush(session: Session, flush_context) -> None:
+    memo = _existing_memo(session)
+    if memo is not None:
+        memo.invalidate_tables(_pending_tables(session))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_on_bulk_write(orm_execute_state) -> None:
+    memo = _existing_memo(orm_execute_state.session)
+    if memo is None:
+        return
+    if not (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    name = getattr(table, "name", None)
+    if name:
+        memo.invalidate_tables([name])
+    else:
+        memo.clear()
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _clear_on_transaction_end(session: Session) -> None:
+    memo = _existing_memo(session)
+    if memo is not None:
+        memo.clear()
+
+
+def _key_value(value: Any) -> Any:
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(_key_value(item) for item in value)
+    return value
+
+
+def session_memoized(
+    *,
+    tables: frozenset[str],
+    refresh_on: tuple[str, ...] = (),
+):
+    """Memoize an async ``(db, *, pair_id, user_id, ...)`` builder per session.
+
+    ``refresh_on`` names flags that carry side effects (marking a view, writing a
+    snapshot). They are left out of the key and force a recomputation when true,
+    whose result then replaces the cached entry.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        qualified_name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        async def wrapper(db, *args, **kwargs):
+            if db is None:
+                return await func(db, *args, **kwargs)
+
+            bound = signature.bind(db, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            arguments.pop(next(iter(signature.parameters)))
+            force_refresh = any([bool(arguments.pop(name, False)) for name in refresh_on])
+            key = (
+                qualified_name,
+                _key_value(arguments.pop("pair_id", None)),
+                _key_value(arguments.pop("user_id", None)),
+                tuple(sorted((name, _key_value(value)) for name, value in arguments.items())),
+            )
+
+            memo = get_session_memo(db)
+            sync_session = _sync_session(db)
+            if not force_refresh and not (tables & _pending_tables(sync_session)):
+                found, value = memo.lookup(key)
+                if found:
+                    return value
+
+            value = await func(db, *args, **kwargs)
+            memo.store(key, tables, value)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+def get_request_memo_stats() -> dict[str, int]:
+    """Process-wide counters; ``recomputations_avoided`` equals memo hits."""
+
+    return {
+        "hits": _MEMO_STATS["hits"],
+        "misses": _MEMO_STATS["misses"],
+        "invalidations": _MEMO_STATS["invalidations"],
+        "recomputations_avoided": _MEMO_STATS["hits"],
+    }
@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.intervention_effectiveness import build_intervention_scorecard
 from app.services.task_feedback import build_feedback_preference_profile
 from app.services.intervention_theory import build_task_strategy_theory_basis
+from app.services.request_memo import POLICY_TABLES, session_memoized
 
 
 def _normalize_uuid(value: str | uuid.UUID) -> uuid.UUID:
@@ -323,6 +324,7 @@ def merge_task_insight(base_insight: str, strategy: dict) -> str:
     return base or support
 
 
+@session_memoized(tables=POLICY_TABLES)
 async def build_pair_task_adaptation(
     db: AsyncSession,
     *,
@@ -0,0 +1,219 @@
+"""Small read-through cache: bounded in-process LRU with an optional Redis tier.
+
+Shared by the authenticated-user and pair-membership caches. Values are
+opaque strings (callers serialize to JSON); every tier has its own TTL so
+the in-process copy can stay short-lived while Redis carries fills and
+invalidations between processes.
+
+Writers invalidate with ``invalidate_after_commit``: the keys are kept on the
+session and dropped only once it commits. Dropping them earlier lets a
+concurrent reader re-cache the old row before the write is visible, and that
+stale copy would then live for the full Redis TTL. The in-process tier is
+cleared inside the commit hook; the Redis delete runs as a task right after.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_SESSION_INFO_KEY = "tiered_cache_invalidations"
+_PENDING_DELETES: set[asyncio.Task] = set()
+
+
+def new_cache_stats() -> dict[str, int]:
+    return {
+        "hits": 0,
+        "redis_hits": 0,
+        "misses": 0,
+        "stores": 0,
+        "invalidations": 0,
+        "evictions": 0,
+        "errors": 0,
+    }
+
+
+class MemoryTTLCache:
+    def __init__(self, *, ttl_seconds: int, max_entries: int, stats: dict[str, int]):
+        self.ttl_seconds = max(int(ttl_seconds), 1)
+        self.max_entries = max(int(max_entries), 1)
+        self._stats = stats
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def get(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return payload
+
+    def set(self, key: str, payload: str) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class TieredCache:
+    def __init__(
+        self,
+        local: MemoryTTLCache,
+        *,
+        stats: dict[str, int],
+        redis_client: Any = None,
+        redis_prefix: str = "",
+        redis_ttl_seconds: int = 0,
+    ):
+        self.local = local
+        self._stats = stats
+        self._redis = redis_client
+        self._redis_prefix = redis_prefix
+        self._redis_ttl_seconds = max(int(redis_ttl_seconds), 1)
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self._redis_prefix}{key}"
+
+    async def get(self, key: str) -> str | None:
+        payload = self.local.get(key)
+        if payload is not None:
+            self._stats["hits"] += 1
+            return payload
+        if self._redis is not None:
+            payload = await self._redis.get(self._redis_key(key))
+            if payload:
+                if isinstance(payload, bytes):
+                    payload = payload.decode("utf-8")
+                self.local.set(key, payload)
+                self._stats["redis_hits"] += 1
+                return payload
+        self._stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, payload: str) -> None:
+        self.local.set(key, payload)
+        if self._redis is not None:
+            await self._redis.set(self._redis_key(key), payload, ex=self._redis_ttl_seconds)
+        self._stats["stores"] += 1
+
+    async def delete(self, key: str) -> None:
+        self.local.delete(key)
+        if self._redis is not None:
+            await self._redis.delete(self._redis_key(key))
+        self._stats["invalidations"] += 1
+
+    async def close(self) -> None:
+        self.local.clear()
+        close = getattr(self._redis, "aclose", None)
+        if close:
+            await close()
+
+
+def build_tiered_cache(
+    *,
+    ttl_seconds: int,
+    max_entries: int,
+    backend: str,
+    backend_setting: str,
+    redis_prefix: str,
+    redis_ttl_seconds: int,
+    stats: dict[str, int],
+    settings_obj=settings,
+) -> TieredCache | None:
+    """Return ``None`` when ``ttl_seconds`` is not positive (cache disabled)."""
+
+    if int(ttl_seconds or 0) <= 0:
+        return None
+    local = MemoryTTLCache(ttl_seconds=ttl_seconds, max_entries=max_entries, stats=stats)
+    if str(backend or "memory").lower() != "redis":
+        return TieredCache(local, stats=stats)
+
+    redis_url = str(getattr(settings_obj, "REDIS_URL", "") or "").strip()
+    if not redis_url:
+        raise ValueError(f"REDIS_URL is required when {backend_setting}=redis")
+
+    try:
+        from redis import asyncio as redis_asyncio
+    except ImportError as exc:
+        raise RuntimeError("Redis support requires the 'redis' package") from exc
+
+    client = redis_asyncio.from_url(redis_url, decode_responses=True)
+    return TieredCache(
+        local,
+        stats=stats,
+        redis_client=client,
+        redis_prefix=redis_prefix,
+        redis_ttl_seconds=redis_ttl_seconds,
+    )
+
+
+def _sync_session(db: AsyncSession | Session) -> Session:
+    if isinstance(db, AsyncSession):
+        return db.sync_session
+    return db
+
+
+def invalidate_after_commit(db: AsyncSession | Session, cache: TieredCache, key: str) -> None:
+    """Drop ``key`` from ``cache`` once ``db`` commits; a rollback forgets it."""
+
+    _sync_session(db).info.setdefault(_SESSION_INFO_KEY, set()).add((cache, key))
+
+
+async def _delete_keys(pending: set[tuple[TieredCache, str]]) -> None:
+    for cache, key in pending:
+        try:
+            await cache.delete(key)
+        except Exception:
+            cache._stats["errors"] += 1
+            logger.warning("cache invalidation failed", exc_info=True)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    pending = session.info.pop(_SESSION_INFO_KEY, None)
+    if not pending:
+        return
+    for cache, key in pending:
+        cache.local.delete(key)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # 同步脚本里没有事件循环：本进程已清掉，Redis 条目等 TTL 过期
+        logger.warning("no event loop; %d cache keys left in Redis until TTL", len(pending))
+        return
+    task = loop.create_task(_delete_keys(pending))
+    _PENDING_DELETES.add(task)
+    task.add_done_callback(_PENDING_DELETES.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_SESSION_INFO_KEY, None)
+
+
+async def wait_for_invalidations() -> None:
+    """Wait for Redis deletes scheduled by commits so far (shutdown, tests)."""
+
+    if _PENDING_DELETES:
+        await asyncio.gather(*_PENDING_DELETES, return_exceptions=True)
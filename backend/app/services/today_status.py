@@ -0,0 +1,209 @@
+"""Today's checkin status in one round-trip, with cheap conditional polling.
+
+``load_today_status`` answers the whole ``GET /checkins/today`` payload with a
+single SELECT: the caller's own checkin is outer-joined onto a one-row anchor
+and the partner checkin and report lookups are ``EXISTS`` columns.
+
+Polling clients send ``If-None-Match``. The ETag hashes the scope (``pair:<id>``
+or ``user:<id>`` for solo mode), the viewer, the date and a version read from
+the database: the count and newest ``created_at`` of the scope's checkins and
+reports for the day. Checkins are never edited in place and a report's status
+does not change the payload, so any change the poll can show also changes the
+version, whichever process wrote it (the job worker creates reports out of
+process). The version query only touches the day's rows through the
+``(pair_id, ...)``/``(user_id, ...)`` indexes, so a 304 stays far cheaper than
+building the payload.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import uuid
+from datetime import date
+
+from sqlalchemy import exists, func, literal, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Checkin, Report, ReportType
+
+_TODAY_STATUS_STATS = {"not_modified": 0, "queries": 0, "version_queries": 0}
+
+
+def today_status_scope(*, pair_id: uuid.UUID | str | None, user_id: uuid.UUID | str) -> str:
+    return f"pair:{pair_id}" if pair_id else f"user:{user_id}"
+
+
+async def today_status_version(
+    db: AsyncSession,
+    *,
+    viewer_id: uuid.UUID,
+    pair_id: uuid.UUID | None,
+    today: date,
+) -> str:
+    """Fingerprint of the scope's checkins and reports for ``today``."""
+
+    _TODAY_STATUS_STATS["version_queries"] += 1
+    if pair_id is None:
+        checkin_filter = (
+            Checkin.user_id == viewer_id,
+            Checkin.pair_id.is_(None),
+            Checkin.checkin_date == today,
+        )
+        report_filter = (
+            Report.user_id == viewer_id,
+            Report.type == ReportType.SOLO,
+            Report.report_date == today,
+        )
+    else:
+        checkin_filter = (Checkin.pair_id == pair_id, Checkin.checkin_date == today)
+        report_filter = (
+            Report.pair_id == pair_id,
+            Report.type.in_((ReportType.DAILY, ReportType.SOLO)),
+            Report.report_date == today,
+        )
+
+    row = (
+        await db.execute(
+            select(
+                select(func.count()).where(*checkin_filter).scalar_subquery(),
+                select(func.max(Checkin.created_at)).where(*checkin_filter).scalar_subquery(),
+                select(func.count()).where(*report_filter).scalar_subquery(),
+                select(func.max(Report.created_at)).where(*report_filter).scalar_subquery(),
+            )
+        )
+    ).one()
+    return ":".join(str(value) for value in row)
+
+
+async def today_status_etag(
+    db: AsyncSession,
+    *,
+    viewer_id: uuid.UUID,
+    pair_id: uuid.UUID | None,
+    today: date,
+) -> str:
+    """Current ETag for the viewer's status."""
+
+    scope = today_status_scope(pair_id=pair_id, user_id=viewer_id)
+    version = await today_status_version(
+        db, viewer_id=viewer_id, pair_id=pair_id, today=today
+    )
+    digest = hashlib.sha256(f"{scope}:{viewer_id}:{today}:{version}".encode()).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str | None) -> bool:
+    if not if_none_match or not etag:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates or etag.removeprefix("W/") in candidates
+
+
+def record_not_modified() -> None:
+    _TODAY_STATUS_STATS["not_modified"] += 1
+
+
+async def load_today_status(
+    db: AsyncSession,
+    *,
+    viewer_id: uuid.UUID,
+    pair_id: uuid.UUID | None,
+    today: date,
+) -> dict:
+    _TODAY_STATUS_STATS["queries"] += 1
+    if pair_id is None:
+        mine_filter = (
+            Checkin.pair_id.is_(None),
+            Checkin.user_id == viewer_id,
+            Checkin.checkin_date == today,
+        )
+        flags = [
+            literal(False).label("partner_done"),
+            exists()
+            .where(
+                Report.user_id == viewer_id,
+                Report.report_date == today,
+                Report.type == ReportType.SOLO,
+            )
+            .label("has_report"),
+        ]
+    else:
+        mine_filter = (
+            Checkin.pair_id == pair_id,
+            Checkin.user_id == viewer_id,
+            Checkin.checkin_date == today,
+        )
+        flags = [
+            exists()
+            .where(
+                Checkin.pair_id == pair_id,
+                Checkin.user_id != viewer_id,
+                Checkin.checkin_date == today,
+            )
+            .label("partner_done"),
+            exists()
+            .where(
+                Report.pair_id == pair_id,
+                Report.report_date == today,
+                Report.type == ReportType.DAILY,
+            )
+            .label("has_report"),
+            exists()
+            .where(
+                Report.pair_id == pair_id,
+                Report.report_date == today,
+                Report.type == ReportType.SOLO,
+            )
+            .label("has_solo_report"),
+        ]
+
+    mine = (
+        select(
+            Checkin.id,
+            Checkin.mood_score,
+            Checkin.interaction_freq,
+            Checkin.deep_conversation,
+            Checkin.task_completed,
+            Checkin.content,
+        )
+        .where(*mine_filter)
+        .limit(1)
+        .subquery()
+    )
+    anchor = select(literal(1).label("anchor")).subquery()
+    row = (
+        await db.execute(
+            select(
+                mine.c.id,
+                mine.c.mood_score,
+                mine.c.interaction_freq,
+                mine.c.deep_conversation,
+                mine.c.task_completed,
+                mine.c.content,
+                *flags,
+            ).select_from(anchor.outerjoin(mine, true()))
+        )
+    ).one()
+
+    my_done = row.id is not None
+    partner_done = bool(row.partner_done)
+    has_report = bool(row.has_report)
+    return {
+        "date": str(today),
+        "my_done": my_done,
+        "partner_done": partner_done,
+        "both_done": my_done and partner_done,
+        "has_report": has_report,
+        "has_solo_report": bool(row.has_solo_report) if pair_id is not None else has_report,
+        "my_checkin": {
+            "mood_score": row.mood_score,
+            "interaction_freq": row.interaction_freq,
+            "deep_conversation": row.deep_conversation,
+            "task_completed": row.task_completed,
+            "content": row.content,
+        },
+    }
+
+
+def get_today_status_stats() -> dict[str, int]:
+    return dict(_TODAY_STATUS_STATS)
@@ -1,4 +1,12 @@
-"""Signed access helpers for private uploaded files."""
+"""Signed access helpers for private uploaded files.
+
+Ownership lives in the ``uploads`` table. A row is written when a file is
+uploaded and moved to the pair when a pair check-in uses the file, so an owner
+lookup is a single keyed query. Signed URLs are cached per path and reused
+until ``UPLOAD_SIGNED_URL_REFRESH_SECONDS`` before they expire. So a list
+response signs each file once, not once per render, and clients see stable URLs
+they can cache.
+"""
 
 from __future__ import annotations
 
@@ -8,9 +16,12 @@ import hmac
 import mimetypes
 import os
 import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Iterable
 from urllib.parse import urlparse
 
-from sqlalchemy import or_, select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
@@ -19,6 +30,9 @@ UPLOAD_STORAGE_PREFIX = "/uploads/"
 UPLOAD_ACCESS_PREFIX = "/api/v1/upload/access"
 ALLOWED_UPLOAD_SUBDIRS = {"images", "voices"}
 
+_SIGNED_URL_STATS = {"hits": 0, "misses": 0, "evictions": 0}
+_SIGNED_URLS: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
 
 def public_upload_access_enabled() -> bool:
     return bool(settings.UPLOAD_PUBLIC_ACCESS_ENABLED)
@@ -49,10 +63,89 @@ def build_upload_access_url(upload_path: str | None) -> str | None:
     if not normalized or not normalized.startswith(UPLOAD_STORAGE_PREFIX):
         return upload_path
 
+    now = time.time()
+    cached = _SIGNED_URLS.get(normalized)
+    if cached is not None and cached[0] > now:
+        _SIGNED_URLS.move_to_end(normalized)
+        _SIGNED_URL_STATS["hits"] += 1
+        return cached[1]
+    _SIGNED_URL_STATS["misses"] += 1
+
     relative_path = normalized[len(UPLOAD_STORAGE_PREFIX) :]
-    expires_at = int(time.time()) + max(60, settings.UPLOAD_SIGNED_URL_EXPIRE_MINUTES * 60)
+    expires_at = int(now) + max(60, settings.UPLOAD_SIGNED_URL_EXPIRE_MINUTES * 60)
     signature = _build_signature(normalized, expires_at)
-    return f"{UPLOAD_ACCESS_PREFIX}/{relative_path}?expires={expires_at}&sig={signature}"
+    url = f"{UPLOAD_ACCESS_PREFIX}/{relative_path}?expires={expires_at}&sig={signature}"
+
+    refresh_at = expires_at - max(settings.UPLOAD_SIGNED_URL_REFRESH_SECONDS, 0)
+    max_entries = max(settings.UPLOAD_SIGNED_URL_CACHE_SIZE, 0)
+    if refresh_at > now and max_entries:
+        _SIGNED_URLS[normalized] = (refresh_at, url)
+        _SIGNED_URLS.move_to_end(normalized)
+        while len(_SIGNED_URLS) > max_entries:
+            _SIGNED_URLS.popitem(last=False)
+            _SIGNED_URL_STATS["evictions"] += 1
+    return url
+
+
+def get_signed_url_cache_stats() -> dict[str, int]:
+    return {**_SIGNED_URL_STATS, "entries": len(_SIGNED_URLS)}
+
+
+def _local_storage_paths(upload_paths: Iterable[str | None]) -> set[str]:
+    paths = set()
+    for upload_path in upload_paths:
+        normalized = normalize_upload_storage_path(upload_path)
+        if normalized and normalized.startswith(UPLOAD_STORAGE_PREFIX):
+            paths.add(normalized)
+    return paths
+
+
+def register_upload(
+    db: AsyncSession,
+    storage_path: str,
+    *,
+    owner_user_id: uuid.UUID,
+    size: int | None = None,
+) -> None:
+    """Record who owns a freshly saved file; the caller commits."""
+
+    from app.models import Upload
+
+    relative_path = storage_path[len(UPLOAD_STORAGE_PREFIX) :]
+    db.add(
+        Upload(
+            path=storage_path,
+            owner_user_id=owner_user_id,
+            kind=relative_path.split("/", 1)[0],
+            size=size,
+        )
+    )
+
+
+async def assign_uploads_to_pair(
+    db: AsyncSession,
+    upload_paths: Iterable[str | None],
+    *,
+    pair_id: uuid.UUID,
+    owner_user_id: uuid.UUID,
+) -> int:
+    """Share the owner's uploads used in a pair check-in with the whole pair."""
+
+    from app.models import Upload
+
+    paths = _local_storage_paths(upload_paths)
+    if not paths:
+        return 0
+    result = await db.execute(
+        update(Upload)
+        .where(
+            Upload.path.in_(paths),
+            Upload.owner_user_id == owner_user_id,
+            Upload.pair_id.is_(None),
+        )
+        .values(pair_id=pair_id)
+    )
+    return int(result.rowcount or 0)
 
 
 async def get_upload_owner_scope(
@@ -63,37 +156,26 @@ async def get_upload_owner_scope(
     if not normalized or not normalized.startswith(UPLOAD_STORAGE_PREFIX):
         return None
 
-    from app.models import Checkin, Pair, User
+    from app.models import Pair, Upload
 
-    user_result = await db.execute(
-        select(User).where(
-            or_(User.avatar_url == normalized, User.wechat_avatar == normalized)
+    row = (
+        await db.execute(
+            select(Upload.owner_user_id, Upload.pair_id, Pair.user_a_id, Pair.user_b_id)
+            .outerjoin(Pair, Pair.id == Upload.pair_id)
+            .where(Upload.path == normalized)
         )
-    )
-    user = user_result.scalar_one_or_none()
-    if user:
-        return {"scope": "user", "user_id": user.id, "pair_id": None}
-
-    checkin_result = await db.execute(
-        select(Checkin).where(
-            or_(Checkin.image_url == normalized, Checkin.voice_url == normalized)
-        )
-    )
-    checkin = checkin_result.scalar_one_or_none()
-    if not checkin:
+    ).first()
+    if row is None:
         return None
-
-    if checkin.pair_id is None:
-        return {"scope": "user", "user_id": checkin.user_id, "pair_id": None}
-
-    pair = await db.get(Pair, checkin.pair_id)
-    if not pair:
+    if row.pair_id is None:
+        return {"scope": "user", "user_id": row.owner_user_id, "pair_id": None}
+    if row.user_a_id is None:
         return None
     return {
         "scope": "pair",
         "user_id": None,
-        "pair_id": pair.id,
-        "member_ids": [pair.user_a_id, pair.user_b_id],
+        "pair_id": row.pair_id,
+        "member_ids": [row.user_a_id, row.user_b_id],
     }
 
 
@@ -0,0 +1,147 @@
+"""Short-lived cache of authenticated users' row data.
+
+``get_current_user`` used to SELECT the user on every authenticated request.
+Rows are now cached by user id for ``USER_CACHE_TTL_SECONDS`` in a bounded
+in-process LRU, optionally backed by Redis (``USER_CACHE_BACKEND=redis``) so
+that processes share fills and invalidations. ``password_hash`` is never
+cached; handlers that need it refresh that one attribute.
+
+Writers call ``invalidate_cached_user`` after changing a user row; the entry
+is dropped when that session commits, so a concurrent request cannot re-cache
+the old row in between. Other processes' in-process entries can still lag by
+up to the local TTL, which is why it is kept short.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import uuid
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import settings
+from app.models import User
+from app.services.tiered_cache import (
+    TieredCache,
+    build_tiered_cache,
+    invalidate_after_commit,
+    new_cache_stats,
+)
+
+logger = logging.getLogger(__name__)
+
+_UNCACHED_COLUMNS = frozenset({"password_hash"})
+_CACHED_COLUMNS = tuple(
+    column for column in User.__table__.columns if column.key not in _UNCACHED_COLUMNS
+)
+
+_USER_CACHE_STATS = new_cache_stats()
+_USER_CACHE: TieredCache | None = None
+
+
+def serialize_cached_user(user: User) -> str:
+    payload = {}
+    for column in _CACHED_COLUMNS:
+        value = getattr(user, column.key)
+        if isinstance(value, uuid.UUID):
+            value = str(value)
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        payload[column.key] = value
+    return json.dumps(payload, ensure_ascii=False)
+
+
+def _coerce(column, value: Any) -> Any:
+    if value is None:
+        return None
+    python_type = getattr(column.type, "python_type", None)
+    if python_type is uuid.UUID:
+        return uuid.UUID(str(value))
+    if python_type is datetime:
+        return datetime.fromisoformat(str(value))
+    return value
+
+
+def build_cached_user(payload: str) -> User:
+    """Rebuild a detached ``User`` that a session can adopt without a SELECT."""
+
+    data = json.loads(payload)
+    user = User(**{column.key: _coerce(column, data.get(column.key)) for column in _CACHED_COLUMNS})
+    make_transient_to_detached(user)
+    return user
+
+
+def build_user_cache(*, settings_obj=settings) -> TieredCache | None:
+    return build_tiered_cache(
+        ttl_seconds=int(getattr(settings_obj, "USER_CACHE_TTL_SECONDS", 0) or 0),
+        max_entries=int(getattr(settings_obj, "USER_CACHE_MAX_ENTRIES", 5000) or 5000),
+        backend=str(getattr(settings_obj, "USER_CACHE_BACKEND", "memory") or "memory"),
+        backend_setting="USER_CACHE_BACKEND",
+        redis_prefix=str(
+            getattr(settings_obj, "USER_CACHE_REDIS_PREFIX", "qinjian:user:")
+            or "qinjian:user:"
+        ),
+        redis_ttl_seconds=int(getattr(settings_obj, "USER_CACHE_REDIS_TTL_SECONDS", 300) or 300),
+        stats=_USER_CACHE_STATS,
+        settings_obj=settings_obj,
+    )
+
+
+def get_user_cache() -> TieredCache | None:
+    global _USER_CACHE
+    if _USER_CACHE is None:
+        _USER_CACHE = build_user_cache(settings_obj=settings)
+    return _USER_CACHE
+
+
+async def close_user_cache() -> None:
+    global _USER_CACHE
+    if _USER_CACHE is None:
+        return
+    await _USER_CACHE.close()
+    _USER_CACHE = None
+
+
+async def load_cached_user(db: AsyncSession, user_id: uuid.UUID) -> User | None:
+    """Attach the cached user to ``db``; ``None`` on a miss or backend failure."""
+
+    cache = get_user_cache()
+    if cache is None:
+        return None
+    try:
+        payload = await cache.get(str(user_id))
+    except Exception:
+        _USER_CACHE_STATS["errors"] += 1
+        logger.warning("user cache lookup failed", exc_info=True)
+        return None
+    if payload is None:
+        return None
+    return await db.merge(build_cached_user(payload), load=False)
+
+
+async def remember_user(user: User) -> None:
+    cache = get_user_cache()
+    if cache is None:
+        return
+    try:
+        await cache.set(str(user.id), serialize_cached_user(user))
+    except Exception:
+        _USER_CACHE_STATS["errors"] += 1
+        logger.warning("user cache store failed", exc_info=True)
+
+
+def invalidate_cached_user(db: AsyncSession, user_id: uuid.UUID | str) -> None:
+    """Drop the cached user once ``db`` commits the change to the row."""
+
+    cache = get_user_cache()
+    if cache is None:
+        return
+    invalidate_after_commit(db, cache, str(user_id))
+
+
+def get_user_cache_stats() -> dict[str, int]:
+    return dict(_USER_CACHE_STATS)
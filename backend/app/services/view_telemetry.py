@@ -0,0 +1,206 @@
+"""Buffered, batched sink for view telemetry.
+
+Read endpoints (timeline, playbook, plan, methodology and safety views) used to
+INSERT a ``*.viewed`` event and commit inside the GET, so every read was also a
+write transaction. ``record_relationship_event`` now hands view events to an
+in-process buffer and returns immediately. A background task writes the buffer
+with bulk INSERTs on its own session, either every
+``VIEW_TELEMETRY_FLUSH_SECONDS`` or as soon as ``VIEW_TELEMETRY_BATCH_SIZE``
+events are waiting. Idempotency keys are checked once per batch.
+
+Telemetry is best effort. The buffer is bounded by
+``VIEW_TELEMETRY_MAX_BUFFER``; events beyond it are dropped and counted, and a
+failed batch is logged and dropped instead of being retried. Shutdown flushes
+whatever is still buffered. When the sink is not running (flush interval 0,
+scripts, the job worker), view events are written synchronously as before.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import insert, select
+
+from app.core.config import settings
+from app.core.database import background_session
+from app.models import RelationshipViewEvent
+
+logger = logging.getLogger(__name__)
+
+_VIEW_COLUMNS = tuple(column.key for column in RelationshipViewEvent.__table__.columns)
+
+_TELEMETRY_STATS = {
+    "buffered": 0,
+    "written": 0,
+    "flushes": 0,
+    "deduplicated": 0,
+    "dropped": 0,
+    "failed": 0,
+}
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class ViewTelemetrySink:
+    """Accumulates view events and writes them in batches on a background task."""
+
+    def __init__(self, *, flush_seconds: float, batch_size: int, max_buffer: int):
+        self.flush_seconds = max(float(flush_seconds), 0.01)
+        self.batch_size = max(int(batch_size), 1)
+        self.max_buffer = max(int(max_buffer), self.batch_size)
+        self._buffer: list[dict[str, Any]] = []
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._flush_lock = asyncio.Lock()
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def start(self) -> None:
+        if not self.running:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    def submit(self, row: dict[str, Any]) -> bool:
+        if len(self._buffer) >= self.max_buffer:
+            _TELEMETRY_STATS["dropped"] += 1
+            return False
+        self._buffer.append(row)
+        _TELEMETRY_STATS["buffered"] += 1
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def stop(self) -> None:
+        # Let an in-flight batch finish instead of cancelling it mid-write.
+        task, self._task = self._task, None
+        if task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await task
+        await self.flush()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write everything buffered so far; returns the number of rows inserted."""
+
+        async with self._flush_lock:
+            rows, self._buffer = self._buffer, []
+            written = 0
+            for offset in range(0, len(rows), self.batch_size):
+                batch = rows[offset : offset + self.batch_size]
+                written += await self._write_batch(batch)
+            return written
+
+    async def _write_batch(self, rows: list[dict[str, Any]]) -> int:
+        async with background_session() as db:
+            try:
+                rows = await _dedupe_batch(db, rows)
+                if rows:
+                    await db.execute(insert(RelationshipViewEvent), rows)
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                _TELEMETRY_STATS["failed"] += len(rows)
+                logger.exception(
+                    "view telemetry write failed; dropped %d events", len(rows)
+                )
+                return 0
+        _TELEMETRY_STATS["flushes"] += 1
+        _TELEMETRY_STATS["written"] += len(rows)
+        return len(rows)
+
+
+async def _dedupe_batch(db, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    keys = {row["idempotency_key"] for row in rows if row["idempotency_key"]}
+    if not keys:
+        return rows
+    result = await db.execute(
+        select(RelationshipViewEvent.idempotency_key).where(
+            RelationshipViewEvent.idempotency_key.in_(keys)
+        )
+    )
+    seen = set(result.scalars().all())
+    unique = []
+    for row in rows:
+        key = row["idempotency_key"]
+        if key and key in seen:
+            _TELEMETRY_STATS["deduplicated"] += 1
+            continue
+        if key:
+            seen.add(key)
+        unique.append(row)
+    return unique
+
+
+_SINK: ViewTelemetrySink | None = None
+
+
+def get_view_telemetry_sink() -> ViewTelemetrySink | None:
+    return _SINK
+
+
+def start_view_telemetry_sink(*, settings_obj=settings) -> ViewTelemetrySink | None:
+    global _SINK
+    flush_seconds = float(getattr(settings_obj, "VIEW_TELEMETRY_FLUSH_SECONDS", 0) or 0)
+    if flush_seconds <= 0:
+        return None
+    if _SINK is None:
+        _SINK = ViewTelemetrySink(
+            flush_seconds=flush_seconds,
+            batch_size=settings_obj.VIEW_TELEMETRY_BATCH_SIZE,
+            max_buffer=settings_obj.VIEW_TELEMETRY_MAX_BUFFER,
+        )
+    _SINK.start()
+    return _SINK
+
+
+async def close_view_telemetry_sink() -> None:
+    global _SINK
+    if _SINK is None:
+        return
+    sink = _SINK
+    _SINK = None
+    await sink.stop()
+
+
+def buffer_view_event(**values: Any) -> RelationshipViewEvent | None:
+    """Queue a view event for the next batch.
+
+    Returns the (unsaved) event, or ``None`` when no sink is running and the
+    caller should write it synchronously.
+    """
+
+    sink = _SINK
+    if sink is None or not sink.running:
+        return None
+    event = RelationshipViewEvent(id=uuid.uuid4(), created_at=_utcnow(), **values)
+    sink.submit({column: getattr(event, column) for column in _VIEW_COLUMNS})
+    return event
+
+
+def get_view_telemetry_stats() -> dict[str, int]:
+    sink = _SINK
+    return {
+        **_TELEMETRY_STATS,
+        "pending": len(sink) if sink is not None else 0,
+    }
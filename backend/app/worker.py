@@ -0,0 +1,52 @@
+"""后台任务 worker 入口：python -m app.worker"""
+
+import asyncio
+import logging
+import signal
+
+from app.core.database import dispose_engines
+from app.services.job_queue import JobWorker, load_job_handlers
+from app.services.llm_cache import close_llm_cache
+from app.services.phone_code_store import close_phone_code_store
+from app.services.privacy_audit_writer import (
+    close_privacy_audit_writer,
+    start_privacy_audit_writer,
+)
+from app.services.profile_refresh import (
+    close_profile_refresh_scheduler,
+    start_profile_refresh_scheduler,
+)
+
+
+async def run_worker() -> None:
+    load_job_handlers()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows
+            pass
+
+    start_profile_refresh_scheduler()
+    start_privacy_audit_writer()
+    try:
+        await JobWorker().run_forever(stop)
+    finally:
+        await close_profile_refresh_scheduler()
+        await close_privacy_audit_writer()
+        await close_phone_code_store()
+        await close_llm_cache()
+        await dispose_engines()
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    asyncio.run(run_worker())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""测试公共夹具：每个用例使用一个全新的 SQLite 数据库。
+
+DATABASE_URL 必须在导入 app 之前设置，所以放在本文件顶部；环境里已设置时沿用，
+指向 Postgres 即可运行只在 Postgres 上有意义的用例（如 test_query_plans）。
+"""
+
+import os
+import tempfile
+import uuid
+
+_DB_DIR = tempfile.mkdtemp(prefix="qinjian-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_DB_DIR}/test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-test-secret-key-test")
+os.environ.setdefault("DEBUG", "false")
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db(anyio_backend):
+    from app.core.database import Base, async_session, dispose_engines, engine
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        async with async_session() as session:
+            yield session
+    finally:
+        await dispose_engines()
+
+
+@pytest.fixture
+async def pair(db):
+    """已激活的情侣配对，返回 (user_a, user_b, pair)。"""
+
+    from app.models import Pair, PairStatus, PairType, User
+
+    user_a = User(email=f"{uuid.uuid4().hex}@test.invalid", nickname="A", password_hash="x")
+    user_b = User(email=f"{uuid.uuid4().hex}@test.invalid", nickname="B", password_hash="x")
+    db.add_all([user_a, user_b])
+    await db.flush()
+    row = Pair(
+        user_a_id=user_a.id,
+        user_b_id=user_b.id,
+        type=PairType.COUPLE,
+        status=PairStatus.ACTIVE,
+        invite_code=uuid.uuid4().hex[:12],
+    )
+    db.add(row)
+    await db.commit()
+    return user_a, user_b, row
@@ -0,0 +1,56 @@
+"""会话上下文摘要：(created_at, id) 游标不跳过同一时间戳的消息，调用模型时不占连接。"""
+
+from datetime import datetime
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import background_engine, background_session
+from app.models import AgentChatMessage, AgentChatSession
+from app.services import agent_context
+from app.services.agent_context import fold_session_context, load_unsummarized_messages
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_fold_covers_messages_sharing_a_timestamp(db, pair, monkeypatch):
+    user_a, _, _ = pair
+    monkeypatch.setattr(settings, "AGENT_CONTEXT_RECENT_MESSAGES", 2)
+    monkeypatch.setattr(agent_context, "_FOLD_PAGE_SIZE", 2)
+    chat = AgentChatSession(user_id=user_a.id)
+    db.add(chat)
+    await db.flush()
+    # 前五条同一时间戳，第一页的最后一条与后面三条同时刻
+    same = datetime(2026, 4, 1, 9, 0, 0)
+    stamps = [same] * 5 + [datetime(2026, 4, 1, 9, 5), datetime(2026, 4, 1, 9, 6)]
+    for index, created_at in enumerate(stamps):
+        db.add(
+            AgentChatMessage(
+                session_id=chat.id, role="user", content=f"m{index}", created_at=created_at
+            )
+        )
+    await db.commit()
+
+    transcripts: list[str] = []
+    connections: list[int] = []
+
+    async def fake_completion(model, messages, **kwargs):
+        connections.append(background_engine.pool.checkedout())
+        transcripts.append(messages[0]["content"].rsplit("【新增对话】", 1)[1])
+        return f"摘要{len(transcripts)}"
+
+    monkeypatch.setattr(agent_context, "chat_completion", fake_completion)
+    async with background_session() as session:
+        chat_row = await session.get(AgentChatSession, chat.id)
+        folded = await fold_session_context(session, chat_row)
+        recent = await load_unsummarized_messages(session, chat_row, limit=50)
+
+    assert folded == 5
+    folded_names = [
+        line.removeprefix("用户：")
+        for transcript in transcripts
+        for line in transcript.strip().splitlines()
+    ]
+    assert sorted(folded_names) == [f"m{index}" for index in range(5)]
+    assert [message.content for message in recent] == ["m5", "m6"]
+    assert connections == [0] * len(transcripts)
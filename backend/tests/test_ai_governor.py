@@ -0,0 +1,118 @@
+"""模型调用准入：TPM 预算在优先级调度内分配，取消时归还预留。"""
+
+import asyncio
+
+import pytest
+
+from app.services import ai_governor
+from app.services.ai_governor import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    AIGovernor,
+)
+
+pytestmark = pytest.mark.anyio
+
+MODEL = "test-model"
+
+
+@pytest.fixture
+def short_window(monkeypatch):
+    monkeypatch.setattr(ai_governor, "_TPM_WINDOW_SECONDS", 0.1)
+
+
+async def _call(governor, order, name, *, priority, tokens=50, hold=0.0, tenant="global"):
+    async with governor.slot(
+        model=MODEL, estimated_tokens=tokens, priority=priority, tenant=tenant
+    ) as usage:
+        order.append(name)
+        await asyncio.sleep(hold)
+        usage["total_tokens"] = tokens
+
+
+async def test_interactive_call_is_admitted_before_background_under_tpm(short_window):
+    governor = AIGovernor(max_in_flight=4, tpm_limits={MODEL: 100})
+    order: list[str] = []
+
+    await _call(governor, order, "warmup", priority=PRIORITY_BACKGROUND, tokens=100)
+    background = asyncio.create_task(
+        _call(governor, order, "background", priority=PRIORITY_BACKGROUND, tokens=60)
+    )
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(
+        _call(governor, order, "interactive", priority=PRIORITY_INTERACTIVE, tokens=60)
+    )
+    await asyncio.sleep(0)
+    assert governor.queue_depth() == {PRIORITY_INTERACTIVE: 1, PRIORITY_BACKGROUND: 1}
+
+    await asyncio.wait_for(asyncio.gather(background, interactive), timeout=2)
+
+    assert order == ["warmup", "interactive", "background"]
+    assert governor.stats["tpm_waits"] == 2
+
+
+async def test_other_models_are_not_held_behind_a_blocked_model(short_window):
+    governor = AIGovernor(max_in_flight=4, tpm_limits={MODEL: 100})
+    order: list[str] = []
+
+    await _call(governor, order, "warmup", priority=PRIORITY_INTERACTIVE, tokens=100)
+    blocked = asyncio.create_task(
+        _call(governor, order, "blocked", priority=PRIORITY_INTERACTIVE, tokens=60)
+    )
+    await asyncio.sleep(0)
+    async with governor.slot(model="other-model", estimated_tokens=10_000):
+        order.append("other")
+    await asyncio.wait_for(blocked, timeout=2)
+
+    assert order == ["warmup", "other", "blocked"]
+
+
+async def test_cancelled_running_call_releases_slot_and_reservation():
+    governor = AIGovernor(max_in_flight=1, tpm_limits={MODEL: 100})
+    started = asyncio.Event()
+
+    async def hang():
+        async with governor.slot(model=MODEL, estimated_tokens=80):
+            started.set()
+            await asyncio.sleep(60)
+
+    task = asyncio.create_task(hang())
+    await started.wait()
+    assert governor._windows[MODEL].used == 80
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert governor.in_flight == 0
+    assert governor._windows[MODEL].used == 0
+
+
+async def test_cancelled_waiter_leaves_queue_and_others_proceed():
+    governor = AIGovernor(max_in_flight=1, tpm_limits={MODEL: 100})
+    order: list[str] = []
+    release = asyncio.Event()
+
+    async def holder():
+        async with governor.slot(model=MODEL, estimated_tokens=10):
+            order.append("holder")
+            await release.wait()
+
+    holding = asyncio.create_task(holder())
+    await asyncio.sleep(0)
+    doomed = asyncio.create_task(
+        _call(governor, order, "doomed", priority=PRIORITY_INTERACTIVE, tenant="a")
+    )
+    survivor = asyncio.create_task(
+        _call(governor, order, "survivor", priority=PRIORITY_BACKGROUND, tenant="b")
+    )
+    await asyncio.sleep(0)
+    doomed.cancel()
+    await asyncio.gather(doomed, return_exceptions=True)
+    assert governor.queue_depth() == {PRIORITY_INTERACTIVE: 0, PRIORITY_BACKGROUND: 1}
+
+    release.set()
+    await asyncio.wait_for(asyncio.gather(holding, survivor), timeout=2)
+
+    assert order == ["holder", "survivor"]
+    assert governor.in_flight == 0
+    assert governor._windows[MODEL].used == 60
@@ -0,0 +1,187 @@
+"""连续打卡：增量推进与全量扫描结果一致，读取接口不写库。"""
+
+import asyncio
+import random
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.database import async_session, engine
+from app.models import Checkin, CheckinStreak
+from app.rebuild_streaks import _rebuild_users
+from app.services.checkin_streak import (
+    advance_streak,
+    apply_summary,
+    load_checkin_streak,
+    record_checkin_streak,
+    summarize_checkin_dates,
+    summary_of,
+)
+
+pytestmark = pytest.mark.anyio
+
+START = date(2026, 1, 1)
+
+
+def _random_dates(rng: random.Random) -> list[date]:
+    dates = []
+    day = START + timedelta(days=rng.randrange(30))
+    for _ in range(rng.randrange(1, 60)):
+        dates.append(day)
+        roll = rng.random()
+        if roll < 0.55:
+            day += timedelta(days=1)  # 连续
+        elif roll < 0.7:
+            pass  # 同一天重复打卡
+        elif roll < 0.9:
+            day += timedelta(days=rng.randrange(2, 6))  # 断签
+        else:
+            day -= timedelta(days=rng.randrange(1, 10))  # 补录更早的日期
+    return dates
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_advance_matches_full_scan_for_random_sequences(seed):
+    rng = random.Random(seed)
+    state = CheckinStreak()
+    seen: list[date] = []
+    for day in _random_dates(rng):
+        seen.append(day)
+        # 与 record_checkin_streak 相同：无法增量合并时按历史重建
+        if not advance_streak(state, day):
+            apply_summary(state, summarize_checkin_dates(seen))
+        assert summary_of(state) == summarize_checkin_dates(seen)
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_advance_never_needs_rebuild_for_non_decreasing_dates(seed):
+    rng = random.Random(seed)
+    dates = sorted(_random_dates(rng))
+    state = CheckinStreak()
+    for day in dates:
+        assert advance_streak(state, day)
+    assert summary_of(state) == summarize_checkin_dates(dates)
+
+
+async def _streak_rows(db) -> int:
+    return await db.scalar(select(func.count()).select_from(CheckinStreak))
+
+
+async def test_load_without_state_is_read_only(db, pair):
+    user_a, _, pair_row = pair
+    today = date.today()
+    for offset in (0, 1, 3):
+        db.add(
+            Checkin(
+                pair_id=pair_row.id,
+                user_id=user_a.id,
+                content="历史打卡",
+                checkin_date=today - timedelta(days=offset),
+            )
+        )
+    await db.commit()
+
+    summary = await load_checkin_streak(db, user_id=user_a.id, pair_id=pair_row.id)
+
+    assert (summary.current_streak, summary.longest_streak, summary.total_checkins) == (2, 2, 3)
+    assert summary.streak_on(today) == 2
+    assert not db.new and not db.dirty
+    assert await _streak_rows(db) == 0
+
+
+async def test_checkin_seeds_state_from_history(db, pair):
+    user_a, _, pair_row = pair
+    today = date.today()
+    db.add(
+        Checkin(
+            pair_id=pair_row.id,
+            user_id=user_a.id,
+            content="昨天",
+            checkin_date=today - timedelta(days=1),
+        )
+    )
+    db.add(Checkin(pair_id=pair_row.id, user_id=user_a.id, content="今天", checkin_date=today))
+    await db.flush()
+
+    await record_checkin_streak(db, user_id=user_a.id, pair_id=pair_row.id, checkin_date=today)
+    await db.commit()
+
+    assert await _streak_rows(db) == 1
+    summary = await load_checkin_streak(db, user_id=user_a.id, pair_id=pair_row.id)
+    assert summary.streak_on(today) == 2 and summary.total_checkins == 2
+
+
+def _rebuild_stats() -> dict[str, int]:
+    return {"scopes": 0, "ok": 0, "missing": 0, "mismatched": 0, "written": 0}
+
+
+async def test_rebuild_seeds_missing_and_repairs_stale_rows(db, pair):
+    user_a, user_b, pair_row = pair
+    today = date.today()
+    for user, offsets in ((user_a, (0, 1, 2)), (user_b, (0, 2))):
+        for offset in offsets:
+            db.add(
+                Checkin(
+                    pair_id=pair_row.id,
+                    user_id=user.id,
+                    content="历史打卡",
+                    checkin_date=today - timedelta(days=offset),
+                )
+            )
+    await db.flush()
+    stale = await record_checkin_streak(
+        db, user_id=user_a.id, pair_id=pair_row.id, checkin_date=today
+    )
+    stale.total_checkins = 99
+    await db.commit()
+
+    stats = _rebuild_stats()
+    await _rebuild_users([user_a.id, user_b.id], verify=False, stats=stats)
+
+    assert (stats["missing"], stats["mismatched"], stats["written"]) == (1, 1, 2)
+    stats = _rebuild_stats()
+    await _rebuild_users([user_a.id, user_b.id], verify=True, stats=stats)
+    assert stats["ok"] == 2
+
+
+@pytest.mark.skipif(
+    engine.dialect.name != "postgresql",
+    reason="SQLite 没有行锁，两个写事务本来就互斥；在 Postgres 上运行",
+)
+async def test_rebuild_waits_for_concurrent_checkin_and_keeps_it(db, pair):
+    user_a, _, pair_row = pair
+    today = date.today()
+    db.add(
+        Checkin(
+            pair_id=pair_row.id,
+            user_id=user_a.id,
+            content="昨天",
+            checkin_date=today - timedelta(days=1),
+        )
+    )
+    await db.flush()
+    await record_checkin_streak(
+        db, user_id=user_a.id, pair_id=pair_row.id, checkin_date=today - timedelta(days=1)
+    )
+    await db.commit()
+
+    async with async_session() as writer:
+        writer.add(
+            Checkin(pair_id=pair_row.id, user_id=user_a.id, content="今天", checkin_date=today)
+        )
+        await writer.flush()
+        await record_checkin_streak(
+            writer, user_id=user_a.id, pair_id=pair_row.id, checkin_date=today
+        )
+        rebuild = asyncio.create_task(
+            _rebuild_users([user_a.id], verify=False, stats=_rebuild_stats())
+        )
+        await asyncio.sleep(0.3)
+        assert not rebuild.done()
+        await writer.commit()
+    await asyncio.wait_for(rebuild, timeout=5)
+
+    async with async_session() as session:
+        summary = await load_checkin_streak(session, user_id=user_a.id, pair_id=pair_row.id)
+    assert summary.total_checkins == 2 and summary.streak_on(today) == 2
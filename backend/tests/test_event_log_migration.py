@@ -0,0 +1,113 @@
+"""迁移 0023：被干预计划引用而留在 relationship_events 的浏览/隐私事件被迁出。"""
+
+import importlib.util
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import select
+
+from app.core.database import engine
+from app.models import (
+    InterventionPlan,
+    PrivacyAuditEvent,
+    PrivacyAuditEventArchive,
+    RelationshipEvent,
+    RelationshipViewEvent,
+)
+from app.services.privacy_audit import list_privacy_events
+
+pytestmark = pytest.mark.anyio
+
+MIGRATION = (
+    Path(__file__).resolve().parents[1]
+    / "alembic/versions/2026_04_27_0023_move_referenced_log_events.py"
+)
+
+
+def _load_migration():
+    spec = importlib.util.spec_from_file_location("migration_0023", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _run_upgrade(connection) -> None:
+    migration = _load_migration()
+    with Operations.context(MigrationContext.configure(connection)):
+        migration.upgrade()
+
+
+async def test_referenced_log_events_leave_relationship_events(db, pair):
+    user_a, _, pair_row = pair
+    now = datetime.utcnow().replace(microsecond=0)
+
+    def legacy(event_type: str, occurred_at: datetime) -> RelationshipEvent:
+        return RelationshipEvent(
+            pair_id=pair_row.id,
+            user_id=user_a.id,
+            event_type=event_type,
+            payload={},
+            occurred_at=occurred_at,
+        )
+
+    old_privacy = legacy("privacy.ai.chat.logged", now - timedelta(days=400))
+    recent_privacy = legacy("privacy.export.requested", now - timedelta(days=1))
+    view = legacy("report.viewed", now - timedelta(days=2))
+    business = legacy("checkin.created", now - timedelta(days=3))
+    db.add_all([old_privacy, recent_privacy, view, business])
+    db.add(
+        PrivacyAuditEventArchive(
+            user_id=user_a.id,
+            event_type="privacy.login",
+            payload={},
+            occurred_at=now - timedelta(days=200),
+        )
+    )
+    await db.flush()
+    plans = [
+        InterventionPlan(
+            pair_id=pair_row.id,
+            plan_type="repair",
+            trigger_event_id=event.id,
+            start_date=date.today(),
+        )
+        for event in (old_privacy, recent_privacy, view, business)
+    ]
+    db.add_all(plans)
+    await db.commit()
+    plan_ids = [plan.id for plan in plans]
+    user_id = user_a.id
+    keys = {
+        event.event_type: (event.id, event.occurred_at)
+        for event in (old_privacy, recent_privacy, view, business)
+    }
+
+    async with engine.begin() as conn:
+        await conn.run_sync(_run_upgrade)
+    db.expire_all()
+
+    remaining = (await db.execute(select(RelationshipEvent.id))).scalars().all()
+    assert remaining == [keys["checkin.created"][0]]
+    triggers = dict(
+        (await db.execute(select(InterventionPlan.id, InterventionPlan.trigger_event_id))).all()
+    )
+    assert [triggers[plan_id] for plan_id in plan_ids] == [
+        None,
+        None,
+        None,
+        keys["checkin.created"][0],
+    ]
+
+    # 比归档层最新一行还旧的事件进归档，其余进热表
+    assert await db.get(PrivacyAuditEventArchive, keys["privacy.ai.chat.logged"])
+    assert await db.get(PrivacyAuditEvent, keys["privacy.export.requested"])
+    assert await db.get(RelationshipViewEvent, keys["report.viewed"])
+
+    listed = await list_privacy_events(db, user_id=user_id, limit=10)
+    assert {event.id for event in listed} >= {
+        keys["privacy.ai.chat.logged"][0],
+        keys["privacy.export.requested"][0],
+    }
@@ -0,0 +1,146 @@
+"""后台任务队列：去重入队、认领令牌与心跳续租，以及任务在模型调用期间不占连接。"""
+
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.api.v1 import checkins
+from app.core.config import settings
+from app.core.database import background_engine
+from app.models import BackgroundJob, Checkin
+from app.services import job_queue
+from app.services.job_queue import (
+    JOB_STATUS_QUEUED,
+    JOB_STATUS_RUNNING,
+    JOB_STATUS_SUCCEEDED,
+    _finish_job,
+    _utcnow,
+    claim_jobs,
+    enqueue_job,
+    heartbeat_job,
+    job_handler,
+    requeue_stale_jobs,
+    run_claimed_job,
+)
+
+pytestmark = pytest.mark.anyio
+
+WORKER = "test-worker"
+
+
+async def _job(db, job_id) -> BackgroundJob:
+    return await db.get(BackgroundJob, job_id, populate_existing=True)
+
+
+async def _expire_lock(db, job_id) -> None:
+    await db.execute(
+        update(BackgroundJob)
+        .where(BackgroundJob.id == job_id)
+        .values(locked_at=_utcnow() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT_SECONDS + 5))
+    )
+    await db.commit()
+
+
+async def test_enqueue_collapses_onto_active_job_with_same_dedupe_key(db):
+    first = await enqueue_job(db, "test.noop", {"n": 1}, dedupe_key="k")
+    second = await enqueue_job(db, "test.noop", {"n": 2}, dedupe_key="k")
+    await db.commit()
+
+    assert second.id == first.id
+    count = await db.scalar(select(func.count()).select_from(BackgroundJob))
+    assert count == 1
+
+    (claimed,) = await claim_jobs(db, job_type="test.noop", worker_id=WORKER, limit=5)
+    running = await enqueue_job(db, "test.noop", dedupe_key="k")
+    await db.commit()
+    assert running.id == claimed.id
+
+    await _finish_job(claimed, worker_id=WORKER, error=None)
+    third = await enqueue_job(db, "test.noop", dedupe_key="k")
+    await db.commit()
+    assert third.id != first.id
+
+
+async def test_active_dedupe_key_is_unique_in_the_table(db):
+    await enqueue_job(db, "test.noop", dedupe_key="k")
+    db.add(BackgroundJob(job_type="test.noop", payload={}, status=JOB_STATUS_QUEUED, dedupe_key="k"))
+    with pytest.raises(IntegrityError):
+        await db.flush()
+
+
+async def test_stale_runner_cannot_finish_a_reclaimed_job(db):
+    job = await enqueue_job(db, "test.noop")
+    await db.commit()
+    (stale,) = await claim_jobs(db, job_type="test.noop", worker_id=WORKER, limit=1)
+    await _expire_lock(db, job.id)
+    assert await requeue_stale_jobs(db) == 1
+
+    (fresh,) = await claim_jobs(db, job_type="test.noop", worker_id=WORKER, limit=1)
+    assert fresh.claim_token != stale.claim_token
+
+    assert await heartbeat_job(stale) is False
+    assert await _finish_job(stale, worker_id=WORKER, error=None) is False
+    row = await _job(db, job.id)
+    assert row.status == JOB_STATUS_RUNNING
+    assert row.claim_token == fresh.claim_token
+
+    assert await _finish_job(fresh, worker_id=WORKER, error=None) is True
+    row = await _job(db, job.id)
+    assert row.status == JOB_STATUS_SUCCEEDED
+    assert row.claim_token is None
+
+
+async def test_heartbeat_keeps_long_running_job_claimed(db, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_HEARTBEAT_SECONDS", 0.02)
+    release = asyncio.Event()
+    beats = 0
+    original_heartbeat = job_queue.heartbeat_job
+
+    async def counting_heartbeat(job):
+        nonlocal beats
+        beats += 1
+        return await original_heartbeat(job)
+
+    monkeypatch.setattr(job_queue, "heartbeat_job", counting_heartbeat)
+
+    @job_handler("test.slow")
+    async def slow_job():
+        await release.wait()
+
+    job = await enqueue_job(db, "test.slow")
+    await db.commit()
+    (claimed,) = await claim_jobs(db, job_type="test.slow", worker_id=WORKER, limit=1)
+    await _expire_lock(db, job.id)
+
+    runner = asyncio.create_task(run_claimed_job(claimed, worker_id=WORKER))
+    await asyncio.sleep(0.1)
+    assert beats >= 1
+    assert await requeue_stale_jobs(db) == 0
+
+    release.set()
+    assert await runner is True
+    assert (await _job(db, job.id)).status == JOB_STATUS_SUCCEEDED
+
+
+async def test_sentiment_job_releases_connection_during_model_call(db, pair, monkeypatch):
+    user_a, _, pair_row = pair
+    checkin = Checkin(
+        pair_id=pair_row.id, user_id=user_a.id, content="今天很开心", checkin_date=date.today()
+    )
+    db.add(checkin)
+    await db.commit()
+    held = []
+
+    async def fake_analyze(content):
+        held.append(background_engine.pool.checkedout())
+        return {"score": 8.0}
+
+    monkeypatch.setattr(checkins, "analyze_sentiment", fake_analyze)
+    await checkins._run_sentiment_analysis(str(checkin.id))
+
+    assert held == [0]
+    await db.refresh(checkin)
+    assert checkin.sentiment_score == 8.0
@@ -0,0 +1,129 @@
+"""迁移链 0018→0023 在 Postgres 上的升级与回滚：事件拆表可往返，0023 明确拒绝回滚。
+
+需要一个可以清空的 Postgres 库，CI 的 query-plans 任务提供；SQLite 上跳过。
+"""
+
+import uuid
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pytest
+import sqlalchemy as sa
+from alembic import command
+from alembic.config import Config
+
+from app.core.config import settings
+from app.core.database import engine
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+pytestmark = pytest.mark.skipif(
+    engine.dialect.name != "postgresql",
+    reason="the migration chain creates Postgres enums and partitions",
+)
+
+
+@pytest.fixture
+def sync_engine():
+    bind = sa.create_engine(settings.DATABASE_URL)
+
+    def reset() -> None:
+        with bind.begin() as conn:
+            conn.execute(sa.text("DROP SCHEMA public CASCADE"))
+            conn.execute(sa.text("CREATE SCHEMA public"))
+
+    reset()
+    try:
+        yield bind
+    finally:
+        # 还给后面的用例一个空库，db 夹具会 create_all
+        reset()
+        bind.dispose()
+
+
+@pytest.fixture
+def alembic_config():
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    return config
+
+
+def _seed_legacy_events(conn) -> dict[str, uuid.UUID]:
+    """0018 时所有事件都在 relationship_events；除 unreferenced 外都被计划引用。"""
+
+    now = datetime.utcnow().replace(microsecond=0)
+    events = {
+        "privacy": ("privacy.export.requested", now - timedelta(days=1)),
+        "unreferenced": ("privacy.login", now - timedelta(days=2)),
+        "view": ("report.viewed", now - timedelta(days=3)),
+        "business": ("checkin.created", now - timedelta(days=4)),
+    }
+    ids = {name: uuid.uuid4() for name in events}
+    conn.execute(
+        sa.text(
+            "INSERT INTO relationship_events "
+            "(id, event_type, source, payload, occurred_at, created_at) "
+            "VALUES (:id, :event_type, 'system', '{}', :occurred_at, :occurred_at)"
+        ),
+        [
+            {"id": ids[name], "event_type": event_type, "occurred_at": occurred_at}
+            for name, (event_type, occurred_at) in events.items()
+        ],
+    )
+    conn.execute(
+        sa.text(
+            "INSERT INTO intervention_plans "
+            "(id, plan_type, trigger_event_id, start_date, created_at, updated_at) "
+            "VALUES (:id, 'repair', :trigger_event_id, :start_date, :now, :now)"
+        ),
+        [
+            {
+                "id": uuid.uuid4(),
+                "trigger_event_id": ids[name],
+                "start_date": date.today(),
+                "now": now,
+            }
+            for name in ("privacy", "view", "business")
+        ],
+    )
+    return ids
+
+
+def _ids(conn, table: str) -> set[uuid.UUID]:
+    return set(conn.execute(sa.text(f"SELECT id FROM {table}")).scalars())
+
+
+def test_event_log_split_round_trips_and_0023_refuses_downgrade(sync_engine, alembic_config):
+    command.upgrade(alembic_config, "0018")
+    with sync_engine.begin() as conn:
+        ids = _seed_legacy_events(conn)
+
+    command.upgrade(alembic_config, "0022")
+    with sync_engine.connect() as conn:
+        # 0019 只迁出未被计划引用的日志事件
+        assert _ids(conn, "privacy_audit_events") == {ids["unreferenced"]}
+        assert _ids(conn, "relationship_events") == {
+            ids["privacy"],
+            ids["view"],
+            ids["business"],
+        }
+
+    command.downgrade(alembic_config, "0018")
+    with sync_engine.connect() as conn:
+        assert _ids(conn, "relationship_events") == set(ids.values())
+
+    command.upgrade(alembic_config, "0023")
+    with sync_engine.connect() as conn:
+        assert _ids(conn, "relationship_events") == {ids["business"]}
+        assert _ids(conn, "privacy_audit_events") == {ids["unreferenced"], ids["privacy"]}
+        assert _ids(conn, "relationship_view_events") == {ids["view"]}
+        triggers = set(
+            conn.execute(sa.text("SELECT trigger_event_id FROM intervention_plans")).scalars()
+        )
+        assert triggers == {ids["business"], None}
+
+    with pytest.raises(RuntimeError, match="0023 is irreversible"):
+        command.downgrade(alembic_config, "0022")
+    with sync_engine.connect() as conn:
+        version = conn.execute(sa.text("SELECT version_num FROM alembic_version")).scalar()
+    assert version == "0023"
@@ -0,0 +1,105 @@
+"""配对成员缓存：成员变化提交之后才失效，提交前的并发读取不能把旧状态留在缓存里。"""
+
+import pytest
+
+from app.core.database import async_session
+from app.models import Pair, PairStatus
+from app.services import pair_access
+from app.services.pair_access import (
+    build_pair_access_cache,
+    get_pair_membership,
+    invalidate_pair_membership,
+)
+from app.services.tiered_cache import (
+    MemoryTTLCache,
+    TieredCache,
+    new_cache_stats,
+    wait_for_invalidations,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values: dict[str, str] = {}
+        self.deleted: list[str] = []
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    async def delete(self, key):
+        self.deleted.append(key)
+        self.values.pop(key, None)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = build_pair_access_cache()
+    monkeypatch.setattr(pair_access, "_PAIR_ACCESS_CACHE", cache)
+    return cache
+
+
+async def _end_pair(session, pair_id) -> None:
+    row = await session.get(Pair, pair_id)
+    row.status = PairStatus.ENDED
+    await session.flush()
+    invalidate_pair_membership(session, pair_id)
+
+
+async def test_read_between_flush_and_commit_does_not_outlive_the_commit(db, pair, cache):
+    _, _, row = pair
+
+    async with async_session() as writer:
+        await _end_pair(writer, row.id)
+
+        # 提交前的并发请求仍读到旧行，并把它写入缓存
+        async with async_session() as reader:
+            stale = await get_pair_membership(reader, row.id)
+        assert stale.status == PairStatus.ACTIVE
+        assert cache.local.get(str(row.id)) is not None
+
+        await writer.commit()
+
+    async with async_session() as reader:
+        membership = await get_pair_membership(reader, row.id)
+    assert membership.status == PairStatus.ENDED
+
+
+async def test_rollback_keeps_the_cached_membership(db, pair, cache):
+    _, _, row = pair
+    async with async_session() as reader:
+        await get_pair_membership(reader, row.id)
+
+    async with async_session() as writer:
+        await _end_pair(writer, row.id)
+        await writer.rollback()
+
+    assert cache.local.get(str(row.id)) is not None
+
+
+async def test_redis_tier_is_cleared_after_commit(db, pair, monkeypatch):
+    _, _, row = pair
+    redis = FakeRedis()
+    stats = new_cache_stats()
+    cache = TieredCache(
+        MemoryTTLCache(ttl_seconds=30, max_entries=10, stats=stats),
+        stats=stats,
+        redis_client=redis,
+        redis_ttl_seconds=300,
+    )
+    monkeypatch.setattr(pair_access, "_PAIR_ACCESS_CACHE", cache)
+    async with async_session() as reader:
+        await get_pair_membership(reader, row.id)
+
+    async with async_session() as writer:
+        await _end_pair(writer, row.id)
+        assert redis.deleted == []
+        await writer.commit()
+    await wait_for_invalidations()
+
+    assert redis.deleted == [str(row.id)]
+    assert redis.values == {}
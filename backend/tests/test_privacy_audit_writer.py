@@ -0,0 +1,158 @@
+"""隐私审计后台写入：坏行隔离、退避重试、死信文件、停机排空与分段落盘。"""
+
+import json
+import uuid
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+
+from app.models import PrivacyAuditEvent
+from app.services import privacy_audit_writer
+from app.services.privacy_audit import _privacy_event_row
+from app.services.privacy_audit_writer import (
+    _AUDIT_STATS,
+    AuditSpool,
+    PrivacyAuditWriter,
+    _read_rows,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(privacy_audit_writer, "_RETRY_BACKOFF_SECONDS", 0.01)
+    monkeypatch.setattr(privacy_audit_writer, "_AUDIT_STATS", dict.fromkeys(_AUDIT_STATS, 0))
+
+
+def _row(**overrides):
+    return {**_privacy_event_row(event_type="privacy.ai_chat", user_id=uuid.uuid4()), **overrides}
+
+
+def _builder(row):
+    return lambda: row
+
+
+async def _stored(db) -> int:
+    return await db.scalar(select(func.count()).select_from(PrivacyAuditEvent))
+
+
+def _fail_sessions(monkeypatch, times: int):
+    """让接下来 ``times`` 次写入在打开会话时抛出连接错误。"""
+
+    session = privacy_audit_writer.background_session
+    calls = {"failed": 0}
+
+    @asynccontextmanager
+    async def flaky_session():
+        if calls["failed"] < times:
+            calls["failed"] += 1
+            raise OperationalError("INSERT", {}, Exception("connection refused"))
+        async with session() as db:
+            yield db
+
+    monkeypatch.setattr(privacy_audit_writer, "background_session", flaky_session)
+    return calls
+
+
+async def test_poisoned_row_is_isolated_and_dead_lettered(db, tmp_path):
+    dead_letter = tmp_path / "dead.jsonl"
+    writer = PrivacyAuditWriter(
+        flush_seconds=60, batch_size=8, max_buffer=100, dead_letter_path=dead_letter
+    )
+    bad = _row(event_type=None)
+    for index in range(8):
+        await writer.submit(_builder(bad if index == 5 else _row()))
+
+    assert await writer.flush() == 7
+    assert await _stored(db) == 7
+    assert len(writer) == 1
+    assert privacy_audit_writer._AUDIT_STATS["split"] > 0
+
+    assert await writer.drain() == 0
+    assert len(writer) == 0
+    (line,) = dead_letter.read_text(encoding="utf-8").splitlines()
+    assert json.loads(line)["id"] == str(bad["id"])
+    assert privacy_audit_writer._AUDIT_STATS["dead_lettered"] == 1
+    assert privacy_audit_writer._AUDIT_STATS["dropped"] == 0
+
+
+async def test_transient_failure_backs_off_without_splitting(db, monkeypatch):
+    monkeypatch.setattr(privacy_audit_writer, "_RETRY_BACKOFF_SECONDS", 60)
+    calls = _fail_sessions(monkeypatch, times=1)
+    writer = PrivacyAuditWriter(flush_seconds=60, batch_size=10, max_buffer=100)
+    for _ in range(4):
+        await writer.submit(_builder(_row()))
+
+    assert await writer.flush() == 0
+    assert calls["failed"] == 1
+    assert privacy_audit_writer._AUDIT_STATS["split"] == 0
+
+    # 退避期内的下一次 flush 不会重试
+    assert await writer.flush() == 0
+    assert len(writer) == 4
+
+    for record in writer._retrying:
+        record.retry_at = 0.0
+    assert await writer.flush() == 4
+    assert await _stored(db) == 4
+
+
+async def test_stop_drains_records_through_retries(db, monkeypatch):
+    _fail_sessions(monkeypatch, times=2)
+    writer = PrivacyAuditWriter(flush_seconds=60, batch_size=10, max_buffer=100)
+    writer.start()
+    for _ in range(3):
+        await writer.submit(_builder(_row()))
+
+    await writer.stop()
+
+    assert len(writer) == 0
+    assert await _stored(db) == 3
+
+
+async def test_spool_rotates_segments_and_drops_committed_ones(tmp_path):
+    spool = AuditSpool(tmp_path, segment_rows=2)
+    rows = [_row() for _ in range(5)]
+    for row in rows:
+        spool.append(row)
+    segments = sorted(tmp_path.glob(f"{spool.stem}.*.jsonl"))
+    assert len(segments) == 3
+
+    spool.discard({rows[0]["id"], rows[1]["id"], rows[4]["id"]})
+    assert not segments[0].exists()
+    assert [row["id"] for row in _read_rows(segments[1])] == [rows[2]["id"], rows[3]["id"]]
+    assert segments[2].stat().st_size == 0
+    assert spool.pending == 2
+
+    # 仍有未提交的行：关闭时保留，留待下次启动重放
+    spool.close()
+    assert segments[1].exists()
+
+    clean = AuditSpool(tmp_path / "clean")
+    clean.append(rows[0])
+    clean.discard({rows[0]["id"]})
+    clean.close()
+    assert list((tmp_path / "clean").iterdir()) == []
+
+
+async def test_orphaned_segments_are_replayed_once(db, tmp_path):
+    dead = AuditSpool(tmp_path, segment_rows=2)
+    rows = [_row() for _ in range(3)]
+    for row in rows:
+        dead.append(row)
+    dead._handle.close()
+    dead._lock_handle.close()
+
+    writer = PrivacyAuditWriter(
+        flush_seconds=60, batch_size=10, max_buffer=100, spool=AuditSpool(tmp_path)
+    )
+    await writer._replay_orphans()
+    await writer._replay_orphans()
+    await writer.stop()
+
+    assert await _stored(db) == 3
+    assert privacy_audit_writer._AUDIT_STATS["replayed"] == 3
+    assert list(tmp_path.iterdir()) == []
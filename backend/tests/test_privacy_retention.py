@@ -0,0 +1,235 @@
+"""到期删除请求与保留清扫：上传文件只在删除事务提交成功后才从磁盘移除，清扫分块、可续跑。"""
+
+import os
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, insert, select
+
+from app.api.deps import CurrentPrincipal, get_current_user
+from app.core.config import settings
+from app.core.database import async_session
+from app.models import (
+    MaintenanceCheckpoint,
+    PrivacyAuditEvent,
+    PrivacyDeletionRequest,
+    Upload,
+    User,
+)
+from app.services import privacy_retention, user_cache
+from app.services.privacy_audit import _privacy_event_row
+from app.services.privacy_retention import (
+    RETENTION_SWEEP_CHECKPOINT,
+    _execute_user_requests_isolated,
+    _utcnow,
+    process_due_deletion_requests,
+    remove_purged_uploads,
+    run_privacy_retention_sweep,
+)
+from app.services.user_cache import build_user_cache
+
+pytestmark = pytest.mark.anyio
+
+UPLOAD_PATH = "/uploads/images/private.jpg"
+
+
+@pytest.fixture
+async def due_request(db, tmp_path, monkeypatch):
+    """一个未配对用户的到期删除请求，外加一份只属于他的本地上传文件。"""
+
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    file_path = tmp_path / "images" / "private.jpg"
+    file_path.parent.mkdir()
+    file_path.write_bytes(b"jpeg")
+
+    user = User(email=f"{uuid.uuid4().hex}@test.invalid", nickname="A", password_hash="x")
+    db.add(user)
+    await db.flush()
+    db.add(Upload(path=UPLOAD_PATH, owner_user_id=user.id, kind="images"))
+    request = PrivacyDeletionRequest(
+        user_id=user.id, scheduled_for=_utcnow() - timedelta(days=1)
+    )
+    db.add(request)
+    await db.commit()
+    return request, file_path
+
+
+async def _upload_rows(db) -> list[str]:
+    return list((await db.execute(select(Upload.path))).scalars().all())
+
+
+async def test_sequential_purge_leaves_files_until_caller_commits(db, due_request):
+    _, file_path = due_request
+
+    stats = await process_due_deletion_requests(db, concurrency=1)
+    assert stats["executed"] == 1
+    assert stats["upload_paths"] == [UPLOAD_PATH]
+    assert file_path.exists()
+
+    await db.rollback()
+    assert file_path.exists()
+    assert await _upload_rows(db) == [UPLOAD_PATH]
+
+    stats = await process_due_deletion_requests(db, concurrency=1)
+    await db.commit()
+    assert await remove_purged_uploads(stats["upload_paths"]) == 1
+    assert not file_path.exists()
+    assert await _upload_rows(db) == []
+
+
+async def test_isolated_purge_removes_files_only_after_commit(db, due_request, monkeypatch):
+    request, file_path = due_request
+    log_privacy_event = privacy_retention.log_privacy_event
+
+    async def failing_log(*args, **kwargs):
+        raise RuntimeError("audit insert failed")
+
+    monkeypatch.setattr(privacy_retention, "log_privacy_event", failing_log)
+    assert (
+        await _execute_user_requests_isolated([request.id], reviewer_id=None, review_note="x")
+        is None
+    )
+    assert file_path.exists()
+
+    monkeypatch.setattr(privacy_retention, "log_privacy_event", log_privacy_event)
+    (counts,) = await _execute_user_requests_isolated(
+        [request.id], reviewer_id=None, review_note="x"
+    )
+    assert counts["uploads"] == 1
+    assert counts["local_uploads_removed"] == 1
+    assert not file_path.exists()
+    row = await db.get(PrivacyDeletionRequest, request.id, populate_existing=True)
+    assert row.status == "executed"
+
+
+async def test_isolated_purge_evicts_cached_user_after_commit(db, due_request, monkeypatch):
+    request, _ = due_request
+    cache = build_user_cache()
+    monkeypatch.setattr(user_cache, "_USER_CACHE", cache)
+    async with async_session() as session:
+        await get_current_user(CurrentPrincipal(id=request.user_id), session)
+    assert cache.local.get(str(request.user_id)) is not None
+
+    await _execute_user_requests_isolated([request.id], reviewer_id=None, review_note="x")
+
+    assert cache.local.get(str(request.user_id)) is None
+    async with async_session() as session:
+        user = await get_current_user(CurrentPrincipal(id=request.user_id), session)
+    assert user.email.endswith("@deleted.invalid")
+    assert user.phone is None
+
+
+SWEEP_NOW = datetime(2026, 6, 1)
+
+
+async def _seed_audit_events(db, *occurred_at: datetime) -> None:
+    await db.execute(
+        insert(PrivacyAuditEvent),
+        [
+            _privacy_event_row(event_type="privacy.ai_chat", user_id=None, occurred_at=stamp)
+            for stamp in occurred_at
+        ],
+    )
+    await db.commit()
+
+
+async def _audit_event_times(db) -> list[datetime]:
+    return list(
+        (
+            await db.execute(
+                select(PrivacyAuditEvent.occurred_at).order_by(PrivacyAuditEvent.occurred_at)
+            )
+        ).scalars()
+    )
+
+
+@pytest.fixture
+def sweep_settings(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PRIVACY_AUDIT_RETENTION_DAYS", 30)
+    monkeypatch.setattr(settings, "PRIVACY_TRANSCRIPTION_TEMP_DIR", str(tmp_path / "temp"))
+    return tmp_path / "temp"
+
+
+async def test_sweep_deletes_expired_events_in_chunks(db, sweep_settings):
+    expired = [SWEEP_NOW - timedelta(days=40, hours=index) for index in range(5)]
+    fresh = [SWEEP_NOW - timedelta(days=1), SWEEP_NOW - timedelta(days=2)]
+    await _seed_audit_events(db, *expired, *fresh)
+
+    summary = await run_privacy_retention_sweep(
+        db, now=SWEEP_NOW, batch_size=2, pause_seconds=0, time_budget_seconds=0
+    )
+
+    assert summary["expired_privacy_events"] == 5
+    assert summary["completed"] is True
+    assert summary["resumed"] is False
+    # 主表 2 + 2 + 1 三块，归档表空跑一块
+    assert summary["batches"] == 4
+    assert await _audit_event_times(db) == sorted(fresh)
+    assert await db.get(MaintenanceCheckpoint, RETENTION_SWEEP_CHECKPOINT) is None
+
+
+async def test_time_budget_exit_resumes_with_the_stored_cutoff(db, sweep_settings):
+    expired = [SWEEP_NOW - timedelta(days=40, hours=index) for index in range(5)]
+    await _seed_audit_events(db, *expired)
+
+    first = await run_privacy_retention_sweep(
+        db, now=SWEEP_NOW, batch_size=2, pause_seconds=0, time_budget_seconds=1e-9
+    )
+    assert first["completed"] is False
+    assert first["batches"] == 1
+    assert first["expired_privacy_events"] == 2
+    checkpoint = await db.get(MaintenanceCheckpoint, RETENTION_SWEEP_CHECKPOINT)
+    assert checkpoint.state["cutoff"] == (SWEEP_NOW - timedelta(days=30)).isoformat()
+    assert checkpoint.state["deleted"] == 2
+
+    # 续跑时 now 已后移 10 天：按新 now 会过期、按保存的截止点不过期的行必须保留
+    in_between = SWEEP_NOW - timedelta(days=25)
+    await _seed_audit_events(db, in_between)
+    second = await run_privacy_retention_sweep(
+        db,
+        now=SWEEP_NOW + timedelta(days=10),
+        batch_size=2,
+        pause_seconds=0,
+        time_budget_seconds=0,
+    )
+
+    assert second["resumed"] is True
+    assert second["completed"] is True
+    assert second["expired_privacy_events"] == 3
+    assert await _audit_event_times(db) == [in_between]
+    assert await db.scalar(
+        select(func.count())
+        .select_from(MaintenanceCheckpoint)
+        .where(MaintenanceCheckpoint.name == RETENTION_SWEEP_CHECKPOINT)
+    ) == 0
+
+
+async def test_undeletable_temp_file_does_not_abort_the_sweep(db, pair, sweep_settings, monkeypatch):
+    actor, _, _ = pair
+    sweep_settings.mkdir()
+    stale = [sweep_settings / "locked.wav", sweep_settings / "old.wav"]
+    old_mtime = (SWEEP_NOW - timedelta(days=3)).timestamp()
+    for path in stale:
+        path.write_bytes(b"wav")
+        os.utime(path, (old_mtime, old_mtime))
+    remove = os.remove
+
+    def guarded_remove(path):
+        if path.endswith("locked.wav"):
+            raise PermissionError(13, "Permission denied", path)
+        remove(path)
+
+    monkeypatch.setattr(privacy_retention.os, "remove", guarded_remove)
+    summary = await run_privacy_retention_sweep(db, now=SWEEP_NOW, actor_user_id=actor.id)
+    await db.commit()
+
+    assert summary["stale_temp_files"] == 1
+    assert stale[0].exists()
+    assert not stale[1].exists()
+    logged = await db.scalar(
+        select(func.count())
+        .select_from(PrivacyAuditEvent)
+        .where(PrivacyAuditEvent.event_type == "privacy.retention.purged")
+    )
+    assert logged == 1
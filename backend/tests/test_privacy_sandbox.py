@@ -0,0 +1,130 @@
+"""脱敏引擎：输出与逐规则多遍替换的旧实现一致，缓存不保留原文。"""
+
+import random
+
+import pytest
+
+from app.services import privacy_sandbox
+from app.services.privacy_sandbox import (
+    EMAIL_PATTERN,
+    JWT_PATTERN,
+    LONG_NUMBER_PATTERN,
+    PHONE_PATTERN,
+    UUID_PATTERN,
+    redact_message_payload,
+    redact_sensitive_text,
+)
+
+PROSE = [
+    "今天和伴侣聊了聊工作上的压力，感觉被理解了一些。",
+    "晚饭后一起散步，讨论了周末要不要回父母家。",
+    "We talked about the move and agreed to revisit it next week.",
+    "第3次尝试冷静沟通，语气比上周好多了。",
+]
+
+# 规则相互重叠：先打码的片段会影响后续规则的匹配
+OVERLAP_CASES = [
+    "9d1408ee-86ef-4fe8-ac4f-b15002720349",
+    "eyJhbGciOi.eyJzdWIiOjEzODEyMzQ1Njc4fQ.a13812345678b",
+    "abc13812345678@qq.com",
+    "13812345678abcdef-1234-4abc-8abc-123456789abc",
+    "1381234567812345678901234@mail.co",
+    "电话13812345678，邮箱x@qq.com",
+]
+
+
+def legacy_redact_text(text: str) -> str:
+    """改造前的实现：手机号、邮箱、UUID、JWT、长数字依次整段替换。"""
+
+    if not text:
+        return text
+    redacted = PHONE_PATTERN.sub(r"\1****\2", text)
+    redacted = EMAIL_PATTERN.sub(lambda match: f"{match.group(1)}***{match.group(3)}", redacted)
+    redacted = UUID_PATTERN.sub("[UUID]", redacted)
+    redacted = JWT_PATTERN.sub("[TOKEN]", redacted)
+    redacted = LONG_NUMBER_PATTERN.sub("[LONG_NUMBER]", redacted)
+    return redacted
+
+
+def _sensitive(rng: random.Random) -> str:
+    digits = "0123456789"
+    hexdigits = "0123456789abcdef"
+    kind = rng.randrange(6)
+    if kind == 0:
+        return "1" + "".join(rng.choice(digits) for _ in range(10))
+    if kind == 1:
+        local = "".join(rng.choice("abcxyz0139._-") for _ in range(rng.randint(1, 12)))
+        return f"{local}@{rng.choice(['qq.com', 'example.cn', 'mail.co'])}"
+    if kind == 2:
+        parts = ["".join(rng.choice(hexdigits) for _ in range(n)) for n in (8, 4, 3, 3, 12)]
+        return f"{parts[0]}-{parts[1]}-4{parts[2]}-a{parts[3]}-{parts[4]}"
+    if kind == 3:
+        segment = lambda n: "".join(rng.choice("ABCdef123_-") for _ in range(n))  # noqa: E731
+        return f"eyJ{segment(12)}.{segment(20)}.{segment(16)}"
+    if kind == 4:
+        return "".join(rng.choice(digits) for _ in range(rng.randint(14, 20)))
+    return str(rng.randint(0, 99999))
+
+
+def _fuzz_text(rng: random.Random, *, pieces: int) -> str:
+    # 分隔符里有空串和规则字符集内的字符，片段经常首尾相接、互相重叠
+    separators = [" ", "，", "\n", "", "", ".", "-", "@", "a", "电话"]
+    parts = []
+    for _ in range(pieces):
+        parts.append(rng.choice(PROSE) if rng.random() < 0.4 else _sensitive(rng))
+        parts.append(rng.choice(separators))
+    return "".join(parts)
+
+
+@pytest.fixture(params=["default", "token_pass"])
+def redaction_mode(request, monkeypatch):
+    if request.param == "token_pass":
+        # 强制短文本也走按 token 定位的路径
+        monkeypatch.setattr(privacy_sandbox, "_TOKEN_PASS_MIN_LENGTH", 0)
+        monkeypatch.setattr(privacy_sandbox, "_TOKEN_PASS_LIMIT", 10_000)
+    return request.param
+
+
+@pytest.mark.parametrize("text", OVERLAP_CASES + PROSE + ["", "没有数字的文本"])
+def test_matches_legacy_on_known_cases(redaction_mode, text):
+    assert redact_sensitive_text(text) == legacy_redact_text(text)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_legacy_on_random_texts(redaction_mode, seed):
+    rng = random.Random(seed)
+    for _ in range(200):
+        text = _fuzz_text(rng, pieces=rng.randint(1, 10))
+        assert redact_sensitive_text(text) == legacy_redact_text(text), text
+
+
+def test_long_sparse_text_takes_token_pass_and_matches_legacy():
+    rng = random.Random(7)
+    for _ in range(50):
+        filler = "".join(rng.choice(PROSE) for _ in range(20))
+        text = filler + rng.choice(OVERLAP_CASES) + filler + _sensitive(rng) + filler
+        assert len(text) >= privacy_sandbox._TOKEN_PASS_MIN_LENGTH
+        assert redact_sensitive_text(text) == legacy_redact_text(text)
+
+
+def test_payload_cache_keeps_only_digests_and_redacted_output(monkeypatch):
+    monkeypatch.setattr(privacy_sandbox, "_REDACTION_CACHE", type(privacy_sandbox._REDACTION_CACHE)())
+    secret = "我的手机号 13812345678，邮箱 alice@example.com"
+    messages = [{"role": "user", "content": secret}]
+
+    first = redact_message_payload(messages, enabled=True)
+    second = redact_message_payload(messages, enabled=True)
+
+    assert first == second == [{"role": "user", "content": legacy_redact_text(secret)}]
+    cache = privacy_sandbox._REDACTION_CACHE
+    assert all(isinstance(key, bytes) and len(key) == 32 for key in cache)
+    assert secret not in cache.values()
+    assert not any("13812345678" in value or "alice@" in value for value in cache.values())
+
+
+def test_payload_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(privacy_sandbox, "_REDACTION_CACHE", type(privacy_sandbox._REDACTION_CACHE)())
+    monkeypatch.setattr(privacy_sandbox, "_REDACTION_CACHE_SIZE", 4)
+    for index in range(10):
+        redact_message_payload([{"role": "user", "content": f"第{index}条"}], enabled=True)
+    assert len(privacy_sandbox._REDACTION_CACHE) == 4
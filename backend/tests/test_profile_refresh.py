@@ -0,0 +1,96 @@
+"""画像刷新调度器：到期的范围并行刷新，并受并发上限约束。"""
+
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models import Pair, PairStatus, PairType, RelationshipProfileSnapshot, User
+from app.services import profile_refresh
+from app.services.profile_refresh import ProfileRefreshScheduler, _scope_key
+
+pytestmark = pytest.mark.anyio
+
+
+async def _create_pairs(db, count: int) -> list[Pair]:
+    pairs = []
+    for _ in range(count):
+        user_a = User(email=f"{uuid.uuid4().hex}@test.invalid", nickname="A", password_hash="x")
+        user_b = User(email=f"{uuid.uuid4().hex}@test.invalid", nickname="B", password_hash="x")
+        db.add_all([user_a, user_b])
+        await db.flush()
+        pair = Pair(
+            user_a_id=user_a.id,
+            user_b_id=user_b.id,
+            type=PairType.COUPLE,
+            status=PairStatus.ACTIVE,
+            invite_code=uuid.uuid4().hex[:12],
+        )
+        db.add(pair)
+        pairs.append(pair)
+    await db.commit()
+    return pairs
+
+
+async def test_due_scopes_refresh_concurrently_up_to_limit(db, monkeypatch):
+    pairs = await _create_pairs(db, 5)
+    refresh = profile_refresh.refresh_profile_and_plan
+    active = 0
+    peak = 0
+
+    async def tracked_refresh(session, **scope):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        try:
+            await asyncio.sleep(0.05)
+            return await refresh(session, **scope)
+        finally:
+            active -= 1
+
+    monkeypatch.setattr(profile_refresh, "refresh_profile_and_plan", tracked_refresh)
+    scheduler = ProfileRefreshScheduler(debounce_seconds=0.01, concurrency=3)
+    scheduler.start()
+    for pair in pairs:
+        scheduler.submit(_scope_key(pair.id, None))
+    await asyncio.sleep(0.02)
+    await scheduler.stop()
+
+    assert peak == 3
+    assert len(scheduler) == 0 and scheduler.in_flight == 0
+    snapshots = await db.scalar(
+        select(func.count(func.distinct(RelationshipProfileSnapshot.pair_id)))
+    )
+    assert snapshots == len(pairs)
+
+
+async def test_scope_resubmitted_while_refreshing_runs_again_afterwards(db, monkeypatch):
+    (pair,) = await _create_pairs(db, 1)
+    key = _scope_key(pair.id, None)
+    calls = 0
+    overlap = False
+    running = False
+
+    async def slow_refresh(session, **scope):
+        nonlocal calls, overlap, running
+        overlap = overlap or running
+        running = True
+        calls += 1
+        try:
+            await asyncio.sleep(0.05)
+        finally:
+            running = False
+        return None, None
+
+    monkeypatch.setattr(profile_refresh, "refresh_profile_and_plan", slow_refresh)
+    scheduler = ProfileRefreshScheduler(debounce_seconds=0.01, concurrency=3)
+    scheduler.start()
+    scheduler.submit(key)
+    await asyncio.sleep(0.03)
+    scheduler.submit(key)
+    await asyncio.sleep(0.15)
+    await scheduler.stop()
+
+    assert calls == 2
+    assert not overlap
@@ -0,0 +1,287 @@
+"""增量画像状态与全量重建的一致性校验（pair 与 solo 两种范围）。"""
+
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.core.database import async_session, engine
+from app.models import (
+    Checkin,
+    CrisisAlert,
+    CrisisLevel,
+    LongDistanceActivity,
+    RelationshipEvent,
+    RelationshipTask,
+    Report,
+    ReportStatus,
+    ReportType,
+    TaskStatus,
+)
+from app.services.profile_state import (
+    PROFILE_STATE_EVENT_TYPES,
+    apply_event_to_profile_state,
+    get_profile_state,
+)
+from app.services.relationship_intelligence import (
+    record_relationship_event,
+    refresh_profile_snapshot,
+    verify_profile_state,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+async def _assert_matches_rebuild(db, **scope) -> None:
+    check = await verify_profile_state(db, repair=False, **scope)
+    assert check == {"consistent": True, "mismatched_days": [], "repaired": False}
+
+    incremental = await refresh_profile_snapshot(db, **scope)
+    incremental_metrics = dict(incremental.metrics_json)
+    incremental_risk = dict(incremental.risk_summary)
+    rebuilt = await refresh_profile_snapshot(db, rebuild=True, **scope)
+    assert rebuilt.metrics_json == incremental_metrics
+    assert rebuilt.risk_summary == incremental_risk
+
+
+async def _emit_pair_events(db, user_a, user_b, pair) -> set[str]:
+    """为每种增量事件写入业务数据和对应事件，返回覆盖到的事件类型。"""
+
+    today = date.today()
+    yesterday = today - timedelta(days=1)
+    emitted: set[str] = set()
+
+    async def emit(event_type: str, **values) -> RelationshipEvent:
+        emitted.add(event_type)
+        return await record_relationship_event(
+            db, event_type=event_type, pair_id=pair.id, **values
+        )
+
+    for user, day, mood in ((user_a, today, 7), (user_b, yesterday, 3)):
+        checkin = Checkin(
+            pair_id=pair.id,
+            user_id=user.id,
+            content="今天聊得不错",
+            mood_score=mood,
+            interaction_freq=4,
+            interaction_initiative="me",
+            deep_conversation=True,
+            checkin_date=day,
+        )
+        db.add(checkin)
+        await db.flush()
+        await emit("checkin.created", user_id=user.id, entity_id=checkin.id)
+
+    report = Report(
+        pair_id=pair.id,
+        type=ReportType.DAILY,
+        status=ReportStatus.COMPLETED,
+        health_score=72.5,
+        report_date=yesterday,
+    )
+    db.add(report)
+    await db.flush()
+    await emit("report.completed", entity_id=report.id)
+
+    alert = CrisisAlert(pair_id=pair.id, level=CrisisLevel.MODERATE)
+    db.add(alert)
+    await db.flush()
+    await emit("crisis.raised", entity_id=alert.id)
+
+    tasks = [
+        RelationshipTask(pair_id=pair.id, title=f"任务{index}", due_date=today)
+        for index in range(3)
+    ]
+    db.add_all(tasks)
+    await db.flush()
+    await emit("task.generated", entity_id=f"{pair.id}:{today.isoformat()}")
+
+    tasks[0].status = TaskStatus.COMPLETED
+    tasks[0].completed_at = _now()
+    await db.flush()
+    await emit("task.completed", user_id=user_a.id, entity_id=tasks[0].id)
+
+    activity = LongDistanceActivity(
+        pair_id=pair.id, type="movie", title="一起看电影", created_by=user_a.id
+    )
+    db.add(activity)
+    await db.flush()
+    await emit("longdistance.activity_created", entity_id=activity.id)
+    activity.status = "completed"
+    await db.flush()
+    await emit("longdistance.activity_completed", entity_id=activity.id)
+
+    await emit(
+        "message.simulated",
+        user_id=user_a.id,
+        payload={"risk_level": "high", "conversation_goal": "repair"},
+    )
+    await emit(
+        "alignment.generated",
+        user_id=user_b.id,
+        entity_id=pair.id,
+        payload={
+            "alignment_score": 40,
+            "suggested_opening": "先说说你的感受",
+            "bridge_actions": ["散步"],
+        },
+    )
+    return emitted
+
+
+async def test_pair_incremental_state_matches_rebuild(db, pair):
+    user_a, user_b, pair_row = pair
+    # 先全量播种，之后的事件全部走增量路径
+    await refresh_profile_snapshot(db, pair_id=pair_row.id)
+    assert await get_profile_state(db, pair_id=pair_row.id, user_id=None) is not None
+
+    emitted = await _emit_pair_events(db, user_a, user_b, pair_row)
+
+    assert emitted == PROFILE_STATE_EVENT_TYPES
+    await _assert_matches_rebuild(db, pair_id=pair_row.id)
+
+
+async def test_solo_incremental_state_matches_rebuild(db, pair):
+    user_a, _, _ = pair
+    await refresh_profile_snapshot(db, user_id=user_a.id)
+
+    for offset, mood in ((0, 4), (2, 8)):
+        checkin = Checkin(
+            user_id=user_a.id,
+            content="一个人的日记",
+            mood_score=mood,
+            checkin_date=date.today() - timedelta(days=offset),
+        )
+        db.add(checkin)
+        await db.flush()
+        await record_relationship_event(
+            db, event_type="checkin.created", user_id=user_a.id, entity_id=checkin.id
+        )
+
+    report = Report(
+        user_id=user_a.id,
+        type=ReportType.SOLO,
+        status=ReportStatus.COMPLETED,
+        health_score=55.0,
+        report_date=date.today(),
+    )
+    db.add(report)
+    await db.flush()
+    await record_relationship_event(
+        db, event_type="report.completed", user_id=user_a.id, entity_id=report.id
+    )
+
+    await _assert_matches_rebuild(db, user_id=user_a.id)
+
+
+async def test_replayed_and_duplicate_events_do_not_change_state(db, pair):
+    user_a, user_b, pair_row = pair
+    await refresh_profile_snapshot(db, pair_id=pair_row.id)
+    await _emit_pair_events(db, user_a, user_b, pair_row)
+    state = await get_profile_state(db, pair_id=pair_row.id, user_id=None)
+    before = state.day_buckets
+
+    events = (
+        await db.execute(
+            select(RelationshipEvent).where(RelationshipEvent.pair_id == pair_row.id)
+        )
+    ).scalars().all()
+    for event in events:
+        await apply_event_to_profile_state(db, event)
+
+    checkin = (
+        await db.execute(select(Checkin).where(Checkin.user_id == user_a.id))
+    ).scalar_one()
+    for _ in range(2):
+        await record_relationship_event(
+            db,
+            event_type="checkin.created",
+            pair_id=pair_row.id,
+            user_id=user_a.id,
+            entity_id=checkin.id,
+            idempotency_key=f"checkin.created:{checkin.id}",
+        )
+
+    assert state.day_buckets == before
+    await _assert_matches_rebuild(db, pair_id=pair_row.id)
+
+
+async def test_verify_repairs_diverged_state(db, pair):
+    user_a, user_b, pair_row = pair
+    await refresh_profile_snapshot(db, pair_id=pair_row.id)
+    await _emit_pair_events(db, user_a, user_b, pair_row)
+
+    state = await get_profile_state(db, pair_id=pair_row.id, user_id=None)
+    today_key = date.today().isoformat()
+    corrupted = dict(state.day_buckets)
+    corrupted.pop(today_key)
+    state.day_buckets = corrupted
+    await db.flush()
+
+    check = await verify_profile_state(db, pair_id=pair_row.id, repair=False)
+    assert check["consistent"] is False
+    assert check["mismatched_days"] == [today_key]
+
+    repaired = await verify_profile_state(db, pair_id=pair_row.id)
+    assert repaired["repaired"] is True
+    await _assert_matches_rebuild(db, pair_id=pair_row.id)
+
+
+async def test_verify_seeds_missing_state(db, pair):
+    user_a, _, _ = pair
+
+    check = await verify_profile_state(db, user_id=user_a.id)
+
+    assert check["consistent"] is False
+    assert check["repaired"] is True
+    await _assert_matches_rebuild(db, user_id=user_a.id)
+
+
+async def _checkin_with_event(session, user, pair_row) -> Checkin:
+    checkin = Checkin(
+        pair_id=pair_row.id,
+        user_id=user.id,
+        content="同一时间打卡",
+        mood_score=6,
+        checkin_date=date.today(),
+    )
+    session.add(checkin)
+    await session.flush()
+    await record_relationship_event(
+        session,
+        event_type="checkin.created",
+        pair_id=pair_row.id,
+        user_id=user.id,
+        entity_id=checkin.id,
+    )
+    return checkin
+
+
+@pytest.mark.skipif(
+    engine.dialect.name != "postgresql",
+    reason="SQLite 没有行锁，两个写事务本来就互斥；在 Postgres 上运行",
+)
+async def test_concurrent_checkins_both_land_in_state(db, pair):
+    user_a, user_b, pair_row = pair
+    await refresh_profile_snapshot(db, pair_id=pair_row.id)
+    await db.commit()
+
+    async with async_session() as first, async_session() as second:
+        first_checkin = await _checkin_with_event(first, user_a, pair_row)
+        # 第二位伴侣的事件要等第一位提交后才能读到状态行
+        blocked = asyncio.create_task(_checkin_with_event(second, user_b, pair_row))
+        await asyncio.sleep(0.3)
+        assert not blocked.done()
+        await first.commit()
+        second_checkin = await asyncio.wait_for(blocked, timeout=5)
+        await second.commit()
+
+    async with async_session() as session:
+        state = await get_profile_state(session, pair_id=pair_row.id, user_id=None)
+        checkins = state.day_buckets[date.today().isoformat()]["checkins"]
+    assert set(checkins) == {str(first_checkin.id), str(second_checkin.id)}
@@ -0,0 +1,359 @@
+"""查询计划回归检查：热点查询不得全表扫描大表。
+
+按真实比例写入配对、打卡、报告、事件、预警、异地活动、通知和后台任务，
+ANALYZE 后走一遍真实代码路径（首页/历史/时间线/危机/异地接口、画像重建、
+任务认领），截获它们发出的每条 SELECT，逐条 EXPLAIN，计划树中出现对大表的
+``Seq Scan`` 即视为全表扫描。
+
+SQLite 的计划不能代表线上，所以只在 Postgres 上运行：
+DATABASE_URL=postgresql+psycopg://... python -m pytest tests/test_query_plans.py
+未配置 Postgres 时整个模块跳过。数据量可用 QUERY_PLAN_PAIRS / QUERY_PLAN_DAYS 调整。
+"""
+
+import json
+import os
+import random
+import re
+import uuid
+from datetime import date, datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy import event, insert, text
+
+from app.core.database import Base, async_session, engine
+from app.core.security import create_access_token
+from app.main import app
+from app.models import (
+    BackgroundJob,
+    Checkin,
+    CrisisAlert,
+    CrisisAlertStatus,
+    CrisisLevel,
+    LongDistanceActivity,
+    Pair,
+    PairStatus,
+    PairType,
+    Report,
+    ReportStatus,
+    ReportType,
+    User,
+    UserNotification,
+)
+from app.services.event_store import event_model
+from app.services.job_queue import claim_jobs
+from app.services.privacy_audit import list_privacy_events
+from app.services.relationship_intelligence import verify_profile_state
+
+pytestmark = [
+    pytest.mark.anyio,
+    pytest.mark.skipif(
+        engine.dialect.name != "postgresql",
+        reason="查询计划检查需要 Postgres：设置 DATABASE_URL=postgresql+psycopg://...",
+    ),
+]
+
+PAIRS = int(os.environ.get("QUERY_PLAN_PAIRS", "300"))
+DAYS = int(os.environ.get("QUERY_PLAN_DAYS", "120"))
+
+LARGE_TABLES = (
+    "background_jobs",
+    "checkins",
+    "crisis_alerts",
+    "long_distance_activities",
+    "privacy_audit_events",
+    "privacy_audit_events_archive",
+    "relationship_events",
+    "relationship_view_events",
+    "relationship_view_events_archive",
+    "reports",
+    "user_notifications",
+)
+
+EVENT_TYPES = (
+    "checkin.created",
+    "report.completed",
+    "report.viewed",
+    "timeline.viewed",
+    "message.simulated",
+    "alignment.generated",
+    "task.feedback_submitted",
+    "privacy.ai.chat.logged",
+)
+
+
+async def _insert(model, rows: list[dict]) -> None:
+    for offset in range(0, len(rows), 5000):
+        async with engine.begin() as conn:
+            await conn.execute(insert(model), rows[offset : offset + 5000])
+
+
+async def seed(pairs: int, days: int) -> tuple[dict, dict]:
+    rng = random.Random(17)
+    today = date.today()
+    now = datetime.utcnow().replace(microsecond=0)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    users, pair_rows, solo_ids = [], [], []
+    for index in range(pairs):
+        a, b, solo = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        for user_id, tag in ((a, "a"), (b, "b"), (solo, "s")):
+            users.append(
+                {
+                    "id": user_id,
+                    "email": f"plan-{index}-{tag}@example.com",
+                    "nickname": f"{tag}{index}",
+                    "password_hash": "x",
+                }
+            )
+        pair_rows.append(
+            {
+                "id": uuid.uuid4(),
+                "user_a_id": a,
+                "user_b_id": b,
+                "type": PairType.COUPLE,
+                "status": PairStatus.ACTIVE,
+                "invite_code": uuid.uuid4().hex[:12],
+            }
+        )
+        solo_ids.append(solo)
+    await _insert(User, users)
+    await _insert(Pair, pair_rows)
+
+    checkins, reports, events, alerts, activities, notifications = [], [], [], [], [], []
+    for pair in pair_rows:
+        for offset in range(days):
+            day = today - timedelta(days=offset)
+            stamp = datetime.combine(day, datetime.min.time()) + timedelta(hours=20)
+            for user_id in (pair["user_a_id"], pair["user_b_id"]):
+                if rng.random() < 0.8:
+                    checkins.append(
+                        {
+                            "pair_id": pair["id"],
+                            "user_id": user_id,
+                            "content": "今天一起散步了",
+                            "mood_score": rng.randint(1, 10),
+                            "checkin_date": day,
+                            "created_at": stamp,
+                        }
+                    )
+            reports.append(
+                {
+                    "pair_id": pair["id"],
+                    "user_id": None,
+                    "type": ReportType.DAILY,
+                    "status": ReportStatus.COMPLETED,
+                    "health_score": rng.uniform(40, 95),
+                    "content": {},
+                    "report_date": day,
+                    "created_at": stamp,
+                }
+            )
+            for event_type in rng.sample(EVENT_TYPES, 4):
+                events.append(
+                    {
+                        "pair_id": pair["id"],
+                        "user_id": pair["user_a_id"],
+                        "event_type": event_type,
+                        "payload": {},
+                        "occurred_at": stamp + timedelta(minutes=rng.randint(0, 180)),
+                        "created_at": now,
+                    }
+                )
+            if offset % 10 == 0:
+                alerts.append(
+                    {
+                        "pair_id": pair["id"],
+                        "level": CrisisLevel.MILD,
+                        "status": rng.choice(list(CrisisAlertStatus)),
+                        "created_at": stamp,
+                    }
+                )
+                activities.append(
+                    {
+                        "pair_id": pair["id"],
+                        "type": "movie",
+                        "title": "一起看电影",
+                        "status": "completed",
+                        "created_by": pair["user_a_id"],
+                        "created_at": stamp,
+                    }
+                )
+            if offset % 2 == 0:
+                notifications.append(
+                    {
+                        "user_id": pair["user_a_id"],
+                        "type": "tip",
+                        "content": "记得今天打卡",
+                        "is_read": offset > 10,
+                        "created_at": stamp,
+                    }
+                )
+    for solo in solo_ids:
+        for offset in range(days):
+            day = today - timedelta(days=offset)
+            stamp = datetime.combine(day, datetime.min.time()) + timedelta(hours=21)
+            checkins.append(
+                {
+                    "pair_id": None,
+                    "user_id": solo,
+                    "content": "一个人的日记",
+                    "mood_score": rng.randint(1, 10),
+                    "checkin_date": day,
+                    "created_at": stamp,
+                }
+            )
+            reports.append(
+                {
+                    "pair_id": None,
+                    "user_id": solo,
+                    "type": ReportType.SOLO,
+                    "status": ReportStatus.COMPLETED,
+                    "health_score": rng.uniform(40, 95),
+                    "content": {},
+                    "report_date": day,
+                    "created_at": stamp,
+                }
+            )
+    jobs = [
+        {
+            "job_type": rng.choice(("checkin.sentiment", "report.auto_daily", "report.auto_solo")),
+            "payload": {},
+            "status": "succeeded" if index % 200 else "queued",
+            "run_after": now - timedelta(minutes=rng.randint(0, 60 * 24 * days)),
+            "created_at": now,
+        }
+        for index in range(len(checkins) // 2)
+    ]
+
+    # 浏览埋点和隐私审计按事件族写入各自的日志表
+    events_by_model: dict = {}
+    for row in events:
+        events_by_model.setdefault(event_model(row["event_type"]), []).append(row)
+    for model, rows in events_by_model.items():
+        await _insert(model, rows)
+
+    for model, rows in (
+        (Checkin, checkins),
+        (Report, reports),
+        (CrisisAlert, alerts),
+        (LongDistanceActivity, activities),
+        (UserNotification, notifications),
+        (BackgroundJob, jobs),
+    ):
+        await _insert(model, rows)
+
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE"))
+
+    return pair_rows[0], {"user_id": solo_ids[0]}
+
+
+async def exercise(pair: dict, solo: dict, captured: list) -> None:
+    pair_id = str(pair["id"])
+    pair_headers = {"Authorization": f"Bearer {create_access_token(str(pair['user_a_id']))}"}
+    solo_headers = {"Authorization": f"Bearer {create_access_token(str(solo['user_id']))}"}
+    requests = [
+        (pair_headers, "/api/v1/checkins/today", {"pair_id": pair_id}),
+        (pair_headers, "/api/v1/checkins/history", {"pair_id": pair_id}),
+        (pair_headers, "/api/v1/checkins/streak", {"pair_id": pair_id}),
+        (pair_headers, "/api/v1/reports/latest", {"pair_id": pair_id}),
+        (pair_headers, "/api/v1/reports/history", {"pair_id": pair_id}),
+        (pair_headers, "/api/v1/reports/trend", {"pair_id": pair_id}),
+        (pair_headers, "/api/v1/insights/timeline", {"pair_id": pair_id}),
+        (pair_headers, f"/api/v1/crisis/status/{pair_id}", {}),
+        (pair_headers, f"/api/v1/crisis/alerts/{pair_id}", {}),
+        (pair_headers, f"/api/v1/longdistance/activities/{pair_id}", {}),
+        (pair_headers, "/api/v1/community/notifications", {}),
+        (solo_headers, "/api/v1/checkins/today", {"mode": "solo"}),
+        (solo_headers, "/api/v1/checkins/history", {"mode": "solo"}),
+        (solo_headers, "/api/v1/reports/history", {"mode": "solo"}),
+    ]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+        for headers, path, params in requests:
+            captured.append(f"-- GET {path}")
+            response = await client.get(path, params=params, headers=headers)
+            assert response.status_code < 400, f"GET {path} -> {response.status_code}: {response.text}"
+
+    async with async_session() as db:
+        captured.append("-- profile rebuild (pair)")
+        await verify_profile_state(db, pair_id=pair["id"], window_days=30, repair=False)
+        captured.append("-- profile rebuild (solo)")
+        await verify_profile_state(db, user_id=solo["user_id"], window_days=30, repair=False)
+        captured.append("-- privacy audit list")
+        await list_privacy_events(db, user_id=pair["user_a_id"], limit=20)
+        await list_privacy_events(db, limit=20)
+        captured.append("-- claim_jobs")
+        await claim_jobs(db, job_type="report.auto_daily", worker_id="plan-check", limit=5)
+        await db.rollback()
+
+
+def _postgres_full_scans(plan: dict) -> list[str]:
+    scans = []
+    stack = [plan["Plan"]]
+    while stack:
+        node = stack.pop()
+        if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") in LARGE_TABLES:
+            scans.append(f"Seq Scan on {node['Relation Name']}")
+        stack.extend(node.get("Plans", []))
+    return scans
+
+
+async def explain_all(captured: list) -> tuple[int, list[str]]:
+    violations: list[str] = []
+    checked = 0
+    label = ""
+    async with engine.connect() as conn:
+        for item in captured:
+            if isinstance(item, str):
+                label = item
+                continue
+            statement, parameters = item
+            if not statement.lstrip().upper().startswith("SELECT"):
+                continue
+            if not any(re.search(rf"\b{table}\b", statement) for table in LARGE_TABLES):
+                continue
+            checked += 1
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = result.scalar_one()
+            plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]
+            scans = _postgres_full_scans(plan)
+            if scans:
+                plan_text = json.dumps(plan["Plan"], ensure_ascii=False)[:600]
+                violations.append(f"{label} {', '.join(scans)}\n{statement.strip()}\n{plan_text}")
+    return checked, violations
+
+
+@pytest.fixture
+async def seeded(anyio_backend):
+    from app.core.database import dispose_engines
+
+    try:
+        yield await seed(PAIRS, DAYS)
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await dispose_engines()
+
+
+async def test_hot_queries_do_not_full_scan_large_tables(seeded):
+    pair, solo = seeded
+    captured: list = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        await exercise(pair, solo, captured)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    checked, violations = await explain_all(captured)
+    assert checked > 0
+    assert not violations, "\n\n".join(violations)
@@ -0,0 +1,114 @@
+"""批量记录关系事件：幂等键去重、按事件族分表写入，只有新业务事件折进画像状态。"""
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models import PrivacyAuditEvent, RelationshipEvent, RelationshipViewEvent
+from app.services import relationship_intelligence
+from app.services.relationship_intelligence import (
+    record_relationship_event,
+    record_relationship_events,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def applied(monkeypatch):
+    events: list = []
+    apply_event_to_profile_state = relationship_intelligence.apply_event_to_profile_state
+
+    async def record(db, event):
+        events.append(event)
+        await apply_event_to_profile_state(db, event)
+
+    monkeypatch.setattr(relationship_intelligence, "apply_event_to_profile_state", record)
+    return events
+
+
+async def _count(db, model) -> int:
+    return await db.scalar(select(func.count()).select_from(model))
+
+
+def _checkin_event(user, pair, key: str | None = None, **overrides) -> dict:
+    return {
+        "event_type": "checkin.created",
+        "pair_id": pair.id,
+        "user_id": user.id,
+        "entity_type": "checkin",
+        "idempotency_key": key,
+        **overrides,
+    }
+
+
+async def test_repeated_key_within_a_batch_collapses_to_one_event(db, pair, applied):
+    user_a, _, row = pair
+
+    first, second = await record_relationship_events(
+        db,
+        [
+            _checkin_event(user_a, row, "checkin:1", payload={"n": 1}),
+            _checkin_event(user_a, row, "checkin:1", payload={"n": 2}),
+        ],
+    )
+    await db.commit()
+
+    assert first is second
+    assert first.payload == {"n": 1}
+    assert await _count(db, RelationshipEvent) == 1
+    assert applied == [first]
+
+
+async def test_existing_key_returns_the_stored_row(db, pair, applied):
+    user_a, _, row = pair
+    stored = await record_relationship_event(db, **_checkin_event(user_a, row, "checkin:2"))
+    await db.commit()
+    applied.clear()
+
+    again, fresh = await record_relationship_events(
+        db,
+        [
+            _checkin_event(user_a, row, "checkin:2", payload={"retry": True}),
+            _checkin_event(user_a, row, "checkin:3"),
+        ],
+    )
+    await db.commit()
+
+    assert again.id == stored.id
+    assert again.payload != {"retry": True}
+    assert await _count(db, RelationshipEvent) == 2
+    # 已存在的事件不会被重复折进画像状态
+    assert applied == [fresh]
+
+
+async def test_mixed_batch_writes_each_family_to_its_table(db, pair, applied):
+    user_a, _, row = pair
+
+    business, privacy, view = await record_relationship_events(
+        db,
+        [
+            _checkin_event(user_a, row, "checkin:4"),
+            _checkin_event(
+                user_a, row, "privacy:4", event_type="privacy.export.requested"
+            ),
+            _checkin_event(user_a, row, "view:4", event_type="report.viewed"),
+        ],
+    )
+    await db.commit()
+
+    assert isinstance(business, RelationshipEvent)
+    assert isinstance(privacy, PrivacyAuditEvent)
+    assert isinstance(view, RelationshipViewEvent)
+    assert await _count(db, RelationshipEvent) == 1
+    assert await _count(db, PrivacyAuditEvent) == 1
+    assert await _count(db, RelationshipViewEvent) == 1
+    # 隐私与浏览事件不进画像状态
+    assert applied == [business]
+
+    # 隐私事件在自己的表里按幂等键查重
+    (privacy_again,) = await record_relationship_events(
+        db,
+        [_checkin_event(user_a, row, "privacy:4", event_type="privacy.export.requested")],
+    )
+    assert privacy_again.id == privacy.id
+    assert applied == [business]
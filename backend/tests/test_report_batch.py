@@ -0,0 +1,127 @@
+"""夜间批量报告：占位报告作为续跑检查点，分块写回重跑时报告与事件只落一次。"""
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models import (
+    Checkin,
+    CrisisAlert,
+    RelationshipEvent,
+    Report,
+    ReportStatus,
+    ReportType,
+)
+from app.services import report_batch
+from app.services.report_batch import (
+    BatchReportStats,
+    _write_chunk,
+    checkpoint_batch_reports,
+    collect_batch_report_items,
+    run_report_batch,
+)
+
+pytestmark = pytest.mark.anyio
+
+RUN_DATE = date(2026, 5, 2)
+CONTENT = {"health_score": 72, "crisis_level": "mild", "intervention": {"type": "talk"}}
+
+
+@pytest.fixture
+async def daily_inputs(db, pair):
+    """双方都在前一天打了卡的配对。"""
+
+    user_a, user_b, row = pair
+    for user in (user_a, user_b):
+        db.add(
+            Checkin(
+                pair_id=row.id,
+                user_id=user.id,
+                content=f"{user.nickname} 的打卡",
+                checkin_date=RUN_DATE - timedelta(days=1),
+            )
+        )
+    await db.commit()
+    return row
+
+
+@pytest.fixture
+def generated(monkeypatch):
+    calls: list[dict] = []
+
+    async def fake_daily_report(**kwargs):
+        calls.append(kwargs)
+        return dict(CONTENT)
+
+    monkeypatch.setattr(report_batch, "generate_daily_report", fake_daily_report)
+    return calls
+
+
+async def _count(db, model, *where) -> int:
+    return await db.scalar(select(func.count()).select_from(model).where(*where))
+
+
+async def _completed_events(db) -> int:
+    return await _count(db, RelationshipEvent, RelationshipEvent.event_type == "report.completed")
+
+
+async def test_rerunning_a_chunk_writes_reports_and_events_once(db, daily_inputs):
+    items, _ = await collect_batch_report_items(db, ReportType.DAILY, run_date=RUN_DATE)
+    await checkpoint_batch_reports(db, items)
+    (item,) = items
+    stats = BatchReportStats()
+
+    await _write_chunk([(item, dict(CONTENT))], stats)
+    # 写回成功但进程在记账前退出：同一块被再写一次
+    await _write_chunk([(item, dict(CONTENT))], stats)
+
+    assert await _count(db, Report) == 1
+    report = await db.get(Report, item.report_id, populate_existing=True)
+    assert report.status == ReportStatus.COMPLETED
+    assert report.health_score == 72
+    assert await _completed_events(db) == 1
+    assert await _count(db, CrisisAlert) == 1
+
+
+async def test_batch_rerun_skips_completed_reports(db, daily_inputs, generated):
+    first = await run_report_batch(run_date=RUN_DATE, kinds=[ReportType.DAILY], token_budget=0)
+    assert (first.planned, first.completed, first.failed) == (1, 1, 0)
+    assert generated[0]["content_a"].endswith("的打卡")
+
+    second = await run_report_batch(run_date=RUN_DATE, kinds=[ReportType.DAILY], token_budget=0)
+    assert (second.planned, second.completed) == (0, 0)
+    assert len(generated) == 1
+    assert await _count(db, Report) == 1
+    assert await _completed_events(db) == 1
+
+
+async def test_crashed_run_resumes_its_pending_reports(db, daily_inputs, generated):
+    items, _ = await collect_batch_report_items(db, ReportType.DAILY, run_date=RUN_DATE)
+    await checkpoint_batch_reports(db, items)
+    # 检查点已写入、生成前崩溃：只剩一份 PENDING 占位报告
+
+    stats = await run_report_batch(run_date=RUN_DATE, kinds=[ReportType.DAILY], token_budget=0)
+
+    assert (stats.planned, stats.resumed, stats.completed) == (1, 1, 1)
+    reports = (
+        await db.execute(select(Report).execution_options(populate_existing=True))
+    ).scalars().all()
+    assert [report.id for report in reports] == [items[0].report_id]
+    assert reports[0].status == ReportStatus.COMPLETED
+
+
+async def test_spent_token_budget_leaves_reports_pending(db, daily_inputs, monkeypatch):
+    async def expensive_report(**kwargs):
+        raise AssertionError("budget already spent")
+
+    monkeypatch.setattr(report_batch, "generate_daily_report", expensive_report)
+    items, _ = await collect_batch_report_items(db, ReportType.DAILY, run_date=RUN_DATE)
+    await checkpoint_batch_reports(db, items)
+    stats = BatchReportStats(tokens=100)
+
+    await report_batch.run_batch_items(items, stats, token_budget=50)
+
+    assert stats.skipped_budget == 1
+    report = await db.get(Report, items[0].report_id, populate_existing=True)
+    assert report.status == ReportStatus.PENDING
@@ -0,0 +1,110 @@
+"""会话级记忆化：写到依赖表的 flush、批量 DML、提交与回滚之后都要重新计算。"""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import func, select, update
+
+from app.models import RelationshipTask, User
+from app.services.request_memo import get_session_memo, session_memoized
+
+pytestmark = pytest.mark.anyio
+
+CALLS: list[str] = []
+
+
+@session_memoized(tables=frozenset({"relationship_tasks"}), refresh_on=("refresh",))
+async def count_tasks(db, *, pair_id, user_id=None, refresh: bool = False) -> int:
+    CALLS.append(str(pair_id))
+    return await db.scalar(
+        select(func.count())
+        .select_from(RelationshipTask)
+        .where(RelationshipTask.pair_id == pair_id)
+    )
+
+
+@pytest.fixture(autouse=True)
+def calls():
+    CALLS.clear()
+    return CALLS
+
+
+def _task(pair, title: str = "散步") -> RelationshipTask:
+    return RelationshipTask(pair_id=pair.id, title=title, due_date=date(2026, 5, 1))
+
+
+async def test_repeat_calls_hit_and_unrelated_flushes_keep_the_entry(db, pair, calls):
+    user_a, _, row = pair
+
+    assert await count_tasks(db, pair_id=row.id) == 0
+    assert await count_tasks(db, pair_id=str(row.id)) == 0
+    assert len(calls) == 1
+    assert get_session_memo(db).hits == 1
+
+    user_a.nickname = "改名"
+    await db.flush()
+    assert await count_tasks(db, pair_id=row.id) == 0
+    assert len(calls) == 1
+
+    # 其他参数是不同的键
+    await count_tasks(db, pair_id=row.id, user_id=user_a.id)
+    assert len(calls) == 2
+
+
+async def test_flush_touching_its_tables_recomputes(db, pair, calls):
+    _, _, row = pair
+    assert await count_tasks(db, pair_id=row.id) == 0
+
+    db.add(_task(row))
+    await db.flush()
+    assert await count_tasks(db, pair_id=row.id) == 1
+    assert len(calls) == 2
+    assert await count_tasks(db, pair_id=row.id) == 1
+    assert len(calls) == 2
+
+    # 尚未 flush 的改动同样不能读到旧结果
+    db.add(_task(row, "做饭"))
+    assert await count_tasks(db, pair_id=row.id) == 2
+    assert len(calls) == 3
+
+
+async def test_bulk_dml_recomputes_only_for_its_tables(db, pair, calls):
+    user_a, _, row = pair
+    db.add(_task(row))
+    await db.flush()
+    assert await count_tasks(db, pair_id=row.id) == 1
+
+    await db.execute(update(User).where(User.id == user_a.id).values(nickname="批量"))
+    assert await count_tasks(db, pair_id=row.id) == 1
+    assert len(calls) == 1
+
+    await db.execute(
+        update(RelationshipTask).where(RelationshipTask.pair_id == row.id).values(title="改")
+    )
+    assert await count_tasks(db, pair_id=row.id) == 1
+    assert len(calls) == 2
+
+
+async def test_commit_and_rollback_clear_the_memo(db, pair, calls):
+    _, _, row = pair
+    pair_id = row.id
+    await count_tasks(db, pair_id=pair_id)
+    await db.commit()
+    assert len(get_session_memo(db)) == 0
+    await count_tasks(db, pair_id=pair_id)
+    assert len(calls) == 2
+
+    await db.rollback()
+    assert len(get_session_memo(db)) == 0
+    await count_tasks(db, pair_id=pair_id)
+    assert len(calls) == 3
+
+
+async def test_refresh_flag_forces_recomputation_and_replaces_the_entry(db, pair, calls):
+    _, _, row = pair
+    await count_tasks(db, pair_id=row.id)
+    await count_tasks(db, pair_id=row.id, refresh=True)
+    assert len(calls) == 2
+
+    await count_tasks(db, pair_id=row.id)
+    assert len(calls) == 2
@@ -0,0 +1,67 @@
+"""今日状态 ETag：版本来自数据库，其他进程写入的报告也会让轮询拿到新数据。"""
+
+from datetime import date
+
+import pytest
+
+from app.core.database import background_session
+from app.models import Checkin, Report, ReportStatus, ReportType
+from app.services.today_status import load_today_status, today_status_etag
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_pair_etag_tracks_checkins_and_reports_written_elsewhere(db, pair):
+    user_a, user_b, pair_row = pair
+    today = date.today()
+
+    async def etag():
+        return await today_status_etag(db, viewer_id=user_a.id, pair_id=pair_row.id, today=today)
+
+    empty = await etag()
+    assert await etag() == empty
+
+    db.add(Checkin(pair_id=pair_row.id, user_id=user_b.id, content="伴侣打卡", checkin_date=today))
+    await db.commit()
+    partner_done = await etag()
+    assert partner_done != empty
+
+    # 模拟 job worker：在另一个会话里创建报告，不经过 web 进程
+    async with background_session() as worker_db:
+        worker_db.add(
+            Report(
+                pair_id=pair_row.id,
+                type=ReportType.SOLO,
+                status=ReportStatus.PENDING,
+                report_date=today,
+            )
+        )
+        await worker_db.commit()
+
+    with_report = await etag()
+    assert with_report != partner_done
+    status = await load_today_status(db, viewer_id=user_a.id, pair_id=pair_row.id, today=today)
+    assert status["partner_done"] and status["has_solo_report"]
+    assert await etag() == with_report
+
+
+async def test_solo_etag_is_scoped_to_the_viewer(db, pair):
+    user_a, user_b, _ = pair
+    today = date.today()
+
+    before = await today_status_etag(db, viewer_id=user_a.id, pair_id=None, today=today)
+    db.add(Checkin(user_id=user_b.id, content="别人的日记", checkin_date=today))
+    await db.commit()
+    assert await today_status_etag(db, viewer_id=user_a.id, pair_id=None, today=today) == before
+
+    async with background_session() as worker_db:
+        worker_db.add(
+            Report(
+                user_id=user_a.id,
+                type=ReportType.SOLO,
+                status=ReportStatus.COMPLETED,
+                report_date=today,
+            )
+        )
+        await worker_db.commit()
+    assert await today_status_etag(db, viewer_id=user_a.id, pair_id=None, today=today) != before
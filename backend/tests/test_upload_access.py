@@ -0,0 +1,133 @@
+"""上传归属与签名链接：上传时登记归属，配对打卡只能转移自己的文件，签名链接临近过期前重签。"""
+
+import uuid
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models import Pair, PairStatus, PairType, Upload
+from app.services import upload_access
+from app.services.upload_access import (
+    assign_uploads_to_pair,
+    build_scoped_upload_access_url,
+    build_upload_access_url,
+    get_upload_owner_scope,
+    register_upload,
+    verify_upload_access,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def signed_urls(monkeypatch):
+    cache: OrderedDict = OrderedDict()
+    monkeypatch.setattr(upload_access, "_SIGNED_URLS", cache)
+    return cache
+
+
+def _upload_path(kind: str = "images") -> str:
+    return f"/uploads/{kind}/{uuid.uuid4().hex}.jpg"
+
+
+async def _pair_of(db, path: str):
+    return await db.scalar(
+        select(Upload.pair_id)
+        .where(Upload.path == path)
+        .execution_options(populate_existing=True)
+    )
+
+
+async def test_register_upload_records_owner_kind_and_size(db, pair):
+    user_a, _, _ = pair
+    path = _upload_path("voices")
+
+    register_upload(db, path, owner_user_id=user_a.id, size=42)
+    await db.commit()
+
+    row = await db.get(Upload, path)
+    assert (row.owner_user_id, row.pair_id, row.kind, row.size) == (user_a.id, None, "voices", 42)
+    assert await get_upload_owner_scope(db, path) == {
+        "scope": "user",
+        "user_id": user_a.id,
+        "pair_id": None,
+    }
+
+
+async def test_assign_moves_only_the_owners_unshared_uploads(db, pair):
+    user_a, user_b, row = pair
+    other_pair = Pair(
+        user_a_id=user_a.id,
+        user_b_id=user_b.id,
+        type=PairType.BESTFRIEND,
+        status=PairStatus.ACTIVE,
+        invite_code=uuid.uuid4().hex[:12],
+    )
+    db.add(other_pair)
+    own, partners, shared = _upload_path(), _upload_path(), _upload_path()
+    register_upload(db, own, owner_user_id=user_a.id)
+    register_upload(db, partners, owner_user_id=user_b.id)
+    db.add(Upload(path=shared, owner_user_id=user_a.id, pair_id=row.id, kind="images"))
+    await db.commit()
+
+    moved = await assign_uploads_to_pair(
+        db,
+        [own, f"https://cdn.example.com{partners}?sig=x", shared, "https://other.example/a.jpg", None],
+        pair_id=other_pair.id,
+        owner_user_id=user_a.id,
+    )
+    await db.commit()
+
+    assert moved == 1
+    assert await _pair_of(db, own) == other_pair.id
+    # 别人的文件、已归属配对的文件都不能被挪走
+    assert await _pair_of(db, partners) is None
+    assert await _pair_of(db, shared) == row.id
+
+
+async def test_scoped_url_follows_pair_membership(db, pair, signed_urls):
+    user_a, user_b, row = pair
+    path = _upload_path()
+    register_upload(db, path, owner_user_id=user_a.id)
+    await db.commit()
+
+    assert await build_scoped_upload_access_url(db, path, actor_user_id=user_b.id) is None
+
+    await assign_uploads_to_pair(db, [path], pair_id=row.id, owner_user_id=user_a.id)
+    await db.commit()
+
+    assert await build_scoped_upload_access_url(db, path, actor_user_id=user_b.id)
+    assert await build_scoped_upload_access_url(db, path, actor_user_id=uuid.uuid4()) is None
+
+
+async def test_signed_url_is_reused_until_shortly_before_expiry(signed_urls, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_SIGNED_URL_EXPIRE_MINUTES", 10)
+    monkeypatch.setattr(settings, "UPLOAD_SIGNED_URL_REFRESH_SECONDS", 60)
+    clock = {"now": 1_800_000_000.0}
+    monkeypatch.setattr(upload_access.time, "time", lambda: clock["now"])
+    path = _upload_path()
+
+    first = build_upload_access_url(path)
+    clock["now"] += 539
+    assert build_upload_access_url(path) == first
+
+    # 进入过期前的刷新窗口：重新签名，新链接的有效期往后顺延
+    clock["now"] += 2
+    second = build_upload_access_url(path)
+    assert second != first
+    query = parse_qs(urlparse(second).query)
+    expires = int(query["expires"][0])
+    assert expires == int(clock["now"]) + 600
+    assert verify_upload_access(path, expires, query["sig"][0])
+
+
+async def test_signed_url_cache_is_bounded(signed_urls, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_SIGNED_URL_CACHE_SIZE", 2)
+    paths = [_upload_path() for _ in range(3)]
+    for path in paths:
+        build_upload_access_url(path)
+
+    assert list(signed_urls) == paths[1:]
@@ -0,0 +1,109 @@
+"""登录用户缓存：填充、提交后失效，以及 merge(load=False) 挂回会话后的读写。"""
+
+import pytest
+from sqlalchemy import event, select
+
+from app.api.deps import CurrentPrincipal, get_current_user
+from app.core.database import async_session, engine
+from app.models import User
+from app.services import user_cache
+from app.services.user_cache import build_user_cache, invalidate_cached_user
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = build_user_cache()
+    monkeypatch.setattr(user_cache, "_USER_CACHE", cache)
+    return cache
+
+
+@pytest.fixture
+def statements():
+    seen: list[str] = []
+
+    def record(conn, cursor, statement, *args):
+        seen.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    yield seen
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+async def _current_user(session, user_id) -> User:
+    return await get_current_user(CurrentPrincipal(id=user_id), session)
+
+
+async def test_miss_fills_cache_and_hit_skips_the_select(db, pair, cache, statements):
+    user, _, _ = pair
+
+    async with async_session() as session:
+        await _current_user(session, user.id)
+    assert cache.local.get(str(user.id)) is not None
+    assert "password_hash" not in cache.local.get(str(user.id))
+
+    statements.clear()
+    async with async_session() as session:
+        cached = await _current_user(session, user.id)
+        assert cached.email == user.email
+        assert cached in session
+    assert statements == []
+
+
+async def test_cached_user_attached_with_merge_can_be_updated(db, pair, cache):
+    user, _, _ = pair
+    async with async_session() as session:
+        await _current_user(session, user.id)
+
+    async with async_session() as session:
+        cached = await _current_user(session, user.id)
+        # 缓存里没有 password_hash，按需 refresh 读出真实值
+        await session.refresh(cached, attribute_names=["password_hash"])
+        assert cached.password_hash == "x"
+        cached.nickname = "改名了"
+        await session.flush()
+        invalidate_cached_user(session, cached.id)
+        await session.commit()
+
+    stored = await db.scalar(
+        select(User.nickname).where(User.id == user.id).execution_options(populate_existing=True)
+    )
+    assert stored == "改名了"
+    async with async_session() as session:
+        assert (await _current_user(session, user.id)).nickname == "改名了"
+
+
+async def test_read_between_flush_and_commit_does_not_outlive_the_commit(db, pair, cache):
+    user, _, _ = pair
+
+    async with async_session() as writer:
+        row = await writer.get(User, user.id)
+        row.phone = None
+        row.email = "deleted@deleted.invalid"
+        await writer.flush()
+        invalidate_cached_user(writer, user.id)
+
+        async with async_session() as reader:
+            stale = await _current_user(reader, user.id)
+        assert stale.email == user.email
+
+        await writer.commit()
+
+    async with async_session() as reader:
+        assert (await _current_user(reader, user.id)).email == "deleted@deleted.invalid"
+
+
+async def test_rollback_leaves_the_cached_user(db, pair, cache):
+    user, _, _ = pair
+    async with async_session() as session:
+        await _current_user(session, user.id)
+
+    async with async_session() as writer:
+        row = await writer.get(User, user.id)
+        row.nickname = "不会提交"
+        await writer.flush()
+        invalidate_cached_user(writer, user.id)
+        await writer.rollback()
+
+    assert cache.local.get(str(user.id)) is not None
@@ -0,0 +1,142 @@
+"""连接池基准：后台任务占用连接时，并发打卡接口的吞吐与延迟。
+
+用法：python db_pool_benchmark.py [--checkins 200] [--concurrency 20] [--holders 12] [--shared]
+
+模拟后台任务（情感分析、报告生成）拿着数据库会话等待 AI 响应的情形：
+--holders 个任务循环“取会话 -> 查询 -> 持有 --hold-ms 毫秒”，同时并发提交打卡。
+默认后台任务走 background 池；--shared 让它们和 API 请求共用 interactive 池，
+即拆分连接池之前的表现。
+
+默认使用临时 SQLite 库；设置 DATABASE_URL 指向 Postgres 可测真实连接数限制。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="qj-bench-"), "bench.sqlite3")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{DB_PATH}")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-benchmark-secret-key")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import httpx
+from sqlalchemy import text
+
+from app.core.database import (
+    Base,
+    async_session,
+    background_session,
+    dispose_engines,
+    engine,
+    get_db_pool_stats,
+)
+from app.core.security import create_access_token
+from app.main import app
+from app.models import User
+
+
+def percentile(samples: list[float], ratio: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * ratio), len(ordered) - 1)]
+
+
+async def hold_connections(session_factory, hold_seconds: float, stop: asyncio.Event) -> int:
+    rounds = 0
+    while not stop.is_set():
+        async with session_factory() as db:
+            await db.execute(text("SELECT 1"))
+            await asyncio.sleep(hold_seconds)
+        rounds += 1
+    return rounds
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_session() as db:
+        users = [
+            User(email=f"pool{i}@example.com", nickname=f"pool{i}", password_hash="x")
+            for i in range(args.checkins)
+        ]
+        db.add_all(users)
+        await db.commit()
+        tokens = [create_access_token(str(user.id)) for user in users]
+
+    stop = asyncio.Event()
+    holder_factory = async_session if args.shared else background_session
+    holders = [
+        asyncio.create_task(hold_connections(holder_factory, args.hold_ms / 1000, stop))
+        for _ in range(args.holders)
+    ]
+    await asyncio.sleep(0.2)
+
+    latencies: list[float] = []
+    failures = 0
+    semaphore = asyncio.Semaphore(args.concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://localhost", timeout=120
+    ) as client:
+
+        async def checkin(token: str) -> None:
+            nonlocal failures
+            async with semaphore:
+                started_at = time.perf_counter()
+                try:
+                    response = await client.post(
+                        "/api/v1/checkins/",
+                        params={"mode": "solo"},
+                        json={"content": "今天一起散步了", "mood_score": 3},
+                        headers={"Authorization": f"Bearer {token}"},
+                    )
+                    response.raise_for_status()
+                except Exception:
+                    failures += 1
+                    return
+                latencies.append((time.perf_counter() - started_at) * 1000)
+
+        started_at = time.perf_counter()
+        await asyncio.gather(*(checkin(token) for token in tokens))
+        elapsed = time.perf_counter() - started_at
+
+    stop.set()
+    rounds = sum(await asyncio.gather(*holders))
+    pools = get_db_pool_stats()
+    await dispose_engines()
+
+    print(f"mode: {'shared interactive pool' if args.shared else 'split role pools'}")
+    print(f"checkins: {len(latencies)} ok, {failures} failed in {elapsed:.2f}s")
+    print(f"throughput: {len(latencies) / elapsed:.1f} checkins/s")
+    if latencies:
+        print(
+            f"latency p50={statistics.median(latencies):.1f}ms "
+            f"p99={percentile(latencies, 0.99):.1f}ms max={max(latencies):.1f}ms"
+        )
+    print(f"background holder rounds: {rounds}")
+    for role, stats in pools.items():
+        print(
+            role,
+            json.dumps(
+                {
+                    key: stats.get(key)
+                    for key in ("checkouts", "timeouts", "wait_ms_avg", "wait_ms_max")
+                }
+            ),
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--checkins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--holders", type=int, default=12)
+    parser.add_argument("--hold-ms", type=int, default=200)
+    parser.add_argument("--shared", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,131 @@
+"""游标分页基准：百万级历史下，深页读取耗时与页深无关。
+
+用法：python keyset_pagination_benchmark.py [--rows 1000000] [--page-size 20] [--repeat 5]
+
+为单个用户写入 --rows 条通知（最坏情况：全部历史落在同一分页范围内），
+在不同页深处分别测量：
+- OFFSET 分页：ORDER BY created_at DESC, id DESC OFFSET n LIMIT page；
+- 游标分页：以该页深处的行生成游标，经 /community/notifications 接口读取下一页。
+OFFSET 的耗时随页深线性增长，游标分页各页深应基本持平。
+
+默认使用临时 SQLite 库；设置 DATABASE_URL 指向 Postgres 可测真实执行计划。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="qj-bench-"), "bench.sqlite3")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{DB_PATH}")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-benchmark-secret-key")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import httpx
+from sqlalchemy import insert, select
+
+from app.core.database import Base, async_session, dispose_engines, engine
+from app.core.security import create_access_token
+from app.main import app
+from app.models import User, UserNotification
+from app.services.keyset import NEXT_CURSOR_HEADER, encode_cursor
+
+ORDER = (UserNotification.created_at.desc(), UserNotification.id.desc())
+
+
+async def seed(rows: int) -> User:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_session() as db:
+        user = User(email="keyset@example.com", nickname="keyset", password_hash="x")
+        db.add(user)
+        await db.commit()
+
+    started_at = datetime(2020, 1, 1)
+    chunk = 20000
+    for offset in range(0, rows, chunk):
+        values = [
+            {
+                "id": uuid.uuid4(),
+                "user_id": user.id,
+                "type": "tip",
+                "content": f"notification {index}",
+                "is_read": index % 3 == 0,
+                "created_at": started_at + timedelta(seconds=index * 30),
+            }
+            for index in range(offset, min(offset + chunk, rows))
+        ]
+        async with engine.begin() as conn:
+            await conn.execute(insert(UserNotification), values)
+    return user
+
+
+async def timed(func, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        await func()
+        samples.append((time.perf_counter() - started_at) * 1000)
+    return statistics.median(samples)
+
+
+async def main(args: argparse.Namespace) -> None:
+    seed_started = time.perf_counter()
+    user = await seed(args.rows)
+    print(f"seeded {args.rows} notifications in {time.perf_counter() - seed_started:.1f}s")
+
+    token = create_access_token(str(user.id))
+    headers = {"Authorization": f"Bearer {token}"}
+    base = select(UserNotification).where(UserNotification.user_id == user.id)
+    depths = sorted({0, *(int(args.rows * ratio) for ratio in (0.01, 0.1, 0.5, 0.9, 0.99))})
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+        print(f"{'depth':>10} {'offset ms':>10} {'cursor ms':>10}")
+        for depth in depths:
+            async def offset_page(depth=depth):
+                async with async_session() as db:
+                    result = await db.execute(
+                        base.order_by(*ORDER).offset(depth).limit(args.page_size)
+                    )
+                    assert result.scalars().all()
+
+            cursor = None
+            if depth:
+                async with async_session() as db:
+                    anchor = (
+                        await db.execute(base.order_by(*ORDER).offset(depth - 1).limit(1))
+                    ).scalar_one()
+                cursor = encode_cursor([anchor.created_at, anchor.id])
+
+            async def cursor_page(cursor=cursor):
+                params = {"limit": args.page_size}
+                if cursor:
+                    params["cursor"] = cursor
+                response = await client.get(
+                    "/api/v1/community/notifications", params=params, headers=headers
+                )
+                response.raise_for_status()
+                assert len(response.json()) == args.page_size
+                assert NEXT_CURSOR_HEADER.lower() in response.headers
+
+            offset_ms = await timed(offset_page, args.repeat)
+            cursor_ms = await timed(cursor_page, args.repeat)
+            print(f"{depth:>10} {offset_ms:>10.2f} {cursor_ms:>10.2f}")
+
+    await dispose_engines()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
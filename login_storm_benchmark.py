@@ -0,0 +1,103 @@
+"""登录风暴基准：并发登录期间测量无关接口（/api/health）的 p50/p99 延迟。
+
+用法：python login_storm_benchmark.py [--logins 50] [--blocking]
+--blocking 把密码校验换回同步 bcrypt，用于对比改造前的表现。
+使用临时 SQLite 库，在进程内通过 ASGI 直接调用，不需要启动服务。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="qj-bench-"), "bench.sqlite3")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{DB_PATH}")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-benchmark-secret-key")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import httpx
+
+from app.api.v1 import auth
+from app.core.database import Base, async_session, engine
+from app.core.security import hash_password, verify_password
+from app.main import app
+from app.models import User
+
+PASSWORD = "benchmark-password"
+
+
+async def blocking_verify(plain: str, hashed: str) -> bool:
+    return verify_password(plain, hashed)
+
+
+def percentile(samples: list[float], ratio: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * ratio), len(ordered) - 1)]
+
+
+async def main(args: argparse.Namespace) -> None:
+    if args.blocking:
+        auth.verify_password_async = blocking_verify
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    password_hash = hash_password(PASSWORD)
+    async with async_session() as db:
+        db.add_all(
+            User(email=f"storm{i}@example.com", nickname=f"storm{i}", password_hash=password_hash)
+            for i in range(args.logins)
+        )
+        await db.commit()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+        health_latencies: list[float] = []
+        storm_done = asyncio.Event()
+
+        async def login(i: int) -> None:
+            response = await client.post(
+                "/api/v1/auth/login",
+                json={"email": f"storm{i}@example.com", "password": PASSWORD},
+            )
+            response.raise_for_status()
+
+        async def probe() -> None:
+            # 按固定节拍发请求，延迟从“本应发出”的时刻算起，避免事件循环被卡住时漏记
+            interval = 0.01
+            scheduled = time.perf_counter()
+            while not storm_done.is_set():
+                scheduled += interval
+                await asyncio.sleep(max(scheduled - time.perf_counter(), 0))
+                response = await client.get("/api/health")
+                response.raise_for_status()
+                health_latencies.append((time.perf_counter() - scheduled) * 1000)
+                scheduled = max(scheduled, time.perf_counter() - interval)
+
+        started = time.perf_counter()
+        probe_task = asyncio.create_task(probe())
+        await asyncio.gather(*(login(i) for i in range(args.logins)))
+        storm_done.set()
+        await probe_task
+        elapsed = time.perf_counter() - started
+
+    mode = "blocking" if args.blocking else "pooled"
+    print(
+        f"mode={mode} logins={args.logins} elapsed={elapsed:.2f}s "
+        f"health_samples={len(health_latencies)} "
+        f"p50={statistics.median(health_latencies):.1f}ms "
+        f"p99={percentile(health_latencies, 0.99):.1f}ms "
+        f"max={max(health_latencies):.1f}ms"
+    )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--blocking", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,203 @@
+"""脱敏引擎基准：按 token 定位后逐规则替换与整段多遍替换的吞吐（MB/s）对比及输出一致性校验。
+
+用法：python redaction_benchmark.py [--messages 40] [--repeat 20] [--fuzz 20000]
+
+对照实现为改造前的 redact_sensitive_text（手机号、邮箱、UUID、JWT、长数字五遍 sub）
+与 redact_message_payload（整表递归复制）。分别测量：
+- 纯文本：无敏感信息的中文对话、敏感信息密集的文本；
+- 消息载荷：--messages 条历史消息加一张 base64 图片，模拟 Agent 每轮重发完整历史。
+输出一致性：随机拼接敏感片段与普通文本后逐条比对，片段之间有时不加分隔符，
+覆盖规则相互重叠的情形；任何不一致都会打印并以退出码 1 结束。不访问数据库与外部服务。
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import copy
+import os
+import random
+import sys
+import time
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-benchmark-secret-key")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from app.services.privacy_sandbox import (
+    EMAIL_PATTERN,
+    JWT_PATTERN,
+    LONG_NUMBER_PATTERN,
+    PHONE_PATTERN,
+    UUID_PATTERN,
+    redact_message_payload,
+    redact_sensitive_text,
+)
+
+
+def legacy_redact_text(text: str) -> str:
+    if not text:
+        return text
+    redacted = PHONE_PATTERN.sub(r"\1****\2", text)
+    redacted = EMAIL_PATTERN.sub(lambda match: f"{match.group(1)}***{match.group(3)}", redacted)
+    redacted = UUID_PATTERN.sub("[UUID]", redacted)
+    redacted = JWT_PATTERN.sub("[TOKEN]", redacted)
+    redacted = LONG_NUMBER_PATTERN.sub("[LONG_NUMBER]", redacted)
+    return redacted
+
+
+def _legacy_value(value: Any, *, key: str | None = None) -> Any:
+    if isinstance(value, str):
+        return value if key == "url" else legacy_redact_text(value)
+    if isinstance(value, Mapping):
+        return {k: _legacy_value(v, key=k) for k, v in value.items()}
+    if isinstance(value, Sequence) and not isinstance(value, (bytes, bytearray, str)):
+        return [_legacy_value(item) for item in value]
+    return copy.deepcopy(value)
+
+
+def legacy_redact_payload(messages: list[dict]) -> list[dict]:
+    return [_legacy_value(message) for message in messages]
+
+
+PROSE = [
+    "今天和伴侣聊了聊工作上的压力，感觉被理解了一些。",
+    "晚饭后一起散步，讨论了周末要不要回父母家。",
+    "有点累，但还是完成了今天的小任务，给彼此写了一句感谢。",
+    "We talked about the move and agreed to revisit it next week.",
+    "第3次尝试冷静沟通，语气比上周好多了。",
+]
+
+
+# 规则匹配相互重叠的输入：先打码的片段会影响后续规则的匹配，输出仍须与旧实现一致
+OVERLAP_CASES = [
+    "9d1408ee-86ef-4fe8-ac4f-b15002720349",
+    "eyJhbGciOi.eyJzdWIiOjEzODEyMzQ1Njc4fQ.a13812345678b",
+    "abc13812345678@qq.com",
+]
+
+
+def _sensitive(rng: random.Random) -> str:
+    kind = rng.randrange(6)
+    if kind == 0:
+        return "1" + "".join(rng.choice("3456789") for _ in range(2)) + "".join(
+            rng.choice("0123456789") for _ in range(8)
+        )
+    if kind == 1:
+        local = "".join(rng.choice("abcxyz019._-") for _ in range(rng.randint(1, 10)))
+        return f"{local}@{rng.choice(['qq.com', 'example.cn', 'mail.co'])}"
+    if kind == 2:
+        hexdigits = "0123456789abcdef"
+        parts = ["".join(rng.choice(hexdigits) for _ in range(n)) for n in (8, 4, 3, 3, 6, 5)]
+        return f"{parts[0]}-{parts[1]}-4{parts[2]}-a{parts[3]}-{parts[4]}{rng.choice(hexdigits)}{parts[5]}"
+    if kind == 3:
+        segment = lambda n: "".join(rng.choice("ABCdef123_-") for _ in range(n))  # noqa: E731
+        return f"eyJ{segment(12)}.{segment(20)}.{segment(16)}"
+    if kind == 4:
+        return "".join(rng.choice("0123456789") for _ in range(rng.randint(15, 19)))
+    return str(rng.randint(0, 99999))
+
+
+def fuzz_texts(count: int, seed: int = 20260420) -> list[str]:
+    rng = random.Random(seed)
+    separators = [" ", "，", "\n", "：", " (", ") ", "、", "", "", ".", "-", "@"]
+    texts = []
+    for _ in range(count):
+        pieces = []
+        for _ in range(rng.randint(1, 8)):
+            pieces.append(rng.choice(PROSE) if rng.random() < 0.5 else _sensitive(rng))
+            pieces.append(rng.choice(separators))
+        texts.append("".join(pieces))
+    return texts
+
+
+def check_equivalence(texts: list[str]) -> int:
+    mismatches = 0
+    for text in texts:
+        expected, actual = legacy_redact_text(text), redact_sensitive_text(text)
+        if expected != actual:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"MISMATCH\n  input:  {text!r}\n  legacy: {expected!r}\n  new:    {actual!r}")
+    return mismatches
+
+
+def build_history(length: int, image_bytes: int) -> list[dict]:
+    rng = random.Random(7)
+    image = base64.b64encode(os.urandom(image_bytes)).decode("ascii")
+    messages: list[dict] = [{"role": "system", "content": "你是一名关系陪伴助手。" * 40}]
+    for index in range(length):
+        text = " ".join(rng.choice(PROSE) for _ in range(6))
+        if index % 5 == 0:
+            text += f" 联系我 {_sensitive(rng)}"
+        messages.append({"role": "user" if index % 2 == 0 else "assistant", "content": text})
+    messages.append(
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": "帮我看看这张截图，电话 13812345678"},
+                {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{image}"}},
+            ],
+        }
+    )
+    return messages
+
+
+def payload_size(messages: list[dict]) -> int:
+    total = 0
+    for message in messages:
+        content = message["content"]
+        parts = content if isinstance(content, list) else [{"text": content}]
+        for part in parts:
+            total += len(str(part.get("text") or part.get("image_url", {}).get("url", "")).encode())
+    return total
+
+
+def throughput(func, inputs: list, size_bytes: int, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for item in inputs:
+            func(item)
+    elapsed = time.perf_counter() - started
+    return size_bytes * repeat / elapsed / 1_000_000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=40, help="载荷中的历史消息条数")
+    parser.add_argument("--repeat", type=int, default=20, help="每项测量的重复轮数")
+    parser.add_argument("--fuzz", type=int, default=20000, help="一致性校验的随机文本数")
+    args = parser.parse_args()
+
+    fuzz = fuzz_texts(args.fuzz)
+    mismatches = check_equivalence(fuzz + PROSE + OVERLAP_CASES)
+    print(f"equivalence: {len(fuzz) + len(PROSE) + len(OVERLAP_CASES)} texts, {mismatches} mismatches")
+
+    prose = [" ".join(PROSE) * 20 for _ in range(50)]
+    dense = fuzz[:2000]
+    print(f"{'workload':<22} {'legacy MB/s':>12} {'token-pass MB/s':>17} {'speedup':>8}")
+    for name, texts in (("prose", prose), ("pii-dense", dense)):
+        size = sum(len(text.encode()) for text in texts)
+        old = throughput(legacy_redact_text, texts, size, args.repeat)
+        new = throughput(redact_sensitive_text, texts, size, args.repeat)
+        print(f"{name:<22} {old:>12.1f} {new:>17.1f} {new / old:>7.1f}x")
+
+    history = build_history(args.messages, image_bytes=512 * 1024)
+    size = payload_size(history)
+    expected = legacy_redact_payload(history)
+    actual = redact_message_payload(history, enabled=True)
+    if expected != actual:
+        mismatches += 1
+        print("MISMATCH in message payload redaction")
+    old = throughput(legacy_redact_payload, [history], size, args.repeat)
+    new = throughput(
+        lambda messages: redact_message_payload(messages, enabled=True), [history], size, args.repeat
+    )
+    label = f"payload ({args.messages} msgs)"
+    print(f"{label:<22} {old:>12.1f} {new:>17.1f} {new / old:>7.1f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -533,6 +533,48 @@ class ApiClient {
         return this.request('POST', `/agent/sessions/${sessionId}/chat`, { content });
     }
 
+    async chatWithAgentStream(sessionId, content, onEvent = () => {}) {
+        const headers = { 'Content-Type': 'application/json' };
+        if (this.token) {
+            headers.Authorization = `Bearer ${this.token}`;
+        }
+
+        const response = await fetch(`${API_ROOT}/agent/sessions/${sessionId}/chat/stream`, {
+            method: 'POST',
+            headers,
+            body: JSON.stringify({ content }),
+        });
+        if (!response.ok || !response.body) {
+            throw new Error('AI 服务暂时不可用，请稍后再试');
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let result = null;
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) {
+                break;
+            }
+            buffer += decoder.decode(value, { stream: true });
+            const frames = buffer.split('\n\n');
+            buffer = frames.pop();
+            for (const frame of frames) {
+                const event = frame.match(/^event: (.*)$/m)?.[1] || 'message';
+                const data = JSON.parse(frame.match(/^data: (.*)$/m)?.[1] || '{}');
+                if (event === 'error') {
+                    throw new Error(data.detail || 'AI 服务暂时不可用，请稍后再试');
+                }
+                if (event === 'done') {
+                    result = data;
+                }
+                onEvent(event, data);
+            }
+        }
+        return result;
+    }
+
     async simulateRelationshipMessage(pairId, draft) {
         return this.request('POST', `/agent/simulate-message?pair_id=${pairId}`, { draft });
     }